@@ -0,0 +1,245 @@
+"""
+Almacenamiento diferencial de LogAuditoria y reconstrucción de estado.
+
+En modo 'diferencial' (settings.AUDITORIA_GLOBAL['ALMACENAMIENTO']) un UPDATE
+ya no guarda dos fotos completas del registro: solo guarda en `cambios`
+los campos modificados como {campo: [valor_anterior, valor_nuevo]}.
+
+Para poder reconstruir sin recorrer toda la historia, cada
+CHECKPOINT_CADA updates de un mismo registro se guarda una foto completa
+en `datos_nuevos` con `es_checkpoint=True`. Los CREATE siempre son
+checkpoint. El conteo vive en memoria del proceso (LRU): tras un reinicio,
+el primer update de cada registro emite un checkpoint, lo cual es seguro.
+
+Las filas históricas (modo 'completo') tienen `datos_nuevos` completo y se
+tratan también como checkpoint al reconstruir.
+
+Eventos perdidos: si el escritor (AuditoriaGlobal/escritor.py) descarta un
+evento (cola llena o error de escritura), el siguiente delta de ese registro
+se aplicaría sobre un eslabón faltante. Por eso cada delta viaja con la foto
+completa en la llave privada FOTO (se quita antes del INSERT) y el escritor
+reporta los eventos que no escribió con `registrar_perdidos()`: el siguiente
+evento de cada uno de esos registros se escribe como checkpoint.
+"""
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+# Llave privada del evento con la foto completa de un delta (no es campo de LogAuditoria)
+FOTO = '_foto'
+
+
+def _config():
+    config = getattr(settings, 'AUDITORIA_GLOBAL', {}) or {}
+    return {
+        'ALMACENAMIENTO': config.get('ALMACENAMIENTO', 'completo'),
+        'CHECKPOINT_CADA': max(int(config.get('CHECKPOINT_CADA', 20)), 1),
+        'CHECKPOINT_LRU': int(config.get('CHECKPOINT_LRU', 50000)),
+    }
+
+
+def modo_diferencial():
+    return _config()['ALMACENAMIENTO'] == 'diferencial'
+
+
+class _ContadorCheckpoints:
+    """Cuenta updates desde el último checkpoint por (tabla, registro_id)."""
+
+    def __init__(self):
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def requiere_checkpoint(self, llave, cada, maxsize):
+        """
+        Incrementa el contador del registro y dice si toca checkpoint.
+        Un registro desconocido (nunca visto o expulsado del LRU) siempre
+        recibe checkpoint.
+        """
+        with self._lock:
+            actual = self._datos.get(llave)
+            if actual is None or actual + 1 >= cada:
+                self._datos[llave] = 0
+                checkpoint = True
+            else:
+                self._datos[llave] = actual + 1
+                checkpoint = False
+            self._datos.move_to_end(llave)
+            while len(self._datos) > maxsize:
+                self._datos.popitem(last=False)
+            return checkpoint
+
+    def reiniciar(self, llave):
+        with self._lock:
+            self._datos[llave] = 0
+            self._datos.move_to_end(llave)
+
+    def olvidar(self, llave):
+        """El próximo update del registro recibe checkpoint."""
+        with self._lock:
+            self._datos.pop(llave, None)
+
+
+_contador = _ContadorCheckpoints()
+
+# (tabla, registro_id) con un evento descartado y sin checkpoint escrito desde entonces
+_perdidos = set()
+_perdidos_lock = threading.Lock()
+
+
+def calcular_cambios(anterior, nuevo):
+    """Devuelve {campo: [anterior, nuevo]} solo para los campos que cambiaron."""
+    anterior = anterior or {}
+    return {
+        campo: [anterior.get(campo), valor]
+        for campo, valor in nuevo.items()
+        if anterior.get(campo) != valor
+    }
+
+
+def payload_create(tabla, registro_id, nuevo):
+    """Campos de LogAuditoria para un CREATE (siempre foto completa)."""
+    if modo_diferencial():
+        _contador.reiniciar((tabla, registro_id))
+        return {'datos_anteriores': None, 'datos_nuevos': nuevo, 'cambios': None, 'es_checkpoint': True}
+    return {'datos_anteriores': None, 'datos_nuevos': nuevo}
+
+
+def payload_update(tabla, registro_id, anterior, nuevo):
+    """
+    Campos de LogAuditoria para un UPDATE.
+    En modo diferencial siempre se guardan los `cambios`; la foto completa
+    en `datos_nuevos` solo viaja en los checkpoints.
+    """
+    if not modo_diferencial():
+        return {'datos_anteriores': anterior, 'datos_nuevos': nuevo}
+
+    config = _config()
+    cambios = calcular_cambios(anterior, nuevo)
+    # Sin foto anterior no hay delta confiable: se fuerza checkpoint
+    checkpoint = anterior is None or _contador.requiere_checkpoint(
+        (tabla, registro_id), config['CHECKPOINT_CADA'], config['CHECKPOINT_LRU']
+    )
+    payload = {
+        'datos_anteriores': None,
+        'datos_nuevos': nuevo if checkpoint else None,
+        'cambios': cambios,
+        'es_checkpoint': checkpoint,
+    }
+    if not checkpoint:
+        payload[FOTO] = nuevo
+    return payload
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Eventos perdidos
+# ──────────────────────────────────────────────────────────────────────────────
+def registrar_perdidos(eventos):
+    """
+    Marca los registros de `eventos` (no escritos) para que su siguiente
+    evento sea checkpoint: tanto los ya encolados como los que aún no se generan.
+    """
+    llaves = {(evento.get('tabla'), evento.get('registro_id')) for evento in eventos}
+    with _perdidos_lock:
+        _perdidos.update(llaves)
+    for llave in llaves:
+        _contador.olvidar(llave)
+
+
+def preparar_para_escritura(evento):
+    """
+    kwargs de LogAuditoria para `evento`: sin la llave FOTO y, si el registro
+    perdió un evento anterior, convertido en checkpoint con su foto completa.
+    """
+    foto = evento.get(FOTO)
+    campos = {clave: valor for clave, valor in evento.items() if clave != FOTO}
+    llave = (campos.get('tabla'), campos.get('registro_id'))
+    with _perdidos_lock:
+        if llave not in _perdidos:
+            return campos
+        if campos.get('accion') != 'UPDATE' or campos.get('es_checkpoint') or foto is not None:
+            _perdidos.discard(llave)
+    if campos.get('accion') == 'UPDATE' and not campos.get('es_checkpoint') and foto is not None:
+        campos['datos_nuevos'] = foto
+        campos['es_checkpoint'] = True
+    return campos
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Reconstrucción
+# ──────────────────────────────────────────────────────────────────────────────
+def _es_foto_completa(log):
+    """Checkpoint explícito, CREATE, o fila histórica en modo completo."""
+    if log['accion'] == 'DELETE':
+        return False
+    return bool(log['es_checkpoint']) or (log['cambios'] is None and log['datos_nuevos'] is not None)
+
+
+def reconstruir_estado(tabla, registro_id, momento):
+    """
+    Reconstruye el estado de un registro tal como estaba en `momento`.
+
+    Recorre los logs del registro hacia atrás desde `momento` hasta la foto
+    completa más reciente y aplica hacia adelante los deltas posteriores.
+
+    Retorna un dict:
+      - existe:            False si no había sido creado o ya estaba eliminado
+      - estado:            dict de campos (o None)
+      - checkpoint_id:     id del log usado como base (o None)
+      - deltas_aplicados:  cantidad de deltas aplicados sobre la base
+      - ultimo_log_id:     id del log más reciente considerado
+    """
+    from .models import LogAuditoria
+
+    logs = LogAuditoria.objects.filter(
+        tabla=tabla,
+        registro_id=str(registro_id),
+        fecha__lte=momento,
+    ).order_by('-fecha', '-id').values(
+        'id', 'accion', 'datos_anteriores', 'datos_nuevos', 'cambios', 'es_checkpoint'
+    )
+
+    resultado = {
+        'existe': False,
+        'estado': None,
+        'checkpoint_id': None,
+        'deltas_aplicados': 0,
+        'ultimo_log_id': None,
+    }
+
+    deltas = []
+    base = None
+    for log in logs.iterator(chunk_size=200):
+        if resultado['ultimo_log_id'] is None:
+            resultado['ultimo_log_id'] = log['id']
+            if log['accion'] == 'DELETE':
+                # El último evento antes de `momento` fue la eliminación
+                resultado['estado'] = log['datos_anteriores']
+                return resultado
+        if _es_foto_completa(log):
+            base = log
+            break
+        if log['cambios']:
+            deltas.append(log['cambios'])
+
+    if base is None:
+        if not deltas:
+            return resultado
+        # Sin foto completa (historia truncada): se reconstruye lo que se pueda
+        estado = {}
+        for cambios in reversed(deltas):
+            for campo, (anterior, _nuevo) in cambios.items():
+                estado.setdefault(campo, anterior)
+    else:
+        estado = dict(base['datos_nuevos'])
+        resultado['checkpoint_id'] = base['id']
+
+    for cambios in reversed(deltas):
+        for campo, (_anterior, nuevo) in cambios.items():
+            estado[campo] = nuevo
+
+    resultado['existe'] = True
+    resultado['estado'] = estado
+    resultado['deltas_aplicados'] = len(deltas)
+    return resultado
@@ -0,0 +1,294 @@
+"""
+Escritor asíncrono y por lotes para LogAuditoria.
+
+Los signals globales de auditoría ya no hacen un INSERT por cada save().
+En su lugar entregan un "evento" (dict con los campos del log) a este módulo:
+
+  1. Confirmación: si el save ocurre dentro de una transacción, el evento solo
+     entra al buffer en `transaction.on_commit`. Si la transacción (o el
+     savepoint) hace rollback, Django descarta el callback y el evento nunca
+     se escribe. Fuera de transacción se confirma de inmediato.
+  2. Buffer por request: AuditMiddleware marca el inicio del request y al
+     responder llama a `flush()`, que escribe todo el buffer con UN solo
+     `bulk_create`. Fuera de un request (shell, comandos) se hace flush al
+     confirmar cada evento, salvo dentro de `lote_auditoria()`.
+  3. Modo hilo (MODO='thread'): el flush no escribe en el hilo del request;
+     entrega el lote a una cola que un hilo de fondo vacía cada
+     FLUSH_INTERVAL segundos o cada FLUSH_SIZE eventos.
+  4. Eventos perdidos: los que se descartan (cola llena, error del INSERT)
+     se reportan a `diferencial.registrar_perdidos()` para que el siguiente
+     evento de cada registro se escriba como checkpoint.
+
+Configuración (settings.AUDITORIA_GLOBAL, todas opcionales):
+    'MODO'            → 'request' (default) | 'thread' | 'sync'
+    'FLUSH_SIZE'      → eventos por bulk_create (default 200)
+    'FLUSH_INTERVAL'  → segundos máximos que el hilo retiene un lote (default 2.0)
+    'QUEUE_MAXSIZE'   → capacidad de la cola del hilo (default 10000)
+    'POLITICA_LLENO'  → qué hacer con la cola llena:
+                        'drop'  descarta el evento nuevo (default)
+                        'block' espera hasta BLOCK_TIMEOUT y luego descarta
+                        'sync'  escribe en el hilo del request
+    'BLOCK_TIMEOUT'   → segundos de espera con POLITICA_LLENO='block' (default 0.5)
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .diferencial import preparar_para_escritura, registrar_perdidos
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+def _config():
+    config = getattr(settings, 'AUDITORIA_GLOBAL', {}) or {}
+    return {
+        'MODO': config.get('MODO', 'request'),
+        'FLUSH_SIZE': max(int(config.get('FLUSH_SIZE', 200)), 1),
+        'FLUSH_INTERVAL': float(config.get('FLUSH_INTERVAL', 2.0)),
+        'QUEUE_MAXSIZE': int(config.get('QUEUE_MAXSIZE', 10000)),
+        'POLITICA_LLENO': config.get('POLITICA_LLENO', 'drop'),
+        'BLOCK_TIMEOUT': float(config.get('BLOCK_TIMEOUT', 0.5)),
+    }
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Contadores
+# ──────────────────────────────────────────────────────────────────────────────
+class _Contadores:
+    """Contadores de proceso protegidos por lock."""
+
+    CAMPOS = ('encolados', 'escritos', 'descartados', 'errores', 'lotes')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def sumar(self, campo, cantidad=1):
+        with self._lock:
+            setattr(self, campo, getattr(self, campo) + cantidad)
+
+    def reiniciar(self):
+        with self._lock:
+            for campo in self.CAMPOS:
+                setattr(self, campo, 0)
+
+    def como_dict(self):
+        with self._lock:
+            return {campo: getattr(self, campo) for campo in self.CAMPOS}
+
+
+contadores = _Contadores()
+
+
+def estadisticas():
+    """Contadores del proceso más el estado actual del buffer y de la cola."""
+    datos = contadores.como_dict()
+    datos['modo'] = _config()['MODO']
+    datos['en_buffer'] = len(_buffer())
+    datos['en_cola'] = _escritor.pendientes() if _escritor is not None else 0
+    return datos
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Escritura
+# ──────────────────────────────────────────────────────────────────────────────
+def _escribir(eventos):
+    """Inserta una lista de eventos con bulk_create en lotes de FLUSH_SIZE."""
+    if not eventos:
+        return
+    from .models import LogAuditoria
+
+    tamano = _config()['FLUSH_SIZE']
+    try:
+        LogAuditoria.objects.bulk_create(
+            [LogAuditoria(**preparar_para_escritura(evento)) for evento in eventos],
+            batch_size=tamano,
+        )
+        contadores.sumar('escritos', len(eventos))
+        contadores.sumar('lotes')
+    except Exception as e:
+        contadores.sumar('errores')
+        contadores.sumar('descartados', len(eventos))
+        # El siguiente evento de cada registro perdido se escribe como checkpoint
+        registrar_perdidos(eventos)
+        logger.error(f"Error escribiendo lote de auditoría ({len(eventos)} eventos): {e}")
+
+
+class EscritorEnSegundoPlano:
+    """
+    Hilo daemon que consume eventos de una cola acotada y los escribe
+    por lotes. Se crea perezosamente la primera vez que se usa MODO='thread'.
+    """
+
+    def __init__(self, flush_size, flush_interval, maxsize):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.cola = queue.Queue(maxsize=maxsize)
+        self._detener = threading.Event()
+        self._hilo = threading.Thread(target=self._bucle, name='auditoria-escritor', daemon=True)
+        self._hilo.start()
+
+    def pendientes(self):
+        return self.cola.qsize()
+
+    def encolar(self, evento, politica, block_timeout):
+        """Entrega un evento a la cola aplicando la política de contrapresión."""
+        try:
+            if politica == 'block':
+                self.cola.put(evento, timeout=block_timeout)
+            else:
+                self.cola.put_nowait(evento)
+            return
+        except queue.Full:
+            pass
+
+        if politica == 'sync':
+            _escribir([evento])
+        else:
+            contadores.sumar('descartados')
+            registrar_perdidos([evento])
+            logger.warning('Cola de auditoría llena: evento descartado.')
+
+    def _bucle(self):
+        lote = []
+        limite = time.monotonic() + self.flush_interval
+        while not self._detener.is_set() or not self.cola.empty():
+            restante = max(limite - time.monotonic(), 0)
+            try:
+                lote.append(self.cola.get(timeout=restante or 0.05))
+            except queue.Empty:
+                pass
+
+            if len(lote) >= self.flush_size or (lote and time.monotonic() >= limite):
+                close_old_connections()
+                _escribir(lote)
+                lote = []
+            if time.monotonic() >= limite:
+                limite = time.monotonic() + self.flush_interval
+
+        close_old_connections()
+        _escribir(lote)
+
+    def detener(self, timeout=5.0):
+        """Vacía la cola y detiene el hilo (se invoca al salir del proceso)."""
+        self._detener.set()
+        self._hilo.join(timeout)
+
+
+_escritor = None
+_escritor_lock = threading.Lock()
+
+
+def _get_escritor():
+    global _escritor
+    if _escritor is None:
+        with _escritor_lock:
+            if _escritor is None:
+                config = _config()
+                _escritor = EscritorEnSegundoPlano(
+                    config['FLUSH_SIZE'], config['FLUSH_INTERVAL'], config['QUEUE_MAXSIZE']
+                )
+                atexit.register(_escritor.detener)
+    return _escritor
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Buffer por request / lote
+# ──────────────────────────────────────────────────────────────────────────────
+def _buffer():
+    buffer = getattr(_local, 'buffer', None)
+    if buffer is None:
+        buffer = _local.buffer = []
+    return buffer
+
+
+def _en_lote():
+    """True si hay un request o un `lote_auditoria()` abierto en este hilo."""
+    return getattr(_local, 'profundidad', 0) > 0
+
+
+def iniciar_lote():
+    """Abre un ámbito de buffer (request o bloque de comando)."""
+    _local.profundidad = getattr(_local, 'profundidad', 0) + 1
+
+
+def cerrar_lote():
+    """Cierra el ámbito; al cerrar el más externo se hace flush del buffer."""
+    _local.profundidad = max(getattr(_local, 'profundidad', 0) - 1, 0)
+    if _local.profundidad == 0:
+        flush()
+
+
+def iniciar_request():
+    """
+    Llamado por AuditMiddleware al entrar un request. Si un request previo
+    del mismo hilo dejó eventos sin escribir (ej. excepción no controlada),
+    se escriben antes de abrir el nuevo ámbito.
+    """
+    flush()
+    _local.profundidad = 1
+
+
+def finalizar_request():
+    """Llamado por AuditMiddleware al responder: un solo flush por request."""
+    _local.profundidad = 0
+    flush()
+
+
+@contextmanager
+def lote_auditoria():
+    """
+    Agrupa los eventos generados dentro del bloque en un solo flush.
+    Pensado para comandos de gestión y scripts fuera del ciclo de request.
+    """
+    iniciar_lote()
+    try:
+        yield
+    finally:
+        cerrar_lote()
+
+
+def _confirmar(evento):
+    """Callback de on_commit: el evento ya pertenece a datos confirmados."""
+    buffer = _buffer()
+    buffer.append(evento)
+    if not _en_lote() or len(buffer) >= _config()['FLUSH_SIZE']:
+        flush()
+
+
+def registrar_evento(evento):
+    """
+    Punto de entrada de los signals. `evento` es un dict con los kwargs de
+    LogAuditoria (tabla, registro_id, accion, datos_*, fecha, usuario_id, casino_id).
+    """
+    contadores.sumar('encolados')
+    if _config()['MODO'] == 'sync':
+        _escribir([evento])
+        return
+    # Fuera de atomic() Django ejecuta el callback de inmediato
+    transaction.on_commit(lambda: _confirmar(evento))
+
+
+def flush():
+    """Escribe (o entrega al hilo) todo lo acumulado en el buffer del hilo actual."""
+    buffer = _buffer()
+    if not buffer:
+        return
+    eventos = buffer[:]
+    buffer.clear()
+
+    config = _config()
+    if config['MODO'] == 'thread':
+        escritor = _get_escritor()
+        for evento in eventos:
+            escritor.encolar(evento, config['POLITICA_LLENO'], config['BLOCK_TIMEOUT'])
+    else:
+        _escribir(eventos)
@@ -0,0 +1,172 @@
+"""
+Management Command: benchmark_paginacion_auditoria
+==================================================
+Compara la paginación numerada anterior (COUNT(*) + OFFSET) contra la
+paginación por cursor (ModelBase/paginacion.py) sobre auditoria_global, a
+distintas profundidades y con y sin filtro.
+
+Con --sembrar se insertan primero N logs sintéticos (tabla
+'BenchmarkPaginacion', repartidos en los últimos dos años) con bulk_create,
+sin signals; --limpiar los elimina al terminar. Para una medición
+representativa se recomiendan varios millones de filas:
+
+    python manage.py benchmark_paginacion_auditoria --sembrar 3000000
+    python manage.py benchmark_paginacion_auditoria --paginas 1 100 10000 --accion UPDATE
+    python manage.py benchmark_paginacion_auditoria --limpiar
+
+El cursor de la página N se obtiene fuera de la medición (es el que el
+cliente ya tendría de la página N-1).
+"""
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from AuditoriaGlobal.models import LogAuditoria
+from ModelBase.paginacion import PaginacionKeyset, contar_aproximado
+
+TABLA_SINTETICA = 'BenchmarkPaginacion'
+TAMANO_PAGINA = 50
+
+
+class _Paginacion(PaginacionKeyset):
+    campo_por_defecto = 'fecha'
+    page_size = TAMANO_PAGINA
+
+
+class Command(BaseCommand):
+    help = 'Mide COUNT+OFFSET contra paginación por cursor sobre auditoria_global'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sembrar', type=int, default=0, help='Logs sintéticos a insertar antes de medir.')
+        parser.add_argument('--limpiar', action='store_true', help='Elimina los logs sintéticos al terminar.')
+        parser.add_argument('--paginas', type=int, nargs='+', default=[1, 10, 100, 1000, 10000],
+                            help='Páginas a medir (de 50 filas).')
+        parser.add_argument('--accion', choices=['CREATE', 'UPDATE', 'DELETE'],
+                            help='Mide además con el filtro ?accion=.')
+        parser.add_argument('--repeticiones', type=int, default=5, help='Repeticiones por medición (mediana).')
+
+    # ── Datos sintéticos ──────────────────────────────────────────────────
+    def _sembrar(self, cantidad, lote=10000):
+        ahora = timezone.now()
+        segundos = int(timedelta(days=730).total_seconds())
+        acciones = ['CREATE', 'UPDATE', 'UPDATE', 'UPDATE', 'DELETE']
+        inicio = time.perf_counter()
+        for desde in range(0, cantidad, lote):
+            LogAuditoria.objects.bulk_create([
+                LogAuditoria(
+                    tabla=TABLA_SINTETICA,
+                    registro_id=str(desde + i),
+                    accion=random.choice(acciones),
+                    cambios={'campo': [i, i + 1]},
+                    fecha=ahora - timedelta(seconds=random.randrange(segundos)),
+                )
+                for i in range(min(lote, cantidad - desde))
+            ])
+            self.stdout.write(f'  {min(desde + lote, cantidad):>10} / {cantidad}', ending='\r')
+        self.stdout.write(f'\n  ✅ {cantidad} logs sintéticos en {time.perf_counter() - inicio:.1f} s')
+        with connection.cursor() as cursor:
+            # Estadísticas frescas para el conteo aproximado
+            if connection.vendor == 'mysql':
+                cursor.execute(f'ANALYZE TABLE {LogAuditoria._meta.db_table}')
+
+    def _limpiar(self, lote=20000):
+        # Borrado directo por lotes (sin signals): los logs sintéticos nunca
+        # existieron para el resto del sistema
+        borrados = 0
+        with connection.cursor() as cursor:
+            while True:
+                ids = list(
+                    LogAuditoria.objects.filter(tabla=TABLA_SINTETICA).values_list('id', flat=True)[:lote]
+                )
+                if not ids:
+                    return borrados
+                cursor.execute(
+                    f"DELETE FROM {LogAuditoria._meta.db_table} WHERE id IN ({', '.join(['%s'] * len(ids))})",
+                    ids,
+                )
+                borrados += cursor.rowcount
+
+    # ── Medición ──────────────────────────────────────────────────────────
+    def _medir(self, funcion, repeticiones):
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            funcion()
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        return statistics.median(tiempos)
+
+    def _request(self, params):
+        return Request(APIRequestFactory().get('/api/auditoria-sistema/', params))
+
+    def _escenario(self, nombre, queryset, params, paginas, repeticiones):
+        total = queryset.count()
+        self.stdout.write(f'\n📅 {nombre} — {total} filas\n')
+
+        conteo = self._medir(lambda: queryset.count(), repeticiones)
+        aproximado = contar_aproximado(queryset)
+        conteo_aprox = self._medir(lambda: contar_aproximado(queryset), repeticiones)
+        self.stdout.write(f'  COUNT(*) exacto      → {conteo:>9.2f} ms  ({total})')
+        self.stdout.write(f'  Conteo aproximado    → {conteo_aprox:>9.2f} ms  ({aproximado})\n')
+
+        self.stdout.write(f'  {"Página":>8} {"OFFSET ms":>11} {"COUNT+OFFSET ms":>16} {"Cursor ms":>11} {"Mejora":>8}')
+        self.stdout.write(f'  ─────────────────────────────────────────────────────────────')
+        ordenado = queryset.order_by('-fecha', '-id')
+        for pagina in paginas:
+            desplazamiento = (pagina - 1) * TAMANO_PAGINA
+            if desplazamiento >= total:
+                self.stdout.write(f'  {pagina:>8}  (fuera de rango)')
+                continue
+
+            offset = self._medir(
+                lambda: list(ordenado[desplazamiento:desplazamiento + TAMANO_PAGINA]), repeticiones
+            )
+
+            paginacion = _Paginacion()
+            parametros = dict(params)
+            if desplazamiento:
+                # Última fila de la página anterior: el cursor que ya tendría el cliente
+                fila = ordenado.values('id', 'fecha')[desplazamiento - 1]
+                ultima = LogAuditoria(id=fila['id'])
+                ultima.cursor_fecha = fila['fecha']
+                parametros['cursor'] = paginacion._codificar(ultima, False)
+            request = self._request(parametros)
+            cursor = self._medir(lambda: paginacion.paginate_queryset(queryset, request), repeticiones)
+
+            self.stdout.write(
+                f'  {pagina:>8} {offset:>11.2f} {offset + conteo:>16.2f} {cursor:>11.2f} '
+                f'{(offset + conteo) / cursor if cursor else 0:>7.1f}x'
+            )
+
+    def handle(self, *args, **options):
+        repeticiones = max(options['repeticiones'], 1)
+        if options['sembrar']:
+            self.stdout.write(f"\n📅 Sembrando {options['sembrar']} logs sintéticos...")
+            self._sembrar(options['sembrar'])
+
+        paginas = sorted(set(p for p in options['paginas'] if p > 0))
+        try:
+            self._escenario('Sin filtros', LogAuditoria.objects.all(), {}, paginas, repeticiones)
+            if options['accion']:
+                self._escenario(
+                    f"accion={options['accion']}",
+                    LogAuditoria.objects.filter(accion__iexact=options['accion']),
+                    {'accion': options['accion']},
+                    paginas,
+                    repeticiones,
+                )
+        finally:
+            if options['limpiar']:
+                self.stdout.write(f'\n  Logs sintéticos eliminados → {self._limpiar()}')
+
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(
+            '✅ Benchmark completado. El cursor se mantiene constante con la profundidad; '
+            'OFFSET y COUNT(*) crecen con la tabla.'
+        ))
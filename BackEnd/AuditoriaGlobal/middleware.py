@@ -1,5 +1,6 @@
 import threading
 from django.utils.deprecation import MiddlewareMixin
+from .escritor import iniciar_request, finalizar_request
 
 # Usamos ThreadLocal para guardar atributos por cada request
 _thread_locals = threading.local()
@@ -16,12 +17,16 @@ class AuditMiddleware(MiddlewareMixin):
     Al usarse REST Framework y SessionTokenMiddleware (Bearer), 
     request.user no siempre se setea a nivel middleware tradicional.
     Aquí interceptamos `process_view` que ocurre DESPUÉS de Authentication, o en su defecto extraemos manualmente.
+
+    También delimita el buffer de eventos de auditoría: todo lo confirmado
+    durante el request se escribe con un solo bulk_create al responder.
     """
     
     def process_request(self, request):
         # Limpiar al entrar a un nuevo request
         _thread_locals.user = None
         _thread_locals.casino = None
+        iniciar_request()
 
     def process_view(self, request, view_func, view_args, view_kwargs):
         # En DRF, request.user a veces solo está disponible dentro de la vista
@@ -35,6 +40,8 @@ class AuditMiddleware(MiddlewareMixin):
                 _thread_locals.casino = user.casino
 
     def process_response(self, request, response):
+        # Escribir los eventos de auditoría acumulados en el request
+        finalizar_request()
         # Limpiar al salir para evitar cruce de hilos
         _thread_locals.user = None
         _thread_locals.casino = None
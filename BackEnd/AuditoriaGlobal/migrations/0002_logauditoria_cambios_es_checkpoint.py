@@ -0,0 +1,27 @@
+# Generated by Django 6.0.2 on 2026-10-18 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AuditoriaGlobal', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='logauditoria',
+            name='cambios',
+            field=models.JSONField(blank=True, null=True, verbose_name='Cambios (Delta)'),
+        ),
+        migrations.AddField(
+            model_name='logauditoria',
+            name='es_checkpoint',
+            field=models.BooleanField(default=False, help_text='Indica que datos_nuevos contiene la foto completa del registro', verbose_name='Es Checkpoint'),
+        ),
+        migrations.AddIndex(
+            model_name='logauditoria',
+            index=models.Index(fields=['tabla', 'registro_id', 'fecha'], name='auditoria_g_tabla_bdd7c1_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 6.0.2 on 2026-10-18 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AuditoriaGlobal', '0002_logauditoria_cambios_es_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='logauditoria',
+            index=models.Index(fields=['fecha'], name='auditoria_g_fecha_0681ef_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='logauditoria',
+            index=models.Index(fields=['casino', 'fecha'], name='auditoria_g_casino__c066d5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='logauditoria',
+            index=models.Index(fields=['usuario', 'fecha'], name='auditoria_g_usuario_f542d7_idx'),
+        ),
+    ]
@@ -17,6 +17,14 @@ class LogAuditoria(models.Model):
     # JSONField nativo de Django, no requiere librerías extra
     datos_anteriores = models.JSONField(null=True, blank=True, verbose_name="Datos Anteriores")
     datos_nuevos = models.JSONField(null=True, blank=True, verbose_name="Datos Nuevos")
+
+    # Modo diferencial: solo campos modificados {campo: [anterior, nuevo]}
+    cambios = models.JSONField(null=True, blank=True, verbose_name="Cambios (Delta)")
+    es_checkpoint = models.BooleanField(
+        default=False,
+        verbose_name="Es Checkpoint",
+        help_text="Indica que datos_nuevos contiene la foto completa del registro"
+    )
     
     fecha = models.DateTimeField(default=timezone.now, verbose_name="Fecha del Evento")
     
@@ -40,6 +48,13 @@ class LogAuditoria(models.Model):
         verbose_name = "Log de Auditoría"
         verbose_name_plural = "Logs de Auditoría"
         ordering = ['-fecha']
+        indexes = [
+            models.Index(fields=['tabla', 'registro_id', 'fecha']),
+            # Paginación por cursor (fecha, id), con y sin filtro de casino/usuario
+            models.Index(fields=['fecha']),
+            models.Index(fields=['casino', 'fecha']),
+            models.Index(fields=['usuario', 'fecha']),
+        ]
 
     def __str__(self):
         usr = self.usuario.username if self.usuario else "Sistema"
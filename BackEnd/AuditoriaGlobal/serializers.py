@@ -9,6 +9,20 @@ class LogAuditoriaSerializer(serializers.ModelSerializer):
         model = LogAuditoria
         fields = [
             'id', 'tabla', 'registro_id', 'accion', 
-            'datos_anteriores', 'datos_nuevos', 'fecha',
+            'datos_anteriores', 'datos_nuevos', 'cambios', 'es_checkpoint', 'fecha',
             'usuario', 'usuario_nombre', 'casino', 'casino_nombre'
         ]
+
+    def to_representation(self, instance):
+        """
+        Los UPDATE en modo diferencial solo guardan `cambios`. Para que el
+        panel siga mostrando antes/después, se expanden a datos_anteriores /
+        datos_nuevos con únicamente los campos modificados.
+        """
+        data = super().to_representation(instance)
+        cambios = data.get('cambios')
+        if cambios and not data.get('datos_anteriores'):
+            data['datos_anteriores'] = {campo: valores[0] for campo, valores in cambios.items()}
+            if not data.get('datos_nuevos'):
+                data['datos_nuevos'] = {campo: valores[1] for campo, valores in cambios.items()}
+        return data
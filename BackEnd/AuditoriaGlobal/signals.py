@@ -3,8 +3,10 @@ import logging
 from django.db.models.signals import pre_save, post_save, post_delete
 from django.core.serializers.json import DjangoJSONEncoder
 from django.dispatch import receiver
-from .models import LogAuditoria
-import threading
+from django.utils import timezone
+from .escritor import registrar_evento
+from .diferencial import payload_create, payload_update
+from ModelBase.models import ModeloBase
 
 logger = logging.getLogger(__name__)
 
@@ -13,7 +15,9 @@ from .middleware import _thread_locals
 
 # Tupla de modelos a ignorar (típicamente tokens, log, django sessions)
 IGNORE_MODELS = [
-    'LogAuditoria', 'Session', 'LogEntry', 'ContentType', 'Permission', 'Group'
+    'LogAuditoria', 'Session', 'LogEntry', 'ContentType', 'Permission', 'Group',
+    'ContadorNoLeidas', 'ResumenDiario', 'VersionTabla', 'Secuencia',
+    'EntradaBusqueda', 'TerminoBusqueda', 'VersionMapa', 'CambioMapa',
 ]
 
 def obtener_usuario_casino():
@@ -21,6 +25,27 @@ def obtener_usuario_casino():
     casino = getattr(_thread_locals, 'casino', None)
     return user, casino
 
+_encoder = DjangoJSONEncoder()
+_TIPOS_JSON = (str, int, float, bool, type(None))
+
+def valor_json(val):
+    """
+    Convierte un valor de campo a un tipo nativo de JSON sin pasar por
+    json.dumps → json.loads. Fechas, Decimales y UUIDs usan las mismas
+    reglas que DjangoJSONEncoder; cualquier otro objeto (ej. FieldFile) se
+    guarda como string.
+    """
+    if isinstance(val, _TIPOS_JSON):
+        return val
+    if isinstance(val, (list, tuple)):
+        return [valor_json(v) for v in val]
+    if isinstance(val, dict):
+        return {str(k): valor_json(v) for k, v in val.items()}
+    try:
+        return _encoder.default(val)
+    except TypeError:
+        return str(val)
+
 def model_to_dict(instance):
     """
     Convierte una instancia de modelo a un diccionario serializable JSON.
@@ -28,10 +53,8 @@ def model_to_dict(instance):
     opts = instance._meta
     data = {}
     for f in opts.concrete_fields:
-        val = f.value_from_object(instance)
-        # Convertimos campos especiales a string si es necesario 
-        # (Fechas con JSONEncoder, pero para seguridad y rapidez usamos strings crudos donde no se soporte)
-        data[f.name] = val
+        # Los valores ya quedan en tipos nativos de JSON, listos para JSONField
+        data[f.name] = valor_json(f.value_from_object(instance))
     return data
 
 def serialize_dict(d):
@@ -63,8 +86,14 @@ def auditoria_pre_save(sender, instance, **kwargs):
         return
 
     try:
-        # Obtenemos el registro viejo desde la DB 
-        # (podría generar Queries extras, pero es necesario para la auditoría)
+        if isinstance(instance, ModeloBase):
+            # ModeloBase guarda la foto de valores cargados: sin SELECT extra
+            previos = instance.valores_previos()
+            instance._old_data_dict = None if previos is None else {
+                f.name: valor_json(previos.get(f.attname)) for f in sender._meta.concrete_fields
+            }
+            return
+        # Modelos sin seguimiento de cambios: se consulta el registro viejo
         old_instance = sender.objects.get(pk=instance.pk)
         instance._old_data_dict = model_to_dict(old_instance)
     except sender.DoesNotExist:
@@ -94,36 +123,32 @@ def auditoria_post_save(sender, instance, created, **kwargs):
     old_data_dict = getattr(instance, '_old_data_dict', None)
     new_data_dict = model_to_dict(instance)
 
-    # Convertir a JSON nativo en vez de strings
-    datos_anteriores_json = None
-    if old_data_dict:
-        # Parsearlo de vuelta porque Django requiere diccionarios para JSONField
-        try:
-           datos_anteriores_json = json.loads(serialize_dict(old_data_dict))
-        except: pass
-        
-    datos_nuevos_json = None
-    if new_data_dict:
-        try:
-           datos_nuevos_json = json.loads(serialize_dict(new_data_dict))
-        except: pass
-
     # Solo guardar logs si se modifica algo en caso de UPDATE
     if accion == 'UPDATE' and old_data_dict == new_data_dict:
         return # No registrar updates vacios
 
+    registro_id = str(instance.pk)
+    # En modo diferencial los UPDATE solo llevan los campos cambiados
+    # (ver AuditoriaGlobal/diferencial.py)
+    if accion == 'CREATE':
+        payload = payload_create(nombre_tabla, registro_id, new_data_dict)
+    else:
+        payload = payload_update(nombre_tabla, registro_id, old_data_dict or None, new_data_dict)
+
+    # El INSERT se difiere: se agrupa por request y se escribe con bulk_create
+    # al confirmarse la transacción (ver AuditoriaGlobal/escritor.py)
     try:
-        LogAuditoria.objects.create(
-            tabla=nombre_tabla,
-            registro_id=str(instance.pk),
-            accion=accion,
-            datos_anteriores=datos_anteriores_json,
-            datos_nuevos=datos_nuevos_json,
-            usuario=user,
-            casino=casino
-        )
+        registrar_evento({
+            'tabla': nombre_tabla,
+            'registro_id': registro_id,
+            'accion': accion,
+            'fecha': timezone.now(),
+            'usuario_id': user.pk if user else None,
+            'casino_id': casino.pk if casino else None,
+            **payload,
+        })
     except Exception as e:
-        logger.error(f"Error guardando auditoria post_save en {nombre_tabla}: {e}")
+        logger.error(f"Error registrando auditoria post_save en {nombre_tabla}: {e}")
 
 
 @receiver(post_delete)
@@ -139,22 +164,17 @@ def auditoria_post_delete(sender, instance, **kwargs):
     user, casino = obtener_usuario_casino()
     
     old_data_dict = model_to_dict(instance)
-    datos_anteriores_json = None
-
-    if old_data_dict:
-        try:
-           datos_anteriores_json = json.loads(serialize_dict(old_data_dict))
-        except: pass
 
     try:
-        LogAuditoria.objects.create(
-            tabla=nombre_tabla,
-            registro_id=str(instance.pk),
-            accion='DELETE',
-            datos_anteriores=datos_anteriores_json,
-            datos_nuevos=None,
-            usuario=user,
-            casino=casino
-        )
+        registrar_evento({
+            'tabla': nombre_tabla,
+            'registro_id': str(instance.pk),
+            'accion': 'DELETE',
+            'datos_anteriores': old_data_dict or None,
+            'datos_nuevos': None,
+            'fecha': timezone.now(),
+            'usuario_id': user.pk if user else None,
+            'casino_id': casino.pk if casino else None,
+        })
     except Exception as e:
-        logger.error(f"Error guardando auditoria post_delete en {nombre_tabla}: {e}")
+        logger.error(f"Error registrando auditoria post_delete en {nombre_tabla}: {e}")
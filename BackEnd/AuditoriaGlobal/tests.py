@@ -1,3 +1,32 @@
-from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from Maquinas.tests import crear_sala
+from Tickets.tests import crear_usuario
+
+
+class ReconstruirEstadoTests(APITestCase):
+    """Validación de la fecha de /auditoria-sistema/reconstruir/."""
+
+    @classmethod
+    def setUpTestData(cls):
+        casino, _ = crear_sala(0)
+        cls.usuario = crear_usuario(casino, 'ADMINISTRADOR', 'admin')
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.usuario)
+        self.url = reverse('auditoria-reconstruir')
+
+    def _get(self, fecha):
+        return self.client.get(self.url, {'tabla': 'Ticket', 'registro_id': 1, 'fecha': fecha})
+
+    def test_fecha_inexistente_responde_400(self):
+        for fecha in ('2026-13-01', '2026-02-30', '2026-02-30T10:00', 'ayer'):
+            with self.subTest(fecha=fecha):
+                respuesta = self._get(fecha)
+                self.assertEqual(respuesta.status_code, 400)
+                self.assertIn('Formato de fecha inválido', respuesta.json()['error'])
+
+    def test_fecha_valida(self):
+        self.assertEqual(self._get('2026-02-28').status_code, 200)
+        self.assertEqual(self._get('2026-02-28T10:00:00').status_code, 200)
@@ -1,9 +1,14 @@
-from rest_framework import viewsets, permissions
+from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.pagination import PageNumberPagination
 from .models import LogAuditoria
 from .serializers import LogAuditoriaSerializer
+from .escritor import estadisticas
+from .diferencial import reconstruir_estado
+from ModelBase.cache_respuestas import estadisticas as estadisticas_cache
+from ModelBase.exportacion import respuesta_exportacion
+from ModelBase.paginacion import PaginacionKeyset
 
 # En proyectos grandes esto debe extenderse a IsAdminUser,
 # Asumimos que el front valida la entrada al panel admin en la ruta.
@@ -16,6 +21,25 @@ class AuditoriaPagination(PageNumberPagination):
     page_size = 50
     page_size_query_param = 'page_size'
 
+class AuditoriaCursorPagination(PaginacionKeyset):
+    """
+    Cursor por (fecha, id) (ver ModelBase/paginacion.py): cualquier página
+    cuesta lo mismo que la primera y no hay COUNT(*) salvo ?total=aprox|exacto.
+    Con ?page= se conserva la paginación numerada anterior (COUNT + OFFSET).
+    """
+    campo_por_defecto = 'fecha'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.numerada = AuditoriaPagination() if 'page' in request.query_params else None
+        if self.numerada is not None:
+            return self.numerada.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.numerada is not None:
+            return self.numerada.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
 class LogAuditoriaViewSet(viewsets.ReadOnlyModelViewSet):
     """
     Vista de solo lectura del Ojo de Dios.
@@ -24,7 +48,7 @@ class LogAuditoriaViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = LogAuditoria.objects.all().order_newest() if hasattr(LogAuditoria.objects, 'order_newest') else LogAuditoria.objects.all().order_by('-fecha')
     serializer_class = LogAuditoriaSerializer
     permission_classes = [permissions.IsAuthenticated] # Lo restringimos temporalmente a auth si el decorador admin requiere roles específicos, o reemplazar por IsAdminPermission.
-    pagination_class = AuditoriaPagination
+    pagination_class = AuditoriaCursorPagination
 
     def get_queryset(self):
         qs = super().get_queryset()
@@ -54,3 +78,81 @@ class LogAuditoriaViewSet(viewsets.ReadOnlyModelViewSet):
         """Devuelve un listado único de las tablas que tienen logs, ideal para el combobox de filtro"""
         tablas = LogAuditoria.objects.values_list('tabla', flat=True).distinct().order_by('tabla')
         return Response(list(tablas))
+
+    @action(detail=False, methods=['GET'])
+    def exportar(self, request):
+        """
+        Exporta el log en streaming (NDJSON o CSV) con los mismos filtros del
+        listado más rango de fechas (desde/hasta). Reanudable con ?cursor=<id>.
+        """
+        return respuesta_exportacion(
+            request,
+            self.get_queryset(),
+            columnas=[
+                'id', 'fecha', 'tabla', 'registro_id', 'accion',
+                ('usuario_username', 'usuario__username'),
+                ('casino_nombre', 'casino__nombre'),
+                'es_checkpoint', 'cambios', 'datos_anteriores', 'datos_nuevos',
+            ],
+            campo_fecha='fecha',
+            campo_casino='casino',
+            nombre='auditoria',
+        )
+
+    @action(detail=False, methods=['GET'])
+    def metricas(self, request):
+        """Contadores del escritor de auditoría de este proceso: encolados, escritos, descartados, etc."""
+        return Response(estadisticas())
+
+    @action(detail=False, methods=['GET'], url_path='metricas-cache')
+    def metricas_cache(self, request):
+        """Aciertos/fallos del caché de respuestas de este proceso, por endpoint."""
+        return Response(estadisticas_cache())
+
+    @action(detail=False, methods=['GET'])
+    def reconstruir(self, request):
+        """
+        Reconstruye el estado de un registro en un momento dado a partir del
+        último checkpoint + los deltas posteriores.
+        Query params: ?tabla=Ticket&registro_id=15&fecha=2026-03-01T12:00:00
+        (sin fecha se reconstruye el estado más reciente registrado).
+        """
+        from django.utils import timezone
+        from django.utils.dateparse import parse_datetime, parse_date
+        from datetime import datetime, time
+
+        tabla = request.query_params.get('tabla')
+        registro_id = request.query_params.get('registro_id')
+        if not tabla or not registro_id:
+            return Response(
+                {'error': 'Se requieren los parámetros tabla y registro_id'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        fecha_str = request.query_params.get('fecha')
+        momento = timezone.now()
+        if fecha_str:
+            try:
+                momento = parse_datetime(fecha_str)
+                if momento is None:
+                    fecha = parse_date(fecha_str)
+                    # Con solo fecha se toma el final del día
+                    momento = datetime.combine(fecha, time.max) if fecha else None
+            except ValueError:
+                # Bien formada pero inexistente (ej. 2026-13-01, 2026-02-30T10:00)
+                momento = None
+            if momento is None:
+                return Response(
+                    {'error': 'Formato de fecha inválido. Use ISO 8601 (YYYY-MM-DD o YYYY-MM-DDTHH:MM:SS)'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if timezone.is_naive(momento):
+                momento = timezone.make_aware(momento)
+
+        resultado = reconstruir_estado(tabla, registro_id, momento)
+        return Response({
+            'tabla': tabla,
+            'registro_id': registro_id,
+            'fecha': momento,
+            **resultado,
+        })
@@ -53,6 +53,7 @@ INSTALLED_APPS = INIT_APPS + THIRD_PARTY_APPS + OWN_APPS
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'ModelBase.middleware.PresupuestoConsultasMiddleware',  # Conteo de consultas por request (ver PRESUPUESTO_CONSULTAS)
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -126,6 +127,14 @@ DATABASES = {
     }
 }
 
+# Misma BD, conexión aparte: las secuencias (folios) reservan números y
+# confirman de inmediato, fuera de la transacción del request que los pide
+# (ver ModelBase/secuencias.py).
+DATABASES['secuencias'] = {
+    **DATABASES['default'],
+    'TEST': {'MIRROR': 'default'},
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -187,3 +196,219 @@ REST_FRAMEWORK = {
     # Manejador global de excepciones para estandarizar las respuestas JSON
     'EXCEPTION_HANDLER': 'BackEnd.exceptions.custom_exception_handler',
 }
+
+# ============================================================================
+# CACHÉ DE AUTENTICACIÓN POR SESSION_TOKEN
+# ============================================================================
+
+# Resolución de "Authorization: Bearer" compartida por SessionTokenMiddleware
+# y SessionTokenAuthentication (ver Usuarios/token_cache.py).
+# CACHE_ALIAS apunta a un alias de CACHES (ej. Redis) para compartir entre
+# workers las entradas y las revocaciones (logout, desactivar, editar). Con
+# None solo se usa el LRU en memoria de cada proceso y, como los demás
+# workers no se enteran de una revocación, su TTL baja a TTL_SIN_COMPARTIDO.
+SESSION_TOKEN_CACHE = {
+    'LRU_MAXSIZE': 1024,
+    'TTL': 300,
+    'TTL_SIN_COMPARTIDO': 5,
+    'CACHE_ALIAS': None,
+}
+
+# ============================================================================
+# CACHÉ DE RESPUESTAS POR CASINO
+# ============================================================================
+
+# Bytes serializados de endpoints de lectura por casino (mapa, listas por
+# casino, reporte diario, vacíos). Se invalida por generación de casino desde
+# signals, nunca por tiempo (ver ModelBase/cache_respuestas.py); TTL solo
+# libera memoria de entradas ya inalcanzables.
+# CACHE_ALIAS debe apuntar a un caché compartido entre workers (Redis,
+# Memcached): con el LocMemCache por defecto cada worker tendría sus propias
+# generaciones y serviría respuestas ya invalidadas, así que el caché no se
+# usa aunque HABILITADO sea True. Encenderlo junto con un CACHES compartido.
+CACHE_RESPUESTAS = {
+    'HABILITADO': False,
+    'CACHE_ALIAS': 'default',
+    'TTL': 86400,
+    'MAX_BYTES': 2 * 1024 * 1024,
+}
+
+# ============================================================================
+# RESPUESTAS CONDICIONALES (ETag / 304)
+# ============================================================================
+
+# Menú activo y listados completos de catálogos responden 304 cuando el
+# cliente ya tiene la versión vigente (ver ModelBase/condicional.py).
+# VERSION se incrementa al cambiar el formato de alguna de esas respuestas.
+RESPUESTAS_CONDICIONALES = {
+    'HABILITADO': True,
+    'VERSION': '1',
+    'CACHE_CONTROL': 'private, no-cache',
+}
+
+# ============================================================================
+# SECUENCIAS (FOLIOS)
+# ============================================================================
+
+# Contadores por (prefijo, año) en sys_secuencias (ver ModelBase/secuencias.py).
+# BLOQUE: números que cada proceso reserva por viaje a la BD. Con 1 los folios
+# son consecutivos y sin huecos salvo rollbacks; con más, casi todas las altas
+# evitan la BD a cambio de huecos al reiniciar un worker.
+# BLOQUES: tamaño de bloque por prefijo (ej. {'TK': 20}).
+SECUENCIAS = {
+    'DB_ALIAS': 'secuencias',
+    'BLOQUE': 1,
+    'BLOQUES': {},
+}
+
+# ============================================================================
+# EXPORTACIONES EN STREAMING
+# ============================================================================
+
+# Endpoints .../exportar/ (NDJSON / CSV, ver ModelBase/exportacion.py).
+# LOTE: filas por consulta; la memoria de una exportación depende de este
+# valor, no del rango pedido. NIVEL_GZIP: 1 (rápido) a 9 (más compacto).
+EXPORTACIONES = {
+    'LOTE': 2000,
+    'NIVEL_GZIP': 6,
+}
+
+# ============================================================================
+# FEED DE CAMBIOS DEL MAPA INTERACTIVO
+# ============================================================================
+
+# Endpoint maquinas/mapa-cambios/?since=<version> (ver Maquinas/cambios_mapa.py).
+# RETENCION: versiones por casino que se conservan; un cliente más atrasado
+# recibe snapshot=true y recarga el mapa completo. MAX_MAQUINAS: si cambiaron
+# más máquinas que esto desde `since`, también se pide snapshot.
+MAPA_CAMBIOS = {
+    'RETENCION': 2000,
+    'MAX_MAQUINAS': 300,
+}
+
+# ============================================================================
+# IMPORTACIÓN MASIVA DE MÁQUINAS
+# ============================================================================
+
+# maquinas/importar/ y `manage.py importar_maquinas` (ver Maquinas/importacion.py).
+# LOTE: filas por INSERT de bulk_create. MAX_FILAS: tope por archivo; todo el
+# archivo se valida en memoria y se inserta en una sola transacción.
+IMPORTACION_MAQUINAS = {
+    'LOTE': 500,
+    'MAX_FILAS': 10000,
+}
+
+# ============================================================================
+# PRESUPUESTO DE CONSULTAS POR ENDPOINT
+# ============================================================================
+
+# Mide consultas, tiempo en BD y huellas SQL repetidas de cada request (ver
+# ModelBase/consultas.py) y loguea los que exceden el presupuesto de su ruta
+# en ModelBase/presupuestos_consultas.json. ACTIVO se lee al arrancar; con
+# False el middleware se desactiva sin costo. CABECERAS agrega X-Consultas,
+# X-Consultas-Tiempo-Ms y X-Consultas-Repetidas a la respuesta.
+# UMBRAL_REPETIDAS: veces que una misma huella se considera posible N+1.
+# POR_DEFECTO: presupuesto de las rutas que no están en el archivo.
+PRESUPUESTO_CONSULTAS = {
+    'ACTIVO': DEBUG,
+    'CABECERAS': DEBUG,
+    'ARCHIVO': BASE_DIR / 'ModelBase' / 'presupuestos_consultas.json',
+    'UMBRAL_REPETIDAS': 5,
+    'POR_DEFECTO': 50,
+}
+
+# ============================================================================
+# ALMACÉN DE ARCHIVOS POR CONTENIDO
+# ============================================================================
+
+# Fotos de vacíos, PDFs de la wiki y avatares se guardan una sola vez por
+# contenido en MEDIA_ROOT/RAIZ/ab/cd/<sha256><ext> (ver
+# ModelBase/almacen_contenido.py). GRACIA_HORAS: antigüedad mínima de un blob
+# sin referencias (o de un archivo sin registrar) antes de que
+# `recolectar_blobs_media` lo elimine, para no borrar subidas en curso.
+ALMACEN_CONTENIDO = {
+    'RAIZ': 'contenido',
+    'GRACIA_HORAS': 24,
+}
+
+# ============================================================================
+# DERIVADOS DE IMAGEN
+# ============================================================================
+
+# Miniatura y tamaño medio de las fotos de vacíos y los avatares, generados
+# en un pool de procesos al confirmarse la subida (ver ModelBase/derivados.py).
+# TAMANOS: lado máximo en px por variante. FORMATO: WEBP (JPEG si Pillow no
+# tiene soporte). PROCESOS: tamaño del pool por proceso web; 0 los genera en
+# el acto (tests, entornos sin multiproceso). Los archivos ya existentes se
+# procesan con `manage.py generar_derivados_imagen`.
+DERIVADOS_IMAGEN = {
+    'ACTIVO': True,
+    'FORMATO': 'WEBP',
+    'CALIDAD': 80,
+    'TAMANOS': {'mini': 320, 'medio': 1280},
+    'PROCESOS': 2,
+}
+
+# ============================================================================
+# SERVICIO DE MEDIA
+# ============================================================================
+
+# MEDIA_URL se sirve con ModelBase/media.py: URLs firmadas (FIRMA_DIAS días de
+# vigencia) o usuario autenticado, ETag fuerte, Range y caché `immutable` para
+# los blobs por contenido. MAX_AGE aplica a derivados y archivos con nombre
+# libre. MODO 'django' envía los bytes desde el worker; en producción usar
+# 'x-accel' (nginx, con una location `internal` en PREFIJO_INTERNO con alias a
+# MEDIA_ROOT) o 'x-sendfile' (Apache mod_xsendfile, lighttpd) para que el
+# servidor web los envíe. Comparar con `manage.py benchmark_media`.
+SERVICIO_MEDIA = {
+    'MODO': 'django',
+    'PREFIJO_INTERNO': '/media-interno/',
+    'FIRMA_DIAS': 2,
+    'MAX_AGE': 3600,
+}
+
+# ============================================================================
+# ESCRITOR DE AUDITORÍA GLOBAL
+# ============================================================================
+
+# Los logs de AuditoriaGlobal se agrupan por request y se insertan con
+# bulk_create al confirmarse la transacción (ver AuditoriaGlobal/escritor.py).
+# MODO: 'request' (flush al responder), 'thread' (hilo de fondo) o 'sync'.
+# POLITICA_LLENO (solo MODO='thread'): 'drop', 'block' o 'sync'.
+# ALMACENAMIENTO 'diferencial': los UPDATE guardan solo los campos cambiados
+# y cada CHECKPOINT_CADA updates por registro una foto completa.
+AUDITORIA_GLOBAL = {
+    'ALMACENAMIENTO': 'diferencial',
+    'CHECKPOINT_CADA': 20,
+    'MODO': 'request',
+    'FLUSH_SIZE': 200,
+    'FLUSH_INTERVAL': 2.0,
+    'QUEUE_MAXSIZE': 10000,
+    'POLITICA_LLENO': 'drop',
+    'BLOCK_TIMEOUT': 0.5,
+}
+
+# ============================================================================
+# NOTIFICACIONES
+# ============================================================================
+
+# BANDEJA: fan-out en escritura. Al crear una notificación se materializa una
+# fila por usuario de su audiencia (sys_notificaciones_bandeja) y el listado
+# se lee de ahí. Con False se usa la consulta original por audiencias.
+# Al activarla por primera vez: python manage.py reconstruir_bandeja
+# BANDEJA_LOTE: filas por bulk_create al repartir.
+# ROLES_TTL: segundos que el despacho cachea el mapa nombre de rol → id.
+# STREAM_*: entrega en vivo por SSE / long-poll (ver Notificaciones/stream.py).
+# STREAM_BROKER es reemplazable por un broker compartido (ej. Redis) cuando
+# se sirva con más de un worker ASGI; STREAM_DURACION fuerza la reconexión
+# periódica para que el token se vuelva a validar.
+NOTIFICACIONES = {
+    'BANDEJA': False,
+    'BANDEJA_LOTE': 1000,
+    'ROLES_TTL': 300,
+    'STREAM_BROKER': 'Notificaciones.stream.BrokerEnProceso',
+    'STREAM_HISTORIAL': 500,
+    'STREAM_KEEPALIVE': 20,
+    'STREAM_DURACION': 300,
+    'STREAM_LONGPOLL': 25,
+}
@@ -1,5 +1,8 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.conf import settings
+from django.urls import path, include, re_path
+
+from ModelBase.media import servir_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -27,8 +30,7 @@ urlpatterns = [
     path('api/', include('VaciosTickets.urls')),
 ]
 
-from django.conf import settings
-from django.conf.urls.static import static
-
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# Media con permisos, rangos y caché en cualquier entorno (ver ModelBase/media.py)
+urlpatterns += [
+    re_path(rf'^{settings.MEDIA_URL.lstrip("/")}(?P<nombre>.+)$', servir_media, name='media'),
+]
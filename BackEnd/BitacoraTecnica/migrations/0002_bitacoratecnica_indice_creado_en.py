@@ -0,0 +1,17 @@
+# Generated by Django 6.0.2 on 2026-10-18 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('BitacoraTecnica', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bitacoratecnica',
+            index=models.Index(fields=['creado_en'], name='tickets_bit_creado__54285b_idx'),
+        ),
+    ]
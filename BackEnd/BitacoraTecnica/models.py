@@ -75,6 +75,9 @@ class BitacoraTecnica(ModeloBase):
         db_table = 'tickets_bitacora'
         verbose_name = "Entrada de Bitácora"
         verbose_name_plural = "Bitácoras Técnicas"
+        indexes = [
+            models.Index(fields=['creado_en']),
+        ]
 
     def __str__(self):
         return f"Bitácora {self.id} - Ticket {self.ticket.folio}"
\ No newline at end of file
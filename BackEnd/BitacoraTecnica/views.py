@@ -1,8 +1,11 @@
 from rest_framework import viewsets, status
 from rest_framework.response import Response
+from rest_framework.decorators import action
 from .models import BitacoraTecnica
 from .serializers import BitacoraTecnicaSerializer
 from Usuarios.models import Usuarios
+from ModelBase.exportacion import respuesta_exportacion
+from ModelBase.paginacion import PaginacionKeysetOpcional
 from Gamificacion.signals_gamificacion import get_puntos_context, limpiar_puntos_context
 
 class BitacoraTecnicaViewSet(viewsets.ModelViewSet):
@@ -14,6 +17,8 @@ class BitacoraTecnicaViewSet(viewsets.ModelViewSet):
         'usuario_tecnico'
     )
     serializer_class = BitacoraTecnicaSerializer
+    # Paginación por cursor (creado_en, id) solo con ?cursor= o ?page_size=
+    pagination_class = PaginacionKeysetOpcional
 
     def perform_create(self, serializer):
         # Obtener el ID del usuario desde el payload (localStorage del frontend)
@@ -58,4 +63,31 @@ class BitacoraTecnicaViewSet(viewsets.ModelViewSet):
         ticket_id = self.request.query_params.get('ticket')
         if ticket_id:
             self.queryset = self.queryset.filter(ticket_id=ticket_id)
-        return super().list(request, *args, **kwargs)
\ No newline at end of file
+        return super().list(request, *args, **kwargs)
+
+    @action(detail=False, methods=['get'], url_path='exportar')
+    def exportar(self, request):
+        """
+        Exporta entradas de bitácora en streaming (NDJSON o CSV) por rango y casino.
+        Ej: /api/bitacora-tecnica/exportar/?formato=csv&desde=2026-01-01&casino=3
+        """
+        queryset = self.get_queryset()
+        ticket_id = request.query_params.get('ticket')
+        if ticket_id:
+            queryset = queryset.filter(ticket_id=ticket_id)
+        return respuesta_exportacion(
+            request,
+            queryset,
+            columnas=[
+                'id', 'creado_en',
+                ('ticket_folio', 'ticket__folio'),
+                ('casino_nombre', 'ticket__maquina__casino__nombre'),
+                ('maquina_uid_sala', 'ticket__maquina__uid_sala'),
+                ('tecnico_username', 'usuario_tecnico__username'),
+                'tipo_intervencion', 'descripcion_trabajo', 'resultado_intervencion',
+                'estado_maquina_resultante', 'finaliza_ticket',
+            ],
+            campo_fecha='creado_en',
+            campo_casino='ticket__maquina__casino',
+            nombre='bitacora_tecnica',
+        )
@@ -4,6 +4,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
 from .models import Casino
 from .serializers import CasinoSerializer
+from ModelBase.condicional import respuesta_condicional
 
 class CasinoViewSet(viewsets.ModelViewSet):
     """
@@ -15,6 +16,7 @@ class CasinoViewSet(viewsets.ModelViewSet):
         return Casino.objects.filter(esta_activo=True).order_by('nombre')
     
     @action(detail=False, methods=['get'], url_path='lista')
+    @respuesta_condicional('casinos.lista', tablas=['Casinos.Casino'])
     def lista_casinos(self, request):
         """Devuelve todos los casinos, incluyendo inactivos."""
         casinos = Casino.objects.all().order_by('nombre')
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from ModelBase.derivados import DerivadoImagen
 from .models import RecompensaGamificacion, CanjeRecompensa
 from Usuarios.models import Usuarios
 
@@ -73,6 +74,7 @@ class TecnicoSalonFamaSerializer(serializers.ModelSerializer):
     casino_nombre = serializers.CharField(source='casino.nombre', read_only=True)
     rol_nombre    = serializers.CharField(source='rol.nombre',    read_only=True)
     rango         = serializers.DictField(source='rango_gamificacion', read_only=True)
+    avatar_mini   = DerivadoImagen('mini', source='avatar')
 
     # ── Tickets ──────────────────────────────────────────────────────────────
     tickets_totales     = serializers.IntegerField(read_only=True, default=0)
@@ -104,6 +106,7 @@ class TecnicoSalonFamaSerializer(serializers.ModelSerializer):
             'casino_nombre',
             'rol_nombre',
             'avatar',
+            'avatar_mini',
             # Puntos
             'puntos_gamificacion',
             'puntos_gamificacion_historico',
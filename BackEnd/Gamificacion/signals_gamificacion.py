@@ -165,15 +165,8 @@ def gamif_ticket_capturar_estado(sender, instance, **kwargs):
         # ticket_snapshot_pre_save (Tickets.signals) ya corrió y llenó _prev_estado
         instance._estado_anterior = instance._prev_estado
         return
-    # Fallback: consultar BD si _prev_estado no está disponible
-    if instance.pk:
-        try:
-            anterior = sender.objects.get(pk=instance.pk)
-            instance._estado_anterior = anterior.estado_ciclo
-        except sender.DoesNotExist:
-            instance._estado_anterior = None
-    else:
-        instance._estado_anterior = None
+    # Fallback: foto de ModeloBase (sin consulta a BD)
+    instance._estado_anterior = instance.previous('estado_ciclo')
 
 
 # ── 1. Ticket cerrado → +2 pts al técnico asignado ───────────────────────────
@@ -234,15 +227,8 @@ def gamif_tarea_capturar_estado(sender, instance, **kwargs):
         # tarea_snapshot_pre_save (TareasEspeciales.signals) ya corrió
         instance._estatus_anterior = instance._prev_estatus
         return
-    # Fallback: consultar BD si _prev_estatus no está disponible
-    if instance.pk:
-        try:
-            anterior = sender.objects.get(pk=instance.pk)
-            instance._estatus_anterior = anterior.estatus
-        except sender.DoesNotExist:
-            instance._estatus_anterior = None
-    else:
-        instance._estatus_anterior = None
+    # Fallback: foto de ModeloBase (sin consulta a BD)
+    instance._estatus_anterior = instance.previous('estatus')
 
 
 @receiver(post_save, sender='TareasEspeciales.TareaEspecial')
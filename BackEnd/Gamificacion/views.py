@@ -1,5 +1,5 @@
 from django.db import transaction
-from django.db.models import Count, Q
+from django.db.models import Count, F, Q
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated, AllowAny
@@ -174,7 +174,6 @@ class RecompensaTecnicoViewSet(viewsets.ReadOnlyModelViewSet):
         - Control de stock: si la recompensa tiene stock limitado, lo decrementa.
         """
         recompensa = self.get_object()
-        usuario = request.user
 
         if not recompensa.activo:
             return Response(
@@ -182,18 +181,25 @@ class RecompensaTecnicoViewSet(viewsets.ReadOnlyModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        if usuario.puntos_gamificacion < recompensa.costo_puntos:
-            return Response(
-                {
-                    'error': 'No tienes suficientes puntos para canjear esta recompensa.',
-                    'puntos_disponibles': usuario.puntos_gamificacion,
-                    'costo_requerido': recompensa.costo_puntos,
-                    'faltan': recompensa.costo_puntos - usuario.puntos_gamificacion,
-                },
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
         with transaction.atomic():
+            # Saldo y stock se leen bloqueando las filas: request.user viene del
+            # caché de autenticación y dos canjes simultáneos no deben pasar
+            # ambos la validación con el mismo saldo
+            usuario = Usuarios.objects.select_for_update().get(pk=request.user.pk)
+            recompensa = RecompensaGamificacion.objects.select_for_update().get(pk=recompensa.pk)
+            costo = recompensa.costo_puntos
+
+            if usuario.puntos_gamificacion < costo:
+                return Response(
+                    {
+                        'error': 'No tienes suficientes puntos para canjear esta recompensa.',
+                        'puntos_disponibles': usuario.puntos_gamificacion,
+                        'costo_requerido': costo,
+                        'faltan': costo - usuario.puntos_gamificacion,
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
             # Verificar y decrementar stock si aplica
             if recompensa.stock is not None:
                 if recompensa.stock <= 0:
@@ -204,15 +210,16 @@ class RecompensaTecnicoViewSet(viewsets.ReadOnlyModelViewSet):
                 recompensa.stock -= 1
                 recompensa.save(update_fields=['stock'])
 
-            # Descontar puntos disponibles (histórico INTOCADO)
-            usuario.puntos_gamificacion -= recompensa.costo_puntos
-            usuario.save(update_fields=['puntos_gamificacion'])
+            # Descontar puntos disponibles (histórico INTOCADO) sin pisar
+            # los puntos que otros procesos sumen con F()
+            Usuarios.objects.filter(pk=usuario.pk).update(puntos_gamificacion=F('puntos_gamificacion') - costo)
+            usuario.refresh_from_db(fields=['puntos_gamificacion', 'puntos_gamificacion_historico'])
 
             # Registrar el canje
             canje = CanjeRecompensa.objects.create(
                 usuario=usuario,
                 recompensa=recompensa,
-                puntos_descontados=recompensa.costo_puntos,
+                puntos_descontados=costo,
                 estado='pendiente',
                 creado_por=usuario.username,
                 modificado_por=usuario.username,
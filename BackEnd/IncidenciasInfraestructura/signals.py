@@ -10,36 +10,17 @@ Eventos cubiertos:
 from django.db.models.signals import pre_save, post_save
 from django.dispatch import receiver
 from .models import IncidenciaInfraestructura
-from Notificaciones.models import Notificacion
-from Roles.models import Rol
-
-
-def _notificar_por_rol_y_casino(titulo, contenido, nivel, tipo, casino, nombres_rol):
-    roles = Rol.objects.filter(nombre__in=nombres_rol)
-    for rol in roles:
-        Notificacion.objects.create(
-            titulo        = titulo,
-            contenido     = contenido,
-            nivel         = nivel,
-            tipo          = tipo,
-            casino_destino= casino,
-            rol_destino   = rol,
-        )
+# Despacho compartido: roles cacheados + un solo bulk_create en on_commit
+from Notificaciones.despacho import notificar_por_rol_y_casino
 
 
 # ─────────────────────────────────────────────────────────────
 # Captura si ya tenía hora_fin ANTES de guardar (para detectar cierre)
 # ─────────────────────────────────────────────────────────────
+# Se lee de la foto de ModeloBase (previous), sin consultar la BD.
 @receiver(pre_save, sender=IncidenciaInfraestructura)
 def incidencia_snapshot_pre_save(sender, instance, **kwargs):
-    if instance.pk:
-        try:
-            prev = IncidenciaInfraestructura.objects.get(pk=instance.pk)
-            instance._prev_hora_fin = prev.hora_fin
-        except IncidenciaInfraestructura.DoesNotExist:
-            instance._prev_hora_fin = None
-    else:
-        instance._prev_hora_fin = None
+    instance._prev_hora_fin = instance.previous('hora_fin')
 
 
 # ─────────────────────────────────────────────────────────────
@@ -58,7 +39,7 @@ def incidencia_post_save(sender, instance, created, **kwargs):
         prefijo = "🚨 URGENTE:" if es_critica else "⚠️"
         detalle_op = " — OPERACIÓN AFECTADA" if instance.afecta_operacion else ""
 
-        _notificar_por_rol_y_casino(
+        notificar_por_rol_y_casino(
             titulo      = f"{prefijo} Incidencia de Infraestructura{detalle_op}",
             contenido   = (
                 f"Nueva incidencia registrada en {casino.nombre}: \"{instance.titulo}\". "
@@ -76,7 +57,7 @@ def incidencia_post_save(sender, instance, created, **kwargs):
     # ── 2. Incidencia RESUELTA (se registró hora_fin) ────────
     prev_hora_fin = getattr(instance, '_prev_hora_fin', None)
     if instance.hora_fin and not prev_hora_fin:
-        _notificar_por_rol_y_casino(
+        notificar_por_rol_y_casino(
             titulo      = "✅ Incidencia de Infraestructura Resuelta",
             contenido   = (
                 f"La incidencia \"{instance.titulo}\" en {casino.nombre} "
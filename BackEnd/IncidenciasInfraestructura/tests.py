@@ -1,3 +1,35 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
-# Create your tests here.
+from Maquinas.tests import crear_sala
+from ModelBase.tests import lecturas_de_fila
+from Notificaciones.models import Notificacion
+from Tickets.tests import crear_usuario
+
+from .models import IncidenciaInfraestructura
+
+
+class GuardadoIncidenciaTests(TestCase):
+    """Los receivers de IncidenciaInfraestructura leen el estado previo de la foto, no de la BD."""
+
+    @classmethod
+    def setUpTestData(cls):
+        casino, _ = crear_sala(0)
+        # Audiencia del aviso de cierre (crear los roles renueva el mapa del despacho)
+        crear_usuario(casino, 'SUP SISTEMAS', 'supervisor')
+        crear_usuario(casino, 'GERENCIA', 'gerente')
+        cls.incidencia = IncidenciaInfraestructura.objects.create(
+            casino=casino, titulo='Corte de energía', categoria='otros',
+            descripcion='Sin luz en sala A', hora_inicio=timezone.now(),
+        )
+
+    def test_cerrar_sin_releer(self):
+        incidencia = IncidenciaInfraestructura.objects.get(pk=self.incidencia.pk)
+        incidencia.hora_fin = timezone.now()
+        with CaptureQueriesContext(connection) as ctx, self.captureOnCommitCallbacks(execute=True):
+            incidencia.save()
+        self.assertEqual(lecturas_de_fila(ctx.captured_queries, IncidenciaInfraestructura._meta.db_table), [])
+        self.assertIsNone(incidencia._prev_hora_fin)
+        self.assertTrue(Notificacion.objects.filter(titulo__endswith='Resuelta').exists())
@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class MaquinasConfig(AppConfig):
     name = 'Maquinas'
+
+    def ready(self):
+        """Registra los signals que alimentan el feed de cambios del mapa (Maquinas/cambios_mapa.py)."""
+        from Maquinas import cambios_mapa
+        cambios_mapa.conectar_signals()
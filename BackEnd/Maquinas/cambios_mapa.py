@@ -0,0 +1,280 @@
+"""
+Feed incremental del mapa interactivo (`mapa-cambios/?since=<version>`).
+
+El mapa de cada técnico se refresca pidiendo `mapa-completo`, que reenvía
+todo el piso aunque solo hayan cambiado un par de estados. Aquí cada casino
+tiene una versión de mapa (VersionMapa) que crece con cada transacción que
+toca sus máquinas, y cada máquina tocada deja un CambioMapa compacto
+(máquina, campos, versión). El cliente guarda la versión de su última carga
+y pregunta solo por lo posterior:
+
+  1. Los signals de Maquina (y del M2M de denominaciones y los catálogos que
+     se muestran en el mapa) acumulan los cambios de la transacción en un
+     solo callback de on_commit.
+  2. Al confirmarse, el callback bloquea la fila VersionMapa del casino, la
+     incrementa y escribe los CambioMapa con el número nuevo, todo en una
+     transacción corta. El bloqueo hace que las versiones se confirmen en
+     orden: quien lee la versión V ya puede leer todos los cambios <= V.
+  3. `cambios_desde` devuelve los ids tocados después de `since`, o pide
+     un snapshot completo si el cliente quedó demasiado atrás.
+
+Los cambios se registran después del COMMIT (y no dentro de la transacción
+del llamador) para no serializar por casino las transacciones largas ni
+abrir deadlocks entre las que mueven varias máquinas. Si el proceso muere
+entre el COMMIT y el callback ese cambio no llega al feed; el cliente lo ve
+en su siguiente snapshot.
+
+Los `queryset.update()` no disparan signals: quien los use sobre Maquina
+debe llamar a `marcar_cambio_mapa()`.
+"""
+import logging
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+logger = logging.getLogger(__name__)
+
+# Campos que no se muestran en el mapa: cambiarlos solos no genera versión
+CAMPOS_IGNORADOS = frozenset({
+    'creado_en', 'creado_por', 'modificado_en', 'modificado_por', 'notas_internas',
+})
+
+
+def _config():
+    config = getattr(settings, 'MAPA_CAMBIOS', {}) or {}
+    return {
+        'RETENCION': max(int(config.get('RETENCION', 2000)), 1),
+        'MAX_MAQUINAS': max(int(config.get('MAX_MAQUINAS', 300)), 1),
+    }
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Registro
+# ──────────────────────────────────────────────────────────────────────────────
+def _fila_bloqueada(casino_id):
+    """VersionMapa del casino con SELECT ... FOR UPDATE; la crea si no existe."""
+    from .models import VersionMapa
+
+    while True:
+        fila = VersionMapa.objects.select_for_update().filter(casino_id=casino_id).first()
+        if fila is not None:
+            return fila
+        # Igual que en ModelBase/secuencias.py: la fila se crea fuera del
+        # FOR UPDATE para que dos creadores simultáneos no choquen en gap locks
+        try:
+            with transaction.atomic():
+                VersionMapa.objects.create(casino_id=casino_id)
+        except IntegrityError:
+            pass  # Otro proceso la creó al mismo tiempo
+
+
+def registrar_cambios(casino_id, cambios):
+    """
+    Incrementa la versión del mapa de `casino_id` y registra `cambios`
+    ({maquina_id: (accion, campos)}) con ella. Devuelve la versión nueva.
+    """
+    from .models import CambioMapa, VersionMapa
+
+    retencion = _config()['RETENCION']
+    with transaction.atomic():
+        fila = _fila_bloqueada(casino_id)
+        version = fila.version + 1
+        minima = fila.minima
+        # Purga por tramos: cada `retencion` versiones se borra lo que quedó
+        # fuera de la ventana, con el índice (casino_id, version)
+        if version - minima > 2 * retencion:
+            minima = version - retencion
+            CambioMapa.objects.filter(casino_id=casino_id, version__lte=minima).delete()
+        VersionMapa.objects.filter(casino_id=casino_id).update(version=version, minima=minima)
+        CambioMapa.objects.bulk_create([
+            CambioMapa(casino_id=casino_id, version=version, maquina_id=maquina_id,
+                       accion=accion, campos=sorted(campos))
+            for maquina_id, (accion, campos) in cambios.items()
+        ])
+    return version
+
+
+class _CambiosMapa:
+    """Callback de on_commit que acumula los cambios de la transacción por casino."""
+
+    def __init__(self):
+        self.por_casino = {}
+
+    def agregar(self, casino_id, maquina_id, accion, campos):
+        from .models import CambioMapa
+
+        cambios = self.por_casino.setdefault(casino_id, {})
+        previa = cambios.get(maquina_id)
+        if previa is not None:
+            # Alta + modificación sigue siendo alta; una baja posterior gana
+            if accion == CambioMapa.ACCION_MODIFICACION:
+                accion = previa[0]
+            campos = previa[1] | set(campos)
+        cambios[maquina_id] = (accion, set(campos))
+
+    def __call__(self):
+        for casino_id, cambios in self.por_casino.items():
+            try:
+                registrar_cambios(casino_id, cambios)
+            except Exception:
+                # El feed nunca debe tumbar el request que ya confirmó sus
+                # datos; el cliente se repone con el siguiente snapshot
+                logger.exception('No se pudieron registrar cambios de mapa del casino %s', casino_id)
+
+
+def marcar_cambio_mapa(casino_id, maquina_ids, campos, accion=None):
+    """
+    Registra al confirmarse la transacción actual que `maquina_ids` de
+    `casino_id` cambiaron en `campos`. Todas las llamadas de una misma
+    transacción comparten una versión por casino.
+    """
+    from .models import CambioMapa
+
+    if casino_id is None:
+        return
+    accion = accion or CambioMapa.ACCION_MODIFICACION
+    conexion = transaction.get_connection()
+    callback = None
+    if conexion.in_atomic_block:
+        callback = next(
+            (entrada[1] for entrada in conexion.run_on_commit if isinstance(entrada[1], _CambiosMapa)),
+            None,
+        )
+    nuevo = callback is None
+    if nuevo:
+        callback = _CambiosMapa()
+    for maquina_id in maquina_ids:
+        callback.agregar(casino_id, maquina_id, accion, campos)
+    if nuevo:
+        transaction.on_commit(callback)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Consulta
+# ──────────────────────────────────────────────────────────────────────────────
+def version_actual(casino_id):
+    """Versión vigente del mapa del casino (0 si nunca cambió)."""
+    from .models import VersionMapa
+
+    return VersionMapa.objects.filter(casino_id=casino_id).values_list('version', flat=True).first() or 0
+
+
+def cambios_desde(casino_id, desde):
+    """
+    (version, ids, snapshot): versión vigente, ids de las máquinas que
+    cambiaron después de `desde` y si el cliente debe pedir el mapa completo
+    en lugar de aplicar cambios (quedó antes de la ventana retenida, su
+    versión es de otra BD, o cambiaron más de MAX_MAQUINAS).
+    """
+    from .models import CambioMapa, VersionMapa
+
+    fila = VersionMapa.objects.filter(casino_id=casino_id).values_list('version', 'minima').first()
+    version, minima = fila or (0, 0)
+    if desde > version or desde < minima:
+        return version, [], True
+    if desde == version:
+        return version, [], False
+
+    maximo = _config()['MAX_MAQUINAS']
+    # Solo hasta la versión leída: lo posterior llega en la siguiente consulta
+    ids = list(
+        CambioMapa.objects.filter(casino_id=casino_id, version__gt=desde, version__lte=version)
+        .order_by().values_list('maquina_id', flat=True).distinct()[:maximo + 1]
+    )
+    if len(ids) > maximo:
+        return version, [], True
+    return version, ids, False
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Signals
+# ──────────────────────────────────────────────────────────────────────────────
+def _maquina_guardada(sender, instance, created=False, raw=False, **kwargs):
+    from .models import CambioMapa
+
+    if raw:
+        return
+    if created:
+        marcar_cambio_mapa(instance.casino_id, [instance.pk], [], CambioMapa.ACCION_ALTA)
+        return
+    campos = [campo for campo in instance.changed_fields() if campo not in CAMPOS_IGNORADOS]
+    if not campos:
+        return
+    anterior = instance.previous('casino')
+    if anterior is not None and anterior != instance.casino_id:
+        # Cambio de casino: sale de un mapa y entra al otro
+        marcar_cambio_mapa(anterior, [instance.pk], campos, CambioMapa.ACCION_BAJA)
+        marcar_cambio_mapa(instance.casino_id, [instance.pk], campos, CambioMapa.ACCION_ALTA)
+    else:
+        marcar_cambio_mapa(instance.casino_id, [instance.pk], campos)
+
+
+def _maquina_eliminada(sender, instance, **kwargs):
+    from .models import CambioMapa
+
+    marcar_cambio_mapa(instance.casino_id, [instance.pk], [], CambioMapa.ACCION_BAJA)
+
+
+def _marcar_por_casino(pares, campo):
+    """Marca (maquina_id, casino_id) agrupados por casino."""
+    por_casino = {}
+    for maquina_id, casino_id in pares:
+        por_casino.setdefault(casino_id, []).append(maquina_id)
+    for casino_id, ids in por_casino.items():
+        marcar_cambio_mapa(casino_id, ids, [campo])
+
+
+def _denominaciones_cambiadas(sender, instance, action, reverse, pk_set, **kwargs):
+    from .models import Maquina
+
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        marcar_cambio_mapa(instance.casino_id, [instance.pk], ['denominaciones'])
+    elif pk_set:
+        # Desde la denominación: pk_set son máquinas (un clear inverso no las trae)
+        _marcar_por_casino(Maquina.objects.filter(pk__in=pk_set).values_list('id', 'casino_id'), 'denominaciones')
+
+
+def _catalogo_cambiado(sender, instance, created=False, raw=False, **kwargs):
+    """
+    Modelos, proveedores y denominaciones se muestran dentro de cada máquina
+    del mapa: al editarlos se marcan las máquinas que los usan. Si son más de
+    MAX_MAQUINAS el cliente recibe snapshot, que es lo que conviene.
+    """
+    from Denominaciones.models import Denominacion
+    from ModelosMaquinas.models import ModeloMaquina
+    from Proveedores.models import Proveedor
+
+    from .models import Maquina
+
+    if raw or created:
+        return
+    if isinstance(instance, ModeloMaquina):
+        maquinas, campo = Maquina.objects.filter(modelo=instance), 'modelo'
+    elif isinstance(instance, Proveedor):
+        maquinas, campo = Maquina.objects.filter(modelo__proveedor=instance), 'modelo'
+    elif isinstance(instance, Denominacion):
+        maquinas, campo = Maquina.objects.filter(denominaciones=instance), 'denominaciones'
+    else:
+        return
+    _marcar_por_casino(maquinas.values_list('id', 'casino_id'), campo)
+
+
+def conectar_signals():
+    from django.db.models.signals import m2m_changed, post_delete, post_save
+
+    from Denominaciones.models import Denominacion
+    from ModelosMaquinas.models import ModeloMaquina
+    from Proveedores.models import Proveedor
+
+    from .models import Maquina
+
+    post_save.connect(_maquina_guardada, sender=Maquina, dispatch_uid='cambios_mapa_Maquina_save')
+    post_delete.connect(_maquina_eliminada, sender=Maquina, dispatch_uid='cambios_mapa_Maquina_delete')
+    m2m_changed.connect(
+        _denominaciones_cambiadas, sender=Maquina.denominaciones.through,
+        dispatch_uid='cambios_mapa_denominaciones',
+    )
+    for modelo in (ModeloMaquina, Proveedor, Denominacion):
+        post_save.connect(_catalogo_cambiado, sender=modelo, dispatch_uid=f'cambios_mapa_{modelo.__name__}_save')
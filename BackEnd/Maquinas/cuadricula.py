@@ -0,0 +1,166 @@
+"""
+Cuadrícula de ocupación en memoria de un (casino, piso, sala).
+
+Colocar una máquina validaba colisión y límites con una consulta por
+movimiento (exists() + el Casino), así que reacomodar una sala eran decenas
+de viajes a la BD sin atomicidad entre ellos. `Cuadricula.cargar` trae la
+sala en UNA consulta (id, x, y de las máquinas activas) y a partir de ahí
+colisiones, límites, intercambios y búsqueda de celda libre se resuelven en
+memoria.
+
+Convenciones (las mismas del mapa del frontend):
+  - Las celdas visibles van de (1, 1) a (grid_width, grid_height).
+  - (0, 0) es "sin asignar": no ocupa celda y nunca choca.
+  - Solo cuentan las máquinas activas (igual que actualizar-coordenadas).
+"""
+from .models import Maquina
+
+SIN_ASIGNAR = (0, 0)
+
+
+class ErrorCuadricula(Exception):
+    """Movimiento inválido. `conflicto` distingue una colisión (409) de un dato inválido (400)."""
+
+    def __init__(self, mensaje, maquina_id=None, conflicto=False):
+        super().__init__(mensaje)
+        self.mensaje = mensaje
+        self.maquina_id = maquina_id
+        self.conflicto = conflicto
+
+    def como_dict(self):
+        return {'maquina': self.maquina_id, 'error': self.mensaje}
+
+
+class Cuadricula:
+    """Celdas ocupadas de una sala: maquina_id → (x, y) y (x, y) → maquina_id."""
+
+    def __init__(self, casino_id, piso, sala, ancho, alto, posiciones):
+        self.casino_id = casino_id
+        self.piso = piso
+        self.sala = sala
+        self.ancho = ancho
+        self.alto = alto
+        self.posiciones = {}  # maquina_id → (x, y)
+        self.celdas = {}      # (x, y) → maquina_id
+        for maquina_id, celda in posiciones.items():
+            self._poner(maquina_id, celda)
+
+    @classmethod
+    def cargar(cls, casino, piso, sala, bloquear=False):
+        """
+        Cuadrícula de la sala en una consulta. Con `bloquear` las filas de la
+        sala quedan con SELECT ... FOR UPDATE hasta el fin de la transacción,
+        de modo que dos reacomodos de la misma sala no se pisan.
+        """
+        consulta = Maquina.objects.filter(
+            casino_id=casino.pk, ubicacion_piso=piso, ubicacion_sala=sala, esta_activo=True
+        )
+        if bloquear:
+            consulta = consulta.select_for_update()
+        posiciones = {
+            maquina_id: (x, y)
+            for maquina_id, x, y in consulta.values_list('id', 'coordenada_x', 'coordenada_y')
+        }
+        return cls(casino.pk, piso, sala, casino.grid_width, casino.grid_height, posiciones)
+
+    # ── Celdas ────────────────────────────────────────────────────────────
+    def _poner(self, maquina_id, celda):
+        self.posiciones[maquina_id] = celda
+        if celda != SIN_ASIGNAR:
+            # Datos previos con choques: la celda queda para la primera máquina
+            self.celdas.setdefault(celda, maquina_id)
+
+    def _quitar(self, maquina_id):
+        celda = self.posiciones.pop(maquina_id, None)
+        if celda is not None and self.celdas.get(celda) == maquina_id:
+            del self.celdas[celda]
+
+    def dentro(self, x, y):
+        return 1 <= x <= self.ancho and 1 <= y <= self.alto
+
+    def ocupante(self, x, y):
+        return self.celdas.get((x, y))
+
+    def validar(self, maquina_id, x, y):
+        """Lanza ErrorCuadricula si `maquina_id` no puede quedar en (x, y)."""
+        if (x, y) == SIN_ASIGNAR:
+            return
+        if not self.dentro(x, y):
+            raise ErrorCuadricula(
+                f'La posición ({x}, {y}) está fuera del mapa del casino ({self.ancho}x{self.alto})',
+                maquina_id,
+            )
+        ocupante = self.ocupante(x, y)
+        if ocupante is not None and ocupante != maquina_id:
+            raise ErrorCuadricula(
+                f'La posición ({x}, {y}) ya está ocupada por la máquina {ocupante}',
+                maquina_id, conflicto=True,
+            )
+
+    def mover(self, maquina_id, x, y):
+        """Valida y aplica un movimiento (la máquina puede venir de otra sala)."""
+        self.validar(maquina_id, x, y)
+        self._quitar(maquina_id)
+        self._poner(maquina_id, (x, y))
+
+    def aplicar(self, movimientos):
+        """
+        Aplica `movimientos` ({maquina_id: (x, y)}) como un solo cambio: se
+        valida el estado final, no cada paso, así que intercambios y ciclos
+        (A→B, B→C, C→A) son válidos. Si algo falla la cuadrícula queda igual
+        y se lanza el primer error. Devuelve {maquina_id: (x, y)} solo con
+        las máquinas que realmente cambiaron de celda.
+        """
+        for maquina_id in movimientos:
+            if maquina_id not in self.posiciones:
+                raise ErrorCuadricula('La máquina no está activa en esta sala', maquina_id)
+
+        anteriores = {maquina_id: self.posiciones[maquina_id] for maquina_id in movimientos}
+        for maquina_id in movimientos:
+            self._quitar(maquina_id)
+        try:
+            for maquina_id, (x, y) in movimientos.items():
+                self.mover(maquina_id, x, y)
+        except ErrorCuadricula:
+            for maquina_id in movimientos:
+                self._quitar(maquina_id)
+            for maquina_id, celda in anteriores.items():
+                self._poner(maquina_id, celda)
+            raise
+        return {
+            maquina_id: celda for maquina_id, celda in movimientos.items()
+            if celda != anteriores[maquina_id]
+        }
+
+    # ── Búsqueda ──────────────────────────────────────────────────────────
+    def celda_libre_cercana(self, x=1, y=1):
+        """
+        Celda libre más cercana a (x, y) por anillos (distancia de
+        Chebyshev); a igual distancia gana la de menor (y, x). None si la
+        sala está llena.
+        """
+        if len(self.celdas) >= self.ancho * self.alto:
+            return None
+        x = min(max(x, 1), self.ancho)
+        y = min(max(y, 1), self.alto)
+        for radio in range(max(self.ancho, self.alto)):
+            candidatas = [
+                celda for celda in _anillo(x, y, radio)
+                if self.dentro(*celda) and celda not in self.celdas
+            ]
+            if candidatas:
+                return min(candidatas, key=lambda celda: (celda[1], celda[0]))
+        return None
+
+
+def _anillo(x, y, radio):
+    """Celdas a distancia de Chebyshev exactamente `radio` de (x, y)."""
+    if radio == 0:
+        return [(x, y)]
+    horizontales = [
+        (cx, cy) for cx in range(x - radio, x + radio + 1) for cy in (y - radio, y + radio)
+    ]
+    verticales = [
+        (cx, cy) for cy in range(y - radio + 1, y + radio) for cx in (x - radio, x + radio)
+    ]
+    return horizontales + verticales
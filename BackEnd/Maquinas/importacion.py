@@ -0,0 +1,396 @@
+"""
+Importación masiva de máquinas (CSV / JSON).
+
+Dar de alta el piso de un casino nuevo eran cientos de `POST /maquinas/`,
+cada uno con `full_clean` (consultas de unicidad de IP, serie y coordenada,
+más el Casino) y los INSERT del M2M de denominaciones uno por uno. Aquí:
+
+  1. Se lee UNA foto del casino: uid, serie, IP y posición de sus máquinas,
+     más los catálogos de modelos y denominaciones (tres consultas en total).
+  2. Todas las filas se validan en memoria contra esa foto y contra las
+     filas anteriores del mismo archivo, con las mismas reglas que
+     Maquina.clean: la posición (piso, sala, x, y) no puede repetirse con
+     ninguna otra máquina del casino, activa o no, incluida (0, 0). Así una
+     máquina importada se puede volver a guardar por PUT/PATCH. Se reportan
+     TODOS los errores a la vez.
+  3. Si no hay errores (y no es simulación), en una sola transacción:
+     bulk_create de las máquinas, una consulta para leer sus ids (MySQL no
+     devuelve los PKs de un INSERT múltiple) y bulk_create por lotes de la
+     tabla intermedia de denominaciones.
+
+bulk_create no dispara signals, así que los efectos que dependen de ellos se
+aplican aquí por lote: auditoría (un evento CREATE por máquina, escritos
+juntos por AuditoriaGlobal/escritor.py), caché por casino, versiones de
+tablas, feed del mapa e índice de búsqueda.
+
+Columnas: uid_sala, numero_serie, ip_maquina, juego y modelo (id o
+nombre_modelo) son obligatorias; ubicacion_piso, ubicacion_sala,
+coordenada_x, coordenada_y, estado_actual, ultimo_mantenimiento,
+fecha_vencimiento_licencia (YYYY-MM-DD) y denominaciones (ids o etiquetas
+separadas por "|") son opcionales.
+"""
+import csv
+import io
+import ipaddress
+import json
+import re
+import time
+from datetime import date, datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Maquina
+
+OBLIGATORIAS = ('uid_sala', 'numero_serie', 'ip_maquina', 'juego', 'modelo')
+LONGITUDES = {
+    campo: Maquina._meta.get_field(campo).max_length
+    for campo in ('uid_sala', 'numero_serie', 'juego', 'ubicacion_piso', 'ubicacion_sala', 'estado_actual')
+}
+SEPARADOR_DENOMINACIONES = re.compile(r'[|;]')
+
+
+def _config():
+    config = getattr(settings, 'IMPORTACION_MAQUINAS', {}) or {}
+    return {
+        'LOTE': max(int(config.get('LOTE', 500)), 1),
+        'MAX_FILAS': max(int(config.get('MAX_FILAS', 10000)), 1),
+    }
+
+
+class ErrorImportacion(Exception):
+    """Archivo ilegible o fuera de límites (no errores de fila)."""
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Lectura
+# ──────────────────────────────────────────────────────────────────────────────
+def leer_filas(contenido, formato):
+    """
+    Lista de dicts desde `contenido` en formato 'csv' o 'json'. `contenido`
+    es bytes / str, o para 'json' también la lista ya decodificada (cuerpo
+    JSON del request).
+    """
+    if isinstance(contenido, bytes):
+        try:
+            contenido = contenido.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise ErrorImportacion('El archivo debe estar en UTF-8')
+
+    if formato == 'csv':
+        filas = [
+            {(clave or '').strip(): valor for clave, valor in fila.items()}
+            for fila in csv.DictReader(io.StringIO(contenido))
+        ]
+    elif formato == 'json':
+        filas = contenido
+        if isinstance(contenido, str):
+            try:
+                filas = json.loads(contenido)
+            except json.JSONDecodeError as error:
+                raise ErrorImportacion(f'JSON inválido: {error}')
+        if isinstance(filas, dict):
+            filas = filas.get('maquinas')
+        if not isinstance(filas, list) or not all(isinstance(fila, dict) for fila in filas):
+            raise ErrorImportacion('El JSON debe ser una lista de objetos (o {"maquinas": [...]})')
+    else:
+        raise ErrorImportacion('Formato inválido. Opciones: csv, json')
+
+    if not filas:
+        raise ErrorImportacion('El archivo no contiene filas')
+    if len(filas) > _config()['MAX_FILAS']:
+        raise ErrorImportacion(f"Máximo {_config()['MAX_FILAS']} filas por importación")
+    return filas
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Validación
+# ──────────────────────────────────────────────────────────────────────────────
+def _texto(valor):
+    return '' if valor is None else str(valor).strip()
+
+
+def _fecha(valor):
+    valor = _texto(valor)
+    if not valor:
+        return None
+    return datetime.strptime(valor, '%Y-%m-%d').date()
+
+
+class _Foto:
+    """Lo existente en el casino y los catálogos, leído una sola vez."""
+
+    def __init__(self, casino):
+        from Denominaciones.models import Denominacion
+        from ModelosMaquinas.models import ModeloMaquina
+
+        self.casino = casino
+        self.uids, self.series, self.ips = set(), set(), set()
+        # (piso, sala, x, y) → id de la máquina (negativo: fila del archivo)
+        self.posiciones = {}
+        for maquina_id, uid, serie, ip, piso, sala, x, y in Maquina.objects.filter(
+            casino_id=casino.pk
+        ).values_list(
+            'id', 'uid_sala', 'numero_serie', 'ip_maquina', 'ubicacion_piso', 'ubicacion_sala',
+            'coordenada_x', 'coordenada_y',
+        ):
+            self.uids.add(uid.lower())
+            self.series.add(serie)
+            if ip:
+                self.ips.add(ip)
+            # Como Maquina.clean: cuentan también las inactivas
+            self.posiciones.setdefault((piso, sala, x, y), maquina_id)
+
+        self.modelos_por_id = set()
+        self.modelos_por_nombre = {}
+        for modelo_id, nombre in ModeloMaquina.objects.values_list('id', 'nombre_modelo'):
+            self.modelos_por_id.add(modelo_id)
+            # Un nombre repetido entre proveedores es ambiguo: None
+            clave = nombre.strip().lower()
+            self.modelos_por_nombre[clave] = None if clave in self.modelos_por_nombre else modelo_id
+
+        self.denominaciones_por_id = set()
+        self.denominaciones_por_etiqueta = {}
+        for denominacion_id, etiqueta in Denominacion.objects.values_list('id', 'etiqueta'):
+            self.denominaciones_por_id.add(denominacion_id)
+            self.denominaciones_por_etiqueta[str(etiqueta).strip().lower()] = denominacion_id
+
+    def modelo(self, valor):
+        valor = _texto(valor)
+        if valor.isdigit() and int(valor) in self.modelos_por_id:
+            return int(valor), None
+        modelo_id = self.modelos_por_nombre.get(valor.lower(), 0)
+        if modelo_id is None:
+            return None, f'Hay varios modelos llamados "{valor}"; use el id'
+        if not modelo_id:
+            return None, f'Modelo "{valor}" no encontrado'
+        return modelo_id, None
+
+    def denominaciones(self, valor):
+        partes = valor if isinstance(valor, list) else SEPARADOR_DENOMINACIONES.split(_texto(valor))
+        ids, faltantes = [], []
+        for parte in (_texto(parte) for parte in partes):
+            if not parte:
+                continue
+            if parte.isdigit() and int(parte) in self.denominaciones_por_id:
+                denominacion_id = int(parte)
+            else:
+                denominacion_id = self.denominaciones_por_etiqueta.get(parte.lower())
+            if denominacion_id is None:
+                faltantes.append(parte)
+            elif denominacion_id not in ids:
+                ids.append(denominacion_id)
+        return ids, faltantes
+
+
+def validar_filas(casino, filas):
+    """
+    Valida `filas` contra la foto del casino. Devuelve (maquinas, errores):
+    `maquinas` es [(Maquina sin guardar, [denominacion_id, ...])] y `errores`
+    [{fila, campo, error}] con la fila numerada desde 1.
+    """
+    foto = _Foto(casino)
+    estados = {clave for clave, _ in Maquina.ESTADOS_CHOICES}
+    pisos = {clave for clave, _ in Maquina.PISO_CHOICES}
+    salas = {clave for clave, _ in Maquina.SALA_CHOICES}
+    hoy = date.today()
+    maquinas, errores = [], []
+
+    for numero, datos in enumerate(filas, start=1):
+        errores_fila = []
+
+        def error(campo, mensaje):
+            errores_fila.append({'fila': numero, 'campo': campo, 'error': mensaje})
+
+        valores = {campo: _texto(datos.get(campo)) for campo in (
+            'uid_sala', 'numero_serie', 'ip_maquina', 'juego',
+            'ubicacion_piso', 'ubicacion_sala', 'estado_actual',
+        )}
+        for campo in OBLIGATORIAS:
+            if not _texto(datos.get(campo)):
+                error(campo, 'Este campo es obligatorio')
+        for campo, maximo in LONGITUDES.items():
+            if len(valores[campo]) > maximo:
+                error(campo, f'Máximo {maximo} caracteres')
+
+        valores['ubicacion_piso'] = valores['ubicacion_piso'] or 'PISO_1'
+        valores['ubicacion_sala'] = valores['ubicacion_sala'] or 'SALA_PRINCIPAL'
+        valores['estado_actual'] = valores['estado_actual'] or 'OPERATIVA'
+        if valores['ubicacion_piso'] not in pisos:
+            error('ubicacion_piso', f"Piso inválido: {valores['ubicacion_piso']}")
+        if valores['ubicacion_sala'] not in salas:
+            error('ubicacion_sala', f"Sala inválida: {valores['ubicacion_sala']}")
+        if valores['estado_actual'] not in estados:
+            error('estado_actual', f"Estado inválido: {valores['estado_actual']}")
+
+        modelo_id = None
+        if _texto(datos.get('modelo')):
+            modelo_id, mensaje = foto.modelo(datos.get('modelo'))
+            if mensaje:
+                error('modelo', mensaje)
+
+        if valores['ip_maquina']:
+            try:
+                valores['ip_maquina'] = str(ipaddress.ip_address(valores['ip_maquina']))
+            except ValueError:
+                error('ip_maquina', f"IP inválida: {valores['ip_maquina']}")
+
+        # Unicidad por casino contra lo existente y las filas anteriores del archivo
+        if valores['uid_sala'] and valores['uid_sala'].lower() in foto.uids:
+            error('uid_sala', f"El UID {valores['uid_sala']} ya existe en este casino.")
+        if valores['numero_serie'] and valores['numero_serie'] in foto.series:
+            error('numero_serie', f"El número de serie {valores['numero_serie']} ya está registrado en este casino.")
+        if valores['ip_maquina'] and valores['ip_maquina'] in foto.ips:
+            error('ip_maquina', f"La IP {valores['ip_maquina']} ya está en uso en este casino.")
+
+        fechas = {}
+        for campo in ('ultimo_mantenimiento', 'fecha_vencimiento_licencia'):
+            try:
+                fechas[campo] = _fecha(datos.get(campo))
+            except ValueError:
+                error(campo, 'Formato de fecha inválido (YYYY-MM-DD)')
+                fechas[campo] = None
+        if fechas['ultimo_mantenimiento'] and fechas['ultimo_mantenimiento'] > hoy:
+            error('ultimo_mantenimiento', 'La fecha del último mantenimiento no puede ser futura.')
+        if fechas['fecha_vencimiento_licencia'] and fechas['fecha_vencimiento_licencia'] < hoy:
+            error('fecha_vencimiento_licencia', 'La fecha de vencimiento de la licencia no puede ser pasada.')
+
+        coordenadas = {}
+        for campo in ('coordenada_x', 'coordenada_y'):
+            try:
+                coordenadas[campo] = int(_texto(datos.get(campo)) or 0)
+                if coordenadas[campo] < 0:
+                    raise ValueError
+            except ValueError:
+                error(campo, 'Debe ser un entero positivo')
+                coordenadas[campo] = None
+
+        denominaciones, faltantes = foto.denominaciones(datos.get('denominaciones'))
+        if faltantes:
+            error('denominaciones', f"Denominaciones no encontradas: {', '.join(faltantes)}")
+
+        # La posición se valida al final: una fila con errores no ocupa celda
+        posicion = None
+        if not errores_fila:
+            x, y = coordenadas['coordenada_x'], coordenadas['coordenada_y']
+            posicion = (valores['ubicacion_piso'], valores['ubicacion_sala'], x, y)
+            ocupante = foto.posiciones.get(posicion)
+            if x > casino.grid_width or y > casino.grid_height:
+                error('coordenadas', (
+                    'Las coordenadas X e Y no pueden exceder los límites configurados en el mapa del casino '
+                    f'({casino.grid_width}x{casino.grid_height}).'
+                ))
+            elif ocupante is not None and ocupante < 0:
+                error('coordenadas', f'La posición ({x}, {y}) ya la ocupa la fila {-ocupante} del archivo')
+            elif ocupante is not None:
+                error('coordenadas', 'Ya existe una máquina con las mismas coordenadas en esta sala y piso del casino.')
+
+        if errores_fila:
+            errores.extend(errores_fila)
+            continue
+
+        # Id provisional negativo: la fila aún no existe en la BD
+        foto.posiciones[posicion] = -numero
+        foto.uids.add(valores['uid_sala'].lower())
+        foto.series.add(valores['numero_serie'])
+        foto.ips.add(valores['ip_maquina'])
+        maquinas.append((Maquina(
+            casino_id=casino.pk,
+            modelo_id=modelo_id,
+            **valores,
+            **coordenadas,
+            **fechas,
+        ), denominaciones))
+
+    return maquinas, errores
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Inserción
+# ──────────────────────────────────────────────────────────────────────────────
+def _efectos_de_alta(casino, creadas):
+    """Lo que harían los signals de post_save por cada alta, aplicado por lote."""
+    from AuditoriaGlobal.diferencial import payload_create
+    from AuditoriaGlobal.escritor import registrar_evento
+    from AuditoriaGlobal.signals import model_to_dict, obtener_usuario_casino
+    from ModelBase.busqueda import marcar_reindexado
+    from ModelBase.cache_respuestas import invalidar_casino
+    from ModelBase.condicional import marcar_cambio
+
+    from .cambios_mapa import marcar_cambio_mapa
+    from .models import CambioMapa
+
+    usuario, casino_sesion = obtener_usuario_casino()
+    ahora = timezone.now()
+    for maquina in creadas:
+        registrar_evento({
+            'tabla': 'Maquina',
+            'registro_id': str(maquina.pk),
+            'accion': 'CREATE',
+            'fecha': ahora,
+            'usuario_id': usuario.pk if usuario else None,
+            'casino_id': casino_sesion.pk if casino_sesion else None,
+            **payload_create('Maquina', str(maquina.pk), model_to_dict(maquina)),
+        })
+
+    ids = [maquina.pk for maquina in creadas]
+    invalidar_casino(casino.pk)
+    marcar_cambio('Maquinas.Maquina')
+    marcar_cambio_mapa(casino.pk, ids, [], CambioMapa.ACCION_ALTA)
+    marcar_reindexado('machine', ids)
+
+
+def importar_maquinas(casino, filas, creado_por='Sistema', dry_run=False):
+    """
+    Valida e inserta `filas` en `casino`. Con errores o `dry_run` no escribe
+    nada. Devuelve {total, validas, creadas, errores, dry_run, segundos,
+    filas_por_segundo} con los tiempos de validación e inserción.
+    """
+    lote = _config()['LOTE']
+    inicio = time.perf_counter()
+    maquinas, errores = validar_filas(casino, filas)
+    validacion = time.perf_counter() - inicio
+
+    creadas = []
+    insercion = 0.0
+    if not errores and not dry_run:
+        inicio_insercion = time.perf_counter()
+        with transaction.atomic():
+            for maquina, _ in maquinas:
+                maquina.creado_por = creado_por
+                maquina.modificado_por = creado_por
+            Maquina.objects.bulk_create([maquina for maquina, _ in maquinas], batch_size=lote)
+
+            # MySQL no devuelve los PKs del INSERT múltiple: se leen por uid,
+            # único por casino
+            uids = [maquina.uid_sala for maquina, _ in maquinas]
+            por_uid = {
+                maquina.uid_sala: maquina
+                for maquina in Maquina.objects.filter(casino_id=casino.pk, uid_sala__in=uids)
+            }
+            creadas = [por_uid[uid] for uid in uids]
+
+            intermedia = Maquina.denominaciones.through
+            intermedia.objects.bulk_create([
+                intermedia(maquina_id=por_uid[maquina.uid_sala].pk, denominacion_id=denominacion_id)
+                for maquina, denominaciones in maquinas
+                for denominacion_id in denominaciones
+            ], batch_size=lote)
+
+            _efectos_de_alta(casino, creadas)
+        insercion = time.perf_counter() - inicio_insercion
+
+    total_segundos = validacion + insercion
+    return {
+        'total': len(filas),
+        'validas': len(maquinas),
+        'creadas': len(creadas),
+        'errores': errores,
+        'dry_run': dry_run,
+        'segundos': {
+            'validacion': round(validacion, 3),
+            'insercion': round(insercion, 3),
+        },
+        'filas_por_segundo': round(len(filas) / total_segundos) if total_segundos else None,
+    }
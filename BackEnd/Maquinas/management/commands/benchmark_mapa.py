@@ -0,0 +1,135 @@
+"""
+Management Command: benchmark_mapa
+==================================
+Compara el payload del mapa interactivo serializado con
+MaquinaMapaSerializer contra el formato columnar
+(Maquinas/mapa_columnar.py): consultas SQL, tiempo de armado + render JSON,
+bytes y bytes con gzip.
+
+Con --maquinas N se agregan N máquinas sintéticas a un piso del casino
+dentro de una transacción que se revierte al terminar (no quedan en la BD).
+
+Uso:
+    python manage.py benchmark_mapa --casino 3
+    python manage.py benchmark_mapa --casino 3 --maquinas 5000 --repeticiones 10
+"""
+import gzip
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from Casinos.models import Casino
+from Denominaciones.models import Denominacion
+from Maquinas.mapa_columnar import construir_mapa_columnar
+from Maquinas.models import Maquina
+from Maquinas.serializers import MaquinaMapaSerializer
+from ModelosMaquinas.models import ModeloMaquina
+
+PREFIJO_UID = 'BENCHMAPA-'
+PISO, SALA = 'PISO_1', 'SALA_A'
+
+
+class _Revertir(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Mide tamaño y tiempo del payload del mapa: serializer contra formato columnar'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--casino', type=int, help='ID del casino (por defecto el primero activo).')
+        parser.add_argument('--maquinas', type=int, default=0, help='Máquinas sintéticas a agregar (se revierten).')
+        parser.add_argument('--repeticiones', type=int, default=5, help='Repeticiones por formato (mediana).')
+
+    def _sembrar(self, casino, cantidad):
+        modelos = list(ModeloMaquina.objects.values_list('id', flat=True)[:50])
+        if not modelos:
+            raise CommandError('Se necesita al menos un modelo de máquina para sembrar.')
+        denominaciones = list(Denominacion.objects.values_list('id', flat=True))
+        estados = [clave for clave, _ in Maquina.ESTADOS_CHOICES]
+        ancho = max(casino.grid_width, 1)
+
+        Maquina.objects.bulk_create([
+            Maquina(
+                casino=casino,
+                modelo_id=random.choice(modelos),
+                uid_sala=f'{PREFIJO_UID}{i:06d}',
+                numero_serie=f'{PREFIJO_UID}S{i:06d}',
+                ip_maquina=f'10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}',
+                juego='Benchmark',
+                ubicacion_piso=PISO,
+                ubicacion_sala=SALA,
+                coordenada_x=i % ancho,
+                coordenada_y=i // ancho,
+                estado_actual=random.choice(estados),
+                creado_por='SYSTEM',
+                modificado_por='SYSTEM',
+            )
+            for i in range(cantidad)
+        ], batch_size=1000)
+
+        if denominaciones:
+            intermedia = Maquina.denominaciones.through
+            ids = Maquina.objects.filter(casino=casino, uid_sala__startswith=PREFIJO_UID).values_list('id', flat=True)
+            intermedia.objects.bulk_create([
+                intermedia(maquina_id=maquina_id, denominacion_id=denominacion_id)
+                for maquina_id in ids
+                for denominacion_id in random.sample(denominaciones, min(len(denominaciones), random.randint(1, 3)))
+            ], batch_size=2000)
+
+    def _medir(self, generar, repeticiones):
+        tiempos, consultas, cuerpo = [], 0, b''
+        for _ in range(repeticiones):
+            with CaptureQueriesContext(connection) as ctx:
+                inicio = time.perf_counter()
+                cuerpo = JSONRenderer().render(generar())
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+            consultas = len(ctx.captured_queries)
+        return statistics.median(tiempos), consultas, len(cuerpo), len(gzip.compress(cuerpo))
+
+    def handle(self, *args, **options):
+        casinos = Casino.objects.filter(esta_activo=True)
+        casino = casinos.filter(pk=options['casino']).first() if options['casino'] else casinos.order_by('id').first()
+        if casino is None:
+            raise CommandError('Casino no encontrado o inactivo.')
+        repeticiones = max(options['repeticiones'], 1)
+
+        try:
+            with transaction.atomic():
+                if options['maquinas']:
+                    self._sembrar(casino, options['maquinas'])
+
+                queryset = Maquina.objects.filter(casino=casino, esta_activo=True).select_related(
+                    'modelo', 'modelo__proveedor'
+                )
+                if options['maquinas']:
+                    queryset = queryset.filter(ubicacion_piso=PISO, ubicacion_sala=SALA)
+                total = queryset.count()
+
+                escenarios = [
+                    ('Serializer', lambda: MaquinaMapaSerializer(queryset, many=True).data),
+                    ('Columnar', lambda: construir_mapa_columnar(queryset)),
+                ]
+                self.stdout.write(f'\n📅 {casino.nombre}: {total} máquinas, {repeticiones} repeticiones\n')
+                self.stdout.write(f'  {"Formato":<12} {"SQL":>5} {"ms p50":>9} {"bytes":>11} {"gzip":>10}')
+                self.stdout.write(f'  ─────────────────────────────────────────────────────')
+                resultados = {}
+                for nombre, generar in escenarios:
+                    ms, consultas, tamano, comprimido = self._medir(generar, repeticiones)
+                    resultados[nombre] = (ms, tamano, comprimido)
+                    self.stdout.write(f'  {nombre:<12} {consultas:>5} {ms:>9.1f} {tamano:>11} {comprimido:>10}')
+                raise _Revertir
+        except _Revertir:
+            pass
+
+        (ms_s, bytes_s, gz_s), (ms_c, bytes_c, gz_c) = resultados['Serializer'], resultados['Columnar']
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Columnar: {ms_s / ms_c if ms_c else 0:.1f}x más rápido, '
+            f'{bytes_s / bytes_c if bytes_c else 0:.1f}x menos bytes ({gz_s / gz_c if gz_c else 0:.1f}x con gzip).'
+        ))
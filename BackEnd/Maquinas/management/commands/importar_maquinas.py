@@ -0,0 +1,64 @@
+"""
+Management Command: importar_maquinas
+=====================================
+Alta masiva de máquinas de un casino desde un archivo CSV o JSON, con las
+mismas validaciones y la misma inserción por lotes que el endpoint
+`maquinas/importar/` (ver Maquinas/importacion.py). Si alguna fila tiene
+errores se listan todos y no se crea nada.
+
+Uso:
+    python manage.py importar_maquinas piso_nuevo.csv --casino 3 --dry-run
+    python manage.py importar_maquinas piso_nuevo.csv --casino 3
+    python manage.py importar_maquinas maquinas.json --casino 3 --usuario jlopez
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from Casinos.models import Casino
+from Maquinas.importacion import ErrorImportacion, importar_maquinas, leer_filas
+
+
+class Command(BaseCommand):
+    help = 'Importa máquinas desde CSV/JSON validando todo el archivo antes de insertar'
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help='Ruta del archivo .csv o .json')
+        parser.add_argument('--casino', type=int, required=True, help='ID del casino destino.')
+        parser.add_argument('--formato', choices=['csv', 'json'], help='Por defecto según la extensión.')
+        parser.add_argument('--dry-run', action='store_true', help='Solo valida; no escribe nada.')
+        parser.add_argument('--usuario', default='system', help='Valor de creado_por.')
+
+    def handle(self, *args, **options):
+        casino = Casino.objects.filter(pk=options['casino'], esta_activo=True).first()
+        if casino is None:
+            raise CommandError('Casino no encontrado o inactivo.')
+
+        formato = options['formato'] or options['archivo'].rsplit('.', 1)[-1].lower()
+        try:
+            with open(options['archivo'], 'rb') as archivo:
+                filas = leer_filas(archivo.read(), formato)
+        except OSError as error:
+            raise CommandError(f'No se pudo leer el archivo: {error}')
+        except ErrorImportacion as error:
+            raise CommandError(str(error))
+
+        modo = 'simulación' if options['dry_run'] else 'importación'
+        self.stdout.write(f'\n📅 {casino.nombre}: {len(filas)} filas ({modo})\n')
+        resultado = importar_maquinas(casino, filas, creado_por=options['usuario'], dry_run=options['dry_run'])
+
+        self.stdout.write(
+            f"  Validación: {resultado['segundos']['validacion']:.3f} s   "
+            f"Inserción: {resultado['segundos']['insercion']:.3f} s   "
+            f"Filas/s: {resultado['filas_por_segundo'] or '—'}"
+        )
+        self.stdout.write('  ─────────────────────────────────────────')
+
+        if resultado['errores']:
+            for error in resultado['errores']:
+                self.stdout.write(f"  Fila {error['fila']:>5}  {error['campo']:<26} {error['error']}")
+            filas_con_error = len({error['fila'] for error in resultado['errores']})
+            raise CommandError(f"{len(resultado['errores'])} errores en {filas_con_error} filas; no se creó ninguna máquina.")
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f"⚠️ Simulación: {resultado['validas']} filas válidas, nada escrito."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"✅ {resultado['creadas']} máquinas creadas."))
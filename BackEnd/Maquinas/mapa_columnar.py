@@ -0,0 +1,151 @@
+"""
+Formato columnar del mapa interactivo (`mapa-completo/?formato=columnar`).
+
+MaquinaMapaSerializer arma un objeto por máquina: varios SerializerMethodField
+por fila y los datos del proveedor (nombre, RFC, correo, teléfono) repetidos
+en cada máquina del mismo modelo. Con pisos de miles de máquinas el costo es
+casi todo serialización y el JSON es mayormente nombres de campo repetidos.
+
+Aquí la respuesta se arma directo desde `.values_list()` en cuatro consultas
+(máquinas, tabla intermedia de denominaciones, modelos con su proveedor,
+denominaciones) como arreglos paralelos:
+
+    maquinas: {id: [...], uid: [...], x: [...], y: [...], estado: [0, 2, ...],
+               modelo: [0, 0, 1, ...], denominaciones: [[0, 1], [2], ...], ...}
+    tablas:   {estados: [...], pisos: [...], salas: [...],
+               modelos: {...}, proveedores: {...}, denominaciones: {...}}
+
+Los campos repetidos se guardan una vez en `tablas` y cada máquina lleva su
+índice (null si no tiene). El frontend los reconstruye en
+FrontEnd/src/service/mapaService.js (desempaquetarMapaColumnar).
+"""
+from datetime import date
+
+from django.utils import timezone
+
+from Denominaciones.models import Denominacion
+from ModelosMaquinas.models import ModeloMaquina
+
+from .models import Maquina
+
+COLUMNAS_MAQUINA = (
+    'id', 'uid_sala', 'juego', 'coordenada_x', 'coordenada_y',
+    'ubicacion_piso', 'ubicacion_sala', 'estado_actual', 'contador_fallas',
+    'modelo_id', 'ip_maquina', 'numero_serie', 'ultimo_mantenimiento',
+    'fecha_vencimiento_licencia', 'creado_en',
+)
+
+
+class _Indice:
+    """Valores distintos en orden de aparición → índice estable."""
+
+    def __init__(self):
+        self.valores = []
+        self._posiciones = {}
+
+    def __call__(self, valor):
+        posicion = self._posiciones.get(valor)
+        if posicion is None:
+            posicion = self._posiciones[valor] = len(self.valores)
+            self.valores.append(valor)
+        return posicion
+
+
+def construir_mapa_columnar(queryset):
+    """
+    Dict columnar con las máquinas de `queryset` (ya filtrado por casino,
+    piso y sala). Mismos datos que MaquinaMapaSerializer salvo `casino` y
+    `casino_nombre`, que ya van en la raíz de la respuesta.
+    """
+    hoy = date.today()
+    # Sin prefetch: las denominaciones se leen abajo con una sola consulta
+    queryset = queryset.prefetch_related(None)
+    estados, pisos, salas = _Indice(), _Indice(), _Indice()
+    modelos, denominaciones = _Indice(), _Indice()
+
+    columnas = {
+        'id': [], 'uid': [], 'juego': [], 'x': [], 'y': [],
+        'piso': [], 'sala': [], 'estado': [], 'fallas': [], 'modelo': [],
+        'ip': [], 'serie': [], 'ultimo_mantenimiento': [], 'vencimiento_licencia': [],
+        'dias_licencia': [], 'instalacion': [], 'denominaciones': [],
+    }
+    posicion_por_id = {}
+    for (pk, uid, juego, x, y, piso, sala, estado, fallas, modelo_id, ip, serie,
+         mantenimiento, vencimiento, creado_en) in queryset.values_list(*COLUMNAS_MAQUINA):
+        posicion_por_id[pk] = len(columnas['id'])
+        columnas['id'].append(pk)
+        columnas['uid'].append(uid)
+        columnas['juego'].append(juego)
+        columnas['x'].append(x)
+        columnas['y'].append(y)
+        columnas['piso'].append(pisos(piso))
+        columnas['sala'].append(salas(sala))
+        columnas['estado'].append(estados(estado))
+        columnas['fallas'].append(fallas)
+        columnas['modelo'].append(modelos(modelo_id) if modelo_id is not None else None)
+        columnas['ip'].append(ip)
+        columnas['serie'].append(serie)
+        columnas['ultimo_mantenimiento'].append(mantenimiento.isoformat() if mantenimiento else None)
+        columnas['vencimiento_licencia'].append(vencimiento.isoformat() if vencimiento else None)
+        # Mismo criterio que MaquinaMapaSerializer.get_dias_licencia
+        columnas['dias_licencia'].append(max((vencimiento - hoy).days, 0) if vencimiento else 'Indefinida')
+        columnas['instalacion'].append(timezone.localtime(creado_en).strftime('%Y-%m-%d') if creado_en else None)
+        columnas['denominaciones'].append([])
+
+    # Denominaciones: una consulta sobre la tabla intermedia
+    if posicion_por_id:
+        intermedia = Maquina.denominaciones.through.objects.filter(
+            maquina_id__in=queryset.values('id')
+        ).values_list('maquina_id', 'denominacion_id')
+        for maquina_id, denominacion_id in intermedia:
+            posicion = posicion_por_id.get(maquina_id)
+            if posicion is not None:
+                columnas['denominaciones'][posicion].append(denominaciones(denominacion_id))
+
+    # Modelos con su proveedor: una consulta, cada proveedor una sola vez
+    proveedores = _Indice()
+    tabla_modelos = {'id': [], 'nombre': [], 'producto': [], 'proveedor': []}
+    tabla_proveedores = {'id': [], 'nombre': [], 'rfc': [], 'email': [], 'telefono': []}
+    datos_modelos = {
+        fila[0]: fila for fila in ModeloMaquina.objects.filter(pk__in=modelos.valores).values_list(
+            'id', 'nombre_modelo', 'nombre_producto', 'proveedor_id', 'proveedor__nombre',
+            'proveedor__rfc', 'proveedor__email_corporativo', 'proveedor__telefono_soporte',
+        )
+    }
+    for modelo_id in modelos.valores:
+        _, nombre, producto, proveedor_id, *proveedor = datos_modelos[modelo_id]
+        tabla_modelos['id'].append(modelo_id)
+        tabla_modelos['nombre'].append(nombre)
+        tabla_modelos['producto'].append(producto)
+        posicion = proveedores(proveedor_id)
+        tabla_modelos['proveedor'].append(posicion)
+        if posicion == len(tabla_proveedores['id']):
+            tabla_proveedores['id'].append(proveedor_id)
+            for campo, valor in zip(('nombre', 'rfc', 'email', 'telefono'), proveedor):
+                tabla_proveedores[campo].append(valor)
+
+    datos_denominaciones = {
+        fila[0]: fila for fila in Denominacion.objects.filter(
+            pk__in=denominaciones.valores
+        ).values_list('id', 'etiqueta', 'valor')
+    }
+    tabla_denominaciones = {'id': [], 'etiqueta': [], 'valor': []}
+    for denominacion_id in denominaciones.valores:
+        _, etiqueta, valor = datos_denominaciones[denominacion_id]
+        tabla_denominaciones['id'].append(denominacion_id)
+        tabla_denominaciones['etiqueta'].append(etiqueta)
+        tabla_denominaciones['valor'].append(str(valor))
+
+    return {
+        'formato': 'columnar',
+        'total': len(columnas['id']),
+        'maquinas': columnas,
+        'tablas': {
+            'estados': estados.valores,
+            'pisos': pisos.valores,
+            'salas': salas.valores,
+            'modelos': tabla_modelos,
+            'proveedores': tabla_proveedores,
+            'denominaciones': tabla_denominaciones,
+        },
+    }
@@ -0,0 +1,43 @@
+# Generated by Django 6.0.2 on 2026-10-18 18:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Maquinas', '0003_alter_maquina_numero_serie_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersionMapa',
+            fields=[
+                ('casino_id', models.PositiveBigIntegerField(primary_key=True, serialize=False, verbose_name='ID del Casino')),
+                ('version', models.PositiveBigIntegerField(default=0, verbose_name='Versión')),
+                ('minima', models.PositiveBigIntegerField(default=0, verbose_name='Versión Mínima Disponible')),
+            ],
+            options={
+                'verbose_name': 'Versión de Mapa',
+                'verbose_name_plural': 'Versiones de Mapa',
+                'db_table': 'maquinas_mapa_versiones',
+            },
+        ),
+        migrations.CreateModel(
+            name='CambioMapa',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('casino_id', models.PositiveBigIntegerField(verbose_name='ID del Casino')),
+                ('version', models.PositiveBigIntegerField(verbose_name='Versión')),
+                ('maquina_id', models.PositiveBigIntegerField(verbose_name='ID de la Máquina')),
+                ('accion', models.CharField(choices=[('A', 'Alta'), ('M', 'Modificación'), ('B', 'Baja')], default='M', max_length=1, verbose_name='Acción')),
+                ('campos', models.JSONField(blank=True, default=list, verbose_name='Campos Modificados')),
+            ],
+            options={
+                'verbose_name': 'Cambio de Mapa',
+                'verbose_name_plural': 'Cambios de Mapa',
+                'db_table': 'maquinas_mapa_cambios',
+                'indexes': [models.Index(fields=['casino_id', 'version'], name='mapa_cambios_casino_ver_idx')],
+            },
+        ),
+    ]
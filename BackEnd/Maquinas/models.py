@@ -187,3 +187,81 @@ class Maquina(ModeloBase):
             self.full_clean()
         
         super().save(*args, **kwargs)
+
+
+class VersionMapa(models.Model):
+    """
+    Versión del mapa interactivo de un casino (ver Maquinas/cambios_mapa.py).
+    Cada transacción que modifica máquinas del casino la incrementa una vez
+    y registra sus CambioMapa con el número nuevo. `minima` es la versión
+    más antigua desde la que un cliente aún puede ponerse al día: los cambios
+    anteriores ya se purgaron.
+    """
+    casino_id = models.PositiveBigIntegerField(
+        primary_key=True,
+        verbose_name="ID del Casino"
+    )
+    version = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name="Versión"
+    )
+    minima = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name="Versión Mínima Disponible"
+    )
+
+    class Meta:
+        db_table = 'maquinas_mapa_versiones'
+        verbose_name = "Versión de Mapa"
+        verbose_name_plural = "Versiones de Mapa"
+
+    def __str__(self):
+        return f"Casino {self.casino_id} v{self.version}"
+
+
+class CambioMapa(models.Model):
+    """
+    Cambio de una máquina en el mapa de un casino: qué máquina, qué campos y
+    en qué versión. Sin FK a Maquina ni a Casino: el registro debe sobrevivir
+    al borrado de la máquina (la baja también es un cambio).
+    """
+    ACCION_ALTA = 'A'
+    ACCION_MODIFICACION = 'M'
+    ACCION_BAJA = 'B'
+    ACCION_CHOICES = [
+        (ACCION_ALTA, 'Alta'),
+        (ACCION_MODIFICACION, 'Modificación'),
+        (ACCION_BAJA, 'Baja'),
+    ]
+
+    casino_id = models.PositiveBigIntegerField(
+        verbose_name="ID del Casino"
+    )
+    version = models.PositiveBigIntegerField(
+        verbose_name="Versión"
+    )
+    maquina_id = models.PositiveBigIntegerField(
+        verbose_name="ID de la Máquina"
+    )
+    accion = models.CharField(
+        max_length=1,
+        choices=ACCION_CHOICES,
+        default=ACCION_MODIFICACION,
+        verbose_name="Acción"
+    )
+    campos = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name="Campos Modificados"
+    )
+
+    class Meta:
+        db_table = 'maquinas_mapa_cambios'
+        verbose_name = "Cambio de Mapa"
+        verbose_name_plural = "Cambios de Mapa"
+        indexes = [
+            models.Index(fields=['casino_id', 'version'], name='mapa_cambios_casino_ver_idx'),
+        ]
+
+    def __str__(self):
+        return f"Casino {self.casino_id} v{self.version}: {self.get_accion_display()} {self.maquina_id}"
@@ -1,8 +1,33 @@
 from rest_framework import serializers
 from .models import Maquina
 from Denominaciones.models import Denominacion
+from ModelBase.cargadores import Cargador, CampoPorLote, ListaConCargadores
 from datetime import date
 
+
+def _nombres_de_casinos(ids):
+    from Casinos.models import Casino
+    return dict(Casino.objects.filter(pk__in=ids).values_list('id', 'nombre'))
+
+
+def _denominaciones_de_maquinas(ids):
+    """{maquina_id: [{id, etiqueta, valor}, ...]} con una consulta sobre la tabla intermedia."""
+    resultado = {}
+    intermedia = Maquina.denominaciones.through.objects.filter(maquina_id__in=ids).order_by('id').values_list(
+        'maquina_id', 'denominacion_id', 'denominacion__etiqueta', 'denominacion__valor'
+    )
+    for maquina_id, denominacion_id, etiqueta, valor in intermedia:
+        resultado.setdefault(maquina_id, []).append(
+            {'id': denominacion_id, 'etiqueta': etiqueta, 'valor': str(valor)}
+        )
+    return resultado
+
+
+# Búsquedas por lote de los listados de máquinas (ver ModelBase/cargadores.py)
+NOMBRE_CASINO = Cargador('casino.nombre', _nombres_de_casinos)
+DENOMINACIONES_MAQUINA = Cargador('maquina.denominaciones_info', _denominaciones_de_maquinas)
+
+
 class MaquinaSerializer(serializers.ModelSerializer):
     # Denominaciones: se requiere al menos una, rechaza lista vacía
     denominaciones = serializers.PrimaryKeyRelatedField(
@@ -26,8 +51,8 @@ class MaquinaSerializer(serializers.ModelSerializer):
     proveedor_telefono = serializers.CharField(source='modelo.proveedor.telefono_soporte', read_only=True)
     proveedor_contacto = serializers.CharField(source='modelo.proveedor.nombre_contacto_tecnico', read_only=True)
     
-    # Denominaciones como lista de objetos
-    denominaciones_info = serializers.SerializerMethodField()
+    # Denominaciones como lista de objetos (búsqueda por lote, ver DENOMINACIONES_MAQUINA)
+    denominaciones_info = CampoPorLote(DENOMINACIONES_MAQUINA, clave='pk', defecto=[])
     
     # Alias para compatibilidad: uid es el mismo que uid_sala
     uid = serializers.CharField(source='uid_sala', read_only=True)
@@ -40,6 +65,7 @@ class MaquinaSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Maquina
+        list_serializer_class = ListaConCargadores
         fields = '__all__'
 
         # Campos de readonly
@@ -56,17 +82,6 @@ class MaquinaSerializer(serializers.ModelSerializer):
             return "Indefinida"
         delta = obj.fecha_vencimiento_licencia - date.today()
         return max(delta.days, 0)
-    
-    def get_denominaciones_info(self, obj):
-        """Retorna las denominaciones como lista de objetos con id y etiqueta"""
-        return [
-            {
-                'id': denom.id,
-                'etiqueta': denom.etiqueta,
-                'valor': str(denom.valor)
-            }
-            for denom in obj.denominaciones.all()
-        ]
 
 
 class MaquinaTablaSerializer(serializers.ModelSerializer):
@@ -100,6 +115,11 @@ class MaquinaFKSerializer(serializers.ModelSerializer):
         fields = ['id', 'uid_sala', 'casino_nombre', 'modelo_nombre']
 
 
+# Etiquetas de piso y sala, construidas una vez y no por cada máquina
+PISO_LABELS = dict(Maquina.PISO_CHOICES)
+SALA_LABELS = dict(Maquina.SALA_CHOICES)
+
+
 class MaquinaMapaSerializer(serializers.ModelSerializer):
     """
     Serializer ligero para el Mapa Interactivo de Sala.
@@ -112,7 +132,7 @@ class MaquinaMapaSerializer(serializers.ModelSerializer):
     modelo_nombre = serializers.CharField(source='modelo.nombre_modelo', read_only=True)
     modelo_producto = serializers.CharField(source='modelo.nombre_producto', read_only=True)
     imagen_url = serializers.ImageField(source='modelo.imagen', read_only=True)
-    casino_nombre = serializers.CharField(source='casino.nombre', read_only=True)
+    casino_nombre = CampoPorLote(NOMBRE_CASINO, clave='casino_id')
 
     # Datos del proveedor (para Modo Proveedor en el mapa)
     proveedor_id = serializers.IntegerField(source='modelo.proveedor.id', read_only=True)
@@ -124,7 +144,8 @@ class MaquinaMapaSerializer(serializers.ModelSerializer):
     # Datos adicionales para el diálogo de detalles
     dias_licencia = serializers.SerializerMethodField()
     fecha_instalacion = serializers.DateTimeField(source='creado_en', read_only=True, format='%Y-%m-%d')
-    denominaciones_info = serializers.SerializerMethodField()
+    # Denominaciones como lista de objetos con id, etiqueta y valor
+    denominaciones_info = CampoPorLote(DENOMINACIONES_MAQUINA, clave='pk', defecto=[])
 
     # Labels legibles para piso y sala
     ubicacion_piso_label = serializers.SerializerMethodField()
@@ -132,6 +153,7 @@ class MaquinaMapaSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Maquina
+        list_serializer_class = ListaConCargadores
         fields = [
             'id', 'uid', 'uid_sala', 'juego',
             'coordenada_x', 'coordenada_y',
@@ -148,27 +170,14 @@ class MaquinaMapaSerializer(serializers.ModelSerializer):
 
     def get_ubicacion_piso_label(self, obj):
         """Retorna la etiqueta legible del piso según los choices del modelo."""
-        choices_dict = dict(Maquina.PISO_CHOICES)
-        return choices_dict.get(obj.ubicacion_piso, obj.ubicacion_piso)
+        return PISO_LABELS.get(obj.ubicacion_piso, obj.ubicacion_piso)
 
     def get_ubicacion_sala_label(self, obj):
         """Retorna la etiqueta legible de la sala según los choices del modelo."""
-        choices_dict = dict(Maquina.SALA_CHOICES)
-        return choices_dict.get(obj.ubicacion_sala, obj.ubicacion_sala)
+        return SALA_LABELS.get(obj.ubicacion_sala, obj.ubicacion_sala)
 
     def get_dias_licencia(self, obj):
         if not obj.fecha_vencimiento_licencia:
             return "Indefinida"
         delta = obj.fecha_vencimiento_licencia - date.today()
         return max(delta.days, 0)
-    
-    def get_denominaciones_info(self, obj):
-        """Retorna las denominaciones como lista de objetos con id y etiqueta"""
-        return [
-            {
-                'id': denom.id,
-                'etiqueta': denom.etiqueta,
-                'valor': str(denom.valor)
-            }
-            for denom in obj.denominaciones.all()
-        ]
@@ -1,3 +1,242 @@
+from datetime import date, timedelta
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from Casinos.models import Casino
+from Denominaciones.models import Denominacion
+from ModelBase.pruebas import presupuesto_consultas
+from ModelosMaquinas.models import ModeloMaquina
+from Proveedores.models import Proveedor
+
+from .importacion import importar_maquinas
+from .mapa_columnar import construir_mapa_columnar
+from .models import Maquina
+from .serializers import MaquinaMapaSerializer, MaquinaSerializer
+
+
+def crear_sala(filas, nombre='Casino Pruebas'):
+    """Casino con dos modelos (un proveedor) y `filas` máquinas con denominaciones."""
+    casino = Casino.objects.create(nombre=nombre, direccion='Av. Siempre Viva 1', ciudad='CDMX')
+    proveedor = Proveedor.objects.create(
+        casino=casino, nombre='Proveedor Uno', rfc='PRO010101AAA',
+        email_corporativo='contacto@proveedor.mx', username='prov', password='x',
+    )
+    modelos = [
+        ModeloMaquina.objects.create(proveedor=proveedor, nombre_modelo=f'Modelo {letra}', nombre_producto='Producto')
+        for letra in 'AB'
+    ]
+    denominaciones = [
+        Denominacion.objects.get_or_create(valor=valor, defaults={'etiqueta': f'${valor}'})[0]
+        for valor in ('0.25', '1.00')
+    ]
+    maquinas = []
+    for i in range(filas):
+        maquina = Maquina.objects.create(
+            modelo=modelos[i % 2], casino=casino, uid_sala=f'A{i:03d}', numero_serie=f'SN{i:05d}',
+            ip_maquina=f'10.0.{i // 250}.{i % 250 + 1}', juego='Multijuego',
+            coordenada_x=i % 50, coordenada_y=i // 50,
+            fecha_vencimiento_licencia=date.today() + timedelta(days=i) if i % 3 else None,
+        )
+        maquina.denominaciones.set(denominaciones[:i % 2 + 1])
+        maquinas.append(maquina)
+    return casino, maquinas
+
+
+class ConsultasListadosMaquinasTests(TestCase):
+    """Los listados con búsquedas por lote hacen las mismas consultas con N y 2N filas."""
+
+    FILAS = 6
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.casino, cls.maquinas = crear_sala(2 * cls.FILAS)
+
+    def _consultas(self, serializer_class, queryset, filas):
+        with presupuesto_consultas() as medicion:
+            datos = serializer_class(list(queryset[:filas]), many=True).data
+        self.assertEqual(len(datos), filas)
+        return medicion.total
+
+    def test_listado_maquinas_constante(self):
+        queryset = Maquina.objects.filter(esta_activo=True).select_related(
+            'modelo', 'casino', 'modelo__proveedor'
+        ).prefetch_related('denominaciones').order_by('id')
+        self.assertEqual(
+            self._consultas(MaquinaSerializer, queryset, self.FILAS),
+            self._consultas(MaquinaSerializer, queryset, 2 * self.FILAS),
+        )
+
+    def test_mapa_constante(self):
+        queryset = Maquina.objects.filter(esta_activo=True).select_related(
+            'modelo', 'modelo__proveedor'
+        ).order_by('id')
+        self.assertEqual(
+            self._consultas(MaquinaMapaSerializer, queryset, self.FILAS),
+            self._consultas(MaquinaMapaSerializer, queryset, 2 * self.FILAS),
+        )
+
+    def test_maquina_individual_incluye_denominaciones(self):
+        maquina = Maquina.objects.get(pk=self.maquinas[1].pk)
+        datos = MaquinaSerializer(maquina).data
+        self.assertEqual(datos['casino_nombre'], self.casino.nombre)
+        self.assertEqual(
+            sorted(denominacion['etiqueta'] for denominacion in datos['denominaciones_info']),
+            ['$0.25', '$1.00'],
+        )
+
+
+def desempaquetar_mapa_columnar(data):
+    """Port de desempaquetarMapaColumnar (FrontEnd/src/service/mapaService.js)."""
+    m, t = data['maquinas'], data['tablas']
+    etiqueta_piso = {c['value']: c['label'] for c in data['piso_choices']}
+    etiqueta_sala = {c['value']: c['label'] for c in data['sala_choices']}
+    maquinas = []
+    for i, pk in enumerate(m['id']):
+        modelo = m['modelo'][i]
+        proveedor = t['modelos']['proveedor'][modelo] if modelo is not None else None
+        piso, sala = t['pisos'][m['piso'][i]], t['salas'][m['sala'][i]]
+        maquinas.append({
+            'id': pk, 'uid': m['uid'][i], 'uid_sala': m['uid'][i], 'juego': m['juego'][i],
+            'coordenada_x': m['x'][i], 'coordenada_y': m['y'][i],
+            'ubicacion_piso': piso, 'ubicacion_piso_label': etiqueta_piso.get(piso, piso),
+            'ubicacion_sala': sala, 'ubicacion_sala_label': etiqueta_sala.get(sala, sala),
+            'estado_actual': t['estados'][m['estado'][i]], 'contador_fallas': m['fallas'][i],
+            'casino': data['casino']['id'], 'casino_nombre': data['casino']['nombre'],
+            'modelo_nombre': t['modelos']['nombre'][modelo] if modelo is not None else None,
+            'modelo_producto': t['modelos']['producto'][modelo] if modelo is not None else None,
+            **{
+                f'proveedor_{campo}': t['proveedores'][columna][proveedor] if proveedor is not None else None
+                for campo, columna in (('id', 'id'), ('nombre', 'nombre'), ('rfc', 'rfc'),
+                                       ('email', 'email'), ('telefono', 'telefono'))
+            },
+            'ip_maquina': m['ip'][i], 'numero_serie': m['serie'][i],
+            'ultimo_mantenimiento': m['ultimo_mantenimiento'][i],
+            'fecha_vencimiento_licencia': m['vencimiento_licencia'][i],
+            'dias_licencia': m['dias_licencia'][i], 'fecha_instalacion': m['instalacion'][i],
+            'denominaciones_info': [
+                {campo: t['denominaciones'][campo][d] for campo in ('id', 'etiqueta', 'valor')}
+                for d in m['denominaciones'][i]
+            ],
+        })
+    return maquinas
+
+
+class MapaColumnarTests(APITestCase):
+    """`mapa-completo/?formato=columnar` trae los mismos datos que el formato por filas."""
+
+    URL = '/api/maquinas/mapa-completo/'
+
+    @classmethod
+    def setUpTestData(cls):
+        from Tickets.tests import crear_usuario  # Tickets.tests importa este módulo
+
+        cls.casino, maquinas = crear_sala(6)
+        Maquina.objects.filter(pk=maquinas[0].pk).update(ultimo_mantenimiento=date.today(), estado_actual='DAÑADA')
+        Maquina.objects.filter(pk=maquinas[1].pk).update(ubicacion_piso='VIP', ubicacion_sala='BAR')
+        cls.usuario = crear_usuario(cls.casino, 'SUP SISTEMAS', 'supervisor')
+        cls.casino_grande, _ = crear_sala(12, nombre='Casino Grande')
+        cls.usuario_grande = crear_usuario(cls.casino_grande, 'SUP SISTEMAS', 'supervisor2')
+
+    def _get(self, usuario, **params):
+        self.client.force_authenticate(user=usuario)
+        respuesta = self.client.get(self.URL, params)
+        self.assertEqual(respuesta.status_code, 200)
+        return respuesta.json()
+
+    @staticmethod
+    def _normalizar(maquinas):
+        filas = []
+        for maquina in maquinas:
+            fila = {campo: valor for campo, valor in maquina.items() if campo != 'imagen_url'}
+            fila['denominaciones_info'] = sorted(fila['denominaciones_info'], key=lambda d: d['id'])
+            filas.append(fila)
+        return sorted(filas, key=lambda fila: fila['id'])
+
+    def test_mismos_datos_que_el_formato_por_filas(self):
+        por_filas = self._get(self.usuario)
+        columnar = self._get(self.usuario, formato='columnar')
+        self.assertEqual(columnar['formato'], 'columnar')
+        self.assertEqual(columnar['total'], por_filas['total'])
+        self.assertEqual(
+            self._normalizar(desempaquetar_mapa_columnar(columnar)),
+            self._normalizar(por_filas['maquinas']),
+        )
+
+    def test_respeta_los_filtros(self):
+        por_filas = self._get(self.usuario, piso='VIP')
+        columnar = self._get(self.usuario, piso='VIP', formato='columnar')
+        self.assertEqual(columnar['maquinas']['id'], [maquina['id'] for maquina in por_filas['maquinas']])
+        self.assertEqual(columnar['total'], 1)
+
+    def test_tablas_sin_repetidos(self):
+        tablas = self._get(self.usuario, formato='columnar')['tablas']
+        self.assertEqual(len(tablas['modelos']['id']), 2)
+        # Los dos modelos son del mismo proveedor: se guarda una vez
+        self.assertEqual(len(tablas['proveedores']['id']), 1)
+        self.assertEqual(tablas['modelos']['proveedor'], [0, 0])
+        self.assertEqual(sorted(tablas['denominaciones']['etiqueta']), ['$0.25', '$1.00'])
+
+    def test_consultas_constantes(self):
+        queryset = Maquina.objects.filter(esta_activo=True)
+        with CaptureQueriesContext(connection) as chico:
+            construir_mapa_columnar(queryset.filter(casino=self.casino))
+        with CaptureQueriesContext(connection) as grande:
+            datos = construir_mapa_columnar(queryset.filter(casino=self.casino_grande))
+        self.assertEqual(datos['total'], 12)
+        self.assertEqual(len(chico), len(grande))
+        self.assertEqual(len(grande), 4)
+
+
+class ImportacionMaquinasTests(TestCase):
+    """La importación valida posiciones con las reglas de Maquina.clean."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.casino, maquinas = crear_sala(1)
+        # (0, 0) queda libre; (5, 5) la ocupa una máquina inactiva
+        Maquina.objects.filter(pk=maquinas[0].pk).update(coordenada_x=3, coordenada_y=3)
+        cls.inactiva = Maquina.objects.create(
+            modelo=maquinas[0].modelo, casino=cls.casino, uid_sala='INA', numero_serie='SNINA',
+            ip_maquina='10.9.9.9', juego='Multijuego', coordenada_x=5, coordenada_y=5, esta_activo=False,
+        )
+
+    @staticmethod
+    def _fila(numero, **extra):
+        return {'uid_sala': f'N{numero}', 'numero_serie': f'S-{numero}', 'ip_maquina': f'10.1.0.{numero}',
+                'juego': 'Multijuego', 'modelo': 'Modelo A', **extra}
+
+    def _errores(self, resultado):
+        return [(error['fila'], error['campo']) for error in resultado['errores']]
+
+    def test_importadas_pasan_full_clean(self):
+        resultado = importar_maquinas(self.casino, [
+            self._fila(1, coordenada_x=1, coordenada_y=1, denominaciones='$0.25'),
+            self._fila(2, coordenada_x=2, coordenada_y=1),
+            self._fila(3),
+        ])
+        self.assertEqual(resultado['errores'], [])
+        self.assertEqual(resultado['creadas'], 3)
+        for uid in ('N1', 'N2', 'N3'):
+            maquina = Maquina.objects.get(casino=self.casino, uid_sala=uid)
+            maquina.full_clean()
+            maquina.save()
+
+    def test_dos_filas_sin_coordenadas_chocan_en_cero(self):
+        resultado = importar_maquinas(self.casino, [self._fila(1), self._fila(2)])
+        self.assertEqual(self._errores(resultado), [(2, 'coordenadas')])
+        self.assertIn('fila 1 del archivo', resultado['errores'][0]['error'])
+        self.assertEqual(resultado['creadas'], 0)
+
+    def test_posicion_de_maquina_inactiva_esta_ocupada(self):
+        resultado = importar_maquinas(self.casino, [self._fila(1, coordenada_x=5, coordenada_y=5)])
+        self.assertEqual(self._errores(resultado), [(1, 'coordenadas')])
 
-# Create your tests here.
+    def test_fuera_del_grid(self):
+        resultado = importar_maquinas(self.casino, [
+            self._fila(1, coordenada_x=self.casino.grid_width + 1, coordenada_y=1),
+            self._fila(2, coordenada_x=self.casino.grid_width, coordenada_y=self.casino.grid_height),
+        ])
+        self.assertEqual(self._errores(resultado), [(1, 'coordenadas')])
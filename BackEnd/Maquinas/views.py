@@ -2,13 +2,34 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from .models import Maquina
 from .serializers import MaquinaSerializer, MaquinaMapaSerializer, MaquinaFKSerializer, MaquinaTablaSerializer
+from ModelBase.cache_respuestas import cachear_respuesta, casino_de_url, invalidar_casino
+from ModelBase.condicional import marcar_cambio, respuesta_condicional
+from .mapa_columnar import construir_mapa_columnar
+from .cambios_mapa import cambios_desde, marcar_cambio_mapa, version_actual
+from .cuadricula import Cuadricula, ErrorCuadricula
+from .importacion import ErrorImportacion, importar_maquinas, leer_filas
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Tope de movimientos por llamada a reacomodar
+MAX_MOVIMIENTOS = 500
+
+
+def _casino_del_mapa(view, request, **kwargs):
+    """Mismo criterio que mapa_completo: casino_id explícito solo para roles >= 19."""
+    rol_nivel = getattr(getattr(request.user, 'rol', None), 'nivel_jerarquia', 0)
+    casino_id_param = request.query_params.get('casino_id')
+    if rol_nivel >= 19 and casino_id_param:
+        return casino_id_param if casino_id_param.isdigit() else None
+    return getattr(request.user, 'casino_id', None)
+
+
 class MaquinaViewSet(viewsets.ModelViewSet):
     serializer_class = MaquinaSerializer
 
@@ -105,6 +126,12 @@ class MaquinaViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'], url_path='lista')
+    @respuesta_condicional(
+        'maquinas.lista',
+        tablas=['Maquinas.Maquina', 'ModelosMaquinas.ModeloMaquina', 'Casinos.Casino',
+                'Proveedores.Proveedor', 'Denominaciones.Denominacion'],
+        por_dia=True,  # dias_licencia se calcula contra la fecha actual
+    )
     def lista(self, request):
         """Devuelve todas las máquinas, incluyendo inactivos."""
         queryset = Maquina.objects.all().select_related(
@@ -201,6 +228,7 @@ class MaquinaViewSet(viewsets.ModelViewSet):
         })
         
     @action(detail=False, methods=['get'], url_path='lista-por-casino/(?P<casino_id>[^/.]+)')
+    @cachear_respuesta('maquinas.lista_por_casino', casino=casino_de_url)
     def lista_por_casino(self, request, casino_id=None):
         """
         Devuelve todas las máquinas de un casino específico.
@@ -259,6 +287,10 @@ class MaquinaViewSet(viewsets.ModelViewSet):
                 contador_fallas=F('contador_fallas') + 1,
                 modificado_por=request.user.username if request.user.is_authenticated else 'Sistema'
             )
+            # update() no dispara signals: se invalidan los cachés a mano
+            invalidar_casino(maquina.casino_id)
+            marcar_cambio('Maquinas.Maquina')
+            marcar_cambio_mapa(maquina.casino_id, [maquina.pk], ['contador_fallas'])
             
             # Recargar la instancia para obtener el valor actualizado
             maquina.refresh_from_db()
@@ -279,6 +311,49 @@ class MaquinaViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @action(detail=False, methods=['post'], url_path='importar',
+            parser_classes=[MultiPartParser, FormParser, JSONParser])
+    def importar(self, request):
+        """
+        Alta masiva de máquinas desde CSV o JSON (ver Maquinas/importacion.py).
+        Endpoint: POST /maquinas/importar/[?casino_id=<id>][&dry_run=1]
+        Body: multipart con `archivo` (.csv / .json) o JSON {"maquinas": [...]}
+        Las máquinas se crean en el casino del usuario; solo roles con nivel
+        >= 19 pueden indicar otro con casino_id (mismo criterio que el mapa).
+        Responde 201 al crear, 200 en simulación sin errores y 400 con TODOS
+        los errores por fila (sin crear nada).
+        """
+        casino, error = self._resolver_casino_mapa(request)
+        if error:
+            return error
+
+        try:
+            archivo = request.FILES.get('archivo')
+            if archivo is not None:
+                formato = request.data.get('formato') or archivo.name.rsplit('.', 1)[-1].lower()
+                filas = leer_filas(archivo.read(), formato)
+            elif isinstance(request.data.get('maquinas'), list):
+                filas = leer_filas(request.data['maquinas'], 'json')
+            else:
+                return Response(
+                    {'error': 'Envíe un archivo CSV/JSON en `archivo` o una lista en `maquinas`'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        except ErrorImportacion as error:
+            return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+        dry_run = str(request.query_params.get('dry_run') or request.data.get('dry_run', '')).lower() in ('1', 'true')
+        creado_por = request.user.username if request.user.is_authenticated else 'system'
+        resultado = importar_maquinas(casino, filas, creado_por=creado_por, dry_run=dry_run)
+
+        if resultado['errores']:
+            return Response(resultado, status=status.HTTP_400_BAD_REQUEST)
+        logger.info(
+            f"Importación de máquinas en casino {casino.pk} por {creado_por}: {resultado['creadas']} creadas "
+            f"de {resultado['total']} ({resultado['filas_por_segundo']} filas/s, dry_run={dry_run})"
+        )
+        return Response(resultado, status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED)
+
     def perform_create(self, serializer):
         creado_por = self.request.user.username if self.request.user.is_authenticated else 'system'
         serializer.save(creado_por=creado_por)
@@ -294,7 +369,7 @@ class MaquinaViewSet(viewsets.ModelViewSet):
         Endpoint: PATCH /maquinas/{id}/actualizar-coordenadas/
         Body: { "coordenada_x": int, "coordenada_y": int }
         """
-        maquina = get_object_or_404(Maquina.objects.all(), pk=pk)
+        maquina = get_object_or_404(Maquina.objects.select_related('casino'), pk=pk)
 
         nueva_x = request.data.get('coordenada_x')
         nueva_y = request.data.get('coordenada_y')
@@ -322,28 +397,26 @@ class MaquinaViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Verificar colisión (si no son 0,0 — sin asignar)
-        if not (nueva_x == 0 and nueva_y == 0):
-            colision = Maquina.objects.filter(
-                casino=maquina.casino,
-                ubicacion_piso=maquina.ubicacion_piso,
-                ubicacion_sala=maquina.ubicacion_sala,
-                coordenada_x=nueva_x,
-                coordenada_y=nueva_y,
-                esta_activo=True
-            ).exclude(pk=maquina.pk).exists()
-
-            if colision:
-                return Response(
-                    {'error': 'Ya existe una máquina activa en esa posición dentro de la misma sala y piso'},
-                    status=status.HTTP_409_CONFLICT
-                )
-
-        # Aplicar cambio con update_fields para omitir full_clean
-        maquina.coordenada_x = nueva_x
-        maquina.coordenada_y = nueva_y
-        maquina.modificado_por = request.user.username if request.user.is_authenticated else 'Sistema'
-        maquina.save(update_fields=['coordenada_x', 'coordenada_y', 'modificado_por', 'modificado_en'])
+        with transaction.atomic():
+            # Colisión y límites del grid contra la sala bloqueada (0,0 = sin asignar)
+            cuadricula = Cuadricula.cargar(
+                maquina.casino, maquina.ubicacion_piso, maquina.ubicacion_sala, bloquear=True
+            )
+            try:
+                cuadricula.validar(maquina.pk, nueva_x, nueva_y)
+            except ErrorCuadricula as error:
+                if error.conflicto:
+                    return Response(
+                        {'error': 'Ya existe una máquina activa en esa posición dentro de la misma sala y piso'},
+                        status=status.HTTP_409_CONFLICT
+                    )
+                return Response({'error': error.mensaje}, status=status.HTTP_400_BAD_REQUEST)
+
+            # Aplicar cambio con update_fields para omitir full_clean
+            maquina.coordenada_x = nueva_x
+            maquina.coordenada_y = nueva_y
+            maquina.modificado_por = request.user.username if request.user.is_authenticated else 'Sistema'
+            maquina.save(update_fields=['coordenada_x', 'coordenada_y', 'modificado_por', 'modificado_en'])
 
         logger.info(
             f"Coordenadas actualizadas para máquina {maquina.uid_sala} (ID: {maquina.pk}): "
@@ -356,18 +429,133 @@ class MaquinaViewSet(viewsets.ModelViewSet):
             'maquina': serializer.data
         }, status=status.HTTP_200_OK)
 
-    @action(detail=False, methods=['get'], url_path='mapa-completo')
-    def mapa_completo(self, request):
+    def _cuadricula_de_request(self, request, datos):
+        """(casino, piso, sala, respuesta_de_error) para los endpoints de cuadrícula."""
+        casino, error = self._resolver_casino_mapa(request)
+        if error:
+            return None, None, None, error
+        piso = datos.get('piso')
+        area = datos.get('area')
+        if not piso or not area:
+            return None, None, None, Response(
+                {'error': 'Se requieren piso y area'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return casino, piso, area, None
+
+    @action(detail=False, methods=['post'], url_path='reacomodar')
+    def reacomodar(self, request):
         """
-        Devuelve la configuración del grid del casino y las máquinas con filtros opcionales.
-        El casino siempre se resuelve desde el usuario en sesión para evitar acceso
-        a datos de otras sedes. Roles con nivel >= 19 pueden pasar casino_id opcional.
-        Endpoint: GET /maquinas/mapa-completo/?piso=PISO_1&area=SALA_A
+        Mueve o intercambia varias máquinas de una sala en una sola transacción.
+        Se valida el resultado final en memoria (ver Maquinas/cuadricula.py),
+        así que un intercambio se expresa como dos movimientos cruzados.
+        Endpoint: POST /maquinas/reacomodar/[?casino_id=N]
+        Body: { "piso": "PISO_1", "area": "SALA_A",
+                "movimientos": [{"id": 10, "coordenada_x": 3, "coordenada_y": 4}, ...] }
         """
-        from Casinos.models import Casino
+        casino, piso, area, error = self._cuadricula_de_request(request, request.data)
+        if error:
+            return error
 
-        piso = request.query_params.get('piso')
-        area = request.query_params.get('area')
+        movimientos_data = request.data.get('movimientos')
+        if not isinstance(movimientos_data, list) or not movimientos_data:
+            return Response(
+                {'error': 'Se requiere una lista de movimientos'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(movimientos_data) > MAX_MOVIMIENTOS:
+            return Response(
+                {'error': f'Máximo {MAX_MOVIMIENTOS} movimientos por solicitud'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        movimientos = {}
+        for movimiento in movimientos_data:
+            try:
+                maquina_id = int(movimiento['id'])
+                x, y = int(movimiento['coordenada_x']), int(movimiento['coordenada_y'])
+            except (KeyError, TypeError, ValueError):
+                return Response(
+                    {'error': 'Cada movimiento requiere id, coordenada_x y coordenada_y enteros'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if x < 0 or y < 0:
+                return Response(
+                    {'maquina': maquina_id, 'error': 'Las coordenadas deben ser valores positivos (>= 0)'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if maquina_id in movimientos:
+                return Response(
+                    {'maquina': maquina_id, 'error': 'La máquina aparece más de una vez'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            movimientos[maquina_id] = (x, y)
+
+        modificado_por = request.user.username if request.user.is_authenticated else 'Sistema'
+        with transaction.atomic():
+            cuadricula = Cuadricula.cargar(casino, piso, area, bloquear=True)
+            try:
+                cambiadas = cuadricula.aplicar(movimientos)
+            except ErrorCuadricula as error:
+                return Response(
+                    error.como_dict(),
+                    status=status.HTTP_409_CONFLICT if error.conflicto else status.HTTP_400_BAD_REQUEST
+                )
+
+            maquinas = list(
+                Maquina.objects.filter(pk__in=cambiadas)
+                .select_related('modelo', 'modelo__proveedor')
+            )
+            # Un UPDATE por máquina movida; sin lecturas extra: el estado previo
+            # para auditoría y signals ya viene en la instancia cargada
+            for maquina in maquinas:
+                maquina.coordenada_x, maquina.coordenada_y = cambiadas[maquina.pk]
+                maquina.modificado_por = modificado_por
+                maquina.save(update_fields=['coordenada_x', 'coordenada_y', 'modificado_por', 'modificado_en'])
+
+        logger.info(
+            f"Reacomodo de {len(maquinas)} máquinas en casino {casino.pk} ({piso}/{area}) por {modificado_por}"
+        )
+        return Response({
+            'mensaje': f'{len(maquinas)} máquinas reacomodadas correctamente',
+            'movidas': len(maquinas),
+            'maquinas': MaquinaMapaSerializer(maquinas, many=True).data
+        }, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], url_path='celda-libre')
+    def celda_libre(self, request):
+        """
+        Celda libre más cercana a (x, y) en una sala, para ubicar máquinas
+        recién instaladas. Sin x/y se busca desde la esquina (1, 1).
+        Endpoint: GET /maquinas/celda-libre/?piso=PISO_1&area=SALA_A[&x=5&y=3]
+        """
+        casino, piso, area, error = self._cuadricula_de_request(request, request.query_params)
+        if error:
+            return error
+        try:
+            x = int(request.query_params.get('x', 1))
+            y = int(request.query_params.get('y', 1))
+        except ValueError:
+            return Response(
+                {'error': 'Las coordenadas deben ser números enteros'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        celda = Cuadricula.cargar(casino, piso, area).celda_libre_cercana(x, y)
+        if celda is None:
+            return Response(
+                {'error': 'No hay celdas libres en esta sala'},
+                status=status.HTTP_409_CONFLICT
+            )
+        return Response({'coordenada_x': celda[0], 'coordenada_y': celda[1]}, status=status.HTTP_200_OK)
+
+    def _resolver_casino_mapa(self, request):
+        """
+        (casino, respuesta_de_error) para los endpoints del mapa. El casino
+        siempre se resuelve desde el usuario en sesión para evitar acceso a
+        datos de otras sedes; roles con nivel >= 19 pueden pasar casino_id.
+        """
+        from Casinos.models import Casino
 
         usuario = request.user
 
@@ -378,26 +566,47 @@ class MaquinaViewSet(viewsets.ModelViewSet):
 
         if rol_nivel >= 19 and casino_id_param:
             try:
-                casino = Casino.objects.get(pk=casino_id_param, esta_activo=True)
+                return Casino.objects.get(pk=casino_id_param, esta_activo=True), None
             except Casino.DoesNotExist:
-                return Response(
+                return None, Response(
                     {'error': 'Casino no encontrado o inactivo'},
                     status=status.HTTP_404_NOT_FOUND
                 )
-        else:
-            # Todos los demás roles: usa el casino asignado en el perfil
-            casino = getattr(usuario, 'casino', None)
-            if not casino:
-                return Response(
-                    {'error': 'Tu usuario no tiene un casino asignado'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+
+        # Todos los demás roles: usa el casino asignado en el perfil
+        casino = getattr(usuario, 'casino', None)
+        if not casino:
+            return None, Response(
+                {'error': 'Tu usuario no tiene un casino asignado'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return casino, None
+
+    @action(detail=False, methods=['get'], url_path='mapa-completo')
+    @cachear_respuesta('maquinas.mapa_completo', casino=_casino_del_mapa)
+    def mapa_completo(self, request):
+        """
+        Devuelve la configuración del grid del casino y las máquinas con filtros opcionales.
+        El casino siempre se resuelve desde el usuario en sesión para evitar acceso
+        a datos de otras sedes. Roles con nivel >= 19 pueden pasar casino_id opcional.
+        Endpoint: GET /maquinas/mapa-completo/?piso=PISO_1&area=SALA_A[&formato=columnar]
+        """
+        piso = request.query_params.get('piso')
+        area = request.query_params.get('area')
+
+        casino, error = self._resolver_casino_mapa(request)
+        if error:
+            return error
+
+        # La versión se lee antes que las máquinas: el snapshot puede traer
+        # cambios posteriores, que el feed volverá a enviar sin efecto
+        version = version_actual(casino.id)
 
         # Construir queryset base
         queryset = Maquina.objects.filter(
             casino=casino,
             esta_activo=True
-        ).select_related('modelo', 'modelo__proveedor').prefetch_related('denominaciones')
+        ).select_related('modelo', 'modelo__proveedor')
 
         # Aplicar filtros opcionales
         if piso:
@@ -414,9 +623,8 @@ class MaquinaViewSet(viewsets.ModelViewSet):
             todos.values_list('ubicacion_sala', flat=True).distinct().order_by('ubicacion_sala')
         )
 
-        serializer = MaquinaMapaSerializer(queryset, many=True)
-
-        return Response({
+        respuesta = {
+            'version': version,
             'casino': {
                 'id': casino.id,
                 'nombre': casino.nombre,
@@ -428,6 +636,66 @@ class MaquinaViewSet(viewsets.ModelViewSet):
             'piso_choices': [{'value': k, 'label': v} for k, v in Maquina.PISO_CHOICES],
             'sala_choices': [{'value': k, 'label': v} for k, v in Maquina.SALA_CHOICES],
             'filtros_activos': {'piso': piso, 'area': area},
-            'total': queryset.count(),
-            'maquinas': serializer.data
-        }, status=status.HTTP_200_OK)
\ No newline at end of file
+        }
+
+        # ?formato=columnar: arreglos paralelos + tablas de búsqueda, sin serializer
+        # por máquina (ver Maquinas/mapa_columnar.py)
+        if request.query_params.get('formato') == 'columnar':
+            columnar = construir_mapa_columnar(queryset)
+            respuesta.update(
+                formato=columnar['formato'],
+                total=columnar['total'],
+                maquinas=columnar['maquinas'],
+                tablas=columnar['tablas'],
+            )
+            return Response(respuesta, status=status.HTTP_200_OK)
+
+        serializer = MaquinaMapaSerializer(queryset, many=True)
+        respuesta.update(total=queryset.count(), maquinas=serializer.data)
+        return Response(respuesta, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], url_path='mapa-cambios')
+    def mapa_cambios(self, request):
+        """
+        Cambios del mapa desde la versión `since` (la `version` de la última
+        respuesta de mapa-completo o de este endpoint), para sondear cada
+        pocos segundos sin reenviar el piso completo.
+        Endpoint: GET /maquinas/mapa-cambios/?since=<version>&piso=PISO_1&area=SALA_A
+
+        - maquinas:   máquinas cambiadas que siguen visibles con los filtros
+                      (mismos campos que mapa-completo).
+        - eliminadas: ids cambiados que ya no se deben mostrar (baja,
+                      inactivas, o movidas a otro piso, sala o casino).
+        - snapshot:   true si el cliente quedó demasiado atrás; debe volver a
+                      pedir mapa-completo en lugar de aplicar cambios.
+        """
+        since = request.query_params.get('since', '')
+        if not since.isdigit():
+            return Response(
+                {'error': 'Se requiere since: la versión de la última carga del mapa'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        casino, error = self._resolver_casino_mapa(request)
+        if error:
+            return error
+
+        version, ids, snapshot = cambios_desde(casino.id, int(since))
+        respuesta = {'version': version, 'since': int(since), 'snapshot': snapshot, 'maquinas': [], 'eliminadas': []}
+        if snapshot or not ids:
+            return Response(respuesta, status=status.HTTP_200_OK)
+
+        queryset = Maquina.objects.filter(
+            pk__in=ids, casino=casino, esta_activo=True
+        ).select_related('modelo', 'modelo__proveedor')
+        piso = request.query_params.get('piso')
+        area = request.query_params.get('area')
+        if piso:
+            queryset = queryset.filter(ubicacion_piso=piso)
+        if area:
+            queryset = queryset.filter(ubicacion_sala=area)
+
+        respuesta['maquinas'] = MaquinaMapaSerializer(queryset, many=True).data
+        visibles = {maquina['id'] for maquina in respuesta['maquinas']}
+        respuesta['eliminadas'] = [maquina_id for maquina_id in ids if maquina_id not in visibles]
+        return Response(respuesta, status=status.HTTP_200_OK)
@@ -3,10 +3,12 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from .models import MenuConfig
+from ModelBase.condicional import respuesta_condicional
 
 class MenuActivoView(APIView):
     permission_classes = [AllowAny]
     
+    @respuesta_condicional('menus.activo', tablas=['Menus.MenuConfig'])
     def get(self, request):
         menu = MenuConfig.objects.first()
         if menu:
@@ -0,0 +1,284 @@
+"""
+Almacenamiento direccionado por contenido para archivos subidos.
+
+Las fotos de evidencia de vacíos, los PDFs de la wiki técnica y los avatares
+se guardaban cada uno con un nombre nuevo (timestamp + sufijo aleatorio de
+Django), así que la misma captura subida diez veces ocupaba diez archivos.
+Con `storage=almacen_contenido` en el campo, al subir un archivo:
+
+  1. Se calcula su SHA-256 leyendo por bloques.
+  2. El nombre guardado en la fila es contenido/ab/cd/<sha256><ext>: dos
+     niveles de subdirectorios por los primeros bytes del digest, para que
+     ningún directorio crezca sin límite. El nombre que propone `upload_to`
+     solo aporta la extensión.
+  3. Si el blob ya existe no se vuelve a escribir; si no, se escribe a un
+     temporal y se renombra (os.replace), de modo que nunca queda visible un
+     blob a medio escribir.
+
+BlobContenido lleva por blob su tamaño y cuántos campos de filas lo
+referencian. Los signals post_save/post_delete de los modelos con campos en
+este almacén ajustan el conteo dentro de la misma transacción (el estado
+anterior sale del seguimiento de cambios de ModeloBase). `delete()` del
+almacén no borra nada: un blob puede estar compartido y solo lo elimina la
+recolección, que además recuenta desde las filas porque `queryset.update()`
+no dispara signals:
+
+    python manage.py recolectar_blobs_media
+    python manage.py deduplicar_media        # migra los archivos existentes
+"""
+import hashlib
+import os
+import posixpath
+import re
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+
+# Subdirectorios de dos caracteres hexadecimales bajo la raíz (256 por nivel)
+NIVELES = 2
+
+_EXTENSION = re.compile(r'^\.[a-z0-9]{1,10}$')
+_NOMBRE_BLOB = re.compile(r'/([0-9a-f]{64})(\.[a-z0-9]{1,10})?$')
+# Derivados de un blob junto a él: <sha256>.<variante>.<ext> (ver ModelBase/derivados.py)
+_NOMBRE_DERIVADO = re.compile(r'/([0-9a-f]{64})\.[a-z]+\.[a-z0-9]{1,10}$')
+
+
+def configuracion():
+    config = getattr(settings, 'ALMACEN_CONTENIDO', {}) or {}
+    return {
+        'RAIZ': str(config.get('RAIZ', 'contenido')).strip('/'),
+        'GRACIA_HORAS': int(config.get('GRACIA_HORAS', 24)),
+    }
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Nombres
+# ──────────────────────────────────────────────────────────────────────────────
+def extension_de(nombre):
+    """Extensión en minúsculas de `nombre`, o '' si no es una extensión razonable."""
+    extension = os.path.splitext(nombre or '')[1].lower()
+    return extension if _EXTENSION.match(extension) else ''
+
+
+def ruta_blob(digest, extension=''):
+    """Nombre (relativo a MEDIA_ROOT) del blob con ese digest y extensión."""
+    niveles = [digest[2 * nivel:2 * nivel + 2] for nivel in range(NIVELES)]
+    return '/'.join([configuracion()['RAIZ'], *niveles, digest + extension])
+
+
+def es_blob(nombre):
+    """True si `nombre` ya es un blob del almacén (y no un archivo con nombre libre)."""
+    return bool(nombre) and nombre.startswith(configuracion()['RAIZ'] + '/') and bool(_NOMBRE_BLOB.search(nombre))
+
+
+def digest_de_derivado(nombre):
+    """Digest del blob del que `nombre` es un derivado, o None."""
+    coincidencia = _NOMBRE_DERIVADO.search(nombre or '')
+    return coincidencia.group(1) if coincidencia else None
+
+
+def calcular_digest(archivo):
+    """(sha256 hex, tamaño en bytes) de un File de Django, leído por bloques."""
+    sha = hashlib.sha256()
+    tamano = 0
+    for bloque in archivo.chunks():
+        sha.update(bloque)
+        tamano += len(bloque)
+    if archivo.seekable():
+        archivo.seek(0)
+    return sha.hexdigest(), tamano
+
+
+def legible(total):
+    """Bytes en la unidad más cómoda de leer (para los reportes de los comandos)."""
+    for unidad in ('B', 'KB', 'MB', 'GB'):
+        if abs(total) < 1024 or unidad == 'GB':
+            return f'{total:.0f} {unidad}' if unidad == 'B' else f'{total:.1f} {unidad}'
+        total /= 1024
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Storage
+# ──────────────────────────────────────────────────────────────────────────────
+@deconstructible(path='ModelBase.almacen_contenido.AlmacenContenido')
+class AlmacenContenido(FileSystemStorage):
+    """FileSystemStorage (mismo MEDIA_ROOT y MEDIA_URL) que guarda un blob por contenido."""
+
+    def _save(self, name, content):
+        digest, tamano = calcular_digest(content)
+        nombre = ruta_blob(digest, extension_de(name))
+        if not self.exists(nombre):
+            temporal = super()._save(f'{nombre}.{uuid.uuid4().hex}.tmp', content)
+            # Si otra petición escribió el mismo blob entretanto, el contenido es idéntico
+            os.replace(self.path(temporal), self.path(nombre))
+        registrar_blob(nombre, digest, tamano)
+        return nombre
+
+    def url(self, name):
+        """URL firmada: la entrega ModelBase/media.py, que exige firma o usuario autorizado."""
+        from .media import firmar_url
+
+        return firmar_url(super().url(name), name)
+
+    def delete(self, name):
+        """Los blobs pueden estar compartidos: solo los elimina `eliminar_blob`."""
+        if not es_blob(name):
+            super().delete(name)
+
+    def eliminar_blob(self, name):
+        super().delete(name)
+
+
+almacen = AlmacenContenido()
+
+
+def almacen_contenido():
+    """Callable para `storage=` de los campos (las migraciones referencian la función)."""
+    return almacen
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Referencias
+# ──────────────────────────────────────────────────────────────────────────────
+def registrar_blob(nombre, digest, tamano):
+    """Crea la fila del blob si falta; si existe, renueva su fecha para la recolección."""
+    from .models import BlobContenido
+
+    ahora = timezone.now()
+    if BlobContenido.objects.filter(nombre=nombre).update(modificado_en=ahora):
+        return
+    try:
+        with transaction.atomic():
+            BlobContenido.objects.create(nombre=nombre, digest=digest, tamano=tamano)
+    except IntegrityError:
+        BlobContenido.objects.filter(nombre=nombre).update(modificado_en=ahora)
+
+
+def ajustar_referencias(deltas):
+    """Suma a cada blob su delta ({nombre: ±n}); los nombres que no son blobs se ignoran."""
+    from .models import BlobContenido
+
+    ahora = timezone.now()
+    for nombre, delta in deltas.items():
+        if delta and es_blob(nombre):
+            BlobContenido.objects.filter(nombre=nombre).update(
+                referencias=Greatest(F('referencias') + delta, 0), modificado_en=ahora
+            )
+
+
+def campos_con_almacen():
+    """[(modelo, [FileField, ...])] de los campos cuyo storage es este almacén."""
+    from django.apps import apps
+
+    resultado = []
+    for modelo in apps.get_models():
+        campos = [
+            campo for campo in modelo._meta.concrete_fields
+            if isinstance(campo, models.FileField) and isinstance(campo.storage, AlmacenContenido)
+        ]
+        if campos:
+            resultado.append((modelo, campos))
+    return resultado
+
+
+def contar_referencias():
+    """Counter {nombre_blob: filas que lo referencian}, contado desde las tablas."""
+    raiz = configuracion()['RAIZ'] + '/'
+    conteo = Counter()
+    for modelo, campos in campos_con_almacen():
+        for campo in campos:
+            filas = (
+                modelo._base_manager.filter(**{f'{campo.attname}__startswith': raiz})
+                .values(campo.attname).annotate(total=Count('pk')).order_by()
+            )
+            for fila in filas:
+                conteo[fila[campo.attname]] += fila['total']
+    return conteo
+
+
+def recontar_referencias(conteo=None):
+    """
+    Iguala BlobContenido.referencias al conteo real de las tablas (o a
+    `conteo`, si ya se calculó) y registra los blobs referenciados que no
+    tienen fila. Retorna cuántos blobs corrigió.
+    """
+    from .models import BlobContenido
+
+    conteo = Counter(contar_referencias() if conteo is None else conteo)
+    corregidos = 0
+    for blob in BlobContenido.objects.only('nombre', 'referencias').iterator():
+        real = conteo.pop(blob.nombre, 0)
+        if blob.referencias != real:
+            BlobContenido.objects.filter(pk=blob.pk).update(referencias=real, modificado_en=timezone.now())
+            corregidos += 1
+    for nombre, real in conteo.items():
+        if not almacen.exists(nombre):
+            continue  # Referencia rota: la reporta la recolección
+        digest = _NOMBRE_BLOB.search(nombre).group(1)
+        BlobContenido.objects.create(nombre=nombre, digest=digest, tamano=almacen.size(nombre), referencias=real)
+        corregidos += 1
+    return corregidos
+
+
+def archivos_bajo(storage, directorio):
+    """Genera los nombres de todos los archivos bajo `directorio` (recursivo; '' es la raíz)."""
+    if directorio and not storage.exists(directorio):
+        return
+    subdirectorios, archivos = storage.listdir(directorio)
+    for archivo in archivos:
+        yield posixpath.join(directorio, archivo)
+    for subdirectorio in subdirectorios:
+        yield from archivos_bajo(storage, posixpath.join(directorio, subdirectorio))
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Signals
+# ──────────────────────────────────────────────────────────────────────────────
+def _al_guardar(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    deltas = Counter()
+    for campo in _CAMPOS.get(sender, ()):
+        if update_fields is not None and campo.name not in update_fields:
+            continue
+        actual = getattr(instance, campo.attname).name or ''
+        previo = '' if created else (instance.previous(campo.name) or '')
+        if actual == previo:
+            continue
+        if actual:
+            deltas[actual] += 1
+        if previo:
+            deltas[previo] -= 1
+    ajustar_referencias(deltas)
+
+
+def _al_borrar(sender, instance, **kwargs):
+    deltas = Counter()
+    for campo in _CAMPOS.get(sender, ()):
+        nombre = getattr(instance, campo.attname).name
+        if nombre:
+            deltas[nombre] -= 1
+    ajustar_referencias(deltas)
+
+
+_CAMPOS = {}
+
+
+def conectar_signals():
+    from django.db.models.signals import post_delete, post_save
+
+    from .models import ModeloBase
+
+    for modelo, campos in campos_con_almacen():
+        if not issubclass(modelo, ModeloBase):
+            continue  # Sin estado previo no hay ajuste fino; recolectar_blobs_media recuenta
+        _CAMPOS[modelo] = campos
+        post_save.connect(_al_guardar, sender=modelo, dispatch_uid=f'almacen_contenido_save_{modelo._meta.label}')
+        post_delete.connect(_al_borrar, sender=modelo, dispatch_uid=f'almacen_contenido_delete_{modelo._meta.label}')
@@ -3,3 +3,20 @@ from django.apps import AppConfig
 
 class ModelbaseConfig(AppConfig):
     name = 'ModelBase'
+
+    def ready(self):
+        """
+        Registra los signals que invalidan el caché de respuestas por casino
+        (ModelBase/cache_respuestas.py), los que versionan las tablas de las
+        respuestas condicionales (ModelBase/condicional.py), los que mantienen
+        el índice de búsqueda global (ModelBase/busqueda.py), los que cuentan
+        las referencias a blobs del almacén por contenido
+        (ModelBase/almacen_contenido.py) y los que encolan los derivados de
+        imagen (ModelBase/derivados.py).
+        """
+        from ModelBase import almacen_contenido, busqueda, cache_respuestas, condicional, derivados
+        cache_respuestas.conectar_signals()
+        condicional.conectar_signals()
+        busqueda.conectar_signals()
+        almacen_contenido.conectar_signals()
+        derivados.conectar_signals()
@@ -0,0 +1,502 @@
+"""
+Índice de búsqueda global (Spotlight).
+
+`global_search` hacía hasta 12 consultas por tecla, cada una con un OR de
+`__icontains` (LIKE '%q%', sin índice posible) sobre campos de texto como
+`descripcion`. Ahora cada objeto buscable tiene una fila en
+sys_busqueda_entradas con el resultado ya armado y sus términos en
+sys_busqueda_terminos:
+
+  - Palabras (clase 'p'): texto en minúsculas, sin acentos, partido en
+    caracteres alfanuméricos. "Máquina-Ñandú 01" → maquina, nandu, 01.
+  - Trigramas (clase 't'): solo de los campos cortos (nombres, folios,
+    series), para tolerar errores de captura ("ruelta" encuentra "ruleta").
+    Los campos largos (descripciones) aportan solo palabras.
+
+Buscar es UNA consulta agrupada sobre el índice (clase, termino): rangos por
+prefijo para cada palabra de la consulta más un IN de trigramas. Una entrada
+califica si todas las palabras coinciden por prefijo o si comparte suficientes
+trigramas; el puntaje premia palabras por prefijo, palabras exactas y
+trigramas compartidos. El costo depende de cuántos términos coinciden, no
+del tamaño de las tablas de origen.
+
+El índice se mantiene desde post_save/post_delete al confirmarse la
+transacción (un solo reindexado por tipo y transacción) y desde DEPENDENCIAS
+cuando cambia un dato que aparece en la etiqueta de otros objetos (ej.
+renombrar un casino reindexa sus máquinas). Los `queryset.update()` no
+disparan signals: quien los use sobre tablas buscables debe llamar a
+`reindexar()`. Reconstrucción completa:
+
+    python manage.py reconstruir_indice_busqueda
+"""
+import logging
+import math
+import re
+import unicodedata
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Max, Q, Value, When
+
+logger = logging.getLogger(__name__)
+
+# Longitud máxima de un término (las palabras más largas se truncan)
+LARGO_TERMINO = 40
+# Palabras indexadas por campo largo y palabras consideradas por consulta
+MAX_PALABRAS_CAMPO_LARGO = 200
+MAX_PALABRAS_CONSULTA = 6
+# Fracción de los trigramas de la consulta que debe compartir una entrada
+# para calificar como coincidencia aproximada
+UMBRAL_TRIGRAMAS = 0.6
+RESULTADOS_POR_TIPO = 5
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Configuración por tipo
+# ──────────────────────────────────────────────────────────────────────────────
+# fields: campos cortos (palabras + trigramas); long_fields: solo palabras.
+# casino_fn: casino al que pertenece el objeto (None = visible en todos).
+CONFIG_BUSQUEDA = [
+    {
+        'type': 'user',
+        'model': 'Usuarios.Usuarios',
+        'fields': ['username', 'nombres', 'apellido_paterno', 'apellido_materno'],
+        'select_related': ['rol'],
+        'icon': 'pi pi-user',
+        'label_fn': lambda x: f"{x.nombres} {x.apellido_paterno} {x.apellido_materno or ''}",
+        'sublabel_fn': lambda x: f"Usuario: {x.username} - {x.rol.nombre}",
+        'route_fn': lambda x: f"/admin/usuarios?search={x.username}",
+        'casino_fn': lambda x: x.casino_id,
+    },
+    {
+        'type': 'machine',
+        'model': 'Maquinas.Maquina',
+        'fields': ['uid_sala', 'numero_serie'],
+        'select_related': ['modelo', 'casino'],
+        'icon': 'pi pi-cog',
+        'label_fn': lambda x: f"{x.uid_sala} - {x.modelo.nombre_modelo}",
+        'sublabel_fn': lambda x: f"Serie: {x.numero_serie} - {x.casino.nombre}",
+        'route_fn': lambda x: f"/centro-servicios/maquinas",
+        'casino_fn': lambda x: x.casino_id,
+    },
+    {
+        'type': 'ticket',
+        'model': 'Tickets.Ticket',
+        'fields': ['folio', 'id'],
+        'select_related': ['maquina'],
+        'icon': 'pi pi-ticket',
+        'label_fn': lambda x: f"{x.folio}",
+        'sublabel_fn': lambda x: f"{x.get_categoria_display()} - {x.maquina.uid_sala if x.maquina else 'Sin Máquina'}",
+        'route_fn': lambda x: f"/centro-servicios/tickets",
+        'casino_fn': lambda x: x.maquina.casino_id if x.maquina else None,
+    },
+    {
+        'type': 'supplier',
+        'model': 'Proveedores.Proveedor',
+        'fields': ['nombre', 'rfc', 'nombre_contacto_tecnico'],
+        'select_related': [],
+        'icon': 'pi pi-truck',
+        'label_fn': lambda x: f"{x.nombre}",
+        'sublabel_fn': lambda x: f"RFC: {x.rfc} - Contacto: {x.nombre_contacto_tecnico or 'N/A'}",
+        'route_fn': lambda x: f"/centro-servicios/proveedores",
+        'casino_fn': lambda x: x.casino_id,
+    },
+    {
+        'type': 'model',
+        'model': 'ModelosMaquinas.ModeloMaquina',
+        'fields': ['nombre_modelo', 'nombre_producto'],
+        'select_related': ['proveedor'],
+        'icon': 'pi pi-list',
+        'label_fn': lambda x: f"{x.nombre_modelo}",
+        'sublabel_fn': lambda x: f"Producto: {x.nombre_producto} - Prov: {x.proveedor.nombre}",
+        'route_fn': lambda x: f"/centro-servicios/modelos",
+        'casino_fn': lambda x: x.proveedor.casino_id,
+    },
+    {
+        'type': 'inventory',
+        'model': 'InventarioSala.InventarioSala',
+        'fields': ['nombre'],
+        'select_related': [],
+        'icon': 'pi pi-box',
+        'label_fn': lambda x: f"{x.nombre}",
+        'sublabel_fn': lambda x: f"Tipo: {x.get_tipo_display()} - Cantidad: {x.cantidad}",
+        'route_fn': lambda x: f"/centro-servicios/inventario",
+        'casino_fn': lambda x: x.casino_id,
+    },
+    {
+        'type': 'evolution',
+        'model': 'EvolucionNexus.EvolucionNexus',
+        'fields': ['titulo'],
+        'long_fields': ['descripcion'],
+        'select_related': [],
+        'icon': 'pi pi-bolt',
+        'label_fn': lambda x: f"{x.titulo}",
+        'sublabel_fn': lambda x: f"Evolución: {x.get_categoria_display()} - {x.get_estado_display()}",
+        'route_fn': lambda x: f"/evolucion-nexus",
+        'casino_fn': lambda x: None,
+    },
+    {
+        'type': 'casino',
+        'model': 'Casinos.Casino',
+        'fields': ['nombre', 'identificador', 'ciudad'],
+        'select_related': [],
+        'icon': 'pi pi-building',
+        'label_fn': lambda x: f"{x.nombre}",
+        'sublabel_fn': lambda x: f"{x.ciudad} - ID: {x.identificador or 'N/A'}",
+        'route_fn': lambda x: f"/admin/casinos",
+        'casino_fn': lambda x: x.pk,
+    },
+    {
+        'type': 'audit',
+        'model': 'AuditoriasExternas.AuditoriaServicioExterno',
+        'fields': ['empresa_proveedora__nombre', 'nombre_tecnico_externo'],
+        'long_fields': ['descripcion_actividad'],
+        'select_related': ['empresa_proveedora'],
+        'icon': 'pi pi-file-check',
+        'label_fn': lambda x: f"Auditoria: {x.empresa_proveedora.nombre}",
+        'sublabel_fn': lambda x: f"Técnico: {x.nombre_tecnico_externo} - {x.get_area_acceso_display()}",
+        'route_fn': lambda x: f"/operatividad/auditorias-externas",
+        'casino_fn': lambda x: x.casino_id,
+    },
+    {
+        'type': 'infra',
+        'model': 'IncidenciasInfraestructura.IncidenciaInfraestructura',
+        'fields': ['titulo', 'categoria'],
+        'long_fields': ['descripcion'],
+        'select_related': ['casino'],
+        'icon': 'pi pi-exclamation-triangle',
+        'label_fn': lambda x: f"Infra: {x.titulo}",
+        'sublabel_fn': lambda x: f"{x.get_categoria_display()} - {x.casino.nombre}",
+        'route_fn': lambda x: f"/operatividad/incidencias-infraestructura",
+        'casino_fn': lambda x: x.casino_id,
+    },
+    {
+        'type': 'task',
+        'model': 'TareasEspeciales.TareaEspecial',
+        'fields': ['titulo'],
+        'long_fields': ['descripcion'],
+        'select_related': [],
+        'icon': 'pi pi-check-square',
+        'label_fn': lambda x: f"Tarea: {x.titulo}",
+        'sublabel_fn': lambda x: f"{x.get_prioridad_display()} - {x.get_estatus_display()}",
+        'route_fn': lambda x: f"/operatividad/tareas-especiales",
+        'casino_fn': lambda x: x.casino_id,
+    },
+    {
+        'type': 'wiki',
+        'model': 'Wiki.WikiTecnica',
+        'fields': ['titulo_guia', 'categoria'],
+        'select_related': [],
+        'icon': 'pi pi-book',
+        'label_fn': lambda x: f"Wiki: {x.titulo_guia}",
+        'sublabel_fn': lambda x: f"Categoría: {x.get_categoria_display()}",
+        'route_fn': lambda x: f"/centro-servicios/wiki",
+        # Las guías son conocimiento compartido entre casinos
+        'casino_fn': lambda x: None,
+    },
+]
+
+CONFIG_POR_TIPO = {config['type']: config for config in CONFIG_BUSQUEDA}
+
+# Datos de un modelo que aparecen en la entrada de otro tipo:
+# (modelo origen, campos que importan, tipo dependiente, FK del dependiente)
+DEPENDENCIAS = [
+    ('Roles.Rol', ('nombre',), 'user', 'rol'),
+    ('ModelosMaquinas.ModeloMaquina', ('nombre_modelo',), 'machine', 'modelo'),
+    ('Casinos.Casino', ('nombre',), 'machine', 'casino'),
+    ('Casinos.Casino', ('nombre',), 'infra', 'casino'),
+    ('Maquinas.Maquina', ('uid_sala', 'casino'), 'ticket', 'maquina'),
+    ('Proveedores.Proveedor', ('nombre', 'casino'), 'model', 'proveedor'),
+    ('Proveedores.Proveedor', ('nombre',), 'audit', 'empresa_proveedora'),
+]
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Normalización
+# ──────────────────────────────────────────────────────────────────────────────
+_NO_ALFANUMERICO = re.compile(r'[^a-z0-9]+')
+
+
+def normalizar(texto):
+    """Palabras en minúsculas y sin acentos de `texto`, en orden y sin repetir."""
+    if texto is None:
+        return []
+    plano = unicodedata.normalize('NFKD', str(texto))
+    plano = ''.join(c for c in plano if not unicodedata.combining(c)).lower()
+    palabras = []
+    for palabra in _NO_ALFANUMERICO.split(plano):
+        palabra = palabra[:LARGO_TERMINO]
+        if palabra and palabra not in palabras:
+            palabras.append(palabra)
+    return palabras
+
+
+def trigramas(palabra):
+    return {palabra[i:i + 3] for i in range(len(palabra) - 2)}
+
+
+def _valor(obj, campo):
+    for parte in campo.split('__'):
+        obj = getattr(obj, parte, None) if obj is not None else None
+    return obj
+
+
+def terminos(config, obj):
+    """Conjunto de (termino, clase) de `obj` según su configuración."""
+    from .models import TerminoBusqueda
+
+    resultado = set()
+    for campo in config['fields']:
+        for palabra in normalizar(_valor(obj, campo)):
+            resultado.add((palabra, TerminoBusqueda.CLASE_PALABRA))
+            resultado.update((t, TerminoBusqueda.CLASE_TRIGRAMA) for t in trigramas(palabra))
+    for campo in config.get('long_fields', []):
+        for palabra in normalizar(_valor(obj, campo))[:MAX_PALABRAS_CAMPO_LARGO]:
+            resultado.add((palabra, TerminoBusqueda.CLASE_PALABRA))
+    return resultado
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Indexado
+# ──────────────────────────────────────────────────────────────────────────────
+def modelo_de(tipo):
+    return apps.get_model(CONFIG_POR_TIPO[tipo]['model'])
+
+
+def _entrada(config, obj):
+    return {
+        'casino_id': config['casino_fn'](obj),
+        'label': config['label_fn'](obj)[:255],
+        'sublabel': config['sublabel_fn'](obj)[:255],
+        'icono': config['icon'],
+        'ruta': config['route_fn'](obj)[:255],
+    }
+
+
+def indexar(tipo, objetos):
+    """Crea o reemplaza las entradas y términos de `objetos` (instancias de `tipo`)."""
+    from .models import EntradaBusqueda, TerminoBusqueda
+
+    config = CONFIG_POR_TIPO[tipo]
+    documentos = {obj.pk: (_entrada(config, obj), terminos(config, obj)) for obj in objetos}
+    if not documentos:
+        return 0
+
+    with transaction.atomic():
+        EntradaBusqueda.objects.bulk_create(
+            [EntradaBusqueda(tipo=tipo, objeto_id=pk, **datos) for pk, (datos, _) in documentos.items()],
+            ignore_conflicts=True,
+        )
+        # El bloqueo serializa reindexados simultáneos del mismo objeto
+        entradas = list(
+            EntradaBusqueda.objects.select_for_update().filter(tipo=tipo, objeto_id__in=documentos)
+        )
+        for entrada in entradas:
+            for campo, valor in documentos[entrada.objeto_id][0].items():
+                setattr(entrada, campo, valor)
+        EntradaBusqueda.objects.bulk_update(entradas, ['casino_id', 'label', 'sublabel', 'icono', 'ruta'])
+
+        TerminoBusqueda.objects.filter(entrada__in=entradas).delete()
+        TerminoBusqueda.objects.bulk_create(
+            [
+                TerminoBusqueda(entrada=entrada, termino=termino, clase=clase)
+                for entrada in entradas
+                for termino, clase in documentos[entrada.objeto_id][1]
+            ],
+            batch_size=2000,
+        )
+    return len(entradas)
+
+
+def reindexar(tipo, ids):
+    """
+    Sincroniza el índice con el estado actual de los objetos `ids` de `tipo`:
+    los que existen se reindexan y los que ya no existen se eliminan.
+    """
+    from .models import EntradaBusqueda
+
+    config = CONFIG_POR_TIPO[tipo]
+    ids = set(ids)
+    objetos = list(
+        modelo_de(tipo).objects.select_related(*config['select_related']).filter(pk__in=ids)
+    )
+    indexar(tipo, objetos)
+    faltantes = ids - {obj.pk for obj in objetos}
+    if faltantes:
+        EntradaBusqueda.objects.filter(tipo=tipo, objeto_id__in=faltantes).delete()
+
+
+def reconstruir(tipo, lote=500):
+    """
+    Reindexa todos los objetos de `tipo` por lotes de `lote` y elimina las
+    entradas de objetos que ya no existen. Devuelve (indexados, huerfanas).
+    """
+    from .models import EntradaBusqueda
+
+    modelo = modelo_de(tipo)
+    consulta = modelo.objects.select_related(*CONFIG_POR_TIPO[tipo]['select_related']).order_by('pk')
+
+    indexados, ultimo_pk = 0, None
+    while True:
+        pagina = consulta if ultimo_pk is None else consulta.filter(pk__gt=ultimo_pk)
+        objetos = list(pagina[:lote])
+        if not objetos:
+            break
+        indexados += indexar(tipo, objetos)
+        ultimo_pk = objetos[-1].pk
+
+    vigentes = set(modelo.objects.values_list('pk', flat=True))
+    huerfanas = [
+        entrada_id for entrada_id, objeto_id in
+        EntradaBusqueda.objects.filter(tipo=tipo).values_list('id', 'objeto_id')
+        if objeto_id not in vigentes
+    ]
+    for inicio in range(0, len(huerfanas), lote):
+        EntradaBusqueda.objects.filter(id__in=huerfanas[inicio:inicio + lote]).delete()
+    return indexados, len(huerfanas)
+
+
+class _Reindexado:
+    """Callback de on_commit que acumula los ids de un tipo en la transacción."""
+
+    def __init__(self, tipo):
+        self.tipo = tipo
+        self.ids = set()
+
+    def __call__(self):
+        try:
+            reindexar(self.tipo, self.ids)
+        except Exception:
+            # El índice nunca debe tumbar el request que ya confirmó sus datos;
+            # reconstruir_indice_busqueda lo repara
+            logger.exception('No se pudo reindexar %s %s', self.tipo, sorted(self.ids))
+
+
+def marcar_reindexado(tipo, ids):
+    """Reindexa `ids` de `tipo` al confirmarse la transacción actual."""
+    conexion = transaction.get_connection()
+    if conexion.in_atomic_block:
+        for entrada in conexion.run_on_commit:
+            if isinstance(entrada[1], _Reindexado) and entrada[1].tipo == tipo:
+                entrada[1].ids.update(ids)
+                return
+    callback = _Reindexado(tipo)
+    callback.ids.update(ids)
+    transaction.on_commit(callback)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Consulta
+# ──────────────────────────────────────────────────────────────────────────────
+def buscar(texto, tipos=None, casino_id=None, por_tipo=RESULTADOS_POR_TIPO):
+    """
+    Resultados de la búsqueda global para `texto`, del más al menos relevante
+    y a lo más `por_tipo` por tipo. `tipos` limita los tipos consultados;
+    `casino_id` deja fuera los objetos de otros casinos.
+    """
+    from .models import EntradaBusqueda, TerminoBusqueda
+
+    palabras = [p for p in normalizar(texto) if len(p) >= 2][:MAX_PALABRAS_CONSULTA]
+    tipos = [tipo for tipo in (tipos or CONFIG_POR_TIPO) if tipo in CONFIG_POR_TIPO]
+    if not palabras or not tipos:
+        return []
+
+    grams = set().union(*(trigramas(p) for p in palabras))
+    por_prefijo = Q()
+    for palabra in palabras:
+        por_prefijo |= Q(termino__startswith=palabra)
+    condicion = Q(clase=TerminoBusqueda.CLASE_PALABRA) & por_prefijo
+    if grams:
+        condicion |= Q(clase=TerminoBusqueda.CLASE_TRIGRAMA, termino__in=grams)
+
+    consulta = TerminoBusqueda.objects.filter(condicion)
+    if len(tipos) < len(CONFIG_POR_TIPO):
+        consulta = consulta.filter(entrada__tipo__in=tipos)
+    if casino_id:
+        consulta = consulta.filter(Q(entrada__casino_id=casino_id) | Q(entrada__casino_id__isnull=True))
+
+    # Por palabra de la consulta: 1 si algún término de la entrada empieza con ella
+    coincidencias = {
+        f'p{i}': Max(Case(
+            When(clase=TerminoBusqueda.CLASE_PALABRA, termino__startswith=palabra, then=Value(1)),
+            default=Value(0),
+            output_field=IntegerField(),
+        ))
+        for i, palabra in enumerate(palabras)
+    }
+    consulta = consulta.values('entrada_id').annotate(
+        **coincidencias,
+        exactas=Count('id', filter=Q(clase=TerminoBusqueda.CLASE_PALABRA, termino__in=palabras)),
+        compartidos=Count('id', filter=Q(clase=TerminoBusqueda.CLASE_TRIGRAMA)),
+    )
+    consulta = consulta.annotate(prefijos=sum(F(nombre) for nombre in coincidencias)).annotate(
+        puntaje=10 * F('prefijos') + 3 * F('exactas') + F('compartidos'),
+    )
+
+    calificacion = Q(prefijos=len(palabras))
+    if grams:
+        calificacion |= Q(compartidos__gte=max(2, math.ceil(len(grams) * UMBRAL_TRIGRAMAS)))
+    filas = list(
+        consulta.filter(calificacion)
+        .order_by('-puntaje', 'entrada_id')
+        .values_list('entrada_id', flat=True)[:por_tipo * len(tipos) * 2]
+    )
+
+    entradas = EntradaBusqueda.objects.in_bulk(filas)
+    resultados, cuenta = [], {}
+    for entrada_id in filas:
+        entrada = entradas.get(entrada_id)
+        if entrada is None or cuenta.get(entrada.tipo, 0) >= por_tipo:
+            continue
+        cuenta[entrada.tipo] = cuenta.get(entrada.tipo, 0) + 1
+        resultados.append({
+            'type': entrada.tipo,
+            'label': entrada.label,
+            'sublabel': entrada.sublabel,
+            'icon': entrada.icono,
+            'route': entrada.ruta,
+        })
+    return resultados
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Signals
+# ──────────────────────────────────────────────────────────────────────────────
+_TIPOS_POR_MODELO = {}
+
+
+def _objeto_cambiado(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    for tipo in _TIPOS_POR_MODELO.get(sender._meta.label, ()):
+        marcar_reindexado(tipo, [instance.pk])
+
+
+def _dependencia_cambiada(sender, instance, created=False, raw=False, **kwargs):
+    if raw or created:
+        return
+    cambiados = set(instance.changed_fields()) if hasattr(instance, 'changed_fields') else None
+    for origen, campos, tipo, campo_fk in DEPENDENCIAS:
+        if origen != sender._meta.label or (cambiados is not None and not cambiados & set(campos)):
+            continue
+        ids = modelo_de(tipo).objects.filter(**{campo_fk: instance.pk}).values_list('pk', flat=True)
+        marcar_reindexado(tipo, list(ids))
+
+
+def conectar_signals():
+    from django.db.models.signals import post_delete, post_save
+
+    for config in CONFIG_BUSQUEDA:
+        _TIPOS_POR_MODELO.setdefault(config['model'], []).append(config['type'])
+
+    for etiqueta in _TIPOS_POR_MODELO:
+        modelo = apps.get_model(etiqueta)
+        uid = f'busqueda_{etiqueta}'
+        post_save.connect(_objeto_cambiado, sender=modelo, dispatch_uid=f'{uid}_save')
+        post_delete.connect(_objeto_cambiado, sender=modelo, dispatch_uid=f'{uid}_delete')
+
+    for etiqueta in {origen for origen, _, _, _ in DEPENDENCIAS}:
+        post_save.connect(
+            _dependencia_cambiada, sender=apps.get_model(etiqueta),
+            dispatch_uid=f'busqueda_dependencia_{etiqueta}',
+        )
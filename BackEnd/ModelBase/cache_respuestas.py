@@ -0,0 +1,359 @@
+"""
+Caché de respuestas para endpoints de lectura con alcance de casino.
+
+Pantallas como el mapa, la lista de máquinas, el centro de servicios, el
+reporte diario o el historial de vacíos las piden todos los usuarios de un
+casino y cada request recalculaba el mismo JSON. El decorador
+`cachear_respuesta` guarda los bytes ya serializados bajo la llave:
+
+    (endpoint, casino, generación del casino, generación global,
+     grupo de rol, día local, parámetros normalizados + host)
+
+Invalidación exacta, nunca por tiempo:
+  - Cada casino tiene un contador de generación. Los post_save/post_delete
+    de Maquina, Ticket, BitacoraTecnica, IncidenciaInfraestructura y
+    TicketVacio lo incrementan al confirmarse la transacción; las entradas
+    anteriores quedan inalcanzables y expiran solas del backend.
+  - Una generación global cubre catálogos compartidos que aparecen en las
+    respuestas (Casino, ModeloMaquina, Proveedor, Denominacion y nombres de
+    usuario).
+  - El día local forma parte de la llave porque hay campos calculados contra
+    la fecha actual (dias_abierto, dias_licencia, "Hoy/Ayer").
+  - Los `queryset.update()` no disparan signals: quien los use debe llamar a
+    `invalidar_casino()`.
+
+Las generaciones y las respuestas viven en settings.CACHE_RESPUESTAS
+['CACHE_ALIAS'], que debe ser compartido entre workers (Redis, Memcached,
+archivos): con un backend por proceso (LocMemCache, el de Django si no hay
+CACHES) cada worker tendría sus propias generaciones y serviría datos que
+otro ya invalidó. Por eso el caché viene apagado (HABILITADO False) y, aun
+encendido, no se usa si el alias apunta a BACKENDS_POR_PROCESO.
+
+Las métricas de aciertos/fallos son por proceso y por endpoint
+(`estadisticas()`, expuestas en /api/auditoria-sistema/metricas-cache/).
+"""
+import hashlib
+import logging
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+GLOBAL = 'global'
+
+# Backends cuyo contenido no ven los demás workers
+BACKENDS_POR_PROCESO = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+_aviso_por_proceso = False
+
+
+def _config():
+    config = getattr(settings, 'CACHE_RESPUESTAS', {}) or {}
+    return {
+        'HABILITADO': bool(config.get('HABILITADO', False)),
+        'CACHE_ALIAS': config.get('CACHE_ALIAS', 'default'),
+        'TTL': int(config.get('TTL', 86400)),
+        'MAX_BYTES': int(config.get('MAX_BYTES', 2 * 1024 * 1024)),
+        'KEY_PREFIX': config.get('KEY_PREFIX', 'nexus:respuestas:'),
+    }
+
+
+def _cache():
+    from django.core.cache import caches
+    return caches[_config()['CACHE_ALIAS']]
+
+
+def habilitado():
+    """True si el caché está encendido y su alias es compartido entre workers."""
+    global _aviso_por_proceso
+    config = _config()
+    if not config['HABILITADO']:
+        return False
+    backend = settings.CACHES.get(config['CACHE_ALIAS'], {}).get('BACKEND')
+    if backend is None or backend in BACKENDS_POR_PROCESO:
+        if not _aviso_por_proceso:
+            _aviso_por_proceso = True
+            logger.warning(
+                f"Caché de respuestas desactivado: el alias '{config['CACHE_ALIAS']}' "
+                f"no es un backend compartido ({backend})"
+            )
+        return False
+    return True
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Métricas por endpoint (por proceso)
+# ──────────────────────────────────────────────────────────────────────────────
+_metricas = {}
+_metricas_lock = threading.Lock()
+
+
+def _contar(endpoint, campo, cantidad=1):
+    with _metricas_lock:
+        datos = _metricas.setdefault(endpoint, {
+            'hits': 0, 'misses': 0, 'almacenadas': 0, 'omitidas': 0, 'bytes_servidos': 0,
+        })
+        datos[campo] += cantidad
+
+
+def estadisticas():
+    """Copia de las métricas del proceso con la tasa de aciertos por endpoint."""
+    with _metricas_lock:
+        copia = {endpoint: dict(datos) for endpoint, datos in _metricas.items()}
+    for datos in copia.values():
+        consultas = datos['hits'] + datos['misses']
+        datos['tasa_aciertos'] = round(datos['hits'] / consultas, 4) if consultas else 0.0
+    return copia
+
+
+def limpiar_estadisticas():
+    with _metricas_lock:
+        _metricas.clear()
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Generaciones
+# ──────────────────────────────────────────────────────────────────────────────
+def _llave_generacion(alcance):
+    return f"{_config()['KEY_PREFIX']}gen:{alcance}"
+
+
+def _generaciones(casino_id):
+    """Lee (generación del casino, generación global) en un solo viaje al backend."""
+    cache = _cache()
+    llaves = [_llave_generacion(casino_id), _llave_generacion(GLOBAL)]
+    valores = cache.get_many(llaves)
+    resultado = []
+    for llave in llaves:
+        valor = valores.get(llave)
+        if valor is None:
+            # Si la generación se perdió (expulsión, reinicio del backend) se
+            # arranca en un valor nuevo: nunca reaparecen respuestas viejas
+            cache.add(llave, time.time_ns(), timeout=None)
+            valor = cache.get(llave)
+        resultado.append(valor)
+    return resultado
+
+
+def _incrementar(alcance):
+    cache = _cache()
+    llave = _llave_generacion(alcance)
+    try:
+        cache.incr(llave)
+    except ValueError:
+        cache.add(llave, time.time_ns(), timeout=None)
+
+
+def invalidar_casino(casino_id, inmediato=False):
+    """
+    Invalida las respuestas de un casino al confirmarse la transacción actual,
+    o en el acto con `inmediato` (hilos que no usan la BD, como los callbacks
+    del pool de derivados de imagen).
+    """
+    if casino_id is None:
+        return
+    if inmediato:
+        _incrementar(casino_id)
+        return
+    transaction.on_commit(lambda: _incrementar(casino_id))
+
+
+def invalidar_global():
+    """Invalida las respuestas de todos los casinos al confirmarse la transacción."""
+    transaction.on_commit(lambda: _incrementar(GLOBAL))
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Decorador
+# ──────────────────────────────────────────────────────────────────────────────
+def grupo_rol(usuario):
+    """Grupo de rol de la llave: los privilegiados pueden ver otros casinos."""
+    nivel = getattr(getattr(usuario, 'rol', None), 'nivel_jerarquia', 0) or 0
+    return 'privilegiado' if nivel >= 19 else 'general'
+
+
+def _parametros(request):
+    pares = sorted(
+        (clave, valor)
+        for clave in request.query_params
+        for valor in request.query_params.getlist(clave)
+    )
+    # El host entra en la llave porque hay URLs absolutas (imágenes) en las respuestas
+    crudo = f"{request.get_host()}|{'&'.join(f'{clave}={valor}' for clave, valor in pares)}"
+    return hashlib.sha1(crudo.encode('utf-8')).hexdigest()
+
+
+def cachear_respuesta(endpoint, casino):
+    """
+    Decora una acción de ViewSet de solo lectura.
+
+    `casino(view, request, **kwargs)` devuelve el id del casino de la
+    respuesta, o None para no cachear (ej. parámetros inválidos). Solo se
+    almacenan respuestas 200; los permisos ya se evaluaron antes de llegar a
+    la acción.
+    """
+    def decorador(metodo):
+        @wraps(metodo)
+        def envoltura(self, request, *args, **kwargs):
+            config = _config()
+            casino_id = casino(self, request, **kwargs) if habilitado() else None
+            if casino_id in (None, ''):
+                return metodo(self, request, *args, **kwargs)
+
+            try:
+                generacion_casino, generacion_global = _generaciones(casino_id)
+                llave = (
+                    f"{config['KEY_PREFIX']}r:{endpoint}:{casino_id}:{generacion_casino}:{generacion_global}:"
+                    f"{grupo_rol(request.user)}:{timezone.localdate().isoformat()}:{_parametros(request)}"
+                )
+                contenido = _cache().get(llave)
+            except Exception as e:
+                # El caché nunca debe tumbar el endpoint
+                logger.warning(f"Caché de respuestas no disponible ({endpoint}): {e}")
+                return metodo(self, request, *args, **kwargs)
+
+            if contenido is not None:
+                _contar(endpoint, 'hits')
+                _contar(endpoint, 'bytes_servidos', len(contenido))
+                respuesta = HttpResponse(contenido, content_type='application/json')
+                respuesta['X-Cache'] = 'HIT'
+                return respuesta
+
+            _contar(endpoint, 'misses')
+            respuesta = metodo(self, request, *args, **kwargs)
+            if respuesta.status_code != 200 or not hasattr(respuesta, 'data'):
+                return respuesta
+
+            from rest_framework.renderers import JSONRenderer
+            contenido = JSONRenderer().render(respuesta.data)
+            if len(contenido) > config['MAX_BYTES']:
+                _contar(endpoint, 'omitidas')
+            else:
+                try:
+                    _cache().set(llave, contenido, timeout=config['TTL'])
+                    _contar(endpoint, 'almacenadas')
+                except Exception as e:
+                    logger.warning(f"No se pudo guardar la respuesta en caché ({endpoint}): {e}")
+            _contar(endpoint, 'bytes_servidos', len(contenido))
+            respuesta = HttpResponse(contenido, content_type='application/json')
+            respuesta['X-Cache'] = 'MISS'
+            return respuesta
+        return envoltura
+    return decorador
+
+
+def casino_de_url(view, request, casino_id=None, **kwargs):
+    """Casino tomado del segmento <casino_id> de la URL."""
+    return casino_id if casino_id and str(casino_id).isdigit() else None
+
+
+def casino_de_parametro(nombre):
+    """Casino tomado de un query param (ej. ?casino=3)."""
+    def resolver(view, request, **kwargs):
+        valor = request.query_params.get(nombre)
+        return valor if valor and valor.isdigit() else None
+    return resolver
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Signals
+# ──────────────────────────────────────────────────────────────────────────────
+# Campos de Usuarios que aparecen en las respuestas cacheadas
+CAMPOS_USUARIO_VISIBLES = ('nombres', 'apellido_paterno', 'apellido_materno', 'username')
+
+
+def _casino_de_maquina_id(maquina_id):
+    from Maquinas.models import Maquina
+
+    if maquina_id is None:
+        return None
+    return Maquina.objects.filter(pk=maquina_id).values_list('casino_id', flat=True).first()
+
+
+def _casinos_afectados(instance):
+    """Casinos cuyo contenido cambia con `instance` (actual y, si se movió, el anterior)."""
+    from BitacoraTecnica.models import BitacoraTecnica
+    from Maquinas.models import Maquina
+    from Tickets.models import Ticket
+
+    if isinstance(instance, Maquina):
+        # previous() devuelve el casino anterior si la máquina se movió
+        return {instance.casino_id, instance.previous('casino')}
+    if isinstance(instance, Ticket):
+        if 'maquina' in instance._state.fields_cache:
+            return {instance.maquina.casino_id}
+        return {_casino_de_maquina_id(instance.maquina_id)}
+    if isinstance(instance, BitacoraTecnica):
+        return {Ticket.objects.filter(pk=instance.ticket_id).values_list('maquina__casino_id', flat=True).first()}
+    # IncidenciaInfraestructura, TicketVacio: FK directa a casino
+    return {getattr(instance, 'casino_id', None)}
+
+
+def _invalidar_por_casino(sender, instance, **kwargs):
+    if kwargs.get('raw'):
+        return
+    for casino_id in _casinos_afectados(instance):
+        invalidar_casino(casino_id)
+
+
+def _invalidar_por_catalogo(sender, instance, **kwargs):
+    if kwargs.get('raw'):
+        return
+    invalidar_global()
+
+
+def _invalidar_por_usuario(sender, instance, created=False, **kwargs):
+    if kwargs.get('raw') or created:
+        return
+    # Los logins rotan session_token en cada acceso: solo invalidan los nombres
+    if set(instance.changed_fields()) & set(CAMPOS_USUARIO_VISIBLES):
+        invalidar_global()
+
+
+def _invalidar_denominaciones(sender, instance, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        from Maquinas.models import Maquina
+        if isinstance(instance, Maquina):
+            invalidar_casino(instance.casino_id)
+        else:
+            invalidar_global()
+
+
+def conectar_signals():
+    from django.db.models.signals import m2m_changed, post_delete, post_save
+
+    from BitacoraTecnica.models import BitacoraTecnica
+    from Casinos.models import Casino
+    from Denominaciones.models import Denominacion
+    from IncidenciasInfraestructura.models import IncidenciaInfraestructura
+    from Maquinas.models import Maquina
+    from ModelosMaquinas.models import ModeloMaquina
+    from Proveedores.models import Proveedor
+    from Tickets.models import Ticket
+    from Usuarios.models import Usuarios
+    from VaciosTickets.models import TicketVacio
+
+    for modelo in (Maquina, Ticket, BitacoraTecnica, IncidenciaInfraestructura, TicketVacio):
+        uid = f'cache_respuestas_{modelo.__name__}'
+        post_save.connect(_invalidar_por_casino, sender=modelo, dispatch_uid=f'{uid}_save')
+        post_delete.connect(_invalidar_por_casino, sender=modelo, dispatch_uid=f'{uid}_delete')
+
+    for modelo in (Casino, ModeloMaquina, Proveedor, Denominacion):
+        uid = f'cache_respuestas_{modelo.__name__}'
+        post_save.connect(_invalidar_por_catalogo, sender=modelo, dispatch_uid=f'{uid}_save')
+        post_delete.connect(_invalidar_por_catalogo, sender=modelo, dispatch_uid=f'{uid}_delete')
+
+    post_save.connect(_invalidar_por_usuario, sender=Usuarios, dispatch_uid='cache_respuestas_Usuarios_save')
+    m2m_changed.connect(
+        _invalidar_denominaciones, sender=Maquina.denominaciones.through,
+        dispatch_uid='cache_respuestas_denominaciones',
+    )
@@ -0,0 +1,115 @@
+"""
+Búsquedas por lote para campos calculados de serializers (dataloader).
+
+Un SerializerMethodField que consulta la BD (ej. el estado fresco de la
+máquina de un ticket, o cuántas bitácoras tiene) hace una consulta por fila:
+una lista de 500 tickets son 500 consultas aunque la vista ya haya hecho
+select_related. Aquí el serializer declara la búsqueda y la lista resuelve
+todas las claves de una vez:
+
+    estado_maquina = Cargador(
+        'maquina.estado_actual',
+        lambda ids: dict(Maquina.objects.filter(pk__in=ids).values_list('id', 'estado_actual')),
+    )
+
+    class TicketSerializer(serializers.ModelSerializer):
+        maquina_estado_actual = CampoPorLote(estado_maquina, clave='maquina_id')
+
+        class Meta:
+            list_serializer_class = ListaConCargadores
+
+  1. ListaConCargadores junta las claves de todas las filas para cada
+     CampoPorLote del serializer hijo y llama a cada cargador UNA vez.
+  2. Los resultados se guardan en el request (o en el contexto si no hay
+     request): otro serializer del mismo request que pida las mismas claves
+     no vuelve a consultar.
+  3. Fuera de una lista (detalle, un solo objeto) el campo resuelve su clave
+     al vuelo con la misma función: una consulta, igual que antes.
+
+Una clave sin resultado toma el `defecto` del campo.
+"""
+from django.db.models.manager import BaseManager
+from rest_framework import serializers
+
+_SIN_RESULTADO = object()
+
+
+class Cargador:
+    """
+    Búsqueda por lote con nombre. `cargar(claves)` recibe un set de claves y
+    devuelve {clave: valor} con las que existan.
+    """
+
+    def __init__(self, nombre, cargar):
+        self.nombre = nombre
+        self.cargar = cargar
+
+    def __repr__(self):
+        return f'<Cargador {self.nombre}>'
+
+
+def _almacen(contexto):
+    """{nombre_cargador: {clave: valor}} del request actual (o del contexto del serializer)."""
+    request = contexto.get('request')
+    destino = getattr(request, '_request', request) if request is not None else None
+    if destino is None:
+        return contexto.setdefault('_cargadores', {})
+    if not hasattr(destino, '_cargadores'):
+        destino._cargadores = {}
+    return destino._cargadores
+
+
+def resolver(contexto, cargador, claves):
+    """Resuelve las `claves` que aún no están en el almacén del request con una sola llamada."""
+    resultados = _almacen(contexto).setdefault(cargador.nombre, {})
+    faltantes = {clave for clave in claves if clave is not None and clave not in resultados}
+    if faltantes:
+        encontrados = cargador.cargar(faltantes)
+        for clave in faltantes:
+            resultados[clave] = encontrados.get(clave, _SIN_RESULTADO)
+    return resultados
+
+
+class CampoPorLote(serializers.Field):
+    """
+    Campo de solo lectura resuelto con `cargador`. `clave` es el atributo de
+    la instancia (ej. 'maquina_id') o un callable instancia → clave.
+    """
+
+    def __init__(self, cargador, clave, defecto=None, **kwargs):
+        kwargs['read_only'] = True
+        kwargs.setdefault('source', '*')
+        super().__init__(**kwargs)
+        self.cargador = cargador
+        self.clave = clave
+        self.defecto = defecto
+
+    def clave_de(self, instancia):
+        if callable(self.clave):
+            return self.clave(instancia)
+        return getattr(instancia, self.clave, None)
+
+    def to_representation(self, instancia):
+        clave = self.clave_de(instancia)
+        if clave is None:
+            return self.defecto
+        valor = resolver(self.context, self.cargador, [clave]).get(clave, _SIN_RESULTADO)
+        return self.defecto if valor is _SIN_RESULTADO else valor
+
+
+def precargar(serializer, instancias):
+    """Resuelve de una vez todos los CampoPorLote de `serializer` para `instancias`."""
+    campos = [campo for campo in serializer.fields.values() if isinstance(campo, CampoPorLote)]
+    for campo in campos:
+        resolver(serializer.context, campo.cargador, {campo.clave_de(instancia) for instancia in instancias})
+
+
+class ListaConCargadores(serializers.ListSerializer):
+    """ListSerializer que precarga los CampoPorLote del hijo antes de serializar las filas."""
+
+    def to_representation(self, data):
+        # Igual que ListSerializer: un manager (relación) se convierte en queryset;
+        # un queryset ya evaluado se reutiliza sin volver a consultar
+        instancias = list(data.all() if isinstance(data, BaseManager) else data)
+        precargar(self.child, instancias)
+        return super().to_representation(instancias)
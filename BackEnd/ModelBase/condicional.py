@@ -0,0 +1,206 @@
+"""
+Respuestas condicionales (ETag / Last-Modified → 304) para catálogos.
+
+El menú activo (AllowAny, en cada carga de página) y los listados completos
+de máquinas, casinos, roles, proveedores y modelos devolvían la tabla entera
+en cada llamada aunque cambian pocas veces al día. El decorador
+`respuesta_condicional` calcula un validador barato ANTES de ejecutar la
+vista:
+
+  1. Lee en UNA consulta las versiones (VersionTabla) de las tablas de las
+     que depende la respuesta.
+  2. ETag = hash(endpoint, parámetros, host, versiones[, día local]);
+     Last-Modified = la modificación más reciente de esas tablas.
+  3. Si el cliente envía If-None-Match / If-Modified-Since vigentes se
+     responde 304 sin consultar ni serializar nada más.
+  4. Si no, se ejecuta la vista y se adjuntan los validadores a la respuesta.
+
+Las versiones las incrementan los signals de las tablas de TABLAS_VERSIONADAS
+al confirmarse la transacción (una sola vez por tabla y transacción). Los
+`queryset.update()` no disparan signals: quien los use sobre estas tablas
+debe llamar a `marcar_cambio()`.
+
+settings.RESPUESTAS_CONDICIONALES['VERSION'] se incrementa al cambiar el
+formato de alguna de estas respuestas, para que ningún cliente conserve un
+cuerpo viejo con un ETag que sigue siendo válido.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+# Tablas cuyas versiones se mantienen. Deben declararse aquí (y no al decorar
+# la vista) para que también se versionen los cambios hechos desde procesos
+# que nunca importan las vistas: comandos, shell, tareas programadas.
+TABLAS_VERSIONADAS = frozenset({
+    'Menus.MenuConfig',
+    'Maquinas.Maquina',
+    'ModelosMaquinas.ModeloMaquina',
+    'Casinos.Casino',
+    'Proveedores.Proveedor',
+    'Denominaciones.Denominacion',
+    'Roles.Rol',
+})
+
+
+def _config():
+    config = getattr(settings, 'RESPUESTAS_CONDICIONALES', {}) or {}
+    return {
+        'HABILITADO': bool(config.get('HABILITADO', True)),
+        'VERSION': str(config.get('VERSION', '1')),
+        'CACHE_CONTROL': config.get('CACHE_CONTROL', 'private, no-cache'),
+    }
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Versiones
+# ──────────────────────────────────────────────────────────────────────────────
+class _Incremento:
+    """Callback de on_commit identificable, para no encolar dos por tabla."""
+
+    def __init__(self, tabla):
+        self.tabla = tabla
+
+    def __call__(self):
+        from .models import VersionTabla
+
+        ahora = timezone.now()
+        actualizadas = VersionTabla.objects.filter(tabla=self.tabla).update(
+            version=F('version') + 1, modificado_en=ahora
+        )
+        if actualizadas:
+            return
+        try:
+            with transaction.atomic():
+                VersionTabla.objects.create(tabla=self.tabla, version=1)
+        except IntegrityError:
+            VersionTabla.objects.filter(tabla=self.tabla).update(version=F('version') + 1, modificado_en=ahora)
+
+
+def marcar_cambio(tabla):
+    """
+    Incrementa la versión de `tabla` ('app.Modelo') al confirmarse la
+    transacción actual. Varias llamadas en la misma transacción cuentan una vez.
+    """
+    conexion = transaction.get_connection()
+    # Se revisan los callbacks ya encolados (Django descarta los de los
+    # savepoints revertidos, así que un rollback no deja la tabla "pendiente")
+    if conexion.in_atomic_block and any(
+        isinstance(entrada[1], _Incremento) and entrada[1].tabla == tabla
+        for entrada in conexion.run_on_commit
+    ):
+        return
+    transaction.on_commit(_Incremento(tabla))
+
+
+def versiones(tablas):
+    """{tabla: (version, modificado_en)} en una sola consulta; las ausentes valen (0, None)."""
+    from .models import VersionTabla
+
+    encontradas = {
+        tabla: (version, modificado_en)
+        for tabla, version, modificado_en in VersionTabla.objects.filter(
+            tabla__in=tablas
+        ).values_list('tabla', 'version', 'modificado_en')
+    }
+    return {tabla: encontradas.get(tabla, (0, None)) for tabla in tablas}
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Decorador
+# ──────────────────────────────────────────────────────────────────────────────
+def _parametros(request):
+    consulta = getattr(request, 'query_params', request.GET)
+    pares = sorted((clave, valor) for clave in consulta for valor in consulta.getlist(clave))
+    return '&'.join(f'{clave}={valor}' for clave, valor in pares)
+
+
+def validadores(request, endpoint, tablas, por_dia=False):
+    """Retorna (etag, last_modified) para el endpoint con el estado actual de `tablas`."""
+    estado = versiones(tablas)
+    partes = [
+        _config()['VERSION'],
+        endpoint,
+        request.get_host(),  # hay URLs absolutas (imágenes) en las respuestas
+        _parametros(request),
+        ','.join(f'{tabla}:{estado[tabla][0]}' for tabla in sorted(tablas)),
+    ]
+    if por_dia:
+        partes.append(timezone.localdate().isoformat())
+    etag = quote_etag(hashlib.sha1('|'.join(partes).encode('utf-8')).hexdigest()[:32])
+
+    fechas = [modificado_en for _, modificado_en in estado.values() if modificado_en is not None]
+    # Con campos calculados contra la fecha actual Last-Modified no es fiable
+    last_modified = int(max(fechas).timestamp()) if fechas and not por_dia else None
+    return etag, last_modified
+
+
+def respuesta_condicional(endpoint, tablas, por_dia=False):
+    """
+    Decora un método GET de APIView o una acción de ViewSet cuya respuesta
+    depende solo de `tablas` (labels 'app.Modelo' de TABLAS_VERSIONADAS) y
+    de los parámetros del request. `por_dia` para respuestas con campos
+    calculados contra la fecha actual (ej. días de licencia restantes).
+    """
+    tablas = tuple(tablas)
+    desconocidas = set(tablas) - TABLAS_VERSIONADAS
+    if desconocidas:
+        raise ValueError(f"Tablas sin versionar en {endpoint}: {sorted(desconocidas)}")
+
+    def decorador(metodo):
+        @wraps(metodo)
+        def envoltura(self, request, *args, **kwargs):
+            config = _config()
+            if not config['HABILITADO'] or request.method not in ('GET', 'HEAD'):
+                return metodo(self, request, *args, **kwargs)
+
+            etag, last_modified = validadores(request, endpoint, tablas, por_dia)
+            no_modificada = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if no_modificada is not None:
+                # 304 (o 412 ante un If-Match fallido) sin ejecutar la vista
+                if no_modificada.status_code == 304:
+                    no_modificada['ETag'] = etag
+                    no_modificada['Cache-Control'] = config['CACHE_CONTROL']
+                return no_modificada
+
+            respuesta = metodo(self, request, *args, **kwargs)
+            if respuesta.status_code == 200:
+                respuesta['ETag'] = etag
+                if last_modified is not None:
+                    respuesta['Last-Modified'] = http_date(last_modified)
+                respuesta['Cache-Control'] = config['CACHE_CONTROL']
+            return respuesta
+        return envoltura
+    return decorador
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Signals
+# ──────────────────────────────────────────────────────────────────────────────
+def _cambio_en_tabla(sender, raw=False, **kwargs):
+    if raw:
+        return
+    tabla = sender._meta.label
+    if tabla in TABLAS_VERSIONADAS:
+        marcar_cambio(tabla)
+
+
+def _cambio_en_relacion(sender, instance, action, model, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    for tabla in (type(instance)._meta.label, model._meta.label):
+        if tabla in TABLAS_VERSIONADAS:
+            marcar_cambio(tabla)
+
+
+def conectar_signals():
+    from django.db.models.signals import m2m_changed, post_delete, post_save
+
+    post_save.connect(_cambio_en_tabla, dispatch_uid='condicional_post_save')
+    post_delete.connect(_cambio_en_tabla, dispatch_uid='condicional_post_delete')
+    m2m_changed.connect(_cambio_en_relacion, dispatch_uid='condicional_m2m_changed')
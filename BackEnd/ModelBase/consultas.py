@@ -0,0 +1,153 @@
+"""
+Presupuesto de consultas SQL por endpoint y detector de N+1.
+
+Nada avisaba cuando una vista pasaba de 3 consultas a 300: el estado de la
+máquina por ticket o el historial que reconsultaba las bitácoras llegaron a
+producción sin que nadie lo notara. Aquí se mide cada request con un
+`execute_wrapper` de Django (sin tocar las vistas):
+
+  - total de consultas y tiempo en BD,
+  - huella de cada sentencia: el SQL con sus parámetros como %s y las listas
+    IN (...) / VALUES (...) colapsadas. Muchas consultas con la misma huella
+    y distintos parámetros son la forma típica de un N+1,
+  - sentencias idénticas (mismo SQL y mismos parámetros) repetidas: siempre
+    son trabajo desperdiciado.
+
+El presupuesto de cada endpoint vive en presupuestos_consultas.json, con la
+forma {nombre_de_ruta: {MÉTODO: máximo}}. El nombre de ruta es el que arma
+el router de DRF: '<basename>-list', '<basename>-detail' o
+'<basename>-<accion>' (ej. 'tickets-historial-maquina').
+
+Lo usan:
+  - ModelBase.middleware.PresupuestoConsultasMiddleware: en runtime, loguea
+    los requests que se pasan y agrega cabeceras X-Consultas* en DEBUG.
+  - ModelBase.pruebas: helper para pruebas que falla al exceder el
+    presupuesto o al repetir sentencias.
+  - `manage.py verificar_presupuestos_consultas`: cobertura del archivo
+    contra las rutas registradas y medición de los listados.
+"""
+import json
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+
+ARCHIVO_POR_DEFECTO = Path(__file__).resolve().parent / 'presupuestos_consultas.json'
+
+_LISTA_IN = re.compile(r'\bIN \((?:%s, )*%s\)', re.IGNORECASE)
+_FILAS_VALUES = re.compile(r'(\((?:%s, )*%s\))(?:, \((?:%s, )*%s\))+')
+_CADENAS = re.compile(r"'(?:[^']|'')*'")
+_NUMEROS = re.compile(r'\b\d+(?:\.\d+)?\b')
+_ESPACIOS = re.compile(r'\s+')
+
+
+def configuracion():
+    config = getattr(settings, 'PRESUPUESTO_CONSULTAS', {}) or {}
+    return {
+        'ACTIVO': config.get('ACTIVO', settings.DEBUG),
+        'CABECERAS': config.get('CABECERAS', settings.DEBUG),
+        'ARCHIVO': str(config.get('ARCHIVO') or ARCHIVO_POR_DEFECTO),
+        'POR_DEFECTO': config.get('POR_DEFECTO', 50),
+        'UMBRAL_REPETIDAS': max(int(config.get('UMBRAL_REPETIDAS', 5)), 2),
+    }
+
+
+def huella_sql(sql):
+    """SQL normalizado: literales como %s, listas IN/VALUES colapsadas, espacios simples."""
+    sql = _CADENAS.sub('%s', sql)
+    sql = _NUMEROS.sub('%s', sql)
+    sql = _ESPACIOS.sub(' ', sql).strip()
+    sql = _LISTA_IN.sub('IN (...)', sql)
+    return _FILAS_VALUES.sub(r'\1, ...', sql)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Medición
+# ──────────────────────────────────────────────────────────────────────────────
+class Medicion:
+    """execute_wrapper que acumula consultas, tiempo y huellas de un bloque."""
+
+    def __init__(self):
+        self.total = 0
+        self.tiempo = 0.0
+        self.huellas = Counter()
+        self.sentencias = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.tiempo += time.perf_counter() - inicio
+            self.total += 1
+            self.huellas[huella_sql(sql)] += 1
+            self.sentencias[(sql, repr(params))] += 1
+
+    def repetidas(self, umbral):
+        """[(huella, veces)] de las huellas ejecutadas `umbral` veces o más (forma de N+1)."""
+        return [(huella, veces) for huella, veces in self.huellas.most_common() if veces >= umbral]
+
+    def duplicadas(self):
+        """[(sql, veces)] de las sentencias idénticas (SQL y parámetros) ejecutadas más de una vez."""
+        return [(sql, veces) for (sql, _), veces in self.sentencias.most_common() if veces > 1]
+
+    def resumen(self):
+        return f'{self.total} consultas, {self.tiempo * 1000:.1f} ms en BD'
+
+
+@contextmanager
+def medir(aliases=None):
+    """Mide las consultas de todas las conexiones (o de `aliases`) dentro del bloque."""
+    medicion = Medicion()
+    with ExitStack() as pila:
+        for alias in aliases or connections:
+            pila.enter_context(connections[alias].execute_wrapper(medicion))
+        yield medicion
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Presupuestos
+# ──────────────────────────────────────────────────────────────────────────────
+@lru_cache(maxsize=4)
+def cargar_presupuestos(archivo=None):
+    """{nombre_de_ruta: {MÉTODO: máximo}} del archivo de presupuestos (se lee una vez)."""
+    with open(archivo or configuracion()['ARCHIVO'], encoding='utf-8') as fuente:
+        datos = json.load(fuente)
+    return {
+        ruta: {metodo.upper(): maximo for metodo, maximo in metodos.items()}
+        for ruta, metodos in datos.items() if not ruta.startswith('_')
+    }
+
+
+def presupuesto_de(ruta, metodo, archivo=None):
+    """Máximo de consultas de `ruta` + `metodo`; POR_DEFECTO si no está declarado."""
+    try:
+        presupuestos = cargar_presupuestos(archivo)
+    except FileNotFoundError:
+        presupuestos = {}
+    return presupuestos.get(ruta, {}).get(metodo.upper(), configuracion()['POR_DEFECTO'])
+
+
+def revisar(medicion, maximo=None, umbral_repetidas=None):
+    """
+    Problemas de la medición como lista de textos (vacía si todo está bien):
+    presupuesto excedido, sentencias idénticas repetidas y huellas que se
+    repiten `umbral_repetidas` veces o más.
+    """
+    umbral = umbral_repetidas or configuracion()['UMBRAL_REPETIDAS']
+    problemas = []
+    if maximo is not None and medicion.total > maximo:
+        problemas.append(f'{medicion.total} consultas (presupuesto {maximo})')
+    reportadas = set()
+    for sql, veces in medicion.duplicadas():
+        reportadas.add(huella_sql(sql))
+        problemas.append(f'sentencia idéntica {veces} veces: {sql[:200]}')
+    for huella, veces in medicion.repetidas(umbral):
+        if huella not in reportadas:
+            problemas.append(f'posible N+1 ({veces} veces): {huella[:200]}')
+    return problemas
@@ -0,0 +1,239 @@
+"""
+Derivados de imagen (miniatura y tamaño medio) generados fuera del request.
+
+Las cuatro fotos de cada TicketVacio llegan desde el celular a resolución
+completa y los listados (por_casino, el DataTable del Centro de Servicios)
+devolvían los originales en cada fila. Ahora, al confirmarse el guardado de
+una fila con campos de CAMPOS_CON_DERIVADOS, se encolan en un
+ProcessPoolExecutor (contexto 'spawn', sin heredar conexiones a la BD) los
+derivados que falten. ModelBase/imagenes.py aplica la orientación EXIF,
+descarta los metadatos, reduce y recomprime cada uno. Quedan junto al
+original:
+
+    contenido/ab/cd/<sha256>.png         original (intacto: es la evidencia)
+    contenido/ab/cd/<sha256>.mini.webp   miniatura (listados)
+    contenido/ab/cd/<sha256>.medio.webp  tamaño medio (detalle)
+
+Como el original está direccionado por contenido (ModelBase/almacen_contenido.py),
+los derivados de una misma imagen se generan una sola vez aunque varias filas
+la compartan. `DerivadosImagen` y `DerivadoImagen` exponen las URLs en los
+serializers; un derivado que todavía no existe vale None. Al terminar se
+invalida el caché de respuestas del casino de la fila, que pudo servirse sin él.
+
+Para los archivos que ya existían:
+
+    python manage.py generar_derivados_imagen
+"""
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework import serializers
+
+from .imagenes import EXTENSIONES, formato_disponible, generar_derivados
+
+logger = logging.getLogger(__name__)
+
+# Campos de imagen con derivados, por modelo
+CAMPOS_CON_DERIVADOS = {
+    'VaciosTickets.TicketVacio': (
+        'foto_ultimas_operaciones',
+        'foto_carga_sistema',
+        'foto_seguimiento_slot',
+        'foto_recarga_error',
+    ),
+    'Usuarios.Usuarios': ('avatar',),
+}
+
+TAMANOS_POR_DEFECTO = {'mini': 320, 'medio': 1280}
+
+
+def configuracion():
+    config = getattr(settings, 'DERIVADOS_IMAGEN', {}) or {}
+    return {
+        'ACTIVO': bool(config.get('ACTIVO', True)),
+        'FORMATO': formato_disponible(str(config.get('FORMATO', 'WEBP')).upper()),
+        'CALIDAD': int(config.get('CALIDAD', 80)),
+        'TAMANOS': dict(config.get('TAMANOS', TAMANOS_POR_DEFECTO)),
+        'PROCESOS': int(config.get('PROCESOS', 2)),
+    }
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Nombres y URLs
+# ──────────────────────────────────────────────────────────────────────────────
+def nombre_derivado(nombre, tamano):
+    """Nombre del derivado `tamano` del archivo `nombre` (en su mismo directorio)."""
+    return f'{os.path.splitext(nombre)[0]}.{tamano}{EXTENSIONES[configuracion()["FORMATO"]]}'
+
+
+def base_original(nombre):
+    """`nombre` sin extensión ni variante: la base común del original y sus derivados."""
+    base = os.path.splitext(nombre)[0]
+    raiz, variante = os.path.splitext(base)
+    return raiz if variante[1:] in configuracion()['TAMANOS'] else base
+
+
+def url_derivado(archivo, tamano, request=None):
+    """
+    URL del derivado `tamano` de un FieldFile ('original' para el archivo
+    subido), absoluta si hay request. None si el campo está vacío o el
+    derivado aún no se generó.
+    """
+    if not archivo:
+        return None
+    if tamano == 'original':
+        url = archivo.url
+    else:
+        nombre = nombre_derivado(archivo.name, tamano)
+        if not archivo.storage.exists(nombre):
+            return None
+        url = archivo.storage.url(nombre)
+    return request.build_absolute_uri(url) if request else url
+
+
+class DerivadoImagen(serializers.Field):
+    """URL de un solo tamaño de la imagen de `source` (ej. avatar_mini)."""
+
+    def __init__(self, tamano, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+        self.tamano = tamano
+
+    def to_representation(self, archivo):
+        return url_derivado(archivo, self.tamano, self.context.get('request'))
+
+
+class DerivadosImagen(serializers.Field):
+    """
+    Campo de solo lectura {campo: {tamaño: url}} para las imágenes de la
+    instancia. Los listados piden solo ('mini',); el detalle agrega 'medio'
+    y 'original'.
+    """
+
+    def __init__(self, campos, tamanos=('mini',), **kwargs):
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+        self.campos = tuple(campos)
+        self.tamanos = tuple(tamanos)
+
+    def to_representation(self, instancia):
+        request = self.context.get('request')
+        return {
+            campo: {tamano: url_derivado(getattr(instancia, campo), tamano, request) for tamano in self.tamanos}
+            for campo in self.campos
+        }
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Pool
+# ──────────────────────────────────────────────────────────────────────────────
+_ejecutor = None
+_candado = threading.Lock()
+
+
+def _pool(reiniciar=False):
+    global _ejecutor
+    with _candado:
+        if reiniciar and _ejecutor is not None:
+            _ejecutor.shutdown(wait=False)
+            _ejecutor = None
+        if _ejecutor is None:
+            _ejecutor = ProcessPoolExecutor(
+                max_workers=configuracion()['PROCESOS'],
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _ejecutor
+
+
+def tarea(storage, nombre, forzar=False):
+    """
+    (origen absoluto, [(destino absoluto, lado)]) con los derivados que
+    faltan de `nombre` (todos con `forzar`), o None si no hay nada que hacer.
+    """
+    config = configuracion()
+    if not nombre or not storage.exists(nombre):
+        return None
+    destinos = [
+        (storage.path(nombre_derivado(nombre, tamano)), lado)
+        for tamano, lado in config['TAMANOS'].items()
+        if forzar or not storage.exists(nombre_derivado(nombre, tamano))
+    ]
+    return (storage.path(nombre), destinos) if destinos else None
+
+
+def _terminado(nombre, al_terminar, futuro):
+    error = futuro.exception()
+    if error is not None:
+        logger.warning('No se pudieron generar los derivados de %s: %s', nombre, error)
+    elif al_terminar is not None:
+        al_terminar()
+
+
+def encolar(archivos, al_terminar=None):
+    """
+    Envía al pool los derivados que falten de cada (storage, nombre) de
+    `archivos` sin esperar el resultado. `al_terminar` se llama (en un hilo
+    del pool) por cada archivo procesado. Con PROCESOS = 0 se generan en el acto.
+    """
+    config = configuracion()
+    if not config['ACTIVO']:
+        return
+    for storage, nombre in archivos:
+        trabajo = tarea(storage, nombre)
+        if trabajo is None:
+            continue
+        argumentos = (*trabajo, config['FORMATO'], config['CALIDAD'])
+        if config['PROCESOS'] <= 0:
+            try:
+                generar_derivados(*argumentos)
+            except Exception as error:
+                logger.warning('No se pudieron generar los derivados de %s: %s', nombre, error)
+                continue
+            if al_terminar is not None:
+                al_terminar()
+            continue
+        try:
+            futuro = _pool().submit(generar_derivados, *argumentos)
+        except BrokenProcessPool:
+            # Un proceso murió (ej. sin memoria con una imagen enorme): pool nuevo
+            futuro = _pool(reiniciar=True).submit(generar_derivados, *argumentos)
+        futuro.add_done_callback(partial(_terminado, nombre, al_terminar))
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Signals
+# ──────────────────────────────────────────────────────────────────────────────
+def _al_guardar(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    from .cache_respuestas import invalidar_casino
+
+    if raw:
+        return
+    archivos = []
+    for campo in CAMPOS_CON_DERIVADOS[sender._meta.label]:
+        if update_fields is not None and campo not in update_fields:
+            continue
+        actual = getattr(instance, campo)
+        if actual and (created or actual.name != instance.previous(campo)):
+            archivos.append((actual.storage, actual.name))
+    if not archivos:
+        return
+    al_terminar = partial(invalidar_casino, getattr(instance, 'casino_id', None), inmediato=True)
+    transaction.on_commit(partial(encolar, archivos, al_terminar))
+
+
+def conectar_signals():
+    from django.apps import apps
+    from django.db.models.signals import post_save
+
+    for label in CAMPOS_CON_DERIVADOS:
+        post_save.connect(
+            _al_guardar, sender=apps.get_model(label), dispatch_uid=f'derivados_imagen_{label}'
+        )
@@ -0,0 +1,253 @@
+"""
+Exportaciones en streaming (NDJSON / CSV) para reportes de alto volumen.
+
+Los reportes se armaban pidiendo listas completas al API (serializers de DRF
+con todo el rango en memoria). `respuesta_exportacion` responde con un
+StreamingHttpResponse que escribe mientras lee:
+
+  - Las filas se leen con `.values()` (sin instancias ni serializers) en
+    lotes por cursor (fecha, id) ascendente (ver ModelBase/paginacion.py).
+    mysqlclient trae el resultado completo de cada consulta a memoria, así
+    que `iterator(chunk_size)` por sí solo no acota el consumo en MySQL;
+    con lotes de LIMIT n la memoria es constante sin importar el rango.
+  - ?gzip=1 comprime al vuelo; cada lote se vacía con Z_SYNC_FLUSH para que
+    lo recibido antes de un corte se pueda descomprimir.
+  - ?cursor=<id> reanuda después de la fila con ese id (la última recibida
+    completa). Al reanudar un CSV no se repite el encabezado.
+  - Bajo ASGI el cuerpo es un iterador asíncrono: cada lote se lee con
+    sync_to_async y se codifica en el event loop. Con un iterador síncrono
+    Django lo consumiría entero con sync_to_async(list) antes de enviar nada.
+
+Parámetros comunes: formato=ndjson|csv, desde / hasta (YYYY-MM-DD, fecha
+local, ambos incluidos), casino, cursor, gzip.
+"""
+import csv
+import json
+import zlib
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .paginacion import q_keyset
+
+FORMATOS = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+}
+
+
+def _config():
+    config = getattr(settings, 'EXPORTACIONES', {}) or {}
+    return {
+        'LOTE': max(int(config.get('LOTE', 2000)), 1),
+        'NIVEL_GZIP': int(config.get('NIVEL_GZIP', 6)),
+    }
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Lectura por lotes
+# ──────────────────────────────────────────────────────────────────────────────
+def _valores(queryset, columnas):
+    """`.values()` con columnas 'campo' o ('alias', 'ruta__relacion')."""
+    simples = [columna for columna in columnas if isinstance(columna, str)]
+    alias = {columna[0]: F(columna[1]) for columna in columnas if not isinstance(columna, str)}
+    return queryset.values(*simples, **alias)
+
+
+def filas_por_lotes(queryset, columnas, campo_fecha, despues_de=None, lote=None):
+    """
+    Genera las filas (dicts) de `queryset` en orden (campo_fecha, id)
+    ascendente, un lote por consulta. `despues_de` = (fecha, id) de la
+    última fila ya entregada.
+    """
+    lote = lote or _config()['LOTE']
+    columnas = list(columnas)
+    for requerida in ('id', campo_fecha):
+        if requerida not in columnas:
+            columnas.insert(0, requerida)
+    consulta = _valores(queryset, columnas).order_by(campo_fecha, 'id')
+
+    while True:
+        pagina = consulta
+        if despues_de is not None:
+            pagina = consulta.filter(q_keyset(campo_fecha, despues_de[0], despues_de[1], descendente=False))
+        filas = list(pagina[:lote])
+        if not filas:
+            return
+        yield filas
+        if len(filas) < lote:
+            return
+        despues_de = (filas[-1][campo_fecha], filas[-1]['id'])
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Formatos
+# ──────────────────────────────────────────────────────────────────────────────
+def _celda(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, datetime):
+        return timezone.localtime(valor).isoformat() if timezone.is_aware(valor) else valor.isoformat()
+    if isinstance(valor, date):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return str(valor)
+    if isinstance(valor, (dict, list)):
+        return json.dumps(valor, ensure_ascii=False, cls=DjangoJSONEncoder)
+    return valor
+
+
+def _json(valor):
+    # Fechas en hora local, igual que en el CSV; lo demás lo resuelve DjangoJSONEncoder
+    return _celda(valor) if isinstance(valor, datetime) else valor
+
+
+class _Eco:
+    """Pseudo-archivo para csv.writer: devuelve lo escrito en vez de guardarlo."""
+
+    def write(self, valor):
+        return valor
+
+
+class _Codificador:
+    """Convierte cada lote en los bytes del formato pedido, comprimidos con ?gzip=1."""
+
+    def __init__(self, formato, encabezado, nivel_gzip=None):
+        self.formato = formato
+        self.encabezado = encabezado
+        self.escritor = csv.writer(_Eco())
+        # 31 = encabezado gzip
+        self.compresor = zlib.compressobj(nivel_gzip, zlib.DEFLATED, 31) if nivel_gzip is not None else None
+
+    def _ndjson(self, filas):
+        return ''.join(
+            json.dumps({clave: _json(valor) for clave, valor in fila.items()}, ensure_ascii=False, cls=DjangoJSONEncoder)
+            + '\n'
+            for fila in filas
+        )
+
+    def _csv(self, filas):
+        partes = []
+        if self.encabezado:
+            partes.append(self.escritor.writerow(list(filas[0].keys())))
+            self.encabezado = False
+        partes.extend(self.escritor.writerow([_celda(valor) for valor in fila.values()]) for fila in filas)
+        return ''.join(partes)
+
+    def lote(self, filas):
+        bloque = (self._ndjson(filas) if self.formato == 'ndjson' else self._csv(filas)).encode('utf-8')
+        if self.compresor is None:
+            return bloque
+        return self.compresor.compress(bloque) + self.compresor.flush(zlib.Z_SYNC_FLUSH)
+
+    def fin(self):
+        return self.compresor.flush() if self.compresor is not None else b''
+
+
+def _cuerpo(lotes, codificador):
+    for filas in lotes:
+        bloque = codificador.lote(filas)
+        if bloque:
+            yield bloque
+    final = codificador.fin()
+    if final:
+        yield final
+
+
+async def _cuerpo_async(lotes, codificador):
+    # thread_sensitive: todas las consultas del generador en el mismo hilo (y conexión)
+    siguiente = sync_to_async(next, thread_sensitive=True)
+    while (filas := await siguiente(lotes, None)) is not None:
+        bloque = codificador.lote(filas)
+        if bloque:
+            yield bloque
+    final = codificador.fin()
+    if final:
+        yield final
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Respuesta
+# ──────────────────────────────────────────────────────────────────────────────
+def _error(mensaje):
+    return Response({'error': mensaje}, status=status.HTTP_400_BAD_REQUEST)
+
+
+def _dia(valor):
+    try:
+        return datetime.strptime(valor, '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+
+def respuesta_exportacion(request, queryset, columnas, campo_fecha, campo_casino, nombre):
+    """
+    Aplica los parámetros comunes de exportación sobre `queryset` (ya filtrado
+    por la vista) y responde en streaming. `campo_casino` es la ruta al
+    casino desde el modelo (ej. 'maquina__casino').
+    """
+    params = request.query_params
+    formato = params.get('formato', 'ndjson').lower()
+    if formato not in FORMATOS:
+        return _error(f"Formato inválido. Opciones: {', '.join(FORMATOS)}")
+
+    desde = hasta = None
+    if params.get('desde'):
+        desde = _dia(params['desde'])
+        if desde is None:
+            return _error('Formato de fecha inválido en desde (YYYY-MM-DD)')
+        queryset = queryset.filter(**{
+            f'{campo_fecha}__gte': timezone.make_aware(datetime.combine(desde, time.min)),
+        })
+    if params.get('hasta'):
+        hasta = _dia(params['hasta'])
+        if hasta is None:
+            return _error('Formato de fecha inválido en hasta (YYYY-MM-DD)')
+        queryset = queryset.filter(**{
+            f'{campo_fecha}__lt': timezone.make_aware(datetime.combine(hasta + timedelta(days=1), time.min)),
+        })
+
+    casino_id = params.get('casino')
+    if casino_id:
+        if not casino_id.isdigit():
+            return _error('El parámetro casino debe ser numérico')
+        queryset = queryset.filter(**{f'{campo_casino}_id': casino_id})
+
+    despues_de = None
+    cursor = params.get('cursor')
+    if cursor:
+        fecha = queryset.model.objects.filter(pk=cursor).values_list(campo_fecha, flat=True).first() \
+            if cursor.isdigit() else None
+        if fecha is None:
+            return _error('Cursor inválido: use el id de la última fila recibida')
+        despues_de = (fecha, int(cursor))
+
+    content_type, extension = FORMATOS[formato]
+    archivo = f"{nombre}_{desde or 'inicio'}_{hasta or timezone.localdate()}.{extension}"
+    nivel_gzip = None
+    if params.get('gzip') in ('1', 'true'):
+        nivel_gzip = _config()['NIVEL_GZIP']
+        content_type, archivo = 'application/gzip', f'{archivo}.gz'
+
+    lotes = filas_por_lotes(queryset, columnas, campo_fecha, despues_de)
+    codificador = _Codificador(formato, encabezado=despues_de is None, nivel_gzip=nivel_gzip)
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        cuerpo = _cuerpo_async(lotes, codificador)
+    else:
+        cuerpo = _cuerpo(lotes, codificador)
+
+    response = StreamingHttpResponse(cuerpo, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{archivo}"'
+    response['Cache-Control'] = 'no-cache'
+    # Evita que nginx retenga el flujo en su buffer
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,63 @@
+"""
+Procesamiento de imágenes con Pillow para los derivados (ver ModelBase/derivados.py).
+
+Este módulo no importa Django: sus funciones corren en los procesos del pool
+(contexto 'spawn'), que solo reciben rutas absolutas y escriben archivos.
+"""
+import os
+
+from PIL import Image, ImageOps, features
+
+# Formato de Pillow → extensión del derivado
+EXTENSIONES = {'WEBP': '.webp', 'JPEG': '.jpg'}
+
+
+def formato_disponible(formato):
+    """`formato` si Pillow puede escribirlo; si no, JPEG."""
+    if formato == 'WEBP' and not features.check('webp'):
+        return 'JPEG'
+    return formato if formato in EXTENSIONES else 'JPEG'
+
+
+def _preparar(imagen, formato):
+    """Modo de color que acepta `formato` (JPEG no tiene transparencia)."""
+    if formato == 'JPEG':
+        if imagen.mode in ('RGBA', 'LA') or (imagen.mode == 'P' and 'transparency' in imagen.info):
+            fondo = Image.new('RGB', imagen.size, (255, 255, 255))
+            fondo.paste(imagen.convert('RGBA'), mask=imagen.convert('RGBA').getchannel('A'))
+            return fondo
+        return imagen.convert('RGB') if imagen.mode != 'RGB' else imagen
+    if imagen.mode not in ('RGB', 'RGBA'):
+        return imagen.convert('RGBA' if 'transparency' in imagen.info or imagen.mode in ('LA', 'PA') else 'RGB')
+    return imagen
+
+
+def generar_derivados(origen, destinos, formato, calidad):
+    """
+    Genera desde la imagen `origen` cada derivado de `destinos`
+    ([(ruta absoluta, lado máximo en px)]): orientación aplicada desde EXIF,
+    sin metadatos (no se copia EXIF, ICC ni XMP), reducida sin agrandar y
+    recomprimida en `formato` con `calidad`. Cada derivado se escribe a un
+    temporal y se renombra. Retorna los bytes escritos.
+    """
+    escritos = 0
+    with Image.open(origen) as imagen:
+        # JPEG puede decodificar directamente a 1/2, 1/4 u 1/8 de resolución
+        lado_mayor = max(lado for _, lado in destinos)
+        imagen.draft('RGB', (lado_mayor, lado_mayor))
+        normalizada = _preparar(ImageOps.exif_transpose(imagen), formato)
+
+        for destino, lado in sorted(destinos, key=lambda par: -par[1]):
+            copia = normalizada.copy()
+            copia.thumbnail((lado, lado), Image.Resampling.LANCZOS)
+            temporal = f'{destino}.{os.getpid()}.tmp'
+            opciones = {'quality': calidad}
+            if formato == 'JPEG':
+                opciones.update(optimize=True, progressive=True)
+            else:
+                opciones.update(method=4)
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            copia.save(temporal, format=formato, **opciones)
+            os.replace(temporal, destino)
+            escritos += os.path.getsize(destino)
+    return escritos
@@ -0,0 +1,92 @@
+"""
+Management Command: benchmark_cambios_save
+==========================================
+Verifica que guardar un Ticket, una TareaEspecial o una
+IncidenciaInfraestructura ya no vuelve a consultar su propia fila antes del
+UPDATE. Antes, cada receptor pre_save (auditoría, tickets, notificaciones,
+gamificación) hacía su propio `objects.get(pk=...)`: hasta 4 SELECTs de la
+misma fila por save. Con el seguimiento de cambios de ModeloBase el estado
+anterior sale de la foto tomada al cargar la instancia.
+
+Cada save corre dentro de una transacción que se revierte al final, por lo
+que el comando no deja cambios en la BD (ni logs de auditoría).
+
+Uso:
+    python manage.py benchmark_cambios_save
+    python manage.py benchmark_cambios_save --iteraciones 50
+"""
+import re
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from IncidenciasInfraestructura.models import IncidenciaInfraestructura
+from TareasEspeciales.models import TareaEspecial
+from Tickets.models import Ticket
+
+
+MODELOS = (Ticket, TareaEspecial, IncidenciaInfraestructura)
+
+
+def _es_reselect(sql, tabla, pk):
+    """True si `sql` es un SELECT de la misma fila que se está guardando."""
+    if not sql.lstrip().upper().startswith('SELECT'):
+        return False
+    patron = rf'FROM [`"]?{re.escape(tabla)}[`"]?\s+WHERE .*[`"]?{re.escape(tabla)}[`"]?\.[`"]?id[`"]?\s*=\s*{pk}\b'
+    return re.search(patron, sql, re.IGNORECASE) is not None
+
+
+class Command(BaseCommand):
+    help = 'Cuenta re-SELECTs de la propia fila al guardar Ticket / TareaEspecial / IncidenciaInfraestructura'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iteraciones', type=int, default=20, help='Saves por modelo.')
+
+    def _medir(self, modelo, iteraciones):
+        instancia = modelo.objects.filter(esta_activo=True).order_by('-id').first()
+        if instancia is None:
+            return None
+
+        tabla = modelo._meta.db_table
+        reselects = 0
+        total = 0
+        inicio = time.perf_counter()
+        with transaction.atomic():
+            for i in range(iteraciones):
+                instancia.notas_internas = f'benchmark_cambios_save #{i}'
+                with CaptureQueriesContext(connection) as ctx:
+                    instancia.save()
+                total += len(ctx.captured_queries)
+                reselects += sum(
+                    1 for query in ctx.captured_queries if _es_reselect(query['sql'], tabla, instancia.pk)
+                )
+            transaction.set_rollback(True)
+        duracion = time.perf_counter() - inicio
+        return {
+            'reselects': reselects / iteraciones,
+            'consultas': total / iteraciones,
+            'ms': duracion / iteraciones * 1000,
+        }
+
+    def handle(self, *args, **options):
+        iteraciones = max(options['iteraciones'], 1)
+        fallas = []
+
+        for modelo in MODELOS:
+            nombre = modelo.__name__
+            resultado = self._medir(modelo, iteraciones)
+            if resultado is None:
+                self.stdout.write(self.style.WARNING(f'  {nombre:<28} → sin registros, se omite'))
+                continue
+            self.stdout.write(
+                f"  {nombre:<28} → re-SELECTs por save: {resultado['reselects']:.2f} | "
+                f"consultas por save: {resultado['consultas']:.2f} | {resultado['ms']:.2f} ms"
+            )
+            if resultado['reselects']:
+                fallas.append(nombre)
+
+        if fallas:
+            raise CommandError(f"Se detectaron re-SELECTs de la misma fila en: {', '.join(fallas)}")
+        self.stdout.write(self.style.SUCCESS('✅ Ningún save vuelve a consultar su propia fila.'))
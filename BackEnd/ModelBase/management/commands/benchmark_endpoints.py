@@ -0,0 +1,216 @@
+"""
+Management Command: benchmark_endpoints
+=======================================
+Corre en proceso (APIClient, sin servidor ni servicios externos) los
+endpoints clave contra la BD local y reporta por endpoint:
+
+  - latencia p50 / p95 / p99 / media de las repeticiones (la primera
+    llamada, en frío, se reporta aparte porque llena las cachés),
+  - consultas SQL y tiempo en BD (ModelBase/consultas.py),
+  - memoria pico de Python de una llamada extra medida con tracemalloc
+    (fuera de las repeticiones cronometradas para no sesgarlas),
+  - bytes de la respuesta.
+
+La salida es JSON para comparar corridas. Pensado para el dataset de
+`seed_nexus_perfecto --scale N`, pero sirve con cualquier BD.
+
+Uso:
+    python manage.py benchmark_endpoints
+    python manage.py benchmark_endpoints --casino 12 --repeticiones 50 --salida antes.json
+    python manage.py benchmark_endpoints --salida despues.json --comparar antes.json
+"""
+import json
+import math
+import statistics
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ModelBase.consultas import medir
+
+PREFIJO_ESCALA = 'escala-'
+
+
+def _endpoints(casino):
+    """(nombre, url) de los endpoints medidos."""
+    return [
+        ('dashboard_charts', f'/api/tickets/dashboard-charts/{casino.pk}/?filtro_tipo=mes'),
+        ('mapa_completo', f'/api/maquinas/mapa-completo/?casino_id={casino.pk}'),
+        ('count_no_leidas', '/api/notificaciones/count-no-leidas/'),
+        ('global_search', f'/api/usuarios/global-search/?q=buffalo&casino={casino.pk}'),
+        ('salon_fama', '/api/gamificacion/salon-fama/'),
+    ]
+
+
+def _percentil(valores, percentil):
+    """Percentil por rango más cercano sobre valores ordenados."""
+    ordenados = sorted(valores)
+    indice = max(math.ceil(percentil / 100 * len(ordenados)) - 1, 0)
+    return ordenados[indice]
+
+
+class Command(BaseCommand):
+    help = 'Mide latencia, consultas y memoria de los endpoints clave y emite JSON comparable'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--casino', type=int, help='ID del casino (por defecto el primer casino de escala).')
+        parser.add_argument('--usuario', help='Username con el que se autentican las peticiones.')
+        parser.add_argument('--repeticiones', type=int, default=30, help='Llamadas cronometradas por endpoint.')
+        parser.add_argument('--endpoint', action='append', help='Solo estos endpoints (repetible).')
+        parser.add_argument('--salida', help='Archivo JSON de resultados (por defecto a stdout).')
+        parser.add_argument('--comparar', help='JSON de una corrida anterior para imprimir la diferencia de p50/p95.')
+
+    def _casino(self, casino_id):
+        from Casinos.models import Casino
+
+        if casino_id:
+            casino = Casino.objects.filter(pk=casino_id).first()
+        else:
+            casino = (
+                Casino.objects.filter(nombre__startswith=PREFIJO_ESCALA, esta_activo=True).order_by('nombre').first()
+                or Casino.objects.filter(esta_activo=True).order_by('pk').first()
+            )
+        if casino is None:
+            raise CommandError('No hay casino para medir (use --casino o siembre con --scale).')
+        return casino
+
+    def _usuario(self, casino, username):
+        from Usuarios.models import Usuarios
+
+        usuarios = Usuarios.objects.filter(esta_activo=True).select_related('rol', 'casino')
+        if username:
+            usuarios = usuarios.filter(username=username)
+        else:
+            usuarios = usuarios.filter(casino=casino)
+        usuario = usuarios.order_by('-rol__nivel_jerarquia', 'pk').first()
+        if usuario is None:
+            raise CommandError('No hay un usuario activo para autenticar las peticiones.')
+        return usuario
+
+    def _llamar(self, cliente, url):
+        respuesta = cliente.get(url)
+        contenido = b''.join(respuesta) if respuesta.streaming else respuesta.content
+        return respuesta.status_code, len(contenido)
+
+    def _medir(self, cliente, url, repeticiones):
+        inicio = time.perf_counter()
+        with medir() as frio:
+            status, tamano = self._llamar(cliente, url)
+        frio_ms = (time.perf_counter() - inicio) * 1000
+
+        latencias, consultas, tiempo_bd = [], [], []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            with medir() as medicion:
+                self._llamar(cliente, url)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+            consultas.append(medicion.total)
+            tiempo_bd.append(medicion.tiempo * 1000)
+
+        tracemalloc.start()
+        try:
+            self._llamar(cliente, url)
+            _, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return {
+            'url': url,
+            'status': status,
+            'bytes': tamano,
+            'frio_ms': round(frio_ms, 2),
+            'frio_consultas': frio.total,
+            'p50_ms': round(_percentil(latencias, 50), 2),
+            'p95_ms': round(_percentil(latencias, 95), 2),
+            'p99_ms': round(_percentil(latencias, 99), 2),
+            'media_ms': round(statistics.fmean(latencias), 2),
+            'consultas': round(statistics.median(consultas)),
+            'bd_ms_p50': round(statistics.median(tiempo_bd), 2),
+            'memoria_pico_kb': round(pico / 1024, 1),
+        }
+
+    def _dataset(self):
+        from AuditoriaGlobal.models import LogAuditoria
+        from BitacoraTecnica.models import BitacoraTecnica
+        from Casinos.models import Casino
+        from Maquinas.models import Maquina
+        from Notificaciones.models import Notificacion
+        from Tickets.models import Ticket
+        from Usuarios.models import Usuarios
+
+        modelos = {
+            'casinos': Casino, 'maquinas': Maquina, 'usuarios': Usuarios, 'tickets': Ticket,
+            'bitacoras': BitacoraTecnica, 'notificaciones': Notificacion, 'auditoria': LogAuditoria,
+        }
+        return {nombre: modelo.objects.count() for nombre, modelo in modelos.items()}
+
+    def handle(self, *args, **options):
+        casino = self._casino(options['casino'])
+        usuario = self._usuario(casino, options['usuario'])
+        repeticiones = max(options['repeticiones'], 1)
+        endpoints = _endpoints(casino)
+        if options['endpoint']:
+            desconocidos = set(options['endpoint']) - {nombre for nombre, _ in endpoints}
+            if desconocidos:
+                raise CommandError(f'Endpoints desconocidos: {", ".join(sorted(desconocidos))}')
+            endpoints = [(nombre, url) for nombre, url in endpoints if nombre in options['endpoint']]
+
+        cliente = APIClient()
+        cliente.force_authenticate(user=usuario)
+
+        self.stderr.write(f'\n📅 {casino.nombre} como {usuario.username}, {repeticiones} repeticiones')
+        self.stderr.write(f'  {"Endpoint":<18} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"SQL":>5} {"pico KB":>9}')
+        self.stderr.write(f'  ──────────────────────────────────────────────────────────────')
+        resultados = {}
+        for nombre, url in endpoints:
+            resultado = self._medir(cliente, url, repeticiones)
+            resultados[nombre] = resultado
+            aviso = '' if resultado['status'] < 400 else f'  ⚠️ HTTP {resultado["status"]}'
+            self.stderr.write(
+                f'  {nombre:<18} {resultado["p50_ms"]:>9.1f} {resultado["p95_ms"]:>9.1f} '
+                f'{resultado["p99_ms"]:>9.1f} {resultado["consultas"]:>5} {resultado["memoria_pico_kb"]:>9.1f}{aviso}'
+            )
+
+        reporte = {
+            'fecha': timezone.now().isoformat(),
+            'base_de_datos': connection.vendor,
+            'casino': {'id': casino.pk, 'nombre': casino.nombre},
+            'usuario': usuario.username,
+            'repeticiones': repeticiones,
+            'dataset': self._dataset(),
+            'endpoints': resultados,
+        }
+        texto = json.dumps(reporte, ensure_ascii=False, indent=2)
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as destino:
+                destino.write(texto + '\n')
+            self.stderr.write(self.style.SUCCESS(f'\n  ✅ Resultados en {options["salida"]}'))
+        else:
+            self.stdout.write(texto)
+
+        if options['comparar']:
+            self._comparar(options['comparar'], resultados)
+
+    def _comparar(self, archivo, resultados):
+        try:
+            with open(archivo, encoding='utf-8') as fuente:
+                anteriores = json.load(fuente)['endpoints']
+        except (OSError, ValueError, KeyError) as error:
+            raise CommandError(f'No se pudo leer {archivo}: {error}')
+
+        self.stderr.write(f'\n  {"Endpoint":<18} {"p50 antes":>10} {"ahora":>9} {"Δ%":>7}   {"p95 antes":>10} {"ahora":>9} {"Δ%":>7}')
+        self.stderr.write(f'  ─────────────────────────────────────────────────────────────────────────────')
+        for nombre, actual in resultados.items():
+            previo = anteriores.get(nombre)
+            if not previo:
+                continue
+            columnas = []
+            for clave in ('p50_ms', 'p95_ms'):
+                antes, ahora = previo[clave], actual[clave]
+                delta = (ahora - antes) / antes * 100 if antes else 0.0
+                columnas.append(f'{antes:>10.1f} {ahora:>9.1f} {delta:>+6.1f}%')
+            self.stderr.write(f'  {nombre:<18} ' + '   '.join(columnas))
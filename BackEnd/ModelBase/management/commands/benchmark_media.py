@@ -0,0 +1,145 @@
+"""
+Management Command: benchmark_media
+===================================
+Compara el costo en el worker de entregar archivos de MEDIA_ROOT con cada
+modo de SERVICIO_MEDIA (ModelBase/media.py), en proceso y sin servidor web:
+
+  - django         FileResponse completo, bytes leídos y enviados por Python,
+  - django-rango   206 de un Range de RANGO_KB (ej. una página de un PDF),
+  - django-304     revalidación con If-None-Match (no abre el archivo),
+  - x-accel        solo cabeceras; nginx enviaría los bytes,
+  - x-sendfile     solo cabeceras; Apache/lighttpd enviarían los bytes.
+
+Por modo reporta p50 de tiempo real y de CPU por petición y ms de worker por
+MB entregado. En los modos delegados el MB lo entrega el servidor web, así
+que la cifra es el costo de worker por MB que el cliente recibe.
+
+Por defecto mide los archivos más grandes de MEDIA_ROOT (PDFs e imágenes).
+
+Uso:
+    python manage.py benchmark_media
+    python manage.py benchmark_media --archivo contenido/ab/cd/<sha256>.pdf --repeticiones 50
+    python manage.py benchmark_media --salida media.json
+"""
+import json
+import os
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from django.utils import timezone
+
+from ModelBase.almacen_contenido import almacen, archivos_bajo, legible
+from ModelBase.media import configuracion, etag_de, respuesta_media
+
+EXTENSIONES_MEDIDAS = ('.pdf', '.jpg', '.jpeg', '.png', '.webp')
+RANGO_KB = 256
+
+# (nombre, modo de SERVICIO_MEDIA, cabeceras extra)
+ESCENARIOS = (
+    ('django', 'django', {}),
+    ('django-rango', 'django', {'HTTP_RANGE': f'bytes=0-{RANGO_KB * 1024 - 1}'}),
+    ('django-304', 'django', 'etag'),
+    ('x-accel', 'x-accel', {}),
+    ('x-sendfile', 'x-sendfile', {}),
+)
+
+
+def _consumir(respuesta):
+    """Bytes que el worker envía realmente (0 en los modos delegados)."""
+    if respuesta.streaming:
+        total = sum(len(trozo) for trozo in respuesta.streaming_content)
+    else:
+        total = len(respuesta.content)
+    respuesta.close()
+    return total
+
+
+class Command(BaseCommand):
+    help = 'Mide el tiempo de worker por MB al servir media con cada modo de entrega'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--archivo', action='append', help='Nombre relativo a MEDIA_ROOT (repetible).')
+        parser.add_argument('--cantidad', type=int, default=5, help='Archivos más grandes a medir si no hay --archivo.')
+        parser.add_argument('--repeticiones', type=int, default=20, help='Peticiones cronometradas por archivo y modo.')
+        parser.add_argument('--salida', help='Archivo JSON de resultados (por defecto a stdout).')
+
+    def _archivos(self, nombres, cantidad):
+        if nombres:
+            faltantes = [nombre for nombre in nombres if not almacen.exists(nombre)]
+            if faltantes:
+                raise CommandError(f'No existen en MEDIA_ROOT: {", ".join(faltantes)}')
+            return nombres
+        candidatos = [
+            (almacen.size(nombre), nombre) for nombre in archivos_bajo(almacen, '')
+            if nombre.lower().endswith(EXTENSIONES_MEDIDAS)
+        ]
+        if not candidatos:
+            raise CommandError('No hay PDFs ni imágenes en MEDIA_ROOT (use --archivo).')
+        return [nombre for _, nombre in sorted(candidatos, reverse=True)[:max(cantidad, 1)]]
+
+    def _medir(self, fabrica, nombre, modo, cabeceras, repeticiones):
+        url = almacen.url(nombre)
+        if cabeceras == 'etag':
+            cabeceras = {'HTTP_IF_NONE_MATCH': etag_de(nombre, os.stat(almacen.path(nombre)))}
+        reales, cpu, status, enviados = [], [], None, 0
+        for _ in range(repeticiones):
+            request = fabrica.get(url, **cabeceras)
+            inicio_real, inicio_cpu = time.perf_counter(), time.process_time()
+            respuesta = respuesta_media(request, nombre, modo)
+            enviados = _consumir(respuesta)
+            cpu.append((time.process_time() - inicio_cpu) * 1000)
+            reales.append((time.perf_counter() - inicio_real) * 1000)
+            status = respuesta.status_code
+
+        # MB que recibe el cliente: lo enviado por el worker, o el archivo si lo envía el servidor web
+        entregados = enviados if modo == 'django' else almacen.size(nombre)
+        megas = entregados / (1024 * 1024)
+        p50 = statistics.median(reales)
+        return {
+            'status': status,
+            'bytes_worker': enviados,
+            'bytes_cliente': entregados,
+            'p50_ms': round(p50, 3),
+            'cpu_p50_ms': round(statistics.median(cpu), 3),
+            'ms_por_mb': round(p50 / megas, 3) if megas else None,
+        }
+
+    def handle(self, *args, **options):
+        repeticiones = max(options['repeticiones'], 1)
+        nombres = self._archivos(options['archivo'], options['cantidad'])
+        fabrica = RequestFactory()
+
+        self.stderr.write(
+            f'\n📅 {len(nombres)} archivos, {repeticiones} repeticiones (MODO configurado: {configuracion()["MODO"]})'
+        )
+        self.stderr.write(f'  {"Archivo / modo":<44} {"HTTP":>5} {"p50 ms":>9} {"CPU ms":>9} {"ms/MB":>9}')
+        self.stderr.write(f'  ──────────────────────────────────────────────────────────────────────────────')
+        resultados = {}
+        for nombre in nombres:
+            resultados[nombre] = {'bytes': almacen.size(nombre)}
+            self.stderr.write(f'  {os.path.basename(nombre)[:44]:<44} ({legible(almacen.size(nombre))})')
+            for escenario, modo, cabeceras in ESCENARIOS:
+                resultado = self._medir(fabrica, nombre, modo, cabeceras, repeticiones)
+                resultados[nombre][escenario] = resultado
+                por_mb = f'{resultado["ms_por_mb"]:>9.3f}' if resultado['ms_por_mb'] is not None else f'{"—":>9}'
+                self.stderr.write(
+                    f'    {escenario:<42} {resultado["status"]:>5} {resultado["p50_ms"]:>9.3f} '
+                    f'{resultado["cpu_p50_ms"]:>9.3f} {por_mb}'
+                )
+
+        reporte = {
+            'fecha': timezone.now().isoformat(),
+            'modo_configurado': configuracion()['MODO'],
+            'repeticiones': repeticiones,
+            'rango_kb': RANGO_KB,
+            'archivos': resultados,
+        }
+        texto = json.dumps(reporte, ensure_ascii=False, indent=2)
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as destino:
+                destino.write(texto + '\n')
+            self.stderr.write(self.style.SUCCESS(f'\n  ✅ Resultados en {options["salida"]}'))
+        else:
+            self.stdout.write(texto)
@@ -0,0 +1,124 @@
+"""
+Management Command: deduplicar_media
+====================================
+Migra al almacén por contenido (ModelBase/almacen_contenido.py) los archivos
+que las filas todavía referencian con su nombre original
+(vacios/evidencias/..., wiki_tecnica/pdfs/..., usuarios/avatars/...):
+
+  1. Por cada campo que usa el almacén calcula el SHA-256 de cada archivo
+     referenciado y lo copia a su blob, una sola vez por contenido.
+  2. Apunta las filas a su blob con `queryset.update()` en una transacción.
+  3. Confirmada la transacción, borra los originales migrados y, con
+     --huerfanos, los archivos de DIRECTORIOS_ORIGEN que ninguna fila
+     referencia (las copias con sufijo aleatorio de subidas repetidas).
+  4. Recuenta las referencias de todos los blobs.
+
+Reporta el espacio ocupado antes y después y el recuperado. Es idempotente:
+las filas que ya apuntan a un blob se saltan.
+
+Uso:
+    python manage.py deduplicar_media --dry-run
+    python manage.py deduplicar_media --huerfanos
+"""
+from collections import defaultdict
+
+from django.core.files.storage import FileSystemStorage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ModelBase.almacen_contenido import (
+    almacen, archivos_bajo, calcular_digest, campos_con_almacen, es_blob, extension_de,
+    legible, recontar_referencias, ruta_blob,
+)
+
+# Directorios donde `upload_to` dejaba los archivos antes del almacén
+DIRECTORIOS_ORIGEN = ('vacios/evidencias', 'wiki_tecnica/pdfs', 'usuarios/avatars')
+
+
+class Command(BaseCommand):
+    help = 'Migra los archivos existentes al almacén por contenido y reporta el espacio recuperado'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Solo calcula; no copia, actualiza ni borra.')
+        parser.add_argument(
+            '--huerfanos', action='store_true',
+            help='Borra también los archivos de los directorios de origen que ninguna fila referencia.',
+        )
+
+    def _blob(self, origen, nombre, simular, nuevos):
+        """Nombre del blob para el archivo `nombre`; lo escribe si aún no existe."""
+        with origen.open(nombre, 'rb') as archivo:
+            digest, tamano = calcular_digest(archivo)
+            destino = ruta_blob(digest, extension_de(nombre))
+            if destino not in nuevos and not almacen.exists(destino):
+                nuevos[destino] = tamano
+                if not simular:
+                    almacen.save(nombre, archivo)
+        return destino, tamano
+
+    def handle(self, *args, **options):
+        simular = options['dry_run']
+        origen = FileSystemStorage()
+        migrados = {}                       # nombre original → (blob, tamaño)
+        nuevos = {}                         # blob escrito → tamaño
+        pendientes = defaultdict(list)      # (modelo, attname, blob) → [pk, ...]
+        referenciados = set()               # nombres originales que siguen en filas
+        faltantes = []
+
+        self.stdout.write(f'\n📅 Deduplicando media{" (simulación)" if simular else ""}\n')
+        self.stdout.write(f'  {"Campo":<48} {"filas":>7} {"blobs":>7}')
+        self.stdout.write(f'  ──────────────────────────────────────────────────────────────')
+        for modelo, campos in campos_con_almacen():
+            for campo in campos:
+                filas = (
+                    modelo._base_manager.exclude(**{campo.attname: ''})
+                    .filter(**{f'{campo.attname}__isnull': False})
+                    .values_list('pk', campo.attname).order_by('pk')
+                )
+                cantidad, blobs_campo = 0, set()
+                for pk, nombre in filas.iterator():
+                    if es_blob(nombre):
+                        continue
+                    if nombre not in migrados:
+                        if not origen.exists(nombre):
+                            faltantes.append(f'{modelo._meta.label}.{campo.name} #{pk}: {nombre}')
+                            referenciados.add(nombre)
+                            continue
+                        migrados[nombre] = self._blob(origen, nombre, simular, nuevos)
+                    destino = migrados[nombre][0]
+                    pendientes[(modelo, campo.attname, destino)].append(pk)
+                    blobs_campo.add(destino)
+                    cantidad += 1
+                self.stdout.write(f'  {modelo._meta.label + "." + campo.name:<48} {cantidad:>7} {len(blobs_campo):>7}')
+
+        huerfanos = {}
+        if options['huerfanos']:
+            for directorio in DIRECTORIOS_ORIGEN:
+                for nombre in archivos_bajo(origen, directorio):
+                    if nombre not in migrados and nombre not in referenciados:
+                        huerfanos[nombre] = origen.size(nombre)
+
+        if not simular:
+            with transaction.atomic():
+                for (modelo, attname, destino), pks in pendientes.items():
+                    modelo._base_manager.filter(pk__in=pks).update(**{attname: destino})
+            for nombre in [*migrados, *huerfanos]:
+                origen.delete(nombre)
+            recontar_referencias()
+
+        bytes_origen = sum(tamano for _, tamano in migrados.values())
+        bytes_huerfanos = sum(huerfanos.values())
+        bytes_nuevos = sum(nuevos.values())
+        recuperado = bytes_origen + bytes_huerfanos - bytes_nuevos
+
+        self.stdout.write(f'  ──────────────────────────────────────────────────────────────')
+        self.stdout.write(f'  Originales migrados: {len(migrados):>6}  ({legible(bytes_origen)})')
+        if options['huerfanos']:
+            self.stdout.write(f'  Huérfanos borrados:  {len(huerfanos):>6}  ({legible(bytes_huerfanos)})')
+        self.stdout.write(f'  Blobs nuevos:        {len(nuevos):>6}  ({legible(bytes_nuevos)})')
+        self.stdout.write(f'  Filas actualizadas:  {sum(len(pks) for pks in pendientes.values()):>6}')
+        for faltante in faltantes:
+            self.stdout.write(self.style.WARNING(f'  ⚠️  Archivo inexistente: {faltante}'))
+
+        verbo = 'Se recuperarían' if simular else 'Recuperados'
+        self.stdout.write(self.style.SUCCESS(f'\n✅ {verbo} {legible(recuperado)} en disco.'))
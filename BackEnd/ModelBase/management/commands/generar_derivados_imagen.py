@@ -0,0 +1,117 @@
+"""
+Management Command: generar_derivados_imagen
+============================================
+Genera la miniatura y el tamaño medio (ModelBase/derivados.py) de las
+imágenes que ya existían antes del pipeline o cuyos derivados faltan:
+fotos de evidencia de vacíos y avatares. Cada archivo distinto se procesa
+una sola vez aunque lo referencien varias filas. El trabajo se reparte en
+un pool de procesos propio y el comando espera a que termine. Al final
+invalida el caché de respuestas, que pudo guardar listados sin miniaturas.
+
+Con --forzar regenera también los derivados existentes (ej. tras cambiar
+TAMANOS, FORMATO o CALIDAD en DERIVADOS_IMAGEN).
+
+Uso:
+    python manage.py generar_derivados_imagen
+    python manage.py generar_derivados_imagen --modelo VaciosTickets.TicketVacio --procesos 4
+    python manage.py generar_derivados_imagen --forzar
+"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from ModelBase.almacen_contenido import legible
+from ModelBase.cache_respuestas import invalidar_global
+from ModelBase.derivados import CAMPOS_CON_DERIVADOS, configuracion, tarea
+from ModelBase.imagenes import generar_derivados
+
+
+class Command(BaseCommand):
+    help = 'Genera los derivados de imagen (miniatura, tamaño medio) de los archivos existentes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--modelo', action='append', choices=sorted(CAMPOS_CON_DERIVADOS),
+            help='Modelo a procesar (repetible). Por defecto todos.',
+        )
+        parser.add_argument('--procesos', type=int, help='Procesos del pool (por defecto los núcleos disponibles).')
+        parser.add_argument('--forzar', action='store_true', help='Regenera también los derivados que ya existen.')
+
+    def _archivos(self, modelos):
+        """{nombre: storage} de los archivos distintos referenciados por los campos."""
+        archivos = {}
+        for label in modelos:
+            modelo = apps.get_model(label)
+            for campo in CAMPOS_CON_DERIVADOS[label]:
+                storage = modelo._meta.get_field(campo).storage
+                nombres = (
+                    modelo._base_manager.exclude(**{campo: ''}).filter(**{f'{campo}__isnull': False})
+                    .values_list(campo, flat=True).order_by().distinct()
+                )
+                for nombre in nombres.iterator():
+                    archivos.setdefault(nombre, storage)
+        return archivos
+
+    def handle(self, *args, **options):
+        config = configuracion()
+        procesos = options['procesos'] or os.cpu_count() or 1
+        if procesos < 1:
+            raise CommandError('--procesos debe ser mayor que cero.')
+        modelos = options['modelo'] or list(CAMPOS_CON_DERIVADOS)
+
+        archivos = self._archivos(modelos)
+        trabajos, faltantes = {}, 0
+        for nombre, storage in archivos.items():
+            if not storage.exists(nombre):
+                faltantes += 1
+                continue
+            trabajo = tarea(storage, nombre, forzar=options['forzar'])
+            if trabajo is not None:
+                trabajos[nombre] = trabajo
+
+        self.stdout.write(
+            f'\n📅 Derivados {", ".join(f"{t} {l}px" for t, l in config["TAMANOS"].items())} '
+            f'en {config["FORMATO"]} q{config["CALIDAD"]}: {len(archivos)} archivos, '
+            f'{len(trabajos)} por procesar, {procesos} procesos\n'
+        )
+        inicio = time.perf_counter()
+        generados, errores, bytes_originales, bytes_derivados = 0, [], 0, 0
+        with ProcessPoolExecutor(max_workers=procesos, mp_context=multiprocessing.get_context('spawn')) as pool:
+            futuros = {
+                pool.submit(generar_derivados, origen, destinos, config['FORMATO'], config['CALIDAD']): (nombre, origen)
+                for nombre, (origen, destinos) in trabajos.items()
+            }
+            for indice, futuro in enumerate(as_completed(futuros), start=1):
+                nombre, origen = futuros[futuro]
+                try:
+                    bytes_derivados += futuro.result()
+                except Exception as error:
+                    errores.append(f'{nombre}: {error}')
+                else:
+                    generados += 1
+                    bytes_originales += os.path.getsize(origen)
+                if indice % 100 == 0:
+                    self.stdout.write(f'  {indice}/{len(futuros)} procesados')
+
+        if generados:
+            # Las respuestas cacheadas se sirvieron con esos derivados en None
+            invalidar_global()
+
+        self.stdout.write(f'  ─────────────────────────────────────────')
+        self.stdout.write(f'  Archivos con derivados nuevos: {generados:>6}')
+        self.stdout.write(f'  Originales procesados:         {legible(bytes_originales):>10}')
+        self.stdout.write(f'  Derivados escritos:            {legible(bytes_derivados):>10}')
+        self.stdout.write(f'  Tiempo:                        {time.perf_counter() - inicio:>8.1f} s')
+        if faltantes:
+            self.stdout.write(self.style.WARNING(f'  ⚠️  {faltantes} archivos referenciados no existen en disco'))
+        for error in errores:
+            self.stdout.write(self.style.ERROR(f'  ❌ {error}'))
+
+        if errores:
+            self.stdout.write(self.style.WARNING(f'\n⚠️  Derivados generados con {len(errores)} errores.'))
+        else:
+            self.stdout.write(self.style.SUCCESS('\n✅ Derivados generados.'))
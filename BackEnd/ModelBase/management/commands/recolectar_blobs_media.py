@@ -0,0 +1,95 @@
+"""
+Management Command: recolectar_blobs_media
+==========================================
+Recolección de basura del almacén por contenido (ModelBase/almacen_contenido.py):
+
+  1. Cuenta desde las tablas cuántas filas referencian cada blob y corrige
+     BlobContenido.referencias (los `queryset.update()` no disparan signals).
+  2. Elimina los blobs sin referencias cuya última modificación tiene más de
+     GRACIA_HORAS (una subida en curso registra su blob antes de que se
+     confirme la fila que lo referencia).
+  3. Elimina los archivos bajo la raíz del almacén que no tienen fila
+     (transacciones revertidas, temporales de escrituras interrumpidas,
+     derivados de imagen de blobs eliminados) con la misma antigüedad
+     mínima. Los derivados de los blobs vigentes se conservan.
+  4. Reporta las filas que apuntan a un blob inexistente.
+
+Uso:
+    python manage.py recolectar_blobs_media --dry-run
+    python manage.py recolectar_blobs_media --gracia-horas 1
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from ModelBase.almacen_contenido import (
+    almacen, archivos_bajo, configuracion, contar_referencias, digest_de_derivado, legible,
+    recontar_referencias,
+)
+from ModelBase.models import BlobContenido
+
+
+class Command(BaseCommand):
+    help = 'Recuenta referencias y elimina los blobs del almacén por contenido que nadie usa'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Solo reporta; no corrige ni borra.')
+        parser.add_argument('--gracia-horas', type=int, help='Antigüedad mínima para borrar (por defecto GRACIA_HORAS).')
+
+    def handle(self, *args, **options):
+        config = configuracion()
+        simular = options['dry_run']
+        gracia = config['GRACIA_HORAS'] if options['gracia_horas'] is None else options['gracia_horas']
+        if gracia < 0:
+            raise CommandError('--gracia-horas no puede ser negativo.')
+        limite = timezone.now() - timedelta(hours=gracia)
+
+        self.stdout.write(f'\n📅 Recolectando blobs en {config["RAIZ"]}/ (gracia {gracia} h){" (simulación)" if simular else ""}\n')
+        conteo = contar_referencias()
+        corregidos = 0 if simular else recontar_referencias(conteo)
+
+        registrados = {}
+        vigentes = set()
+        eliminados, bytes_eliminados = 0, 0
+        for blob in BlobContenido.objects.only('nombre', 'digest', 'tamano', 'modificado_en').order_by('pk').iterator():
+            registrados[blob.nombre] = blob
+            if conteo.get(blob.nombre) or blob.modificado_en >= limite:
+                vigentes.add(blob.digest)
+                continue
+            if not simular:
+                # Condicionado: una subida del mismo contenido pudo renovar la fila entretanto
+                borradas, _ = BlobContenido.objects.filter(
+                    pk=blob.pk, referencias=0, modificado_en__lt=limite
+                ).delete()
+                if not borradas:
+                    vigentes.add(blob.digest)
+                    continue
+                almacen.eliminar_blob(blob.nombre)
+            eliminados += 1
+            bytes_eliminados += blob.tamano
+
+        sueltos, bytes_sueltos = 0, 0
+        for nombre in archivos_bajo(almacen, config['RAIZ']):
+            if nombre in registrados or conteo.get(nombre) or digest_de_derivado(nombre) in vigentes:
+                continue
+            if almacen.get_modified_time(nombre) >= limite:
+                continue
+            tamano = almacen.size(nombre)
+            if not simular:
+                almacen.eliminar_blob(nombre)
+            sueltos += 1
+            bytes_sueltos += tamano
+
+        rotos = sorted(nombre for nombre in conteo if not almacen.exists(nombre))
+
+        self.stdout.write(f'  Blobs registrados:       {len(registrados):>6}')
+        self.stdout.write(f'  Referencias corregidas:  {corregidos:>6}')
+        self.stdout.write(f'  Blobs sin referencias:   {eliminados:>6}  ({legible(bytes_eliminados)})')
+        self.stdout.write(f'  Archivos sin registrar:  {sueltos:>6}  ({legible(bytes_sueltos)})')
+        self.stdout.write(f'  ─────────────────────────────────────────')
+        for nombre in rotos:
+            self.stdout.write(self.style.WARNING(f'  ⚠️  {conteo[nombre]} fila(s) apuntan a un blob inexistente: {nombre}'))
+
+        verbo = 'Se recuperarían' if simular else 'Recuperados'
+        self.stdout.write(self.style.SUCCESS(f'\n✅ {verbo} {legible(bytes_eliminados + bytes_sueltos)} en disco.'))
@@ -0,0 +1,54 @@
+"""
+Management Command: reconstruir_indice_busqueda
+===============================================
+Reconstruye el índice de la búsqueda global (ModelBase/busqueda.py) desde
+las tablas de origen: reindexa cada objeto buscable por lotes y elimina las
+entradas de objetos que ya no existen.
+
+La carga inicial la hace la migración ModelBase 0005 con el mismo código.
+Se ejecuta al cambiar CONFIG_BUSQUEDA (campos, etiquetas, rutas) o después
+de cargas masivas hechas con `queryset.update()` / SQL directo, que no
+disparan signals.
+
+Uso:
+    python manage.py reconstruir_indice_busqueda
+    python manage.py reconstruir_indice_busqueda --tipo machine --tipo ticket
+    python manage.py reconstruir_indice_busqueda --lote 1000
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ModelBase.busqueda import CONFIG_BUSQUEDA, CONFIG_POR_TIPO, reconstruir
+from ModelBase.models import EntradaBusqueda, TerminoBusqueda
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el índice de la búsqueda global desde las tablas de origen'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tipo', action='append', choices=sorted(CONFIG_POR_TIPO),
+            help='Tipo a reconstruir (repetible). Por defecto todos.',
+        )
+        parser.add_argument('--lote', type=int, default=500, help='Objetos por lote de indexado.')
+
+    def handle(self, *args, **options):
+        lote = options['lote']
+        if lote < 1:
+            raise CommandError('--lote debe ser mayor que cero.')
+        tipos = options['tipo'] or [config['type'] for config in CONFIG_BUSQUEDA]
+
+        self.stdout.write(f'\n📅 Reconstruyendo índice de búsqueda ({len(tipos)} tipos, lotes de {lote})\n')
+        inicio = time.perf_counter()
+        for tipo in tipos:
+            indexados, huerfanas = reconstruir(tipo, lote)
+            self.stdout.write(f'  {tipo:<10} → {indexados:>7} indexados, {huerfanas:>5} huérfanas eliminadas')
+
+        self.stdout.write(f'  ─────────────────────────────────────────')
+        self.stdout.write(
+            f'  Entradas: {EntradaBusqueda.objects.count()}  '
+            f'Términos: {TerminoBusqueda.objects.count()}  '
+            f'({time.perf_counter() - inicio:.1f} s)\n'
+        )
+        self.stdout.write(self.style.SUCCESS('✅ Índice de búsqueda reconstruido.'))
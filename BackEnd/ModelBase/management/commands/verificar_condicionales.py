@@ -0,0 +1,105 @@
+"""
+Management Command: verificar_condicionales
+===========================================
+Prueba de las respuestas condicionales (ModelBase/condicional.py) sobre el
+menú activo y los listados completos de catálogos.
+
+Para cada endpoint:
+  1. GET normal               → 200, consultas SQL, bytes y ETag recibido.
+  2. GET con If-None-Match    → debe ser 304, 0 bytes y UNA consulta
+                                (la de versiones), sin serializar nada.
+  3. Se incrementa la versión de una tabla dentro de una transacción que se
+     revierte y se repite el GET condicional → debe volver a ser 200.
+
+No deja cambios en la BD.
+
+Uso:
+    python manage.py verificar_condicionales
+    python manage.py verificar_condicionales --usuario jperez
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from ModelBase.condicional import _Incremento
+from Usuarios.models import Usuarios
+
+ENDPOINTS = [
+    ('/api/menus/activo/', 'Menus.MenuConfig'),
+    ('/api/maquinas/lista/', 'Maquinas.Maquina'),
+    ('/api/casinos/lista/', 'Casinos.Casino'),
+    ('/api/roles/lista/', 'Roles.Rol'),
+    ('/api/proveedores/lista/', 'Proveedores.Proveedor'),
+    ('/api/modelos/lista/', 'ModelosMaquinas.ModeloMaquina'),
+]
+
+
+class _Revertir(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Cuenta consultas y bytes del camino 304 de los endpoints con ETag'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuario', help='Username con el que se autentican las peticiones.')
+
+    def _get(self, cliente, url, **headers):
+        with CaptureQueriesContext(connection) as ctx:
+            respuesta = cliente.get(url, **headers)
+        contenido = b''.join(respuesta) if respuesta.streaming else respuesta.content
+        return respuesta, len(ctx.captured_queries), len(contenido)
+
+    def handle(self, *args, **options):
+        usuarios = Usuarios.objects.filter(esta_activo=True).select_related('rol', 'casino')
+        if options['usuario']:
+            usuarios = usuarios.filter(username=options['usuario'])
+        usuario = usuarios.order_by('-rol__nivel_jerarquia').first()
+        if usuario is None:
+            raise CommandError('No hay un usuario activo para autenticar las peticiones.')
+
+        cliente = APIClient()
+        cliente.force_authenticate(user=usuario)
+
+        fallas = []
+        self.stdout.write(f'\n  {"Endpoint":<28} {"200: SQL":>9} {"bytes":>9}   {"304: SQL":>9} {"bytes":>6}   {"tras cambio":>11}')
+        self.stdout.write(f'  ─────────────────────────────────────────────────────────────────────────────────')
+        for url, tabla in ENDPOINTS:
+            completa, consultas_200, bytes_200 = self._get(cliente, url)
+            etag = completa.get('ETag')
+            if completa.status_code != 200 or not etag:
+                fallas.append(f'{url}: respuesta {completa.status_code} sin ETag')
+                continue
+
+            condicional, consultas_304, bytes_304 = self._get(cliente, url, HTTP_IF_NONE_MATCH=etag)
+
+            estado_tras_cambio = None
+            try:
+                with transaction.atomic():
+                    _Incremento(tabla)()
+                    tras_cambio, _, _ = self._get(cliente, url, HTTP_IF_NONE_MATCH=etag)
+                    estado_tras_cambio = tras_cambio.status_code
+                    raise _Revertir
+            except _Revertir:
+                pass
+
+            self.stdout.write(
+                f'  {url:<28} {consultas_200:>9} {bytes_200:>9}   '
+                f'{consultas_304:>9} {bytes_304:>6}   {estado_tras_cambio!s:>11}'
+            )
+            if condicional.status_code != 304:
+                fallas.append(f'{url}: If-None-Match vigente respondió {condicional.status_code}')
+            if bytes_304:
+                fallas.append(f'{url}: el 304 envió {bytes_304} bytes')
+            if consultas_304 > 1:
+                fallas.append(f'{url}: el 304 ejecutó {consultas_304} consultas (máximo 1)')
+            if estado_tras_cambio != 200:
+                fallas.append(f'{url}: tras cambiar {tabla} respondió {estado_tras_cambio}')
+
+        self.stdout.write('')
+        if fallas:
+            for falla in fallas:
+                self.stdout.write(self.style.ERROR(f'  ❌ {falla}'))
+            raise CommandError(f'{len(fallas)} verificaciones fallidas.')
+        self.stdout.write(self.style.SUCCESS('✅ Todos los 304 sin cuerpo, con una sola consulta, e invalidados al cambiar la tabla.'))
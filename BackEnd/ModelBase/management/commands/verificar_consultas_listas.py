@@ -0,0 +1,83 @@
+"""
+Management Command: verificar_consultas_listas
+==============================================
+Comprueba que los listados migrados a búsquedas por lote
+(ModelBase/cargadores.py) hacen un número FIJO de consultas SQL sin
+importar cuántas filas serializan.
+
+Para cada listado se serializan las primeras N filas y luego las primeras
+2N con el mismo queryset que usa la vista; el número de consultas debe ser
+igual en ambos casos. Si crece con N, algún campo sigue consultando por fila.
+
+Solo lee: no deja cambios en la BD.
+
+Uso:
+    python manage.py verificar_consultas_listas
+    python manage.py verificar_consultas_listas --filas 100
+"""
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from Maquinas.models import Maquina
+from Maquinas.serializers import MaquinaMapaSerializer, MaquinaSerializer
+from Tickets.models import Ticket
+from Tickets.serializers import TicketCentroServiciosSerializer, TicketSerializer
+
+
+def _listados():
+    """(nombre, serializer, queryset) con los mismos select_related que las vistas."""
+    return [
+        ('Tickets (ViewSet)', TicketSerializer, Ticket.objects.select_related(
+            'maquina', 'maquina__casino', 'reportante', 'reportante__rol', 'tecnico_asignado'
+        ).order_by('-creado_en')),
+        ('Tickets (centro servicios)', TicketCentroServiciosSerializer, Ticket.objects.filter(
+            esta_activo=True
+        ).select_related(
+            'maquina', 'maquina__casino', 'reportante', 'reportante__rol', 'tecnico_asignado'
+        ).order_by('-creado_en')),
+        ('Máquinas (ViewSet)', MaquinaSerializer, Maquina.objects.filter(
+            esta_activo=True
+        ).select_related('modelo', 'casino', 'modelo__proveedor').prefetch_related('denominaciones').order_by('id')),
+        ('Mapa de sala', MaquinaMapaSerializer, Maquina.objects.filter(
+            esta_activo=True
+        ).select_related('modelo', 'modelo__proveedor').order_by('id')),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Verifica que los listados con búsquedas por lote no hagan consultas por fila'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filas', type=int, default=50, help='N: se comparan N contra 2N filas.')
+
+    def _consultas(self, serializer_class, queryset, filas):
+        with CaptureQueriesContext(connection) as ctx:
+            serializer_class(list(queryset[:filas]), many=True).data
+        return len(ctx.captured_queries)
+
+    def handle(self, *args, **options):
+        filas = max(options['filas'], 1)
+        fallas = []
+
+        self.stdout.write(f'\n  {"Listado":<28} {"filas":>11} {"SQL":>9}')
+        self.stdout.write(f'  ─────────────────────────────────────────────────')
+        for nombre, serializer_class, queryset in _listados():
+            total = queryset.count()
+            if total < 2 * filas:
+                self.stdout.write(self.style.WARNING(
+                    f'  ⚠️  {nombre:<25} solo {total} filas (se necesitan {2 * filas}); se omite'
+                ))
+                continue
+            con_n = self._consultas(serializer_class, queryset, filas)
+            con_2n = self._consultas(serializer_class, queryset, 2 * filas)
+            self.stdout.write(f'  {nombre:<28} {f"{filas}/{2 * filas}":>11} {f"{con_n}/{con_2n}":>9}')
+            if con_n != con_2n:
+                fallas.append(f'{nombre}: {con_n} consultas con {filas} filas, {con_2n} con {2 * filas}')
+
+        self.stdout.write('')
+        if fallas:
+            for falla in fallas:
+                self.stdout.write(self.style.ERROR(f'  ❌ {falla}'))
+        else:
+            self.stdout.write(self.style.SUCCESS('  ✅ Consultas constantes en todos los listados'))
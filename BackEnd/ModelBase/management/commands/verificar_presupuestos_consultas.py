@@ -0,0 +1,131 @@
+"""
+Management Command: verificar_presupuestos_consultas
+====================================================
+Revisa ModelBase/presupuestos_consultas.json contra las rutas reales
+(ver ModelBase/consultas.py):
+
+  1. Cobertura: cada acción de cada ViewSet registrado en un router debe
+     tener presupuesto para cada uno de sus métodos. Las entradas que ya no
+     corresponden a ninguna ruta se reportan como sobrantes.
+  2. Con --medir, hace GET a las rutas sin parámetros en la URL (listados,
+     métricas, catálogos) autenticado como el usuario de mayor jerarquía y
+     compara consultas, sentencias repetidas y huellas N+1 con el
+     presupuesto. Cada GET corre en una transacción que se revierte.
+
+Termina con código 1 si algo falla, para poder usarlo en CI.
+
+Uso:
+    python manage.py verificar_presupuestos_consultas
+    python manage.py verificar_presupuestos_consultas --medir --usuario jperez
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.urls import NoReverseMatch, URLPattern, URLResolver, get_resolver, reverse
+from rest_framework.test import APIClient
+
+from ModelBase.consultas import cargar_presupuestos, configuracion, medir, presupuesto_de, revisar
+from Usuarios.models import Usuarios
+
+
+class _Revertir(Exception):
+    pass
+
+
+def rutas_de_viewsets(patrones=None):
+    """{nombre_de_ruta: {MÉTODOS}} de todas las rutas generadas por routers de DRF."""
+    rutas = {}
+    for patron in patrones if patrones is not None else get_resolver().url_patterns:
+        if isinstance(patron, URLResolver):
+            for nombre, metodos in rutas_de_viewsets(patron.url_patterns).items():
+                rutas.setdefault(nombre, set()).update(metodos)
+        elif isinstance(patron, URLPattern) and patron.name:
+            acciones = getattr(patron.callback, 'actions', None)
+            if acciones:
+                # El router mapea put/patch/delete aunque http_method_names los excluya
+                permitidos = patron.callback.cls.http_method_names
+                rutas.setdefault(patron.name, set()).update(
+                    metodo.upper() for metodo in acciones if metodo in permitidos
+                )
+    return rutas
+
+
+class Command(BaseCommand):
+    help = 'Verifica la cobertura del archivo de presupuestos de consultas y mide los listados'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--medir', action='store_true', help='Mide los GET sin parámetros contra su presupuesto.')
+        parser.add_argument('--usuario', help='Username con el que se autentican las peticiones de --medir.')
+
+    def _cobertura(self, rutas, presupuestos):
+        fallas = []
+        for nombre in sorted(rutas):
+            faltantes = sorted(rutas[nombre] - set(presupuestos.get(nombre, {})))
+            if faltantes:
+                fallas.append(f'{nombre}: sin presupuesto para {", ".join(faltantes)}')
+        sobrantes = sorted(set(presupuestos) - set(rutas))
+        for nombre in sobrantes:
+            self.stdout.write(self.style.WARNING(f'  ⚠️  {nombre}: no corresponde a ninguna ruta registrada'))
+        total = sum(len(metodos) for metodos in rutas.values())
+        self.stdout.write(f'  {len(rutas)} rutas, {total} métodos, {len(fallas)} sin presupuesto')
+        return fallas
+
+    def _medir(self, rutas, usuario):
+        cliente = APIClient()
+        cliente.force_authenticate(user=usuario)
+        fallas = []
+
+        self.stdout.write(f'\n  {"Ruta":<42} {"SQL":>5} {"máx":>5} {"ms BD":>8}')
+        self.stdout.write(f'  ──────────────────────────────────────────────────────────────')
+        for nombre in sorted(rutas):
+            if 'GET' not in rutas[nombre]:
+                continue
+            try:
+                url = reverse(nombre)
+            except NoReverseMatch:
+                continue  # Necesita parámetros en la URL (detalle, por casino, etc.)
+
+            maximo = presupuesto_de(nombre, 'GET')
+            try:
+                with transaction.atomic():
+                    with medir() as medicion:
+                        respuesta = cliente.get(url)
+                        if respuesta.streaming:
+                            b''.join(respuesta)
+                    raise _Revertir()
+            except _Revertir:
+                pass
+
+            self.stdout.write(
+                f'  {nombre:<42} {medicion.total:>5} {maximo:>5} {medicion.tiempo * 1000:>8.1f}'
+                + ('' if respuesta.status_code < 400 else f'  (HTTP {respuesta.status_code})')
+            )
+            for problema in revisar(medicion, maximo):
+                fallas.append(f'{nombre}: {problema}')
+        return fallas
+
+    def handle(self, *args, **options):
+        archivo = configuracion()['ARCHIVO']
+        try:
+            presupuestos = cargar_presupuestos(archivo)
+        except FileNotFoundError:
+            raise CommandError(f'No existe el archivo de presupuestos: {archivo}')
+
+        rutas = rutas_de_viewsets()
+        self.stdout.write(f'\n📅 Presupuestos: {archivo}')
+        fallas = self._cobertura(rutas, presupuestos)
+
+        if options['medir']:
+            usuarios = Usuarios.objects.filter(esta_activo=True).select_related('rol', 'casino')
+            if options['usuario']:
+                usuarios = usuarios.filter(username=options['usuario'])
+            usuario = usuarios.order_by('-rol__nivel_jerarquia').first()
+            if usuario is None:
+                raise CommandError('No hay un usuario activo para autenticar las peticiones.')
+            fallas += self._medir(rutas, usuario)
+
+        self.stdout.write('')
+        if fallas:
+            for falla in fallas:
+                self.stdout.write(self.style.ERROR(f'  ❌ {falla}'))
+            raise SystemExit(1)
+        self.stdout.write(self.style.SUCCESS('  ✅ Presupuestos completos y respetados'))
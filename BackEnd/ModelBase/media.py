@@ -0,0 +1,311 @@
+"""
+Entrega de archivos de MEDIA_ROOT (PDFs de la wiki, evidencias, avatares).
+
+Antes solo se servían con `django.conf.urls.static` y únicamente con DEBUG:
+sin permisos, sin rangos y sin caché. `servir_media` atiende MEDIA_URL en
+cualquier entorno:
+
+  - Permisos. Un <img> o un <a> no envían el header Authorization, así que
+    las URLs que emite el almacén por contenido llevan una firma
+    (?d=<día>&f=<hmac>) válida FIRMA_DIAS días. La firma es una capacidad:
+    la API solo la entrega dentro de respuestas que ya pasaron sus permisos,
+    y como depende solo del nombre y del día, la misma URL se repite durante
+    el día y el caché del navegador sirve. Sin firma se exige un usuario
+    autenticado (Bearer) y, para las evidencias de vacíos, que sea de su
+    casino o de un rol privilegiado (nivel >= 19, como en cache_respuestas).
+    Una evidencia o un blob que ninguna fila referencia (ticket borrado o
+    editado) solo lo ve un rol privilegiado.
+  - Validadores fuertes. El ETag de un blob es su SHA-256; los demás
+    archivos usan (nombre, tamaño, mtime). If-None-Match, If-Modified-Since
+    e If-Range se respetan (304 sin abrir el archivo).
+  - Caché. Los blobs (nombre = hash del contenido) se marcan `immutable` por
+    un año; derivados y archivos con nombre libre, MAX_AGE con revalidación.
+  - Rangos. `Range: bytes=a-b` (un solo intervalo) responde 206 con
+    Content-Range; uno no satisfacible, 416. Los manuales en PDF se pueden
+    abrir por páginas sin descargar el archivo completo.
+  - Descarga delegada. Con MODO 'x-accel' (nginx) o 'x-sendfile'
+    (Apache/lighttpd) el worker solo valida y responde cabeceras; el
+    servidor web envía los bytes y resuelve los rangos. Para nginx:
+
+        location /media-interno/ {
+            internal;
+            alias /ruta/a/BackEnd/media/;
+        }
+
+Comparación de tiempo de worker por MB entre modos:
+
+    python manage.py benchmark_media
+"""
+import hashlib
+import mimetypes
+import os
+import re
+import time
+from urllib.parse import quote, urlencode
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import SuspiciousFileOperation
+from django.db.models import Q
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.crypto import constant_time_compare
+from django.utils.http import http_date, parse_http_date_safe
+
+from .almacen_contenido import almacen, configuracion as configuracion_almacen, es_blob
+from .derivados import CAMPOS_CON_DERIVADOS, base_original
+
+MODOS = ('django', 'x-accel', 'x-sendfile')
+BLOQUE = 64 * 1024
+INMUTABLE = 365 * 24 * 3600
+
+_RANGO = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def configuracion():
+    config = getattr(settings, 'SERVICIO_MEDIA', {}) or {}
+    modo = str(config.get('MODO', 'django')).lower()
+    return {
+        'MODO': modo if modo in MODOS else 'django',
+        'PREFIJO_INTERNO': '/' + str(config.get('PREFIJO_INTERNO', '/media-interno/')).strip('/') + '/',
+        'FIRMA_DIAS': int(config.get('FIRMA_DIAS', 2)),
+        'MAX_AGE': int(config.get('MAX_AGE', 3600)),
+    }
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Firmas
+# ──────────────────────────────────────────────────────────────────────────────
+def _dia_actual():
+    return int(time.time() // 86400)
+
+
+def _firma(nombre, dia):
+    return signing.Signer(salt='ModelBase.media').signature(f'{nombre}|{dia}')
+
+
+def firmar_url(url, nombre):
+    """`url` con la firma del día para `nombre`."""
+    dia = _dia_actual()
+    separador = '&' if '?' in url else '?'
+    return f'{url}{separador}{urlencode({"d": dia, "f": _firma(nombre, dia)})}'
+
+
+def firma_valida(nombre, parametros):
+    """True si `parametros` (request.GET) traen una firma vigente para `nombre`."""
+    try:
+        dia = int(parametros.get('d', ''))
+    except ValueError:
+        return False
+    hoy = _dia_actual()
+    if not hoy - configuracion()['FIRMA_DIAS'] <= dia <= hoy + 1:
+        return False
+    return constant_time_compare(parametros.get('f', ''), _firma(nombre, dia))
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Permisos
+# ──────────────────────────────────────────────────────────────────────────────
+def es_ruta_protegida(nombre):
+    """True para evidencias de vacíos (ruta original) y blobs del almacén por contenido."""
+    return nombre.startswith('vacios/') or nombre.startswith(configuracion_almacen()['RAIZ'] + '/')
+
+
+def casinos_de_evidencia(nombre):
+    """
+    Casinos de los TicketVacio que usan `nombre` (o el original del que
+    `nombre` es un derivado) como foto de evidencia; vacío si ninguno.
+    """
+    from VaciosTickets.models import TicketVacio
+
+    prefijo = base_original(nombre) + '.'
+    filtro = Q()
+    for campo in CAMPOS_CON_DERIVADOS['VaciosTickets.TicketVacio']:
+        filtro |= Q(**{f'{campo}__startswith': prefijo})
+    return set(TicketVacio.objects.filter(filtro).values_list('casino_id', flat=True).distinct()[:50])
+
+
+def _dueno_no_evidencia(nombre):
+    """True si algún campo del almacén que no es evidencia (PDF de wiki, avatar) referencia `nombre`."""
+    from .almacen_contenido import campos_con_almacen
+
+    evidencia = set(CAMPOS_CON_DERIVADOS['VaciosTickets.TicketVacio'])
+    prefijo = base_original(nombre) + '.'
+    for modelo, campos in campos_con_almacen():
+        filtro = Q()
+        for campo in campos:
+            if modelo._meta.label == 'VaciosTickets.TicketVacio' and campo.name in evidencia:
+                continue
+            filtro |= Q(**{f'{campo.attname}__startswith': prefijo})
+        if filtro and modelo._base_manager.filter(filtro).exists():
+            return True
+    return False
+
+
+def puede_ver(usuario, nombre):
+    """
+    Permiso de un usuario autenticado (sin firma) sobre el archivo `nombre`:
+
+      - fuera de las rutas protegidas, cualquier usuario autenticado;
+      - evidencia de vacíos, su casino o un rol privilegiado;
+      - blob de un PDF de la wiki o de un avatar, cualquier usuario autenticado;
+      - ruta protegida que ninguna fila referencia (evidencia de un ticket
+        borrado o editado, blob huérfano), solo roles privilegiados.
+    """
+    from .cache_respuestas import grupo_rol
+
+    if not getattr(usuario, 'is_authenticated', False):
+        return False
+    if not es_ruta_protegida(nombre) or grupo_rol(usuario) == 'privilegiado':
+        return True
+    casinos = casinos_de_evidencia(nombre)
+    if casinos:
+        return getattr(usuario, 'casino_id', None) in casinos
+    return _dueno_no_evidencia(nombre)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Rangos y validadores
+# ──────────────────────────────────────────────────────────────────────────────
+class RangoNoSatisfacible(Exception):
+    pass
+
+
+def rango_solicitado(cabecera, tamano):
+    """
+    (inicio, fin) inclusivos del header Range, o None para responder el
+    archivo completo (sin Range, varios intervalos o sintaxis inválida).
+    Lanza RangoNoSatisfacible si el intervalo cae fuera del archivo.
+    """
+    coincidencia = _RANGO.match((cabecera or '').strip())
+    if coincidencia is None or tamano == 0:
+        return None
+    inicio, fin = coincidencia.groups()
+    if not inicio and not fin:
+        return None
+    if not inicio:
+        sufijo = int(fin)
+        if sufijo == 0:
+            raise RangoNoSatisfacible()
+        return max(tamano - sufijo, 0), tamano - 1
+    inicio = int(inicio)
+    fin = min(int(fin), tamano - 1) if fin else tamano - 1
+    if inicio >= tamano:
+        raise RangoNoSatisfacible()
+    if inicio > fin:
+        return None
+    return inicio, fin
+
+
+def etag_de(nombre, estado):
+    """ETag fuerte: el digest para los blobs, (nombre, tamaño, mtime) para el resto."""
+    if es_blob(nombre):
+        return '"' + os.path.splitext(os.path.basename(nombre))[0] + '"'
+    huella = f'{nombre}:{estado.st_size}:{estado.st_mtime_ns}'
+    return '"' + hashlib.sha1(huella.encode('utf-8')).hexdigest()[:32] + '"'
+
+
+def _if_range_vigente(request, etag, last_modified):
+    """False si If-Range no coincide: el rango se ignora y se responde completo."""
+    condicion = request.headers.get('If-Range')
+    if not condicion:
+        return True
+    if condicion.startswith('"'):
+        return constant_time_compare(condicion, etag)
+    fecha = parse_http_date_safe(condicion)
+    return fecha is not None and fecha >= last_modified
+
+
+def _trozos(ruta, inicio, longitud):
+    with open(ruta, 'rb') as archivo:
+        archivo.seek(inicio)
+        restante = longitud
+        while restante > 0:
+            datos = archivo.read(min(BLOQUE, restante))
+            if not datos:
+                break
+            restante -= len(datos)
+            yield datos
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Vista
+# ──────────────────────────────────────────────────────────────────────────────
+def respuesta_media(request, nombre, modo=None):
+    """Respuesta para `nombre` (ya autorizado) según `modo` (por defecto MODO)."""
+    config = configuracion()
+    modo = modo or config['MODO']
+    try:
+        ruta = almacen.path(nombre)
+        estado = os.stat(ruta)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404('Archivo no encontrado')
+    if not os.path.isfile(ruta):
+        raise Http404('Archivo no encontrado')
+
+    etag = etag_de(nombre, estado)
+    last_modified = int(estado.st_mtime)
+    cache_control = (
+        f'private, max-age={INMUTABLE}, immutable' if es_blob(nombre)
+        else f'private, max-age={config["MAX_AGE"]}'
+    )
+    cabeceras = {
+        'ETag': etag,
+        'Last-Modified': http_date(last_modified),
+        'Cache-Control': cache_control,
+        'Accept-Ranges': 'bytes',
+        'X-Content-Type-Options': 'nosniff',
+    }
+
+    condicional = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if condicional is not None:
+        for clave, valor in cabeceras.items():
+            condicional[clave] = valor
+        return condicional
+
+    tipo, codificacion = mimetypes.guess_type(nombre)
+    tipo = tipo or 'application/octet-stream'
+
+    if modo != 'django':
+        # El servidor web envía el archivo y resuelve Range por su cuenta
+        respuesta = HttpResponse(content_type=tipo)
+        if modo == 'x-accel':
+            respuesta['X-Accel-Redirect'] = config['PREFIJO_INTERNO'] + quote(nombre)
+        else:
+            respuesta['X-Sendfile'] = ruta
+    else:
+        try:
+            rango = rango_solicitado(request.headers.get('Range'), estado.st_size)
+        except RangoNoSatisfacible:
+            respuesta = HttpResponse(status=416)
+            respuesta['Content-Range'] = f'bytes */{estado.st_size}'
+            return respuesta
+        if rango is not None and not _if_range_vigente(request, etag, last_modified):
+            rango = None
+
+        if request.method == 'HEAD':
+            respuesta = HttpResponse(content_type=tipo)
+            respuesta['Content-Length'] = str(estado.st_size)
+        elif rango is None:
+            respuesta = FileResponse(open(ruta, 'rb'), content_type=tipo)
+        else:
+            inicio, fin = rango
+            longitud = fin - inicio + 1
+            respuesta = StreamingHttpResponse(_trozos(ruta, inicio, longitud), status=206, content_type=tipo)
+            respuesta['Content-Length'] = str(longitud)
+            respuesta['Content-Range'] = f'bytes {inicio}-{fin}/{estado.st_size}'
+
+    if codificacion:
+        respuesta['Content-Encoding'] = codificacion
+    for clave, valor in cabeceras.items():
+        respuesta[clave] = valor
+    return respuesta
+
+
+def servir_media(request, nombre):
+    """GET/HEAD de MEDIA_URL<nombre> con firma o con usuario autorizado."""
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponse(status=405, headers={'Allow': 'GET, HEAD'})
+    if not firma_valida(nombre, request.GET) and not puede_ver(getattr(request, 'user', None), nombre):
+        return HttpResponseForbidden('Acceso denegado al archivo')
+    return respuesta_media(request, nombre)
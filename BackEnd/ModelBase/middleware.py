@@ -0,0 +1,53 @@
+"""
+Instrumentación de consultas SQL por request (ver ModelBase/consultas.py).
+
+Con PRESUPUESTO_CONSULTAS['ACTIVO'] cada request se mide completo (incluye
+autenticación y el flush de auditoría) y se loguea un warning cuando excede
+el presupuesto de su ruta, repite sentencias idénticas o tiene una huella
+con forma de N+1. Con 'CABECERAS' la respuesta lleva:
+
+    X-Consultas: 12
+    X-Consultas-Tiempo-Ms: 8.4
+    X-Consultas-Repetidas: 0
+
+En respuestas streaming solo se cuenta lo ejecutado antes del primer byte.
+"""
+import logging
+
+from django.core.exceptions import MiddlewareNotUsed
+
+from .consultas import configuracion, medir, presupuesto_de, revisar
+
+logger = logging.getLogger(__name__)
+
+
+class PresupuestoConsultasMiddleware:
+    """Mide las consultas de cada request y las compara con el presupuesto de su ruta."""
+
+    def __init__(self, get_response):
+        config = configuracion()
+        if not config['ACTIVO']:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.cabeceras = config['CABECERAS']
+        self.umbral = config['UMBRAL_REPETIDAS']
+
+    def __call__(self, request):
+        with medir() as medicion:
+            response = self.get_response(request)
+
+        match = getattr(request, 'resolver_match', None)
+        ruta = match.url_name if match else None
+        maximo = presupuesto_de(ruta, request.method) if ruta else None
+        problemas = revisar(medicion, maximo, self.umbral)
+        if problemas:
+            logger.warning(
+                '%s %s [%s] %s: %s',
+                request.method, request.path, ruta or '-', medicion.resumen(), ' | '.join(problemas),
+            )
+
+        if self.cabeceras:
+            response['X-Consultas'] = str(medicion.total)
+            response['X-Consultas-Tiempo-Ms'] = f'{medicion.tiempo * 1000:.1f}'
+            response['X-Consultas-Repetidas'] = str(len(medicion.repetidas(self.umbral)))
+        return response
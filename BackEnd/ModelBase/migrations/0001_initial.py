@@ -0,0 +1,27 @@
+# Generated by Django 6.0.2 on 2026-10-18 15:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersionTabla',
+            fields=[
+                ('tabla', models.CharField(help_text='Label del modelo (app.Modelo)', max_length=100, primary_key=True, serialize=False, verbose_name='Tabla')),
+                ('version', models.BigIntegerField(default=0, verbose_name='Versión')),
+                ('modificado_en', models.DateTimeField(auto_now=True, verbose_name='Última Modificación')),
+            ],
+            options={
+                'verbose_name': 'Versión de Tabla',
+                'verbose_name_plural': 'Versiones de Tablas',
+                'db_table': 'sys_versiones_tablas',
+            },
+        ),
+    ]
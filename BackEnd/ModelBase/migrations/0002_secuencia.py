@@ -0,0 +1,28 @@
+# Generated by Django 6.0.2 on 2026-10-18 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ModelBase', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Secuencia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prefijo', models.CharField(max_length=20, verbose_name='Prefijo')),
+                ('anio', models.PositiveIntegerField(verbose_name='Año')),
+                ('ultimo', models.PositiveBigIntegerField(default=0, verbose_name='Último Número Entregado')),
+            ],
+            options={
+                'verbose_name': 'Secuencia',
+                'verbose_name_plural': 'Secuencias',
+                'db_table': 'sys_secuencias',
+                'unique_together': {('prefijo', 'anio')},
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 6.0.2 on 2026-10-18 16:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ModelBase', '0002_secuencia'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EntradaBusqueda',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(max_length=20, verbose_name='Tipo')),
+                ('objeto_id', models.PositiveBigIntegerField(verbose_name='ID del Objeto')),
+                ('casino_id', models.PositiveBigIntegerField(blank=True, db_index=True, help_text='Nulo para objetos visibles desde cualquier casino', null=True, verbose_name='ID del Casino')),
+                ('label', models.CharField(max_length=255, verbose_name='Etiqueta')),
+                ('sublabel', models.CharField(blank=True, max_length=255, verbose_name='Subetiqueta')),
+                ('icono', models.CharField(max_length=50, verbose_name='Icono')),
+                ('ruta', models.CharField(max_length=255, verbose_name='Ruta')),
+                ('modificado_en', models.DateTimeField(auto_now=True, verbose_name='Última Indexación')),
+            ],
+            options={
+                'verbose_name': 'Entrada de Búsqueda',
+                'verbose_name_plural': 'Entradas de Búsqueda',
+                'db_table': 'sys_busqueda_entradas',
+                'unique_together': {('tipo', 'objeto_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='TerminoBusqueda',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('termino', models.CharField(max_length=40, verbose_name='Término')),
+                ('clase', models.CharField(choices=[('p', 'Palabra'), ('t', 'Trigrama')], max_length=1, verbose_name='Clase')),
+                ('entrada', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='terminos', to='ModelBase.entradabusqueda', verbose_name='Entrada')),
+            ],
+            options={
+                'verbose_name': 'Término de Búsqueda',
+                'verbose_name_plural': 'Términos de Búsqueda',
+                'db_table': 'sys_busqueda_terminos',
+                'indexes': [models.Index(fields=['clase', 'termino'], name='busqueda_clase_termino_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 6.0.2 on 2026-10-18 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ModelBase', '0003_busqueda'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlobContenido',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(help_text='Ruta relativa a MEDIA_ROOT (contenido/ab/cd/<sha256><ext>)', max_length=255, unique=True, verbose_name='Nombre')),
+                ('digest', models.CharField(db_index=True, max_length=64, verbose_name='SHA-256')),
+                ('tamano', models.BigIntegerField(verbose_name='Tamaño (bytes)')),
+                ('referencias', models.IntegerField(default=0, help_text='Campos de archivo que apuntan a este blob', verbose_name='Referencias')),
+                ('creado_en', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')),
+                ('modificado_en', models.DateTimeField(auto_now=True, help_text='Último registro o ajuste de referencias; la recolección respeta un periodo de gracia desde aquí', verbose_name='Última Modificación')),
+            ],
+            options={
+                'verbose_name': 'Blob de Contenido',
+                'verbose_name_plural': 'Blobs de Contenido',
+                'db_table': 'sys_blobs_contenido',
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 6.0.2 on 2026-10-18 19:10
+
+from django.db import migrations
+
+
+def poblar_indice(apps, schema_editor):
+    """
+    Carga inicial del índice de búsqueda: sin ella global_search responde
+    vacío hasta correr `reconstruir_indice_busqueda`. Usa el mismo código
+    que el comando (modelos actuales, no los históricos); los tipos sin
+    filas se saltan, así una BD nueva no consulta columnas que aún no existen.
+    """
+    from ModelBase.busqueda import CONFIG_BUSQUEDA, modelo_de, reconstruir
+
+    for config in CONFIG_BUSQUEDA:
+        if modelo_de(config['type']).objects.exists():
+            reconstruir(config['type'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ModelBase', '0004_blobcontenido'),
+        ('AuditoriasExternas', '0002_alter_auditoriaservicioexterno_area_acceso_and_more'),
+        ('Casinos', '0005_casino_grid_height_casino_grid_width'),
+        ('EvolucionNexus', '0002_alter_evolucionnexus_categoria'),
+        ('IncidenciasInfraestructura', '0001_initial'),
+        ('InventarioSala', '0001_initial'),
+        ('Maquinas', '0004_versionmapa_cambiomapa'),
+        ('ModelosMaquinas', '0001_initial'),
+        ('Proveedores', '0002_alter_proveedor_casino_alter_proveedor_creado_en_and_more'),
+        ('Roles', '0004_rol_nivel_jerarquia'),
+        ('TareasEspeciales', '0001_initial'),
+        ('Tickets', '0005_ticket_indice_creado_en'),
+        ('Usuarios', '0008_usuarios_avatar_almacen_contenido'),
+        ('Wiki', '0003_wikitecnica_archivo_pdf_almacen_contenido'),
+    ]
+
+    operations = [
+        migrations.RunPython(poblar_indice, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,22 @@
+import copy
+
 from django.db import models
 from django.core.validators import MaxValueValidator, MinValueValidator
 
+
+def _valor_rastreable(valor):
+    """
+    Normaliza un valor de campo para guardarlo en la foto de estado cargado:
+    archivos por su nombre y estructuras mutables (JSONField) por copia, para
+    que una mutación in-place no oculte el cambio.
+    """
+    if isinstance(valor, models.fields.files.FieldFile):
+        return valor.name
+    if isinstance(valor, (dict, list)):
+        return copy.deepcopy(valor)
+    return valor
+
+
 class ModeloBase(models.Model):
     """
     Modelo abstracto que proporciona campos de auditoría y borrado lógico.
@@ -43,4 +59,302 @@ class ModeloBase(models.Model):
     )
 
     class Meta:
-        abstract = True
\ No newline at end of file
+        abstract = True
+
+    # ──────────────────────────────────────────────────────────────────────
+    # SEGUIMIENTO DE CAMBIOS (dirty fields)
+    # Al cargar una instancia desde la BD se guarda una foto de sus valores
+    # (`_estado_cargado`, por attname). Los signals pre_save/post_save leen
+    # de ahí el estado anterior en lugar de volver a consultar la fila.
+    # La foto se renueva al terminar save() (después de post_save) y en
+    # refresh_from_db(). Si la instancia no viene de la BD (ej. construida a
+    # mano con pk), el estado previo se consulta una sola vez y se memoriza.
+    # ──────────────────────────────────────────────────────────────────────
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._tomar_estado_cargado()
+        return instance
+
+    def _tomar_estado_cargado(self, attnames=None):
+        """Guarda los valores actuales de los campos concretos presentes en la instancia."""
+        # Se construye un dict nuevo: copias superficiales de la instancia
+        # (ej. caché de autenticación) no deben compartir la foto mutada
+        estado = dict(self.__dict__.get('_estado_cargado') or {}) if attnames is not None else {}
+        for field in self._meta.concrete_fields:
+            if attnames is not None and field.attname not in attnames:
+                continue
+            if field.attname in self.__dict__:
+                estado[field.attname] = _valor_rastreable(self.__dict__[field.attname])
+        self._estado_cargado = estado
+
+    def _estado_previo(self, attnames):
+        """
+        Devuelve la foto de estado anterior garantizando que incluya `attnames`.
+        Retorna None si el registro aún no existe en la BD.
+        """
+        if self.pk is None or self.__dict__.get('_insertando'):
+            return None
+        estado = self.__dict__.get('_estado_cargado')
+        if estado is None:
+            estado = {}
+        faltantes = [attname for attname in attnames if attname not in estado]
+        if faltantes:
+            # Fallback: una sola consulta por los campos que no se cargaron
+            fila = type(self)._base_manager.using(self._state.db or 'default').filter(
+                pk=self.pk
+            ).values(*faltantes).first()
+            if fila is None:
+                return None
+            estado = dict(estado)
+            estado.update({attname: _valor_rastreable(valor) for attname, valor in fila.items()})
+            self._estado_cargado = estado
+        return estado
+
+    def valores_previos(self):
+        """
+        Foto completa del registro tal como está en la BD antes del save en curso
+        (dict attname → valor), o None si el registro es nuevo.
+        """
+        return self._estado_previo([field.attname for field in self._meta.concrete_fields])
+
+    def previous(self, field_name):
+        """Valor que tenía `field_name` al cargarse la instancia (None si es nuevo)."""
+        attname = self._meta.get_field(field_name).attname
+        estado = self._estado_previo([attname])
+        return estado.get(attname) if estado is not None else None
+
+    def changed_fields(self):
+        """Nombres de los campos cargados cuyo valor difiere del estado previo."""
+        campos = [
+            field for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
+        ]
+        estado = self._estado_previo([field.attname for field in campos])
+        if estado is None:
+            return [field.name for field in campos]
+        return [
+            field.name for field in campos
+            if _valor_rastreable(self.__dict__[field.attname]) != estado.get(field.attname)
+        ]
+
+    def save(self, *args, **kwargs):
+        # Durante el INSERT no existe estado previo (los signals no deben consultarlo)
+        self._insertando = self._state.adding and self.pk is None
+        try:
+            super().save(*args, **kwargs)
+        finally:
+            self._insertando = False
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            self._tomar_estado_cargado({self._meta.get_field(nombre).attname for nombre in update_fields})
+        else:
+            self._tomar_estado_cargado()
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        fields = kwargs.get('fields')
+        if fields is not None:
+            self._tomar_estado_cargado({self._meta.get_field(nombre).attname for nombre in fields})
+        else:
+            self._tomar_estado_cargado()
+
+class VersionTabla(models.Model):
+    """
+    Número de versión por tabla para las respuestas condicionales (ETag /
+    Last-Modified, ver ModelBase/condicional.py). Los signals lo incrementan
+    al confirmarse cada alta, edición o borrado de las tablas versionadas, de
+    modo que validar un listado completo cuesta una sola consulta por PK.
+    """
+    tabla = models.CharField(
+        max_length=100,
+        primary_key=True,
+        verbose_name="Tabla",
+        help_text="Label del modelo (app.Modelo)"
+    )
+    version = models.BigIntegerField(
+        default=0,
+        verbose_name="Versión"
+    )
+    modificado_en = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Última Modificación"
+    )
+
+    class Meta:
+        db_table = 'sys_versiones_tablas'
+        verbose_name = "Versión de Tabla"
+        verbose_name_plural = "Versiones de Tablas"
+
+    def __str__(self):
+        return f"{self.tabla} v{self.version}"
+
+
+class Secuencia(models.Model):
+    """
+    Contador por (prefijo, año) para identificadores generados como los
+    folios de Ticket (ver ModelBase/secuencias.py). `ultimo` es el último
+    número entregado; se incrementa con SELECT ... FOR UPDATE en una conexión
+    propia, fuera de la transacción de quien pide el número.
+    """
+    prefijo = models.CharField(
+        max_length=20,
+        verbose_name="Prefijo"
+    )
+    anio = models.PositiveIntegerField(
+        verbose_name="Año"
+    )
+    ultimo = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name="Último Número Entregado"
+    )
+
+    class Meta:
+        db_table = 'sys_secuencias'
+        verbose_name = "Secuencia"
+        verbose_name_plural = "Secuencias"
+        unique_together = [('prefijo', 'anio')]
+
+    def __str__(self):
+        return f"{self.prefijo}-{self.anio}: {self.ultimo}"
+
+
+class EntradaBusqueda(models.Model):
+    """
+    Un objeto buscable desde la búsqueda global (ver ModelBase/busqueda.py):
+    tipo ('machine', 'ticket', ...), su id, el casino al que pertenece y el
+    resultado ya armado (label, sublabel, icono, ruta) para no volver a leer
+    la tabla de origen al responder.
+    """
+    tipo = models.CharField(
+        max_length=20,
+        verbose_name="Tipo"
+    )
+    objeto_id = models.PositiveBigIntegerField(
+        verbose_name="ID del Objeto"
+    )
+    casino_id = models.PositiveBigIntegerField(
+        null=True,
+        blank=True,
+        db_index=True,
+        verbose_name="ID del Casino",
+        help_text="Nulo para objetos visibles desde cualquier casino"
+    )
+    label = models.CharField(
+        max_length=255,
+        verbose_name="Etiqueta"
+    )
+    sublabel = models.CharField(
+        max_length=255,
+        blank=True,
+        verbose_name="Subetiqueta"
+    )
+    icono = models.CharField(
+        max_length=50,
+        verbose_name="Icono"
+    )
+    ruta = models.CharField(
+        max_length=255,
+        verbose_name="Ruta"
+    )
+    modificado_en = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Última Indexación"
+    )
+
+    class Meta:
+        db_table = 'sys_busqueda_entradas'
+        verbose_name = "Entrada de Búsqueda"
+        verbose_name_plural = "Entradas de Búsqueda"
+        unique_together = [('tipo', 'objeto_id')]
+
+    def __str__(self):
+        return f"{self.tipo}:{self.objeto_id} {self.label}"
+
+
+class TerminoBusqueda(models.Model):
+    """
+    Término normalizado (minúsculas, sin acentos) de una entrada de búsqueda:
+    palabra completa para coincidencias por prefijo o trigrama para
+    coincidencias aproximadas. El índice (clase, termino) resuelve ambas.
+    """
+    CLASE_PALABRA = 'p'
+    CLASE_TRIGRAMA = 't'
+    CLASE_CHOICES = [
+        (CLASE_PALABRA, 'Palabra'),
+        (CLASE_TRIGRAMA, 'Trigrama'),
+    ]
+
+    entrada = models.ForeignKey(
+        EntradaBusqueda,
+        on_delete=models.CASCADE,
+        related_name='terminos',
+        verbose_name="Entrada"
+    )
+    termino = models.CharField(
+        max_length=40,
+        verbose_name="Término"
+    )
+    clase = models.CharField(
+        max_length=1,
+        choices=CLASE_CHOICES,
+        verbose_name="Clase"
+    )
+
+    class Meta:
+        db_table = 'sys_busqueda_terminos'
+        verbose_name = "Término de Búsqueda"
+        verbose_name_plural = "Términos de Búsqueda"
+        indexes = [
+            models.Index(fields=['clase', 'termino'], name='busqueda_clase_termino_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.clase}:{self.termino}"
+
+
+class BlobContenido(models.Model):
+    """
+    Un archivo del almacén direccionado por contenido (ver
+    ModelBase/almacen_contenido.py): su nombre bajo MEDIA_ROOT, el SHA-256
+    del contenido, el tamaño y cuántos campos de filas lo referencian. Los
+    blobs sin referencias los elimina `recolectar_blobs_media`.
+    """
+    nombre = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name="Nombre",
+        help_text="Ruta relativa a MEDIA_ROOT (contenido/ab/cd/<sha256><ext>)"
+    )
+    digest = models.CharField(
+        max_length=64,
+        db_index=True,
+        verbose_name="SHA-256"
+    )
+    tamano = models.BigIntegerField(
+        verbose_name="Tamaño (bytes)"
+    )
+    # Con signo: el ajuste F('referencias') - 1 no debe desbordar un UNSIGNED en MySQL
+    referencias = models.IntegerField(
+        default=0,
+        verbose_name="Referencias",
+        help_text="Campos de archivo que apuntan a este blob"
+    )
+    creado_en = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Fecha de Creación"
+    )
+    modificado_en = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Última Modificación",
+        help_text="Último registro o ajuste de referencias; la recolección respeta un periodo de gracia desde aquí"
+    )
+
+    class Meta:
+        db_table = 'sys_blobs_contenido'
+        verbose_name = "Blob de Contenido"
+        verbose_name_plural = "Blobs de Contenido"
+
+    def __str__(self):
+        return f"{self.nombre} ({self.referencias} ref.)"
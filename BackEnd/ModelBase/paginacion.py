@@ -0,0 +1,214 @@
+"""
+Paginación por cursor (keyset) para listados de alto volumen.
+
+`PageNumberPagination` ejecuta un COUNT(*) completo y un OFFSET que recorre y
+descarta todas las filas anteriores: la página 10.000 de auditoria_global
+cuesta 10.000 veces la primera. Aquí cada página continúa desde la última
+fila entregada, ordenando por (fecha, id) descendente:
+
+    WHERE fecha <= :f AND (fecha < :f OR id < :id)
+    ORDER BY fecha DESC, id DESC LIMIT :n + 1
+
+El primer término es un rango sobre el índice de la fecha (InnoDB agrega el
+PK a cada índice secundario, así que equivale a un índice (fecha, id)); el
+segundo solo desempata filas con la misma fecha. Cualquier página cuesta lo
+mismo que la primera y los filtros del ViewSet se aplican antes, sin cambios.
+
+Parámetros:
+  - cursor:    opaco, tomado de `next` / `previous` de la respuesta anterior.
+  - page_size: filas por página (máximo `max_page_size`).
+  - total:     'aprox' agrega un conteo estimado desde las estadísticas de la
+               tabla (o el EXPLAIN de la consulta filtrada); 'exacto' hace el
+               COUNT(*). Sin el parámetro no se cuenta nada.
+
+La vista define el campo de fecha con `cursor_campo` (por defecto creado_en);
+puede ser una ruta con `__` (se lee anotada en cada fila).
+
+El cursor solo tiene sentido en ese orden: si la vista usa OrderingFilter y
+el request trae su parámetro (`ordering`), se responde 400 en lugar de
+ignorarlo en silencio.
+"""
+import base64
+import json
+from collections import OrderedDict
+from math import prod
+
+from django.db import connections
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def q_keyset(campo, fecha, pk, descendente=True):
+    """
+    Filas que van después de (fecha, pk) en el orden (campo, pk) descendente
+    o ascendente. El término externo es un rango sobre el índice de `campo`;
+    el interno solo desempata filas con la misma fecha.
+    """
+    if descendente:
+        return Q(**{f'{campo}__lte': fecha}) & (Q(**{f'{campo}__lt': fecha}) | Q(pk__lt=pk))
+    return Q(**{f'{campo}__gte': fecha}) & (Q(**{f'{campo}__gt': fecha}) | Q(pk__gt=pk))
+
+
+def contar_aproximado(queryset):
+    """
+    Total estimado de filas de `queryset` sin recorrerlas. En MySQL: sin
+    filtros se lee TABLE_ROWS de information_schema; con filtros se usa la
+    estimación del plan (rows × filtered de EXPLAIN). En otros motores hace
+    el COUNT(*) exacto.
+    """
+    consulta = queryset.order_by().values('pk')
+    conexion = connections[queryset.db]
+    if conexion.vendor != 'mysql':
+        return queryset.count()
+
+    with conexion.cursor() as cursor:
+        if not consulta.query.has_filters():
+            cursor.execute(
+                'SELECT TABLE_ROWS FROM information_schema.TABLES '
+                'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s',
+                [queryset.model._meta.db_table],
+            )
+            fila = cursor.fetchone()
+            return int(fila[0] or 0) if fila else 0
+
+        sql, params = consulta.query.sql_with_params()
+        cursor.execute(f'EXPLAIN {sql}', params)
+        columnas = [columna[0] for columna in cursor.description]
+        filas = [dict(zip(columnas, fila)) for fila in cursor.fetchall()]
+    # Join anidado: el resultado se estima como el producto de cada paso
+    return int(prod((fila.get('rows') or 0) * float(fila.get('filtered') or 100) / 100 for fila in filas))
+
+
+class PaginacionKeyset(BasePagination):
+    """
+    Paginación por (cursor_campo, id) descendente. Respuesta:
+    {count, count_aproximado, next, previous, results}; `count` es None si no
+    se pidió `total`.
+    """
+    page_size = 50
+    max_page_size = 500
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    total_query_param = 'total'
+    campo_por_defecto = 'creado_en'
+
+    def _campo(self, view):
+        return getattr(view, 'cursor_campo', None) or self.campo_por_defecto
+
+    def _tamano(self, request):
+        try:
+            tamano = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(tamano, 1), self.max_page_size)
+
+    # ── Cursor ────────────────────────────────────────────────────────────
+    def _codificar(self, fila, atras):
+        datos = {'f': fila.cursor_fecha.isoformat(), 'i': fila.pk, 'r': int(atras)}
+        return base64.urlsafe_b64encode(json.dumps(datos, separators=(',', ':')).encode()).decode()
+
+    def _decodificar(self, valor):
+        try:
+            datos = json.loads(base64.urlsafe_b64decode(valor.encode()).decode())
+            fecha = parse_datetime(datos['f'])
+            if fecha is None:
+                raise ValueError
+            return fecha, int(datos['i']), bool(datos.get('r'))
+        except (ValueError, TypeError, KeyError, UnicodeDecodeError, json.JSONDecodeError):
+            raise NotFound('Cursor inválido')
+
+    def _url(self, fila, atras):
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self._codificar(fila, atras))
+
+    def _rechazar_ordering(self, request, view):
+        """400 si el request pide un orden de OrderingFilter: el cursor lo reemplazaría."""
+        for backend in getattr(view, 'filter_backends', None) or []:
+            if isinstance(backend, type) and issubclass(backend, OrderingFilter) \
+                    and backend.ordering_param in request.query_params:
+                raise ValidationError({
+                    backend.ordering_param: (
+                        f'No se puede combinar con la paginación por cursor, que siempre '
+                        f'ordena por {self._campo(view)} e id descendentes.'
+                    ),
+                })
+
+    # ── API de DRF ────────────────────────────────────────────────────────
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self._rechazar_ordering(request, view)
+        campo = self._campo(view)
+        tamano = self._tamano(request)
+        cursor = request.query_params.get(self.cursor_query_param)
+
+        self.total, self.total_aproximado = None, False
+        modo_total = request.query_params.get(self.total_query_param)
+        if modo_total == 'aprox':
+            self.total, self.total_aproximado = contar_aproximado(queryset), True
+        elif modo_total == 'exacto':
+            self.total = queryset.count()
+
+        queryset = queryset.annotate(cursor_fecha=F(campo))
+        # Una ruta con `__` se filtra sobre la anotación: un filter() aparte
+        # sobre una relación multivaluada agregaría otro JOIN
+        campo = 'cursor_fecha' if '__' in campo else campo
+        atras = False
+        if cursor:
+            fecha, pk, atras = self._decodificar(cursor)
+            if atras:
+                queryset = queryset.filter(q_keyset(campo, fecha, pk, descendente=False)).order_by(campo, 'pk')
+            else:
+                queryset = queryset.filter(q_keyset(campo, fecha, pk)).order_by(f'-{campo}', '-pk')
+        else:
+            queryset = queryset.order_by(f'-{campo}', '-pk')
+
+        filas = list(queryset[:tamano + 1])
+        hay_mas = len(filas) > tamano
+        filas = filas[:tamano]
+        if atras:
+            filas.reverse()
+
+        # Hacia adelante siempre hay "anterior" si se llegó con cursor; hacia
+        # atrás siempre hay "siguiente" (la página de la que se vino)
+        self.siguiente = filas[-1] if filas and (hay_mas if not atras else True) else None
+        self.anterior = filas[0] if filas and (hay_mas if atras else bool(cursor)) else None
+        return filas
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('count', self.total),
+            ('count_aproximado', self.total_aproximado),
+            ('next', self._url(self.siguiente, False) if self.siguiente is not None else None),
+            ('previous', self._url(self.anterior, True) if self.anterior is not None else None),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'count': {'type': 'integer', 'nullable': True},
+                'count_aproximado': {'type': 'boolean'},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class PaginacionKeysetOpcional(PaginacionKeyset):
+    """
+    Para listados que hoy devuelven todas las filas y tienen clientes que
+    esperan un arreglo: solo pagina si el request trae `cursor` o `page_size`.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
@@ -0,0 +1,59 @@
+"""
+Helpers de pruebas para el presupuesto de consultas (ver ModelBase/consultas.py).
+
+Con el presupuesto del archivo, por nombre de ruta:
+
+    class TicketsTests(PresupuestoConsultasMixin, APITestCase):
+        def test_historial(self):
+            self.peticion_con_presupuesto('get', 'tickets-historial-maquina', maquina_id=7)
+
+Con un máximo explícito, alrededor de cualquier bloque:
+
+    with presupuesto_consultas(maximo=4):
+        TicketSerializer(tickets, many=True).data
+
+Ambos fallan con PresupuestoExcedido (un AssertionError) si el bloque
+excede el máximo, repite una sentencia idéntica o ejecuta la misma huella
+UMBRAL_REPETIDAS veces o más.
+"""
+from contextlib import contextmanager
+
+from django.urls import reverse
+
+from .consultas import medir, presupuesto_de, revisar
+
+
+class PresupuestoExcedido(AssertionError):
+    """El bloque medido no respetó su presupuesto de consultas."""
+
+    def __init__(self, problemas, medicion):
+        super().__init__(f'{medicion.resumen()}:\n  - ' + '\n  - '.join(problemas))
+        self.problemas = problemas
+        self.medicion = medicion
+
+
+@contextmanager
+def presupuesto_consultas(maximo=None, ruta=None, metodo='GET', umbral_repetidas=None):
+    """Mide el bloque y falla si excede `maximo` (o el presupuesto de `ruta` + `metodo`)."""
+    if maximo is None and ruta is not None:
+        maximo = presupuesto_de(ruta, metodo)
+    with medir() as medicion:
+        yield medicion
+    problemas = revisar(medicion, maximo, umbral_repetidas)
+    if problemas:
+        raise PresupuestoExcedido(problemas, medicion)
+
+
+class PresupuestoConsultasMixin:
+    """Para TestCase/APITestCase: peticiones medidas contra presupuestos_consultas.json."""
+
+    def peticion_con_presupuesto(self, metodo, ruta, *args, datos=None, **kwargs):
+        """
+        Hace `metodo` sobre reverse(ruta, args/kwargs) con self.client y
+        falla si excede el presupuesto declarado para la ruta. Devuelve la
+        respuesta.
+        """
+        url = reverse(ruta, args=args or None, kwargs=kwargs or None)
+        with presupuesto_consultas(ruta=ruta, metodo=metodo):
+            respuesta = getattr(self.client, metodo.lower())(url, datos, format='json')
+        return respuesta
@@ -0,0 +1,109 @@
+"""
+Secuencias por (prefijo, año) para identificadores generados.
+
+Reemplaza el folio `TK-{año}-{Ticket.objects.count()+1}`, que hacía un COUNT
+de toda la tabla en cada alta, chocaba contra el índice único de `folio` con
+altas concurrentes y nunca reiniciaba por año.
+
+Cada (prefijo, año) tiene una fila en sys_secuencias. Reservar números es:
+
+    SELECT ... FOR UPDATE  →  UPDATE ultimo = ultimo + n  →  COMMIT
+
+en una conexión propia (settings.SECUENCIAS['DB_ALIAS']), de modo que el
+bloqueo dura solo esas dos sentencias y no toda la transacción de quien pidió
+el número. Consecuencia: si la transacción del llamador hace rollback, el
+número ya entregado no se reutiliza (queda un hueco), igual que un
+AUTO_INCREMENT.
+
+Pre-asignación por bloques (opcional, settings.SECUENCIAS['BLOQUES']): cada
+proceso reserva n números de una vez y los entrega desde memoria; solo uno
+de cada n pide un viaje a la BD. A cambio los números dejan de ser
+estrictamente crecientes entre workers y un reinicio pierde lo no usado.
+
+Si la fila no existe se crea arrancando en `inicial()` (ej. el mayor folio ya
+existente del año), para continuar sin choques una numeración previa.
+"""
+import threading
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+from django.utils import timezone
+
+
+def _config():
+    config = getattr(settings, 'SECUENCIAS', {}) or {}
+    alias = config.get('DB_ALIAS', 'secuencias')
+    return {
+        'DB_ALIAS': alias if alias in settings.DATABASES else DEFAULT_DB_ALIAS,
+        'BLOQUE': max(int(config.get('BLOQUE', 1)), 1),
+        'BLOQUES': dict(config.get('BLOQUES', {})),
+    }
+
+
+def tamano_bloque(prefijo):
+    config = _config()
+    return max(int(config['BLOQUES'].get(prefijo, config['BLOQUE'])), 1)
+
+
+# Bloques reservados por este proceso: (prefijo, año) → [siguiente, límite]
+_bloques = {}
+_bloques_lock = threading.Lock()
+
+
+def reservar(prefijo, anio, cantidad=1, inicial=None):
+    """
+    Reserva `cantidad` números consecutivos en la BD y devuelve el primero.
+    Siempre hace un viaje a la BD; normalmente se usa `siguiente()`.
+    """
+    from .models import Secuencia
+
+    alias = _config()['DB_ALIAS']
+    if alias == DEFAULT_DB_ALIAS and transaction.get_connection(alias).in_atomic_block:
+        # Sin conexión propia la reserva vive dentro de la transacción del
+        # llamador: un bloque sobrante se revertiría con ella y se repetirían
+        # números ya entregados desde memoria
+        cantidad = 1
+
+    secuencias = Secuencia.objects.using(alias)
+    while True:
+        with transaction.atomic(using=alias):
+            fila = secuencias.select_for_update().filter(prefijo=prefijo, anio=anio).first()
+            if fila is not None:
+                secuencias.filter(pk=fila.pk).update(ultimo=fila.ultimo + cantidad)
+                return fila.ultimo + 1, cantidad
+
+        # La fila se crea fuera del SELECT ... FOR UPDATE: en MySQL dos
+        # creadores simultáneos con gap locks terminarían en deadlock
+        try:
+            with transaction.atomic(using=alias):
+                secuencias.create(prefijo=prefijo, anio=anio, ultimo=inicial() if inicial else 0)
+        except IntegrityError:
+            pass  # Otro proceso la creó al mismo tiempo
+
+
+def siguiente(prefijo, anio=None, inicial=None):
+    """
+    Siguiente número de la secuencia (prefijo, año). `anio` por defecto es
+    el año local actual. `inicial` (callable) da el punto de arranque si la
+    secuencia aún no existe.
+    """
+    anio = anio or timezone.localdate().year
+    llave = (prefijo, anio)
+    with _bloques_lock:
+        bloque = _bloques.get(llave)
+        if bloque is not None and bloque[0] <= bloque[1]:
+            numero = bloque[0]
+            bloque[0] += 1
+            return numero
+
+        primero, cantidad = reservar(prefijo, anio, tamano_bloque(prefijo), inicial)
+        # Se reserva con el lock tomado: un solo hilo por proceso pide bloque
+        _bloques[llave] = [primero + 1, primero + cantidad - 1]
+        return primero
+
+
+def descartar_bloques(prefijo=None):
+    """Olvida los bloques en memoria (los números no usados quedan como hueco)."""
+    with _bloques_lock:
+        for llave in [llave for llave in _bloques if prefijo is None or llave[0] == prefijo]:
+            del _bloques[llave]
@@ -1,3 +1,323 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+import re
+import threading
+from importlib import import_module
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.management import call_command
+from django.db import IntegrityError, connection, connections, transaction
+from django.test import (
+    AsyncRequestFactory, RequestFactory, TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature,
+)
+from django.test.utils import CaptureQueriesContext
+from django.utils.http import http_date
+from rest_framework.request import Request
+from rest_framework.test import APITransactionTestCase
+
+from Casinos.models import Casino
+from Menus.models import MenuConfig
+from Roles.models import Rol
+from Usuarios.models import Usuarios
+
+from .busqueda import buscar
+from .condicional import marcar_cambio
+from .exportacion import respuesta_exportacion
+from .models import EntradaBusqueda, Secuencia, TerminoBusqueda, VersionTabla
+from .secuencias import descartar_bloques, siguiente
+
+
+def lecturas_de_fila(consultas, tabla):
+    """SELECTs capturados cuya tabla principal es `tabla` (comillas de MySQL o SQLite)."""
+    patron = re.compile(rf'^SELECT .+? FROM [`"]{re.escape(tabla)}[`"] WHERE', re.DOTALL)
+    return [consulta['sql'] for consulta in consultas if patron.match(consulta['sql'])]
+
+
+class SeguimientoCambiosTests(TestCase):
+    """Foto de estado cargado de ModeloBase: previous(), changed_fields() y save sin SELECT previo."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.casino = Casino.objects.create(nombre='Casino Centro', direccion='Calle 1', ciudad='CDMX')
+
+    def setUp(self):
+        self.cargado = Casino.objects.get(pk=self.casino.pk)
+
+    def test_previous_y_changed_fields(self):
+        self.cargado.ciudad = 'Monterrey'
+        self.assertEqual(self.cargado.previous('ciudad'), 'CDMX')
+        self.assertEqual(self.cargado.changed_fields(), ['ciudad'])
+
+    def test_sin_cambios(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(self.cargado.changed_fields(), [])
+            self.assertEqual(self.cargado.previous('nombre'), 'Casino Centro')
+
+    def test_save_no_relee_la_fila(self):
+        self.cargado.ciudad = 'Monterrey'
+        with CaptureQueriesContext(connection) as ctx:
+            self.cargado.save()
+        self.assertEqual(lecturas_de_fila(ctx.captured_queries, Casino._meta.db_table), [])
+
+    def test_foto_se_renueva_al_guardar(self):
+        self.cargado.ciudad = 'Monterrey'
+        self.cargado.save()
+        self.assertEqual(self.cargado.changed_fields(), [])
+        self.assertEqual(self.cargado.previous('ciudad'), 'Monterrey')
+
+    def test_update_fields_solo_renueva_esos_campos(self):
+        self.cargado.ciudad = 'Monterrey'
+        self.cargado.direccion = 'Calle 2'
+        self.cargado.save(update_fields=['ciudad'])
+        self.assertEqual(self.cargado.changed_fields(), ['direccion'])
+        self.assertEqual(self.cargado.previous('direccion'), 'Calle 1')
+
+    def test_refresh_from_db_renueva_la_foto(self):
+        Casino.objects.filter(pk=self.casino.pk).update(ciudad='Tijuana')
+        self.cargado.refresh_from_db()
+        self.assertEqual(self.cargado.previous('ciudad'), 'Tijuana')
+        self.assertEqual(self.cargado.changed_fields(), [])
+
+        Casino.objects.filter(pk=self.casino.pk).update(ciudad='Cancún', direccion='Calle 3')
+        self.cargado.refresh_from_db(fields=['ciudad'])
+        self.assertEqual(self.cargado.previous('ciudad'), 'Cancún')
+        self.assertEqual(self.cargado.previous('direccion'), 'Calle 1')
+
+    def test_instancia_nueva(self):
+        nuevo = Casino(nombre='Casino Norte', direccion='Calle 9', ciudad='León')
+        with self.assertNumQueries(0):
+            self.assertIsNone(nuevo.previous('ciudad'))
+            self.assertIsNone(nuevo.valores_previos())
+            self.assertIn('ciudad', nuevo.changed_fields())
+
+    def test_instancia_construida_con_pk_consulta_una_vez(self):
+        a_mano = Casino(pk=self.casino.pk, nombre='Casino Centro', direccion='Calle 1', ciudad='Puebla')
+        with self.assertNumQueries(1):
+            self.assertEqual(a_mano.valores_previos()['ciudad'], 'CDMX')
+            self.assertEqual(a_mano.previous('ciudad'), 'CDMX')
+            self.assertIn('ciudad', a_mano.changed_fields())
+            self.assertNotIn('nombre', a_mano.changed_fields())
+
+
+class RespuestasCondicionalesTests(APITransactionTestCase):
+    """
+    ETag / Last-Modified: el 304 cuesta una consulta (versiones) y no envía
+    cuerpo. Con transacciones reales: las versiones suben en on_commit.
+    """
+
+    URL_MENU = '/api/menus/activo/'
+
+    def setUp(self):
+        self.casino = Casino.objects.create(nombre='Casino Centro', direccion='Calle 1', ciudad='CDMX')
+        self.usuario = Usuarios.objects.create_user(
+            username='admin', email='admin@nexus.mx', password='clave-segura-123', nombres='Admin',
+            apellido_paterno='Pruebas', casino=self.casino, rol=Rol.objects.create(nombre='ADMINISTRADOR'),
+        )
+        MenuConfig.objects.create(configuracion=[{'label': 'Inicio'}])
+
+    def _version(self):
+        return VersionTabla.objects.get(tabla='Menus.MenuConfig').version
+
+    def test_respuesta_completa_lleva_validadores(self):
+        respuesta = self.client.get(self.URL_MENU)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.json(), [{'label': 'Inicio'}])
+        self.assertTrue(respuesta['ETag'])
+        self.assertEqual(
+            respuesta['Last-Modified'],
+            http_date(VersionTabla.objects.get(tabla='Menus.MenuConfig').modificado_en.timestamp()),
+        )
+
+    def test_if_none_match_vigente_responde_304_sin_cuerpo(self):
+        etag = self.client.get(self.URL_MENU)['ETag']
+        with self.assertNumQueries(1):
+            respuesta = self.client.get(self.URL_MENU, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 304)
+        self.assertEqual(respuesta.content, b'')
+        self.assertEqual(respuesta['ETag'], etag)
+
+    def test_if_modified_since_vigente_responde_304(self):
+        last_modified = self.client.get(self.URL_MENU)['Last-Modified']
+        respuesta = self.client.get(self.URL_MENU, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(respuesta.status_code, 304)
+
+    def test_cambio_confirmado_invalida_el_etag(self):
+        etag = self.client.get(self.URL_MENU)['ETag']
+        # queryset.update() no dispara signals: se marca a mano
+        MenuConfig.objects.update(configuracion=[])
+        marcar_cambio('Menus.MenuConfig')
+        respuesta = self.client.get(self.URL_MENU, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.json(), [])
+        self.assertNotEqual(respuesta['ETag'], etag)
+
+    def test_cambio_revertido_no_incrementa_la_version(self):
+        etag = self.client.get(self.URL_MENU)['ETag']
+        version = self._version()
+        try:
+            with transaction.atomic():
+                MenuConfig.objects.first().save()
+                raise IntegrityError('revertir')
+        except IntegrityError:
+            pass
+        self.assertEqual(self._version(), version)
+        self.assertEqual(self.client.get(self.URL_MENU, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_varios_cambios_en_una_transaccion_cuentan_una_vez(self):
+        version = self._version()
+        with transaction.atomic():
+            menu = MenuConfig.objects.first()
+            menu.save()
+            menu.save()
+            marcar_cambio('Menus.MenuConfig')
+        self.assertEqual(self._version(), version + 1)
+
+    def test_etag_depende_de_los_parametros(self):
+        self.client.force_authenticate(user=self.usuario)
+        todos = self.client.get('/api/casinos/lista/')
+        filtrados = self.client.get('/api/casinos/lista/', {'ciudad': 'CDMX'})
+        self.assertEqual(todos.status_code, 200)
+        self.assertNotEqual(todos['ETag'], filtrados['ETag'])
+        with self.assertNumQueries(1):
+            respuesta = self.client.get('/api/casinos/lista/', HTTP_IF_NONE_MATCH=todos['ETag'])
+        self.assertEqual(respuesta.status_code, 304)
+        self.assertEqual(respuesta.content, b'')
+
+
+def en_paralelo(hilos, funcion):
+    """Ejecuta `funcion(indice)` en `hilos` hilos a la vez; devuelve sus resultados y re-lanza el primer error."""
+    resultados, errores = [None] * hilos, []
+    barrera = threading.Barrier(hilos)
+
+    def trabajo(indice):
+        try:
+            barrera.wait()
+            resultados[indice] = funcion(indice)
+        except Exception as error:  # noqa: BLE001 - se re-lanza en el hilo principal
+            errores.append(error)
+        finally:
+            connections.close_all()
+
+    trabajadores = [threading.Thread(target=trabajo, args=(indice,)) for indice in range(hilos)]
+    for trabajador in trabajadores:
+        trabajador.start()
+    for trabajador in trabajadores:
+        trabajador.join()
+    if errores:
+        raise errores[0]
+    return resultados
+
+
+class SecuenciasTests(TransactionTestCase):
+    """Reserva de números por (prefijo, año), con transacciones reales."""
+
+    databases = {'default', 'secuencias'}
+
+    def setUp(self):
+        descartar_bloques()
+        self.addCleanup(descartar_bloques)
+
+    def test_numeros_consecutivos_por_prefijo_y_anio(self):
+        self.assertEqual([siguiente('PR', 2026) for _ in range(3)], [1, 2, 3])
+        self.assertEqual(siguiente('PR', 2027), 1)
+        self.assertEqual(siguiente('OT', 2026), 1)
+        self.assertEqual(Secuencia.objects.get(prefijo='PR', anio=2026).ultimo, 3)
+
+    def test_arranca_desde_inicial(self):
+        self.assertEqual(siguiente('PR', 2026, inicial=lambda: 41), 42)
+        # `inicial` solo se usa al crear la fila
+        self.assertEqual(siguiente('PR', 2026, inicial=lambda: 900), 43)
+
+    @override_settings(SECUENCIAS={'DB_ALIAS': 'secuencias', 'BLOQUES': {'PR': 10}})
+    def test_bloque_entrega_desde_memoria(self):
+        self.assertEqual(siguiente('PR', 2026), 1)
+        with self.assertNumQueries(0, using='secuencias'), self.assertNumQueries(0):
+            self.assertEqual([siguiente('PR', 2026) for _ in range(9)], list(range(2, 11)))
+        self.assertEqual(Secuencia.objects.get(prefijo='PR', anio=2026).ultimo, 10)
+        self.assertEqual(siguiente('PR', 2026), 11)
+        self.assertEqual(Secuencia.objects.get(prefijo='PR', anio=2026).ultimo, 20)
+
+    @override_settings(SECUENCIAS={'DB_ALIAS': 'secuencias', 'BLOQUE': 1})
+    def test_rollback_del_llamador_no_reutiliza_el_numero(self):
+        try:
+            with transaction.atomic():
+                self.assertEqual(siguiente('PR', 2026), 1)
+                raise IntegrityError('revertir')
+        except IntegrityError:
+            pass
+        self.assertEqual(siguiente('PR', 2026), 2)
+
+    @override_settings(SECUENCIAS={'DB_ALIAS': 'secuencias', 'BLOQUES': {'PR': 5000}})
+    def test_hilos_comparten_el_bloque_sin_repetidos(self):
+        resultados = en_paralelo(8, lambda _: [siguiente('PR', 2026) for _ in range(250)])
+        numeros = [numero for lote in resultados for numero in lote]
+        self.assertEqual(sorted(numeros), list(range(1, 2001)))
+        self.assertEqual(Secuencia.objects.get(prefijo='PR', anio=2026).ultimo, 5000)
+
+    @skipUnlessDBFeature('has_select_for_update')
+    def test_hilos_concurrentes_sin_repetidos(self):
+        hilos, por_hilo = 8, 250
+        resultados = en_paralelo(hilos, lambda _: [siguiente('PR', 2026) for _ in range(por_hilo)])
+        numeros = [numero for lote in resultados for numero in lote]
+        self.assertEqual(sorted(numeros), list(range(1, hilos * por_hilo + 1)))
+
+
+@override_settings(EXPORTACIONES={'LOTE': 2})
+class ExportacionStreamingTests(TestCase):
+    """Bajo ASGI el cuerpo es asíncrono y sale lote por lote, igual que bajo WSGI."""
+
+    URL = '/exportar/'
+
+    @classmethod
+    def setUpTestData(cls):
+        for numero in range(5):
+            Casino.objects.create(nombre=f'Casino {numero}', direccion='Calle 1', ciudad='CDMX')
+
+    def _respuesta(self, fabrica, **params):
+        return respuesta_exportacion(
+            Request(fabrica.get(self.URL, params)), Casino.objects.all(), ['id', 'nombre'],
+            campo_fecha='creado_en', campo_casino='id', nombre='casinos',
+        )
+
+    def test_wsgi_ndjson(self):
+        respuesta = self._respuesta(RequestFactory())
+        self.assertFalse(respuesta.is_async)
+        trozos = list(respuesta.streaming_content)
+        self.assertEqual(len(trozos), 3)
+        nombres = [json.loads(linea)['nombre'] for linea in b''.join(trozos).splitlines()]
+        self.assertEqual(nombres, [f'Casino {numero}' for numero in range(5)])
+
+    async def test_asgi_entrega_lote_por_lote(self):
+        respuesta = await sync_to_async(self._respuesta)(AsyncRequestFactory(), formato='csv')
+        self.assertTrue(respuesta.is_async)
+        trozos = [trozo async for trozo in respuesta.streaming_content]
+        self.assertEqual(len(trozos), 3)
+        self.assertEqual(trozos[0].decode().splitlines()[0], 'creado_en,id,nombre')
+        self.assertEqual(len(b''.join(trozos).splitlines()), 6)
+        esperado = await sync_to_async(lambda: b''.join(self._respuesta(RequestFactory(), formato='csv')))()
+        self.assertEqual(b''.join(trozos), esperado)
+
+    async def test_asgi_gzip(self):
+        respuesta = await sync_to_async(self._respuesta)(AsyncRequestFactory(), gzip='1')
+        comprimido = b''.join([trozo async for trozo in respuesta.streaming_content])
+        self.assertEqual(respuesta['Content-Type'], 'application/gzip')
+        self.assertEqual(len(gzip.decompress(comprimido).splitlines()), 5)
+
+
+class IndiceBusquedaInicialTests(TestCase):
+    """La migración 0005 y reconstruir_indice_busqueda llenan el índice con lo que ya hay en las tablas."""
+
+    def setUp(self):
+        Casino.objects.create(nombre='Casino Tulipanes', direccion='Calle 1', ciudad='Puebla')
+        TerminoBusqueda.objects.all().delete()
+        EntradaBusqueda.objects.all().delete()
+        self.assertEqual(buscar('tulipanes'), [])
+
+    def test_comando_reconstruye(self):
+        call_command('reconstruir_indice_busqueda', stdout=io.StringIO())
+        self.assertEqual([resultado['label'] for resultado in buscar('tulipanes')], ['Casino Tulipanes'])
+
+    def test_migracion_indexa_lo_existente(self):
+        import_module('ModelBase.migrations.0005_indice_busqueda_inicial').poblar_indice(None, None)
+        self.assertEqual([resultado['label'] for resultado in buscar('tulipanes')], ['Casino Tulipanes'])
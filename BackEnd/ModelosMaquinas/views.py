@@ -3,6 +3,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from .models import ModeloMaquina
 from .serializers import ModeloMaquinaSerializer
+from ModelBase.condicional import respuesta_condicional
 
 import logging
 logger = logging.getLogger(__name__)
@@ -18,6 +19,10 @@ class ModeloMaquinaViewSet(viewsets.ModelViewSet):
         return ModeloMaquina.objects.filter(esta_activo=True).select_related('proveedor', 'proveedor__casino')
 
     @action(detail=False, methods=['get'], url_path='lista')
+    @respuesta_condicional(
+        'modelos.lista',
+        tablas=['ModelosMaquinas.ModeloMaquina', 'Proveedores.Proveedor', 'Casinos.Casino', 'Maquinas.Maquina'],
+    )
     def lista_todos(self, request):
         """Muestra todos los modelos (incluyendo inactivos) para administración."""
         queryset = ModeloMaquina.objects.all().select_related('proveedor', 'proveedor__casino').order_by('nombre_modelo')
@@ -0,0 +1,62 @@
+"""
+Reglas de audiencia de notificaciones.
+
+Una notificación es visible para un usuario si cumple cualquiera de:
+  1. es_global == True
+  2. usuario_destino == usuario
+  3. casino_destino == usuario.casino Y rol_destino == usuario.rol
+  4. casino_destino == usuario.casino sin rol ni usuario destino
+
+Estas reglas se usan en ambos sentidos: desde el usuario (qué notificaciones
+ve → `q_visibles_para`) y desde la notificación (quiénes la ven →
+`q_audiencia`). Ambas funciones deben mantenerse en espejo.
+"""
+from django.db.models import Q
+
+# Campos de Notificacion que determinan su audiencia
+CAMPOS_AUDIENCIA = ('es_global', 'usuario_destino', 'casino_destino', 'rol_destino')
+
+
+def q_visibles_para(usuario):
+    """Q sobre Notificacion con las notificaciones que `usuario` puede ver."""
+    # OJO: la condición 4 excluye usuario_destino para que las
+    # notificaciones personales no "filtren" al resto del casino.
+    return (
+        Q(es_global=True) |
+        Q(usuario_destino=usuario) |
+        Q(casino_destino=usuario.casino_id, rol_destino=usuario.rol_id) |
+        Q(casino_destino=usuario.casino_id, rol_destino__isnull=True, usuario_destino__isnull=True)
+    )
+
+
+def q_audiencia(es_global, usuario_id, casino_id, rol_id):
+    """Q sobre Usuarios con los usuarios que ven una notificación con esos destinos."""
+    if es_global:
+        return Q()
+    condicion = Q(pk=usuario_id) if usuario_id is not None else Q(pk__in=[])
+    condicion |= Q(casino_id=casino_id, rol_id=rol_id)
+    if rol_id is None and usuario_id is None:
+        condicion |= Q(casino_id=casino_id)
+    return condicion
+
+
+def q_audiencia_de(notificacion):
+    return q_audiencia(
+        notificacion.es_global,
+        notificacion.usuario_destino_id,
+        notificacion.casino_destino_id,
+        notificacion.rol_destino_id,
+    )
+
+
+def es_audiencia(notificacion, usuario):
+    """Versión en memoria de las reglas (sin consultas) para un usuario concreto."""
+    if notificacion.es_global:
+        return True
+    if notificacion.usuario_destino_id is not None and notificacion.usuario_destino_id == usuario.pk:
+        return True
+    if notificacion.casino_destino_id != usuario.casino_id:
+        return False
+    if notificacion.rol_destino_id == usuario.rol_id:
+        return True
+    return notificacion.rol_destino_id is None and notificacion.usuario_destino_id is None
@@ -0,0 +1,193 @@
+"""
+Bandeja de entrada materializada (fan-out en escritura).
+
+Con settings.NOTIFICACIONES['BANDEJA'] = True, al crear una Notificacion se
+inserta una fila BandejaNotificacion por cada usuario activo de su
+audiencia. El reparto se hace con bulk_create en lotes de BANDEJA_LOTE y se
+difiere a `transaction.on_commit`, fuera de la transacción que creó la
+notificación (si esta hace rollback, no se reparte nada).
+
+Con la bandeja activa, NotificacionViewSet lista desde
+sys_notificaciones_bandeja (rango sobre el índice usuario+activa+creado_en)
+en lugar del OR de audiencias con DISTINCT. Con False (default) se usa la
+consulta original y esta tabla no se escribe.
+
+Sincronización:
+  - Notificación editada (audiencia o esta_activo) → se re-sincronizan sus filas
+  - Usuario creado, reactivado o con cambio de casino/rol → se re-sincronizan
+    sus filas (recibe lo que hoy le es visible, como en la consulta original)
+  - Lectura creada/eliminada → se actualiza `leida`
+
+Al activar la bandeja por primera vez: `python manage.py reconstruir_bandeja`.
+"""
+from django.conf import settings
+from django.db import transaction
+
+from .audiencia import q_audiencia_de, q_visibles_para
+
+
+def _config():
+    config = getattr(settings, 'NOTIFICACIONES', {}) or {}
+    return {
+        'BANDEJA': bool(config.get('BANDEJA', False)),
+        'BANDEJA_LOTE': max(int(config.get('BANDEJA_LOTE', 1000)), 1),
+    }
+
+
+def bandeja_habilitada():
+    return _config()['BANDEJA']
+
+
+def _insertar(filas):
+    from .models import BandejaNotificacion
+
+    if filas:
+        BandejaNotificacion.objects.bulk_create(
+            filas, batch_size=_config()['BANDEJA_LOTE'], ignore_conflicts=True
+        )
+
+
+def _ids_audiencia(notificacion):
+    from Usuarios.models import Usuarios
+
+    return Usuarios.objects.filter(q_audiencia_de(notificacion), esta_activo=True).values_list('pk', flat=True)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Reparto por notificación
+# ──────────────────────────────────────────────────────────────────────────────
+def repartir(notificacion):
+    """Inserta las filas de la audiencia de una notificación recién creada."""
+    from .models import BandejaNotificacion
+
+    lote = _config()['BANDEJA_LOTE']
+    filas = []
+    for usuario_id in _ids_audiencia(notificacion).iterator(chunk_size=lote):
+        filas.append(BandejaNotificacion(
+            usuario_id=usuario_id,
+            notificacion_id=notificacion.pk,
+            activa=notificacion.esta_activo,
+            creado_en=notificacion.creado_en,
+        ))
+        if len(filas) >= lote:
+            _insertar(filas)
+            filas = []
+    _insertar(filas)
+
+
+def sincronizar_notificacion(notificacion):
+    """Ajusta las filas de una notificación editada a su audiencia y estado actuales."""
+    from .models import BandejaNotificacion, NotificacionUsuario
+
+    filas = BandejaNotificacion.objects.filter(notificacion_id=notificacion.pk)
+    if not notificacion.esta_activo:
+        filas.update(activa=False)
+        return
+
+    audiencia = set(_ids_audiencia(notificacion))
+    existentes = set(filas.values_list('usuario_id', flat=True))
+    filas.exclude(usuario_id__in=audiencia).delete()
+    filas.update(activa=True)
+
+    leidas_por = set(
+        NotificacionUsuario.objects.filter(notificacion_id=notificacion.pk).values_list('usuario_id', flat=True)
+    )
+    _insertar([
+        BandejaNotificacion(
+            usuario_id=usuario_id,
+            notificacion_id=notificacion.pk,
+            leida=usuario_id in leidas_por,
+            activa=True,
+            creado_en=notificacion.creado_en,
+        )
+        for usuario_id in audiencia - existentes
+    ])
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Sincronización por usuario
+# ──────────────────────────────────────────────────────────────────────────────
+def sincronizar_usuario(usuario):
+    """
+    Deja la bandeja del usuario igual a lo que la consulta original le
+    mostraría. Un usuario inactivo se queda sin bandeja.
+    """
+    from .models import BandejaNotificacion, Notificacion, NotificacionUsuario
+
+    filas = BandejaNotificacion.objects.filter(usuario_id=usuario.pk)
+    if not usuario.esta_activo:
+        filas.delete()
+        return
+
+    visibles = dict(
+        Notificacion.objects.filter(q_visibles_para(usuario)).distinct().values_list('pk', 'creado_en')
+    )
+    ids_visibles = list(visibles)
+    activas = set(
+        Notificacion.objects.filter(pk__in=ids_visibles, esta_activo=True).values_list('pk', flat=True)
+    )
+    existentes = set(filas.values_list('notificacion_id', flat=True))
+    filas.exclude(notificacion_id__in=ids_visibles).delete()
+
+    leidas = set(
+        NotificacionUsuario.objects.filter(usuario_id=usuario.pk).values_list('notificacion_id', flat=True)
+    )
+    _insertar([
+        BandejaNotificacion(
+            usuario_id=usuario.pk,
+            notificacion_id=notificacion_id,
+            leida=notificacion_id in leidas,
+            activa=notificacion_id in activas,
+            creado_en=creado_en,
+        )
+        for notificacion_id, creado_en in visibles.items()
+        if notificacion_id not in existentes
+    ])
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Puntos de entrada desde signals (difieren el trabajo a on_commit)
+# ──────────────────────────────────────────────────────────────────────────────
+def programar_reparto(notificacion):
+    if bandeja_habilitada():
+        transaction.on_commit(lambda: repartir(notificacion))
+
+
+def programar_reparto_masivo(notificaciones):
+    """Para altas con bulk_create (no disparan post_save)."""
+    if bandeja_habilitada():
+        notificaciones = list(notificaciones)
+        transaction.on_commit(lambda: [repartir(notificacion) for notificacion in notificaciones])
+
+
+def programar_sincronizacion_notificacion(notificacion):
+    if bandeja_habilitada():
+        transaction.on_commit(lambda: sincronizar_notificacion(notificacion))
+
+
+def programar_sincronizacion_usuario(usuario):
+    if bandeja_habilitada():
+        transaction.on_commit(lambda: sincronizar_usuario(usuario))
+
+
+def marcar_leida(usuario_id, notificacion_id, leida=True):
+    from .models import BandejaNotificacion
+
+    if bandeja_habilitada():
+        BandejaNotificacion.objects.filter(
+            usuario_id=usuario_id, notificacion_id=notificacion_id
+        ).update(leida=leida)
+
+
+def queryset_bandeja(usuario):
+    """
+    Notificaciones activas de la bandeja del usuario, ordenadas por fecha.
+    Anota `leido_bandeja` para que el serializer no consulte las lecturas.
+    """
+    from django.db.models import F
+    from .models import Notificacion
+
+    return Notificacion.objects.filter(
+        bandeja__usuario=usuario,
+        bandeja__activa=True,
+    ).annotate(leido_bandeja=F('bandeja__leida')).order_by('-bandeja__creado_en')
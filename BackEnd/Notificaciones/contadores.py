@@ -0,0 +1,175 @@
+"""
+Mantenimiento del contador materializado de no leídas (ContadorNoLeidas).
+
+`count-no-leidas` se consulta cada 45 s por cada terminal conectada. En lugar
+de recalcular el OR de audiencia + Exists sobre sys_notificaciones_usuarios,
+el endpoint lee una fila por llave primaria. Este módulo la mantiene:
+
+  - Notificación creada activa          → +1 a su audiencia
+  - Notificación editada (audiencia o esta_activo) → -1 a la audiencia
+    anterior y +1 a la nueva, solo para quienes no la han leído
+  - Notificación eliminada              → -1 a su audiencia que no la leyó
+  - Lectura creada (NotificacionUsuario) → -1 al lector
+  - Lectura eliminada directamente       → +1 al lector
+  - Usuario cambia de casino o rol       → se borra su contador (su audiencia cambió)
+
+Los contadores se crean de forma perezosa: si un usuario no tiene fila, la
+primera consulta calcula el valor real y la inserta. Los incrementos usan
+UPDATE ... SET no_leidas = GREATEST(no_leidas ± 1, 0) dentro de la misma
+transacción que el cambio que los origina. Cualquier desviación (ej. carreras
+al crear la fila) se corrige con `python manage.py reconciliar_no_leidas`.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, F, OuterRef, Value
+from django.db.models.functions import Greatest
+
+from .audiencia import CAMPOS_AUDIENCIA, es_audiencia, q_audiencia, q_visibles_para
+
+
+def contar_no_leidas_bd(usuario):
+    """Cálculo completo (consulta original) de las no leídas de un usuario."""
+    from .models import Notificacion, NotificacionUsuario
+
+    lectura_exists = NotificacionUsuario.objects.filter(
+        notificacion=OuterRef('pk'),
+        usuario=usuario
+    )
+    return Notificacion.objects.filter(
+        q_visibles_para(usuario)
+    ).filter(esta_activo=True).distinct().annotate(
+        leido=Exists(lectura_exists)
+    ).filter(leido=False).count()
+
+
+def obtener_no_leidas(usuario):
+    """
+    Devuelve el contador del usuario con una lectura por llave primaria.
+    Si aún no existe, lo calcula y lo inserta.
+    """
+    from .models import ContadorNoLeidas
+
+    valor = ContadorNoLeidas.objects.filter(usuario_id=usuario.pk).values_list('no_leidas', flat=True).first()
+    if valor is not None:
+        return valor
+
+    valor = contar_no_leidas_bd(usuario)
+    try:
+        with transaction.atomic():
+            ContadorNoLeidas.objects.create(usuario_id=usuario.pk, no_leidas=valor)
+    except IntegrityError:
+        # Otro request lo creó primero: se respeta el que ya existe
+        pass
+    return valor
+
+
+def _aplicar(filtro_usuarios, delta, excluir_lectores_de=None):
+    """UPDATE de los contadores existentes de los usuarios que cumplen `filtro_usuarios`."""
+    from Usuarios.models import Usuarios
+    from .models import ContadorNoLeidas, NotificacionUsuario
+
+    contadores = ContadorNoLeidas.objects.all()
+    if filtro_usuarios:
+        contadores = contadores.filter(
+            usuario_id__in=Usuarios.objects.filter(filtro_usuarios).values('pk')
+        )
+    if excluir_lectores_de is not None:
+        contadores = contadores.exclude(
+            usuario_id__in=NotificacionUsuario.objects.filter(
+                notificacion_id=excluir_lectores_de
+            ).values('usuario_id')
+        )
+    return contadores.update(no_leidas=Greatest(F('no_leidas') + delta, Value(0)))
+
+
+def _audiencia_actual(notificacion):
+    return q_audiencia(
+        notificacion.es_global,
+        notificacion.usuario_destino_id,
+        notificacion.casino_destino_id,
+        notificacion.rol_destino_id,
+    )
+
+
+def _audiencia_previa(notificacion):
+    return q_audiencia(*(notificacion.previous(campo) for campo in CAMPOS_AUDIENCIA))
+
+
+def registrar_creacion(notificacion):
+    if notificacion.esta_activo:
+        _aplicar(_audiencia_actual(notificacion), 1)
+
+
+def registrar_creacion_masiva(notificaciones):
+    """Para altas con bulk_create (no disparan post_save)."""
+    for notificacion in notificaciones:
+        registrar_creacion(notificacion)
+
+
+def registrar_cambio(notificacion):
+    """
+    Ajusta contadores si la edición cambió la audiencia o el estado activo.
+    Lee los valores anteriores del seguimiento de cambios de ModeloBase.
+    """
+    estaba_activa = notificacion.previous('esta_activo')
+    audiencia_igual = all(
+        notificacion.previous(campo) == getattr(notificacion, notificacion._meta.get_field(campo).attname)
+        for campo in CAMPOS_AUDIENCIA
+    )
+    if audiencia_igual and estaba_activa == notificacion.esta_activo:
+        return
+    if estaba_activa:
+        _aplicar(_audiencia_previa(notificacion), -1, excluir_lectores_de=notificacion.pk)
+    if notificacion.esta_activo:
+        _aplicar(_audiencia_actual(notificacion), 1, excluir_lectores_de=notificacion.pk)
+
+
+def registrar_eliminacion(notificacion):
+    """Se invoca en pre_delete, cuando las lecturas aún existen."""
+    if notificacion.esta_activo:
+        _aplicar(_audiencia_actual(notificacion), -1, excluir_lectores_de=notificacion.pk)
+
+
+def _ajustar_lector(lectura, delta):
+    from .models import ContadorNoLeidas
+
+    notificacion = lectura.notificacion
+    if notificacion.esta_activo and es_audiencia(notificacion, lectura.usuario):
+        ContadorNoLeidas.objects.filter(usuario_id=lectura.usuario_id).update(
+            no_leidas=Greatest(F('no_leidas') + delta, Value(0))
+        )
+
+
+def registrar_lectura(lectura):
+    _ajustar_lector(lectura, -1)
+
+
+def registrar_lectura_eliminada(lectura):
+    _ajustar_lector(lectura, 1)
+
+
+def invalidar_usuario(usuario_id):
+    """Borra el contador de un usuario; se recalcula en su próxima consulta."""
+    from .models import ContadorNoLeidas
+
+    ContadorNoLeidas.objects.filter(usuario_id=usuario_id).delete()
+
+
+def reconciliar(usuarios, aplicar=True):
+    """
+    Recalcula desde cero el contador de cada usuario.
+    Retorna una lista de (usuario, almacenado | None, real) solo para los
+    usuarios con desviación. Con aplicar=True corrige las filas.
+    """
+    from .models import ContadorNoLeidas
+
+    almacenados = dict(ContadorNoLeidas.objects.values_list('usuario_id', 'no_leidas'))
+    desviaciones = []
+    for usuario in usuarios:
+        real = contar_no_leidas_bd(usuario)
+        almacenado = almacenados.get(usuario.pk)
+        if almacenado == real:
+            continue
+        desviaciones.append((usuario, almacenado, real))
+        if aplicar:
+            ContadorNoLeidas.objects.update_or_create(usuario_id=usuario.pk, defaults={'no_leidas': real})
+    return desviaciones
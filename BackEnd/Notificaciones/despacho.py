@@ -0,0 +1,182 @@
+"""
+Servicio de despacho de notificaciones por rol y casino.
+
+Reemplaza los `_notificar_por_rol_y_casino` que estaban copiados en Tickets,
+TareasEspeciales e IncidenciasInfraestructura y los `Rol.objects.get` por
+nombre de Notificaciones/signals.py. Antes, cada rol costaba un SELECT del
+rol, un INSERT de la notificación y los receptores globales de auditoría de
+ese INSERT. Ahora:
+
+  1. Los roles se resuelven desde un mapa nombre → id cacheado en el
+     proceso (se invalida con los signals de Rol y expira por ROLES_TTL).
+  2. Todas las filas del despacho se insertan con UN solo bulk_create,
+     diferido a `transaction.on_commit`: si la transacción que originó el
+     evento hace rollback, no se notifica nada.
+  3. Se registra UN log de auditoría agregado (tabla Notificacion,
+     registro_id "despacho:<id>") con los ids y destinos creados, en lugar
+     de un log por fila.
+
+Como bulk_create no dispara post_save, el despacho mantiene por su cuenta el
+contador de no leídas, la bandeja materializada y el stream en vivo.
+"""
+import logging
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+PREFIJO_DESPACHO = 'despacho:'
+
+
+def _config():
+    config = getattr(settings, 'NOTIFICACIONES', {}) or {}
+    return {
+        'ROLES_TTL': float(config.get('ROLES_TTL', 300)),
+    }
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Mapa de roles
+# ──────────────────────────────────────────────────────────────────────────────
+_roles = {'mapa': None, 'expira_en': 0.0}
+_roles_lock = threading.Lock()
+
+
+def mapa_roles():
+    """Devuelve {nombre_en_minusculas: id} de todos los roles."""
+    with _roles_lock:
+        if _roles['mapa'] is not None and _roles['expira_en'] > time.monotonic():
+            return _roles['mapa']
+
+    from Roles.models import Rol
+    mapa = {nombre.lower(): rol_id for rol_id, nombre in Rol.objects.values_list('id', 'nombre')}
+    with _roles_lock:
+        _roles['mapa'] = mapa
+        _roles['expira_en'] = time.monotonic() + _config()['ROLES_TTL']
+    return mapa
+
+
+def limpiar_mapa_roles():
+    with _roles_lock:
+        _roles['mapa'] = None
+
+
+def resolver_roles(nombres_rol):
+    """Ids de los roles existentes (sin distinguir mayúsculas), en el orden recibido."""
+    mapa = mapa_roles()
+    ids = []
+    for nombre in nombres_rol:
+        rol_id = mapa.get(nombre.lower())
+        if rol_id is not None and rol_id not in ids:
+            ids.append(rol_id)
+    return ids
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Despacho
+# ──────────────────────────────────────────────────────────────────────────────
+def _auditar(despacho_id, notificaciones):
+    from AuditoriaGlobal.escritor import registrar_evento
+    from AuditoriaGlobal.signals import obtener_usuario_casino
+
+    usuario, casino = obtener_usuario_casino()
+    primera = notificaciones[0]
+    registrar_evento({
+        'tabla': 'Notificacion',
+        'registro_id': f'{PREFIJO_DESPACHO}{despacho_id}',
+        'accion': 'CREATE',
+        'datos_anteriores': None,
+        'datos_nuevos': {
+            'despacho': despacho_id,
+            'cantidad': len(notificaciones),
+            'ids': [notificacion.pk for notificacion in notificaciones],
+            'titulo': primera.titulo,
+            'nivel': primera.nivel,
+            'tipo': primera.tipo,
+            'destinos': [
+                {
+                    'es_global': notificacion.es_global,
+                    'usuario_destino': notificacion.usuario_destino_id,
+                    'casino_destino': notificacion.casino_destino_id,
+                    'rol_destino': notificacion.rol_destino_id,
+                }
+                for notificacion in notificaciones
+            ],
+        },
+        'fecha': timezone.now(),
+        'usuario_id': usuario.pk if usuario else None,
+        'casino_id': casino.pk if casino else None,
+    })
+
+
+def _insertar(despacho_id, notificaciones):
+    from .models import Notificacion
+    from . import bandeja, contadores, stream
+
+    try:
+        with transaction.atomic():
+            creadas = Notificacion.objects.bulk_create(notificaciones)
+            if any(notificacion.pk is None for notificacion in creadas):
+                # MySQL no devuelve los ids de un INSERT múltiple: se recuperan
+                # por la columna indexada `despacho`
+                creadas = list(Notificacion.objects.filter(despacho=despacho_id).order_by('id'))
+            contadores.registrar_creacion_masiva(creadas)
+            _auditar(despacho_id, creadas)
+    except Exception:
+        # Corre en on_commit: la escritura que originó el evento ya está
+        # confirmada, así que se registra y se sigue sin notificar
+        logger.exception(f"Error en despacho de notificaciones {despacho_id}")
+        return []
+
+    bandeja.programar_reparto_masivo(creadas)
+    stream.publicar_notificaciones(creadas)
+    return creadas
+
+
+def despachar(notificaciones):
+    """
+    Inserta una lista de Notificacion (sin guardar) con un solo bulk_create
+    al confirmarse la transacción actual. Retorna el id del despacho.
+    """
+    notificaciones = list(notificaciones)
+    if not notificaciones:
+        return None
+
+    despacho_id = uuid.uuid4().hex[:16]
+    for notificacion in notificaciones:
+        # bulk_create no ejecuta save(): se completan los campos de ModeloBase
+        # (creado_en / modificado_en los asigna auto_now en el INSERT)
+        notificacion.creado_por = notificacion.creado_por or 'SYSTEM'
+        notificacion.modificado_por = notificacion.modificado_por or 'SYSTEM'
+        notificacion.despacho = despacho_id
+
+    # Fuera de atomic() Django ejecuta el callback de inmediato. robust: un
+    # error del reparto no corta los demás callbacks on_commit de la petición
+    transaction.on_commit(lambda: _insertar(despacho_id, notificaciones), robust=True)
+    return despacho_id
+
+
+def notificar_por_rol_y_casino(titulo, contenido, nivel, tipo, casino, nombres_rol, **campos):
+    """
+    Una notificación por cada rol existente de `nombres_rol`, segmentada al
+    casino indicado. Los roles inexistentes se ignoran.
+    """
+    from .models import Notificacion
+
+    return despachar(
+        Notificacion(
+            titulo=titulo,
+            contenido=contenido,
+            nivel=nivel,
+            tipo=tipo,
+            casino_destino=casino,
+            rol_destino_id=rol_id,
+            **campos,
+        )
+        for rol_id in resolver_roles(nombres_rol)
+    )
@@ -0,0 +1,153 @@
+"""
+Management Command: benchmark_stream
+====================================
+Prueba de carga de la entrega en vivo (Notificaciones/stream.py).
+
+Abre N clientes SSE simulados sobre un broker en proceso aislado y mide:
+  - Fase inactiva: consultas SQL mientras los clientes esperan (debe ser 0;
+    solo viajan comentarios `: ping`).
+  - Fase activa: se publican eventos desde un hilo síncrono (igual que los
+    signals en on_commit) y se verifica que cada cliente reciba exactamente
+    los de su audiencia, con la latencia de entrega.
+
+Los usuarios son simulados (pk, casino_id, rol_id): no se necesitan datos en BD.
+
+Uso:
+    python manage.py benchmark_stream
+    python manage.py benchmark_stream --clientes 500 --inactivo 10 --eventos 50
+"""
+import asyncio
+import json
+import statistics
+import time
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from Notificaciones.audiencia import es_audiencia
+from Notificaciones.stream import BrokerEnProceso, flujo_sse
+
+CASINOS = 5
+ROLES = 4
+
+
+def _usuarios(cantidad):
+    return [
+        SimpleNamespace(pk=i, casino_id=(i % CASINOS) + 1, rol_id=(i % ROLES) + 1)
+        for i in range(1, cantidad + 1)
+    ]
+
+
+def _evento(i, clientes):
+    """Rota entre las cuatro formas de audiencia."""
+    forma = i % 4
+    audiencia = {'es_global': False, 'usuario_destino_id': None, 'casino_destino_id': None, 'rol_destino_id': None}
+    if forma == 0:
+        audiencia['es_global'] = True
+    elif forma == 1:
+        audiencia['usuario_destino_id'] = (i % clientes) + 1
+    elif forma == 2:
+        audiencia['casino_destino_id'] = (i % CASINOS) + 1
+        audiencia['rol_destino_id'] = (i % ROLES) + 1
+    else:
+        audiencia['casino_destino_id'] = (i % CASINOS) + 1
+    return {'audiencia': audiencia, 'activa': True, 'json': json.dumps({'id': i})}
+
+
+class Command(BaseCommand):
+    help = 'Prueba de carga del stream de notificaciones: consultas SQL con clientes inactivos y entrega por audiencia'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clientes', type=int, default=200, help='Conexiones SSE simuladas.')
+        parser.add_argument('--inactivo', type=float, default=5.0, help='Segundos de fase inactiva.')
+        parser.add_argument('--eventos', type=int, default=40, help='Eventos publicados en la fase activa.')
+        parser.add_argument('--keepalive', type=float, default=1.0, help='Segundos entre pings.')
+
+    async def _cliente(self, usuario, broker, duracion, keepalive, publicados, recibidos, pings):
+        async for bloque in flujo_sse(usuario, broker=broker, keepalive=keepalive, duracion=duracion):
+            ahora = time.perf_counter()
+            if bloque.startswith(': ping'):
+                pings[0] += 1
+            elif 'event: notificacion' in bloque:
+                evento_id = bloque.split('\n', 1)[0][len('id: '):]
+                recibidos.append((usuario.pk, evento_id, ahora - publicados[evento_id]))
+
+    async def _escenario(self, opciones, capturas):
+        clientes = opciones['clientes']
+        broker = BrokerEnProceso(historial=max(opciones['eventos'], 1), cola=max(opciones['eventos'] * 2, 100))
+        usuarios = _usuarios(clientes)
+        publicados, recibidos, pings = {}, [], [0]
+        duracion = opciones['inactivo'] + 3.0 + opciones['eventos'] * 0.01
+
+        tareas = [
+            asyncio.create_task(self._cliente(
+                usuario, broker, duracion, opciones['keepalive'], publicados, recibidos, pings
+            ))
+            for usuario in usuarios
+        ]
+        await asyncio.sleep(0.2)
+        if broker.suscriptores() != clientes:
+            raise CommandError('No se suscribieron todos los clientes.')
+
+        # ── Fase inactiva ─────────────────────────────────────────────────
+        consultas_antes = sum(len(ctx.captured_queries) for ctx in capturas)
+        await asyncio.sleep(opciones['inactivo'])
+        consultas_inactivo = sum(len(ctx.captured_queries) for ctx in capturas) - consultas_antes
+        pings_inactivo = pings[0]
+
+        # ── Fase activa: publicación desde un hilo síncrono ───────────────
+        eventos = [_evento(i, clientes) for i in range(opciones['eventos'])]
+
+        def publicar():
+            for evento in eventos:
+                inicio = time.perf_counter()
+                evento_id = f'{broker.epoca}-{broker._secuencia + 1}'
+                publicados[evento_id] = inicio
+                broker.publicar(evento)
+
+        await asyncio.get_running_loop().run_in_executor(None, publicar)
+        await asyncio.gather(*tareas)
+
+        esperados = sum(
+            1 for evento in eventos for usuario in usuarios
+            if es_audiencia(SimpleNamespace(**evento['audiencia']), usuario)
+        )
+        return {
+            'consultas_inactivo': consultas_inactivo,
+            'pings_inactivo': pings_inactivo,
+            'esperados': esperados,
+            'recibidos': recibidos,
+            'suscriptores_final': broker.suscriptores(),
+        }
+
+    def handle(self, *args, **options):
+        capturas = [CaptureQueriesContext(connections[alias]) for alias in connections]
+        for ctx in capturas:
+            ctx.__enter__()
+        try:
+            resultado = asyncio.run(self._escenario(options, capturas))
+        finally:
+            for ctx in capturas:
+                ctx.__exit__(None, None, None)
+        consultas_total = sum(len(ctx.captured_queries) for ctx in capturas)
+
+        latencias = sorted(latencia * 1000 for _, _, latencia in resultado['recibidos'])
+        recibidos = len(latencias)
+        p50 = statistics.median(latencias) if latencias else 0
+        p95 = latencias[int(len(latencias) * 0.95) - 1] if latencias else 0
+
+        self.stdout.write(f"  Clientes conectados              → {options['clientes']}")
+        self.stdout.write(f"  Pings en fase inactiva           → {resultado['pings_inactivo']}")
+        self.stdout.write(f"  Consultas SQL en fase inactiva   → {resultado['consultas_inactivo']}")
+        self.stdout.write(f"  Consultas SQL en toda la prueba  → {consultas_total}")
+        self.stdout.write(f"  Entregas esperadas / recibidas   → {resultado['esperados']} / {recibidos}")
+        self.stdout.write(f"  Latencia de entrega p50 / p95    → {p50:.2f} ms / {p95:.2f} ms")
+        self.stdout.write(f"  Suscripciones abiertas al final  → {resultado['suscriptores_final']}")
+
+        if resultado['consultas_inactivo'] or consultas_total:
+            raise CommandError('Los clientes inactivos generaron consultas a la BD.')
+        if recibidos != resultado['esperados']:
+            raise CommandError('La entrega por audiencia no coincide con lo esperado.')
+        self.stdout.write(self.style.SUCCESS('✅ Clientes inactivos sin consultas a BD y entrega por audiencia correcta.'))
@@ -0,0 +1,72 @@
+"""
+Management Command: reconciliar_no_leidas
+=========================================
+Recalcula desde cero el contador materializado de notificaciones no leídas
+(ContadorNoLeidas) de cada usuario activo y reporta las desviaciones
+encontradas respecto al valor almacenado.
+
+El contador se mantiene de forma incremental por signals
+(Notificaciones/contadores.py); este comando es la red de seguridad ante
+carreras o cambios hechos fuera del ORM.
+
+Uso:
+    python manage.py reconciliar_no_leidas
+    python manage.py reconciliar_no_leidas --dry-run          ← Solo reporta, no corrige
+    python manage.py reconciliar_no_leidas --usuario jperez   ← Un solo usuario
+
+Programación recomendada: diaria, después de limpiar_notificaciones.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from Notificaciones.contadores import reconciliar
+from Usuarios.models import Usuarios
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye los contadores de no leídas por usuario y reporta desviaciones'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Solo reporta desviaciones sin corregir los contadores.',
+        )
+        parser.add_argument(
+            '--usuario',
+            help='Username a reconciliar (por defecto todos los usuarios activos).',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        ahora   = timezone.now()
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING('⚠️  MODO DRY-RUN: no se corregirá nada.'))
+
+        self.stdout.write(f'\n📅 Reconciliación iniciada: {ahora.strftime("%Y-%m-%d %H:%M:%S")}\n')
+
+        usuarios = Usuarios.objects.filter(esta_activo=True).only('id', 'username', 'casino_id', 'rol_id')
+        if options['usuario']:
+            usuarios = usuarios.filter(username=options['usuario'])
+            if not usuarios.exists():
+                raise CommandError('El usuario no existe o está inactivo.')
+
+        total = usuarios.count()
+        desviaciones = reconciliar(usuarios.iterator(), aplicar=not dry_run)
+
+        for usuario, almacenado, real in desviaciones:
+            anterior = 'sin contador' if almacenado is None else almacenado
+            self.stdout.write(f'  {usuario.username:<30} almacenado: {anterior!s:>12} → real: {real:>5}')
+
+        sin_fila = sum(1 for _, almacenado, _ in desviaciones if almacenado is None)
+        self.stdout.write(f'  ─────────────────────────────────────────')
+        self.stdout.write(f'  Usuarios revisados             → {total:>5}')
+        self.stdout.write(f'  Con desviación                 → {len(desviaciones) - sin_fila:>5}')
+        self.stdout.write(f'  Sin contador (se crean)        → {sin_fila:>5}\n')
+
+        if dry_run:
+            self.stdout.write(self.style.SUCCESS('✅ Dry-run completado. Sin cambios en la BD.'))
+            return
+        self.stdout.write(self.style.SUCCESS(f'✅ Reconciliación completada. Contadores corregidos: {len(desviaciones)}.'))
@@ -0,0 +1,57 @@
+"""
+Management Command: reconstruir_bandeja
+=======================================
+Reconstruye la bandeja materializada (sys_notificaciones_bandeja) de cada
+usuario activo a partir de la consulta original de audiencias. Se usa al
+activar settings.NOTIFICACIONES['BANDEJA'] por primera vez o para corregir
+desviaciones.
+
+Uso:
+    python manage.py reconstruir_bandeja
+    python manage.py reconstruir_bandeja --usuario jperez   ← Un solo usuario
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from Notificaciones.bandeja import bandeja_habilitada, sincronizar_usuario
+from Notificaciones.models import BandejaNotificacion
+from Usuarios.models import Usuarios
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye la bandeja materializada de notificaciones por usuario'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--usuario',
+            help='Username a reconstruir (por defecto todos los usuarios).',
+        )
+
+    def handle(self, *args, **options):
+        ahora = timezone.now()
+        self.stdout.write(f'\n📅 Reconstrucción iniciada: {ahora.strftime("%Y-%m-%d %H:%M:%S")}\n')
+
+        if not bandeja_habilitada():
+            self.stdout.write(self.style.WARNING(
+                "⚠️  NOTIFICACIONES['BANDEJA'] está desactivada: la bandeja se llena pero no se usa para leer."
+            ))
+
+        # Incluye inactivos para vaciar su bandeja
+        usuarios = Usuarios.objects.only('id', 'username', 'casino_id', 'rol_id', 'esta_activo')
+        if options['usuario']:
+            usuarios = usuarios.filter(username=options['usuario'])
+            if not usuarios.exists():
+                raise CommandError('El usuario no existe.')
+
+        filas_antes = BandejaNotificacion.objects.count()
+        total = 0
+        for usuario in usuarios.iterator():
+            sincronizar_usuario(usuario)
+            total += 1
+        filas_despues = BandejaNotificacion.objects.count()
+
+        self.stdout.write(f'  Usuarios procesados            → {total:>7}')
+        self.stdout.write(f'  Filas antes                    → {filas_antes:>7}')
+        self.stdout.write(f'  Filas después                  → {filas_despues:>7}\n')
+        self.stdout.write(self.style.SUCCESS('✅ Bandeja reconstruida.'))
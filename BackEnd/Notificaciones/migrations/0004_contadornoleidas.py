@@ -0,0 +1,27 @@
+# Generated by Django 6.0.2 on 2026-10-18 10:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Notificaciones', '0003_notificacionusuario_and_more'),
+        ('Usuarios', '0007_add_puntos_gamificacion_historico'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContadorNoLeidas',
+            fields=[
+                ('usuario', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='contador_no_leidas', serialize=False, to='Usuarios.usuarios', verbose_name='Usuario')),
+                ('no_leidas', models.IntegerField(default=0, help_text='Notificaciones activas visibles para el usuario que aún no ha marcado como vistas', verbose_name='No Leídas')),
+            ],
+            options={
+                'verbose_name': 'Contador de No Leídas',
+                'verbose_name_plural': 'Contadores de No Leídas',
+                'db_table': 'sys_notificaciones_contadores',
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-18 11:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Notificaciones', '0004_contadornoleidas'),
+        ('Usuarios', '0007_add_puntos_gamificacion_historico'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BandejaNotificacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('leida', models.BooleanField(default=False, verbose_name='¿Leída?')),
+                ('activa', models.BooleanField(default=True, help_text='Copia de Notificacion.esta_activo para filtrar sin JOIN', verbose_name='¿Activa?')),
+                ('creado_en', models.DateTimeField(help_text='Copia de Notificacion.creado_en para ordenar sin JOIN', verbose_name='Fecha de la Notificación')),
+                ('notificacion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bandeja', to='Notificaciones.notificacion', verbose_name='Notificación')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bandeja_notificaciones', to='Usuarios.usuarios', verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Bandeja de Notificaciones',
+                'verbose_name_plural': 'Bandejas de Notificaciones',
+                'db_table': 'sys_notificaciones_bandeja',
+                'indexes': [models.Index(fields=['usuario', 'activa', 'creado_en'], name='sys_notific_usuario_aa6bf8_idx'), models.Index(fields=['usuario', 'activa', 'leida'], name='sys_notific_usuario_11c5b7_idx')],
+                'unique_together': {('usuario', 'notificacion')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-18 19:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Notificaciones', '0005_bandejanotificacion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificacion',
+            name='despacho',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Id del despacho masivo que creó la fila (ver Notificaciones/despacho.py)', max_length=16, null=True, verbose_name='Despacho'),
+        ),
+    ]
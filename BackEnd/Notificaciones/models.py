@@ -89,6 +89,16 @@ class Notificacion(ModeloBase):
         help_text="Si es True, la notificación durará 7 días en el sistema"
     )
 
+    despacho = models.CharField(
+        max_length=16,
+        null=True,
+        blank=True,
+        db_index=True,
+        editable=False,
+        verbose_name="Despacho",
+        help_text="Id del despacho masivo que creó la fila (ver Notificaciones/despacho.py)"
+    )
+
     class Meta:
         db_table = 'sys_notificaciones'
         verbose_name = "Notificación"
@@ -137,4 +147,94 @@ class NotificacionUsuario(ModeloBase):
         ]
 
     def __str__(self):
-        return f"{self.usuario} - {self.notificacion.titulo}"
\ No newline at end of file
+        return f"{self.usuario} - {self.notificacion.titulo}"
+
+class ContadorNoLeidas(models.Model):
+    """
+    Contador materializado de notificaciones no leídas por usuario.
+    Lo consulta el polling de count-no-leidas con una lectura por llave
+    primaria, sin tocar sys_notificaciones. Se mantiene de forma incremental
+    desde Notificaciones/contadores.py (vía signals) y se reconstruye con
+    `python manage.py reconciliar_no_leidas`.
+
+    No hereda de ModeloBase: se actualiza con UPDATE ... SET no_leidas = no_leidas ± 1
+    y no requiere trazabilidad.
+    """
+    usuario = models.OneToOneField(
+        Usuarios,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='contador_no_leidas',
+        verbose_name="Usuario"
+    )
+
+    no_leidas = models.IntegerField(
+        default=0,
+        verbose_name="No Leídas",
+        help_text="Notificaciones activas visibles para el usuario que aún no ha marcado como vistas"
+    )
+
+    class Meta:
+        db_table = 'sys_notificaciones_contadores'
+        verbose_name = "Contador de No Leídas"
+        verbose_name_plural = "Contadores de No Leídas"
+
+    def __str__(self):
+        return f"{self.usuario_id}: {self.no_leidas}"
+
+
+class BandejaNotificacion(models.Model):
+    """
+    Bandeja de entrada materializada (fan-out en escritura): una fila por
+    cada usuario que debe ver una notificación. Solo se usa con
+    settings.NOTIFICACIONES['BANDEJA'] = True (ver Notificaciones/bandeja.py).
+
+    Listado, conteo y marcado de lectura del usuario se resuelven como
+    rangos sobre los índices (usuario, activa, ...) en lugar del OR de
+    audiencias sobre sys_notificaciones.
+
+    No hereda de ModeloBase: se escribe con bulk_create/update masivos y no
+    requiere trazabilidad (la notificación y la lectura ya se auditan).
+    """
+    usuario = models.ForeignKey(
+        Usuarios,
+        on_delete=models.CASCADE,
+        related_name='bandeja_notificaciones',
+        verbose_name="Usuario"
+    )
+
+    notificacion = models.ForeignKey(
+        Notificacion,
+        on_delete=models.CASCADE,
+        related_name='bandeja',
+        verbose_name="Notificación"
+    )
+
+    leida = models.BooleanField(
+        default=False,
+        verbose_name="¿Leída?"
+    )
+
+    activa = models.BooleanField(
+        default=True,
+        verbose_name="¿Activa?",
+        help_text="Copia de Notificacion.esta_activo para filtrar sin JOIN"
+    )
+
+    creado_en = models.DateTimeField(
+        verbose_name="Fecha de la Notificación",
+        help_text="Copia de Notificacion.creado_en para ordenar sin JOIN"
+    )
+
+    class Meta:
+        db_table = 'sys_notificaciones_bandeja'
+        verbose_name = "Bandeja de Notificaciones"
+        verbose_name_plural = "Bandejas de Notificaciones"
+        unique_together = [['usuario', 'notificacion']]
+        indexes = [
+            models.Index(fields=['usuario', 'activa', 'creado_en']),
+            models.Index(fields=['usuario', 'activa', 'leida']),
+        ]
+
+    def __str__(self):
+        return f"{self.usuario_id} - {self.notificacion_id}"
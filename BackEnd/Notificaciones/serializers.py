@@ -19,7 +19,11 @@ class NotificacionSerializer(serializers.ModelSerializer):
     def get_leido(self, obj):
         """
         Determina si la notificación ha sido leída por el usuario actual.
+        Si el queryset viene de la bandeja materializada, el dato ya está anotado.
         """
+        leido_bandeja = getattr(obj, 'leido_bandeja', None)
+        if leido_bandeja is not None:
+            return leido_bandeja
         request = self.context.get('request')
         if request and hasattr(request, 'user'):
             return NotificacionUsuario.objects.filter(
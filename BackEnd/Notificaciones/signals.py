@@ -13,7 +13,7 @@ PROHIBIDO: Notificaciones por creación de máquinas, relevos normales,
 mantenimientos preventivos o altas de usuarios.
 """
 
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
 from django.db.models import Q
 
@@ -80,47 +80,28 @@ def notificar_incidencia_critica(sender, instance, created, **kwargs):
     # Obtener roles específicos del casino afectado
     roles_criticos = ['gerente', 'supervisor_sala', 'supervisor_sistemas']
     
-    # Notificar por casino y rol (usando el nuevo filtro optimizado)
-    from Roles.models import Rol
-    for rol_nombre in roles_criticos:
-        try:
-            rol = Rol.objects.get(nombre__iexact=rol_nombre)
-            crear_notificacion_system(
-                titulo=f"🚨 ALERTA CRÍTICA: Incidencia de Infraestructura",
-                contenido=f"{instance.titulo}\\n\\n"
-                          f"Casino: {instance.casino.nombre}\\n"
-                          f"Categoría: {instance.get_categoria_display()}\\n"
-                          f"Afecta operación: {'SÍ - CIERRE DE ÁREA' if instance.afecta_operacion else 'No'}\\n\\n"
-                          f"Descripción: {instance.descripcion[:300]}\\n\\n"
-                          f"⚠️ Requiere atención inmediata.",
-                nivel='urgente',
-                tipo='infraestructura',
-                casino_destino=instance.casino,
-                rol_destino=rol
-            )
-        except Rol.DoesNotExist:
-            pass  # Si el rol no existe, continuar con el siguiente
+    # Notificar por casino y rol: roles desde el mapa cacheado y un solo
+    # bulk_create (los roles inexistentes se ignoran)
+    from .despacho import notificar_por_rol_y_casino
+    notificar_por_rol_y_casino(
+        titulo=f"🚨 ALERTA CRÍTICA: Incidencia de Infraestructura",
+        contenido=f"{instance.titulo}\\n\\n"
+                  f"Casino: {instance.casino.nombre}\\n"
+                  f"Categoría: {instance.get_categoria_display()}\\n"
+                  f"Afecta operación: {'SÍ - CIERRE DE ÁREA' if instance.afecta_operacion else 'No'}\\n\\n"
+                  f"Descripción: {instance.descripcion[:300]}\\n\\n"
+                  f"⚠️ Requiere atención inmediata.",
+        nivel='urgente',
+        tipo='infraestructura',
+        casino=instance.casino,
+        nombres_rol=roles_criticos,
+    )
 
 
 # ============================================================================
 # TRIGGER 2: TICKET CERRADO/OPERATIVO
 # ============================================================================
 
-# Variable para rastrear estados previos de tickets
-_ticket_estados_previos = {}
-
-@receiver(pre_save, sender='Tickets.Ticket')
-def guardar_estado_previo_ticket(sender, instance, **kwargs):
-    """
-    Guardar el estado previo del ticket antes de guardar.
-    """
-    if instance.pk:
-        try:
-            ticket_anterior = sender.objects.get(pk=instance.pk)
-            _ticket_estados_previos[instance.pk] = ticket_anterior.estado_ciclo
-        except sender.DoesNotExist:
-            pass
-
 @receiver(post_save, sender='Tickets.Ticket')
 def notificar_ticket_resuelto(sender, instance, created, **kwargs):
     """
@@ -130,8 +111,10 @@ def notificar_ticket_resuelto(sender, instance, created, **kwargs):
     if created:
         return
     
-    # Verificar si el estado cambió a 'cerrado'
-    estado_previo = _ticket_estados_previos.get(instance.pk)
+    # Verificar si el estado cambió a 'cerrado'.
+    # El estado previo sale de la foto de ModeloBase: en post_save aún
+    # refleja los valores anteriores al save en curso.
+    estado_previo = instance.previous('estado_ciclo')
     if estado_previo != 'cerrado' and instance.estado_ciclo == 'cerrado':
         # Notificar al reportante
         crear_notificacion_system(
@@ -147,10 +130,7 @@ def notificar_ticket_resuelto(sender, instance, created, **kwargs):
             tipo='ticket',
             usuario_destino=instance.reportante
         )
-        
-        # Limpiar el estado previo
-        if instance.pk in _ticket_estados_previos:
-            del _ticket_estados_previos[instance.pk]
+
 
 
 # ============================================================================
@@ -216,25 +196,134 @@ def notificar_tarea_especial_critica(sender, instance, created, **kwargs):
     if instance.prioridad not in ['critica', 'emergencia']:
         return
     
-    # Notificar al casino específico, roles supervisores
-    from Roles.models import Rol
-    for rol_nombre in ['gerente', 'supervisor_sala', 'supervisor_sistemas']:
-        try:
-            rol = Rol.objects.get(nombre__iexact=rol_nombre)
-            crear_notificacion_system(
-                titulo=f"⚡ Tarea Especial URGENTE",
-                contenido=f"{instance.titulo}\\n\\n"
-                          f"Casino: {instance.casino.nombre}\\n"
-                          f"Prioridad: {instance.get_prioridad_display()}\\n"
-                          f"Fecha límite: {instance.fecha_limite}\\n\\n"
-                          f"Descripción: {instance.descripcion[:300]}",
-                nivel='urgente',
-                tipo='sistema',
-                casino_destino=instance.casino,
-                rol_destino=rol
-            )
-        except Rol.DoesNotExist:
-            pass
+    # Notificar al casino específico, roles supervisores (despacho compartido)
+    from .despacho import notificar_por_rol_y_casino
+    notificar_por_rol_y_casino(
+        titulo=f"⚡ Tarea Especial URGENTE",
+        contenido=f"{instance.titulo}\\n\\n"
+                  f"Casino: {instance.casino.nombre}\\n"
+                  f"Prioridad: {instance.get_prioridad_display()}\\n"
+                  f"Fecha límite: {instance.fecha_limite}\\n\\n"
+                  f"Descripción: {instance.descripcion[:300]}",
+        nivel='urgente',
+        tipo='sistema',
+        casino=instance.casino,
+        nombres_rol=['gerente', 'supervisor_sala', 'supervisor_sistemas'],
+    )
+
+
+# ============================================================================
+# CONTADOR MATERIALIZADO DE NO LEÍDAS (ver Notificaciones/contadores.py)
+# ============================================================================
+
+@receiver(post_save, sender='Notificaciones.Notificacion')
+def contador_notificacion_guardada(sender, instance, created, **kwargs):
+    from . import contadores
+    if created:
+        contadores.registrar_creacion(instance)
+    else:
+        contadores.registrar_cambio(instance)
+
+
+@receiver(pre_delete, sender='Notificaciones.Notificacion')
+def contador_notificacion_eliminada(sender, instance, **kwargs):
+    # pre_delete: las lecturas (CASCADE) todavía existen para excluir a quien ya la leyó
+    from . import contadores
+    contadores.registrar_eliminacion(instance)
+
+
+@receiver(post_save, sender='Notificaciones.NotificacionUsuario')
+def contador_lectura_creada(sender, instance, created, **kwargs):
+    if created:
+        from . import contadores
+        contadores.registrar_lectura(instance)
+
+
+@receiver(post_delete, sender='Notificaciones.NotificacionUsuario')
+def contador_lectura_eliminada(sender, instance, origin=None, **kwargs):
+    # Solo borrados directos de lecturas: en el CASCADE de una notificación
+    # o de un usuario el ajuste ya lo hizo contador_notificacion_eliminada
+    from .models import NotificacionUsuario
+    modelo_origen = getattr(origin, 'model', None) or type(origin)
+    if modelo_origen is not NotificacionUsuario:
+        return
+    from . import contadores
+    contadores.registrar_lectura_eliminada(instance)
+
+
+@receiver(post_save, sender='Usuarios.Usuarios')
+def contador_usuario_cambio_audiencia(sender, instance, created, **kwargs):
+    # Cambiar de casino o de rol cambia qué notificaciones ve el usuario
+    if created:
+        return
+    if instance.previous('casino') != instance.casino_id or instance.previous('rol') != instance.rol_id:
+        from . import contadores
+        contadores.invalidar_usuario(instance.pk)
+
+
+# ============================================================================
+# BANDEJA MATERIALIZADA (solo con NOTIFICACIONES['BANDEJA'], ver bandeja.py)
+# ============================================================================
+
+@receiver(post_save, sender='Notificaciones.Notificacion')
+def bandeja_notificacion_guardada(sender, instance, created, **kwargs):
+    from . import bandeja
+    from .audiencia import CAMPOS_AUDIENCIA
+    if created:
+        bandeja.programar_reparto(instance)
+        return
+    campos = CAMPOS_AUDIENCIA + ('esta_activo',)
+    if any(instance.previous(campo) != getattr(instance, instance._meta.get_field(campo).attname) for campo in campos):
+        bandeja.programar_sincronizacion_notificacion(instance)
+
+
+@receiver(post_save, sender='Notificaciones.NotificacionUsuario')
+def bandeja_lectura_creada(sender, instance, created, **kwargs):
+    if created:
+        from . import bandeja
+        bandeja.marcar_leida(instance.usuario_id, instance.notificacion_id)
+
+
+@receiver(post_delete, sender='Notificaciones.NotificacionUsuario')
+def bandeja_lectura_eliminada(sender, instance, **kwargs):
+    # En el CASCADE de la notificación o del usuario la fila de bandeja
+    # también se elimina, así que el UPDATE simplemente no afecta nada
+    from . import bandeja
+    bandeja.marcar_leida(instance.usuario_id, instance.notificacion_id, leida=False)
+
+
+@receiver(post_save, sender='Usuarios.Usuarios')
+def bandeja_usuario_cambio_audiencia(sender, instance, created, **kwargs):
+    from . import bandeja
+    if created or any(
+        instance.previous(campo) != getattr(instance, instance._meta.get_field(campo).attname)
+        for campo in ('casino', 'rol', 'esta_activo')
+    ):
+        bandeja.programar_sincronizacion_usuario(instance)
+
+
+# ============================================================================
+# ENTREGA EN VIVO (SSE / LONG-POLL, ver stream.py)
+# ============================================================================
+
+@receiver(post_save, sender='Notificaciones.Notificacion')
+def stream_notificacion_creada(sender, instance, created, **kwargs):
+    # Se publica al confirmar: un rollback no debe llegar a las terminales
+    if created:
+        from django.db import transaction
+        from .stream import publicar_notificacion
+        transaction.on_commit(lambda: publicar_notificacion(instance))
+
+
+# ============================================================================
+# MAPA DE ROLES DEL DESPACHO (ver despacho.py)
+# ============================================================================
+
+@receiver(post_save, sender='Roles.Rol')
+@receiver(post_delete, sender='Roles.Rol')
+def despacho_invalidar_roles(sender, **kwargs):
+    from .despacho import limpiar_mapa_roles
+    limpiar_mapa_roles()
 
 
 # ============================================================================
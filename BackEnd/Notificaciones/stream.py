@@ -0,0 +1,281 @@
+"""
+Entrega en vivo de notificaciones (Server-Sent Events y long-poll).
+
+Reemplaza el polling REST de 45 s: el cliente mantiene abierta una conexión
+y recibe cada notificación nueva de su audiencia en cuanto se confirma la
+transacción que la creó. Mientras no hay eventos la conexión solo envía
+comentarios `: ping` y NO toca la base de datos.
+
+Piezas:
+  - Broker: pub/sub con historial acotado. `BrokerEnProceso` vive en memoria
+    del proceso ASGI (un worker). Para varios workers se configura otro
+    broker en settings.NOTIFICACIONES['STREAM_BROKER'] (ruta importable) con
+    la misma interfaz: publicar(), suscribir(), cancelar(), eventos_desde(),
+    ultimo_id().
+  - publicar_notificacion(): lo invocan los signals en `on_commit`. Serializa
+    la notificación UNA vez y la difunde con sus campos de audiencia.
+  - flujo_sse() / esperar_eventos(): generadores async que filtran en memoria
+    por audiencia (Notificaciones/audiencia.py) para cada usuario conectado.
+
+Ids de evento: "<epoca>-<secuencia>". La época cambia en cada arranque del
+proceso; si el cliente reconecta con un id de otra época (o más viejo que el
+historial) recibe un evento `resync` para recargar la lista por REST.
+
+Requiere servir con ASGI (BackEnd/asgi.py: uvicorn, daphne, etc.). Bajo WSGI
+cada conexión abierta ocuparía un worker completo.
+"""
+import asyncio
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+from .audiencia import es_audiencia
+
+# Marca que se encola cuando la cola de un suscriptor se llena
+DESBORDE = object()
+
+
+def _config():
+    config = getattr(settings, 'NOTIFICACIONES', {}) or {}
+    return {
+        'STREAM_BROKER': config.get('STREAM_BROKER', 'Notificaciones.stream.BrokerEnProceso'),
+        'STREAM_HISTORIAL': int(config.get('STREAM_HISTORIAL', 500)),
+        'STREAM_COLA': int(config.get('STREAM_COLA', 100)),
+        'STREAM_KEEPALIVE': float(config.get('STREAM_KEEPALIVE', 20)),
+        'STREAM_DURACION': float(config.get('STREAM_DURACION', 300)),
+        'STREAM_LONGPOLL': float(config.get('STREAM_LONGPOLL', 25)),
+        'STREAM_REINTENTO_MS': int(config.get('STREAM_REINTENTO_MS', 5000)),
+    }
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Broker en proceso
+# ──────────────────────────────────────────────────────────────────────────────
+class Suscripcion:
+    """Cola asyncio de un cliente conectado, ligada a su event loop."""
+
+    def __init__(self, loop, maxsize):
+        self.loop = loop
+        self.cola = asyncio.Queue(maxsize=maxsize)
+
+    def _poner(self, evento):
+        try:
+            self.cola.put_nowait(evento)
+        except asyncio.QueueFull:
+            # Cliente lento: se vacía la cola y se le pide resincronizar
+            while not self.cola.empty():
+                self.cola.get_nowait()
+            self.cola.put_nowait(DESBORDE)
+
+    def entregar(self, evento):
+        """Thread-safe: puede llamarse desde el hilo síncrono que publica."""
+        try:
+            self.loop.call_soon_threadsafe(self._poner, evento)
+        except RuntimeError:
+            # El loop del cliente ya se cerró
+            pass
+
+
+class BrokerEnProceso:
+    """
+    Pub/sub en memoria con historial acotado para reconexiones.
+    Los eventos son dicts: {'id', 'secuencia', 'audiencia', 'activa', 'json'}.
+    """
+
+    def __init__(self, historial=500, cola=100):
+        self.epoca = uuid.uuid4().hex[:8]
+        self._tamano_cola = cola
+        self._lock = threading.Lock()
+        self._suscriptores = set()
+        self._historial = deque(maxlen=historial)
+        self._secuencia = 0
+
+    def publicar(self, evento):
+        with self._lock:
+            self._secuencia += 1
+            evento = dict(evento, secuencia=self._secuencia, id=f'{self.epoca}-{self._secuencia}')
+            self._historial.append(evento)
+            suscriptores = list(self._suscriptores)
+        for suscripcion in suscriptores:
+            suscripcion.entregar(evento)
+        return evento['id']
+
+    def suscribir(self):
+        """Debe llamarse desde el event loop del cliente."""
+        suscripcion = Suscripcion(asyncio.get_running_loop(), self._tamano_cola)
+        with self._lock:
+            self._suscriptores.add(suscripcion)
+        return suscripcion
+
+    def cancelar(self, suscripcion):
+        with self._lock:
+            self._suscriptores.discard(suscripcion)
+
+    def ultimo_id(self):
+        with self._lock:
+            return f'{self.epoca}-{self._secuencia}'
+
+    def eventos_desde(self, ultimo_id):
+        """
+        Eventos posteriores a `ultimo_id`. Retorna (eventos, resync): resync
+        es True si el id es de otra época o ya salió del historial.
+        """
+        if not ultimo_id:
+            return [], False
+        epoca, _, secuencia = ultimo_id.partition('-')
+        if epoca != self.epoca or not secuencia.isdigit():
+            return [], True
+        secuencia = int(secuencia)
+        with self._lock:
+            eventos = [evento for evento in self._historial if evento['secuencia'] > secuencia]
+            primero = self._historial[0]['secuencia'] if self._historial else self._secuencia + 1
+        # Si faltan eventos entre `secuencia` y el más viejo del historial
+        return eventos, secuencia + 1 < primero
+
+    def suscriptores(self):
+        with self._lock:
+            return len(self._suscriptores)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                config = _config()
+                clase = import_string(config['STREAM_BROKER'])
+                _broker = clase(historial=config['STREAM_HISTORIAL'], cola=config['STREAM_COLA'])
+    return _broker
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Publicación (lado síncrono, desde signals)
+# ──────────────────────────────────────────────────────────────────────────────
+def evento_de_notificacion(notificacion):
+    from .serializers import NotificacionSerializer
+
+    # Sin request en el contexto el serializer no consulta lecturas (leido=False)
+    datos = NotificacionSerializer(notificacion).data
+    return {
+        'audiencia': {
+            'es_global': notificacion.es_global,
+            'usuario_destino_id': notificacion.usuario_destino_id,
+            'casino_destino_id': notificacion.casino_destino_id,
+            'rol_destino_id': notificacion.rol_destino_id,
+        },
+        'activa': notificacion.esta_activo,
+        'json': json.dumps(datos, cls=DjangoJSONEncoder),
+    }
+
+
+def publicar_notificacion(notificacion):
+    if notificacion.esta_activo:
+        get_broker().publicar(evento_de_notificacion(notificacion))
+
+
+def publicar_notificaciones(notificaciones):
+    """Para altas con bulk_create (no disparan post_save)."""
+    for notificacion in notificaciones:
+        publicar_notificacion(notificacion)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Consumo (lado async, por cliente)
+# ──────────────────────────────────────────────────────────────────────────────
+def _visible(evento, usuario):
+    return evento['activa'] and es_audiencia(SimpleNamespace(**evento['audiencia']), usuario)
+
+
+def _sse(evento, nombre='notificacion'):
+    return f"id: {evento['id']}\nevent: {nombre}\ndata: {evento['json']}\n\n"
+
+
+def _sse_resync(broker):
+    return f'id: {broker.ultimo_id()}\nevent: resync\ndata: {{}}\n\n'
+
+
+async def flujo_sse(usuario, ultimo_id=None, broker=None, keepalive=None, duracion=None):
+    """
+    Generador async de texto SSE para `usuario` (solo necesita pk, casino_id y
+    rol_id). Termina tras `duracion` segundos para que el cliente reconecte y
+    su token vuelva a validarse.
+    """
+    config = _config()
+    broker = broker or get_broker()
+    keepalive = keepalive or config['STREAM_KEEPALIVE']
+    duracion = duracion or config['STREAM_DURACION']
+
+    # Suscribir antes de leer el historial: no se pierde nada entre ambos pasos
+    suscripcion = broker.suscribir()
+    try:
+        yield f"retry: {config['STREAM_REINTENTO_MS']}\n\n"
+
+        pendientes, resync = broker.eventos_desde(ultimo_id)
+        if resync:
+            yield _sse_resync(broker)
+        ultima_secuencia = 0
+        for evento in pendientes:
+            ultima_secuencia = evento['secuencia']
+            if _visible(evento, usuario):
+                yield _sse(evento)
+
+        limite = time.monotonic() + duracion
+        while (restante := limite - time.monotonic()) > 0:
+            try:
+                evento = await asyncio.wait_for(suscripcion.cola.get(), timeout=min(keepalive, restante))
+            except asyncio.TimeoutError:
+                yield ': ping\n\n'
+                continue
+            if evento is DESBORDE:
+                yield _sse_resync(broker)
+                continue
+            if evento['secuencia'] <= ultima_secuencia:
+                # Ya entregado desde el historial
+                continue
+            if _visible(evento, usuario):
+                yield _sse(evento)
+    finally:
+        broker.cancelar(suscripcion)
+
+
+async def esperar_eventos(usuario, ultimo_id, broker=None, espera=None):
+    """
+    Long-poll: retorna (eventos_visibles, resync, ultimo_id_actual).
+    Si no hay nada visible espera hasta `espera` segundos por un evento nuevo.
+    """
+    broker = broker or get_broker()
+    espera = espera or _config()['STREAM_LONGPOLL']
+
+    suscripcion = broker.suscribir()
+    try:
+        pendientes, resync = broker.eventos_desde(ultimo_id)
+        if resync:
+            return [], True, broker.ultimo_id()
+        visibles = [evento for evento in pendientes if _visible(evento, usuario)]
+        if visibles:
+            return visibles, False, pendientes[-1]['id']
+
+        limite = time.monotonic() + espera
+        while (restante := limite - time.monotonic()) > 0:
+            try:
+                evento = await asyncio.wait_for(suscripcion.cola.get(), timeout=restante)
+            except asyncio.TimeoutError:
+                break
+            if evento is DESBORDE:
+                return [], True, broker.ultimo_id()
+            if _visible(evento, usuario):
+                return [evento], False, evento['id']
+        return [], False, broker.ultimo_id()
+    finally:
+        broker.cancelar(suscripcion)
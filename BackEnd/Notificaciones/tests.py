@@ -1,3 +1,177 @@
-from django.test import TestCase
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase
+
+from Maquinas.tests import crear_sala
+from ModelBase.consultas import medir
+from Roles.models import Rol
+
+from .despacho import notificar_por_rol_y_casino
+from .models import Notificacion
+from .stream import BrokerEnProceso, esperar_eventos, flujo_sse, get_broker
+
+USUARIO = SimpleNamespace(pk=7, casino_id=1, rol_id=3)
+
+
+def evento(titulo, es_global=False, usuario_destino_id=None, casino_destino_id=None, rol_destino_id=None, activa=True):
+    return {
+        'audiencia': {
+            'es_global': es_global,
+            'usuario_destino_id': usuario_destino_id,
+            'casino_destino_id': casino_destino_id,
+            'rol_destino_id': rol_destino_id,
+        },
+        'activa': activa,
+        'json': json.dumps({'titulo': titulo}),
+    }
+
+
+class StreamNotificacionesTests(SimpleTestCase):
+    """
+    Broker en proceso + flujo SSE / long-poll. SimpleTestCase no permite
+    consultas: cualquier acceso a la BD mientras el cliente espera falla.
+    """
+
+    async def test_cliente_inactivo_no_consulta_la_bd(self):
+        broker = BrokerEnProceso()
+        with medir() as medicion:
+            trozos = [trozo async for trozo in flujo_sse(USUARIO, broker=broker, keepalive=0.01, duracion=0.05)]
+        self.assertEqual(medicion.total, 0)
+        self.assertTrue(trozos[0].startswith('retry: '))
+        self.assertTrue(trozos[1:])
+        self.assertEqual(set(trozos[1:]), {': ping\n\n'})
+        self.assertEqual(broker.suscriptores(), 0)
+
+    async def test_solo_entrega_la_audiencia_del_usuario(self):
+        broker = BrokerEnProceso()
+        flujo = flujo_sse(USUARIO, broker=broker, keepalive=5, duracion=5)
+        await flujo.__anext__()  # retry: ya suscrito
+        broker.publicar(evento('otro casino', casino_destino_id=2))
+        broker.publicar(evento('personal ajena', usuario_destino_id=8, casino_destino_id=1))
+        broker.publicar(evento('otro rol', casino_destino_id=1, rol_destino_id=4))
+        broker.publicar(evento('inactiva', es_global=True, activa=False))
+        broker.publicar(evento('mi rol', casino_destino_id=1, rol_destino_id=3))
+        trozo = await asyncio.wait_for(flujo.__anext__(), timeout=1)
+        await flujo.aclose()
+        self.assertIn('event: notificacion', trozo)
+        self.assertIn('"mi rol"', trozo)
+        self.assertIn(f'id: {broker.ultimo_id()}\n', trozo)
+
+    async def test_reconexion_reenvia_el_historial(self):
+        broker = BrokerEnProceso()
+        primero = broker.publicar(evento('uno', es_global=True))
+        broker.publicar(evento('dos', es_global=True))
+        broker.publicar(evento('tres', es_global=True))
+        flujo = flujo_sse(USUARIO, ultimo_id=primero, broker=broker, keepalive=0.01, duracion=5)
+        await flujo.__anext__()
+        entregados = [await flujo.__anext__() for _ in range(3)]
+        await flujo.aclose()
+        self.assertIn('"dos"', entregados[0])
+        self.assertIn('"tres"', entregados[1])
+        self.assertEqual(entregados[2], ': ping\n\n')
+
+    async def test_id_de_otra_epoca_pide_resync(self):
+        broker = BrokerEnProceso()
+        flujo = flujo_sse(USUARIO, ultimo_id='00000000-4', broker=broker, keepalive=5, duracion=5)
+        await flujo.__anext__()
+        trozo = await flujo.__anext__()
+        await flujo.aclose()
+        self.assertIn('event: resync', trozo)
+
+    async def test_cola_llena_pide_resync(self):
+        broker = BrokerEnProceso(cola=2)
+        flujo = flujo_sse(USUARIO, broker=broker, keepalive=5, duracion=5)
+        await flujo.__anext__()
+        for numero in range(5):
+            broker.publicar(evento(f'global {numero}', es_global=True))
+        trozo = await asyncio.wait_for(flujo.__anext__(), timeout=1)
+        await flujo.aclose()
+        self.assertIn('event: resync', trozo)
+
+    async def test_long_poll_despierta_con_evento_visible(self):
+        broker = BrokerEnProceso()
+        desde = broker.ultimo_id()
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.01, broker.publicar, evento('ajena', casino_destino_id=2))
+        loop.call_later(0.02, broker.publicar, evento('personal', usuario_destino_id=7))
+        eventos, resync, actual = await esperar_eventos(USUARIO, desde, broker=broker, espera=2)
+        self.assertFalse(resync)
+        self.assertEqual([json.loads(e['json'])['titulo'] for e in eventos], ['personal'])
+        self.assertEqual(actual, broker.ultimo_id())
+
+    async def test_long_poll_sin_novedades(self):
+        broker = BrokerEnProceso()
+        desde = broker.ultimo_id()
+        with medir() as medicion:
+            eventos, resync, actual = await esperar_eventos(USUARIO, desde, broker=broker, espera=0.05)
+        self.assertEqual((eventos, resync, actual), ([], False, desde))
+        self.assertEqual(medicion.total, 0)
+
+
+class PublicacionNotificacionesTests(TestCase):
+    """Las notificaciones se publican al confirmar la transacción, nunca antes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.casino, _ = crear_sala(0)
+
+    def _crear(self):
+        return Notificacion.objects.create(
+            titulo='Corte programado', contenido='Mañana 8:00', tipo='sistema', casino_destino=self.casino,
+        )
+
+    def test_publica_al_confirmar(self):
+        broker = get_broker()
+        desde = broker.ultimo_id()
+        with self.captureOnCommitCallbacks(execute=True):
+            notificacion = self._crear()
+            self.assertEqual(broker.eventos_desde(desde), ([], False))
+        eventos, _ = broker.eventos_desde(desde)
+        self.assertEqual([json.loads(e['json'])['id'] for e in eventos], [notificacion.pk])
+        self.assertEqual(eventos[0]['audiencia']['casino_destino_id'], self.casino.pk)
+
+    def test_sin_confirmar_no_publica(self):
+        broker = get_broker()
+        desde = broker.ultimo_id()
+        with self.captureOnCommitCallbacks(execute=False):
+            self._crear()
+        self.assertEqual(broker.eventos_desde(desde), ([], False))
+
+
+class DespachoNotificacionesTests(TestCase):
+    """Un despacho que falla en on_commit no revierte ni corta lo ya confirmado."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.casino, _ = crear_sala(0)
+        # Crear el rol renueva el mapa del despacho
+        Rol.objects.create(nombre='SUP SISTEMAS')
+
+    def _despachar(self):
+        return notificar_por_rol_y_casino(
+            'Máquina dañada', 'A001 fuera de servicio', 'alerta', 'ticket', self.casino, ['SUP SISTEMAS'],
+        )
+
+    def test_despacha_al_confirmar(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            despacho_id = self._despachar()
+        self.assertEqual(Notificacion.objects.filter(despacho=despacho_id).count(), 1)
+
+    def test_error_al_insertar_no_propaga(self):
+        posteriores = []
+        with mock.patch('Notificaciones.despacho._auditar', side_effect=RuntimeError('auditoría caída')), \
+                self.assertLogs('Notificaciones.despacho', 'ERROR'), \
+                self.captureOnCommitCallbacks(execute=True):
+            self.casino.ciudad = 'Monterrey'
+            self.casino.save()
+            despacho_id = self._despachar()
+            transaction.on_commit(lambda: posteriores.append('ok'))
+        self.assertEqual(posteriores, ['ok'])
+        self.casino.refresh_from_db()
+        self.assertEqual(self.casino.ciudad, 'Monterrey')
+        # El INSERT del despacho se revierte con su propio atomic()
+        self.assertFalse(Notificacion.objects.filter(despacho=despacho_id).exists())
@@ -1,11 +1,14 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import NotificacionViewSet, NotificacionUsuarioViewSet
+from .views import NotificacionViewSet, NotificacionUsuarioViewSet, espera_notificaciones, stream_notificaciones
 
 router = DefaultRouter()
 router.register(r'notificaciones', NotificacionViewSet, basename='notificaciones')
 router.register(r'notificaciones-usuarios', NotificacionUsuarioViewSet, basename='notificaciones-usuarios')
 
 urlpatterns = [
+    # Antes del router: 'notificaciones/<pk>/' también aceptaría 'stream'
+    path('notificaciones/stream/', stream_notificaciones, name='notificaciones-stream'),
+    path('notificaciones/espera/', espera_notificaciones, name='notificaciones-espera'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
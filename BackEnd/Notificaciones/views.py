@@ -1,9 +1,14 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Q, Exists, OuterRef
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
+from .audiencia import q_visibles_para
+from .bandeja import bandeja_habilitada, queryset_bandeja
+from .contadores import obtener_no_leidas
 from .models import Notificacion, NotificacionUsuario
 from .serializers import NotificacionSerializer, NotificacionUsuarioSerializer
+from .stream import esperar_eventos, flujo_sse, get_broker
+from ModelBase.paginacion import PaginacionKeysetOpcional
 
 class NotificacionViewSet(viewsets.ModelViewSet):
     """
@@ -11,6 +16,14 @@ class NotificacionViewSet(viewsets.ModelViewSet):
     Incluye filtrado por identidad (usuario, casino, rol) y auto-limpieza.
     """
     serializer_class = NotificacionSerializer
+    # Paginación por cursor solo con ?cursor= o ?page_size= (el polling del
+    # frontend sigue recibiendo la lista completa)
+    pagination_class = PaginacionKeysetOpcional
+
+    @property
+    def cursor_campo(self):
+        # La bandeja ordena por la fecha de su propia fila
+        return 'bandeja__creado_en' if bandeja_habilitada() else 'creado_en'
 
     def get_queryset(self):
         """
@@ -33,11 +46,14 @@ class NotificacionViewSet(viewsets.ModelViewSet):
         # 4. Notificaciones para todo el casino (sin rol específico).
         #    OJO: se excluye usuario_destino__isnull=False para que las
         #    notificaciones personales no "filtren" por esta condición.
+        #    (reglas en Notificaciones/audiencia.py)
+        #
+        # Con NOTIFICACIONES['BANDEJA'] se lee la bandeja materializada del
+        # usuario (sin OR ni DISTINCT); si no, la consulta original.
+        if bandeja_habilitada():
+            return queryset_bandeja(user)
         return Notificacion.objects.filter(
-            Q(es_global=True) |
-            Q(usuario_destino=user) |
-            Q(casino_destino=user.casino, rol_destino=user.rol) |
-            Q(casino_destino=user.casino, rol_destino__isnull=True, usuario_destino__isnull=True)
+            q_visibles_para(user)
         ).filter(esta_activo=True).distinct().order_by('-creado_en')
 
     def get_serializer_context(self):
@@ -84,25 +100,10 @@ class NotificacionViewSet(viewsets.ModelViewSet):
     def count_no_leidas(self, request):
         """
         Endpoint rápido para obtener el count de notificaciones no leídas.
-        Optimizado para polling cada 45 segundos.
+        Optimizado para polling cada 45 segundos: lee el contador materializado
+        del usuario (una fila por llave primaria, sin tocar sys_notificaciones).
         """
-        user = request.user
-        
-        # Subconsulta para verificar si existe una lectura del usuario
-        lectura_exists = NotificacionUsuario.objects.filter(
-            notificacion=OuterRef('pk'),
-            usuario=user
-        )
-        
-        # Contar notificaciones que el usuario puede ver y que no ha leído
-        count = Notificacion.objects.filter(
-            Q(es_global=True) |
-            Q(usuario_destino=user) |
-            Q(casino_destino=user.casino, rol_destino=user.rol) |
-            Q(casino_destino=user.casino, rol_destino__isnull=True, usuario_destino__isnull=True)
-        ).filter(esta_activo=True).distinct().annotate(
-            leido=Exists(lectura_exists)
-        ).filter(leido=False).count()
+        count = obtener_no_leidas(request.user)
         
         return Response({'count': count}, status=status.HTTP_200_OK)
 
@@ -154,4 +155,67 @@ class NotificacionUsuarioViewSet(viewsets.ModelViewSet):
             'success': True,
             'created': created,
             'data': serializer.data
-        }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
\ No newline at end of file
+        }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+# ============================================================================
+# ENTREGA EN VIVO (SSE / LONG-POLL) — ver Notificaciones/stream.py
+# ============================================================================
+# Vistas async de Django (no DRF): la conexión queda abierta esperando
+# eventos sin ocupar un hilo. El usuario ya viene resuelto por
+# SessionTokenMiddleware; mientras la conexión espera no hay consultas a BD.
+
+def _no_autorizado():
+    return JsonResponse({'detail': 'Token inválido o sesión expirada'}, status=status.HTTP_401_UNAUTHORIZED)
+
+
+async def stream_notificaciones(request):
+    """
+    GET /api/notificaciones/stream/
+    Server-Sent Events. Reconexión con el header Last-Event-ID (o ?ultimo=).
+    Eventos: `notificacion` (JSON de NotificacionSerializer) y `resync`
+    (el cliente debe recargar la lista por REST).
+    """
+    usuario = request.user
+    if not usuario.is_authenticated:
+        return _no_autorizado()
+
+    ultimo_id = request.headers.get('Last-Event-ID') or request.GET.get('ultimo')
+    response = StreamingHttpResponse(flujo_sse(usuario, ultimo_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Evita que nginx retenga el flujo en su buffer
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def espera_notificaciones(request):
+    """
+    GET /api/notificaciones/espera/
+    Long-poll: el cliente envía If-None-Match con el último ETag recibido.
+      - 200 {eventos: [...], resync: bool} con ETag nuevo si hay novedades
+      - 304 si no llegó nada visible durante la espera
+    Sin If-None-Match responde de inmediato con el ETag actual.
+    """
+    usuario = request.user
+    if not usuario.is_authenticated:
+        return _no_autorizado()
+
+    ultimo_id = request.headers.get('If-None-Match', '').removeprefix('W/').strip('"')
+    if not ultimo_id:
+        eventos, resync, actual = [], False, get_broker().ultimo_id()
+    else:
+        eventos, resync, actual = await esperar_eventos(usuario, ultimo_id)
+        if not eventos and not resync:
+            response = HttpResponseNotModified()
+            response['ETag'] = f'"{actual}"'
+            return response
+
+    response = HttpResponse(
+        '{"eventos": [%s], "resync": %s}' % (
+            ', '.join(evento['json'] for evento in eventos),
+            'true' if resync else 'false',
+        ),
+        content_type='application/json',
+    )
+    response['ETag'] = f'"{actual}"'
+    response['Cache-Control'] = 'no-cache'
+    return response
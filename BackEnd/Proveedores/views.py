@@ -3,6 +3,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from .models import Proveedor
 from .serializers import ProveedorSerializer, ProveedorGestionSerializer, ProveedorVerificacionSerializer
+from ModelBase.condicional import respuesta_condicional
 
 import logging
 logger = logging.getLogger(__name__)
@@ -57,6 +58,7 @@ class ProveedorViewSet(viewsets.ModelViewSet):
         return queryset
     
     @action(detail=False, methods=['get'], url_path='lista')
+    @respuesta_condicional('proveedores.lista', tablas=['Proveedores.Proveedor', 'Casinos.Casino'])
     def lista_proveedores(self, request):
         """Devuelve todos los proveedores, incluyendo inactivos."""
         proveedores = Proveedor.objects.all().order_by('-id')
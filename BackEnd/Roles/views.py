@@ -4,6 +4,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
 from .models import Rol
 from .serializers import RolSerializer
+from ModelBase.condicional import respuesta_condicional
 
 class RolViewSet(viewsets.ModelViewSet):
     """
@@ -15,6 +16,7 @@ class RolViewSet(viewsets.ModelViewSet):
         return Rol.objects.filter(esta_activo=True).order_by('nombre')
     
     @action(detail=False, methods=['get'], url_path='lista')
+    @respuesta_condicional('roles.lista', tablas=['Roles.Rol'])
     def lista_roles(self, request):
         """Devuelve todos los roles, incluyendo inactivos."""
         roles = Rol.objects.all().order_by('nombre')
@@ -11,38 +11,18 @@ from django.db.models.signals import pre_save, post_save
 from django.dispatch import receiver
 from .models import TareaEspecial
 from Notificaciones.models import Notificacion
-from Roles.models import Rol
-
-
-def _notificar_por_rol_y_casino(titulo, contenido, nivel, tipo, casino, nombres_rol):
-    roles = Rol.objects.filter(nombre__in=nombres_rol)
-    for rol in roles:
-        Notificacion.objects.create(
-            titulo        = titulo,
-            contenido     = contenido,
-            nivel         = nivel,
-            tipo          = tipo,
-            casino_destino= casino,
-            rol_destino   = rol,
-        )
+# Despacho compartido: roles cacheados + un solo bulk_create en on_commit
+from Notificaciones.despacho import notificar_por_rol_y_casino
 
 
 # ─────────────────────────────────────────────────────────────
 # Captura estado y técnico asignado ANTES de guardar
 # ─────────────────────────────────────────────────────────────
+# Se lee de la foto de ModeloBase (previous), sin consultar la BD.
 @receiver(pre_save, sender=TareaEspecial)
 def tarea_snapshot_pre_save(sender, instance, **kwargs):
-    if instance.pk:
-        try:
-            prev = TareaEspecial.objects.get(pk=instance.pk)
-            instance._prev_estatus    = prev.estatus
-            instance._prev_asignado_id = prev.asignado_a_id
-        except TareaEspecial.DoesNotExist:
-            instance._prev_estatus     = None
-            instance._prev_asignado_id = None
-    else:
-        instance._prev_estatus     = None
-        instance._prev_asignado_id = None
+    instance._prev_estatus     = instance.previous('estatus')
+    instance._prev_asignado_id = instance.previous('asignado_a')
 
 
 # ─────────────────────────────────────────────────────────────
@@ -56,7 +36,7 @@ def tarea_post_save(sender, instance, created, **kwargs):
 
     # ── 1. Tarea NUEVA ──────────────────────────────────────
     if created:
-        _notificar_por_rol_y_casino(
+        notificar_por_rol_y_casino(
             titulo      = "📌 Nueva Tarea Especial Asignada",
             contenido   = (
                 f"Se ha registrado una nueva tarea especial: \"{titulo}\". "
@@ -87,7 +67,7 @@ def tarea_post_save(sender, instance, created, **kwargs):
             usuario_destino = instance.creado_por_usuario,
         )
         # A la GERENCIA del casino
-        _notificar_por_rol_y_casino(
+        notificar_por_rol_y_casino(
             titulo      = "✅ Tarea Especial Completada",
             contenido   = (
                 f"La tarea especial \"{titulo}\" ha sido finalizada satisfactoriamente en {casino.nombre}."
@@ -1,3 +1,33 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
-# Create your tests here.
+from Maquinas.tests import crear_sala
+from ModelBase.tests import lecturas_de_fila
+from Tickets.tests import crear_usuario
+
+from .models import TareaEspecial
+
+
+class GuardadoTareaTests(TestCase):
+    """Los receivers de TareaEspecial leen el estado previo de la foto, no de la BD."""
+
+    @classmethod
+    def setUpTestData(cls):
+        casino, _ = crear_sala(0)
+        cls.supervisor = crear_usuario(casino, 'SUP SISTEMAS', 'supervisor')
+        cls.tecnico = crear_usuario(casino, 'TECNICO', 'tecnico')
+        cls.tarea = TareaEspecial.objects.create(
+            titulo='Cambio de luminarias', descripcion='Pasillo norte',
+            casino=casino, creado_por_usuario=cls.supervisor,
+        )
+
+    def test_asignar_y_completar_sin_releer(self):
+        tarea = TareaEspecial.objects.get(pk=self.tarea.pk)
+        tarea.asignado_a = self.tecnico
+        tarea.estatus = 'completada'
+        with CaptureQueriesContext(connection) as ctx, self.captureOnCommitCallbacks(execute=True):
+            tarea.save()
+        self.assertEqual(lecturas_de_fila(ctx.captured_queries, TareaEspecial._meta.db_table), [])
+        self.assertEqual(tarea._prev_estatus, 'pendiente')
+        self.assertIsNone(tarea._prev_asignado_id)
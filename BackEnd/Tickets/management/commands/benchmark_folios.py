@@ -0,0 +1,107 @@
+"""
+Management Command: benchmark_folios
+====================================
+Compara el costo de generar un folio con el esquema anterior
+(`Ticket.objects.count() + 1`) contra la secuencia por (prefijo, año) de
+ModelBase/secuencias.py, con y sin pre-asignación por bloques.
+
+Solo se mide la generación del número (consultas SQL y tiempo por folio);
+no se crean tickets. La secuencia de prueba usa el prefijo TKBENCH y se
+elimina al terminar, sin tocar la numeración real.
+
+Uso:
+    python manage.py benchmark_folios
+    python manage.py benchmark_folios --iteraciones 2000 --bloque 50
+"""
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+from ModelBase.models import Secuencia
+from ModelBase.secuencias import descartar_bloques
+from Tickets.models import Ticket
+
+PREFIJO = 'TKBENCH'
+
+
+def _folio_anterior():
+    count = Ticket.objects.count() + 1
+    return f"TK-{timezone.localdate().year}-{count:04d}"
+
+
+def _folio_secuencia():
+    return Ticket.generar_folio(prefijo=PREFIJO)
+
+
+class Command(BaseCommand):
+    help = 'Compara COUNT()+1 contra la secuencia de folios (con y sin bloques)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iteraciones', type=int, default=500, help='Folios generados por escenario.')
+        parser.add_argument('--bloque', type=int, default=20, help='Tamaño de bloque del escenario con pre-asignación.')
+
+    def _medir(self, generar, iteraciones):
+        capturas = [CaptureQueriesContext(connections[alias]) for alias in connections]
+        for ctx in capturas:
+            ctx.__enter__()
+        tiempos = []
+        try:
+            for _ in range(iteraciones):
+                inicio = time.perf_counter()
+                generar()
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+        finally:
+            for ctx in capturas:
+                ctx.__exit__(None, None, None)
+        consultas = sum(len(ctx.captured_queries) for ctx in capturas)
+        tiempos.sort()
+        return {
+            'consultas': consultas / iteraciones,
+            'p50': statistics.median(tiempos),
+            'p95': tiempos[max(int(len(tiempos) * 0.95) - 1, 0)],
+            'total': sum(tiempos),
+        }
+
+    def _limpiar(self):
+        Secuencia.objects.filter(prefijo=PREFIJO).delete()
+        descartar_bloques(PREFIJO)
+
+    def handle(self, *args, **options):
+        iteraciones = max(options['iteraciones'], 1)
+        config = dict(getattr(settings, 'SECUENCIAS', {}) or {})
+        filas_tickets = Ticket.objects.count()
+
+        escenarios = [('COUNT()+1 (anterior)', _folio_anterior, None)]
+        escenarios.append(('Secuencia, bloque 1', _folio_secuencia, 1))
+        escenarios.append((f"Secuencia, bloque {options['bloque']}", _folio_secuencia, max(options['bloque'], 1)))
+
+        self.stdout.write(f'\n📅 {iteraciones} folios por escenario — tabla tickets con {filas_tickets} filas\n')
+        self.stdout.write(f'  {"Escenario":<26} {"SQL/folio":>10} {"p50 ms":>9} {"p95 ms":>9} {"total ms":>10}')
+        self.stdout.write(f'  ─────────────────────────────────────────────────────────────────────')
+        self._limpiar()
+        try:
+            for nombre, generar, bloque in escenarios:
+                ajustes = dict(config, BLOQUES={**config.get('BLOQUES', {}), PREFIJO: bloque or 1})
+                with override_settings(SECUENCIAS=ajustes):
+                    # La primera reserva crea la fila de la secuencia: fuera de la medición
+                    if bloque:
+                        generar()
+                    resultado = self._medir(generar, iteraciones)
+                descartar_bloques(PREFIJO)
+                self.stdout.write(
+                    f"  {nombre:<26} {resultado['consultas']:>10.2f} {resultado['p50']:>9.3f} "
+                    f"{resultado['p95']:>9.3f} {resultado['total']:>10.1f}"
+                )
+        finally:
+            self._limpiar()
+
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(
+            '✅ Benchmark completado. COUNT()+1 crece con la tabla; la secuencia es constante '
+            'y con bloques la mayoría de los folios no consulta la BD.'
+        ))
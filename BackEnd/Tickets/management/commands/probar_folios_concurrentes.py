@@ -0,0 +1,136 @@
+"""
+Management Command: probar_folios_concurrentes
+==============================================
+Prueba de concurrencia de la secuencia de folios (ModelBase/secuencias.py).
+
+Lanza N hilos (cada uno con su propia conexión a MySQL) que dan de alta
+tickets en paralelo. Cada ticket toma su folio con Ticket.generar_folio(),
+el mismo camino que Ticket.save(), y se inserta contra el índice único de
+`folio`: cualquier choque aparece como IntegrityError.
+
+Para no tocar la numeración real se usa el prefijo de prueba TKPRUEBA; las
+filas se insertan inactivas y sin signals (sin notificaciones, auditoría ni
+rollups) y al final se borran junto con su secuencia.
+
+Uso:
+    python manage.py probar_folios_concurrentes
+    python manage.py probar_folios_concurrentes --hilos 32 --tickets 5000 --bloque 20
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, connection, connections
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from Maquinas.models import Maquina
+from ModelBase.models import Secuencia
+from ModelBase.secuencias import descartar_bloques
+from Tickets.models import Ticket
+from Usuarios.models import Usuarios
+
+PREFIJO = 'TKPRUEBA'
+MARCA = 'probar_folios_concurrentes'
+
+
+class Command(BaseCommand):
+    help = 'Crea miles de tickets desde hilos paralelos y verifica que no haya folios repetidos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hilos', type=int, default=16, help='Hilos en paralelo.')
+        parser.add_argument('--tickets', type=int, default=2000, help='Tickets totales a crear.')
+        parser.add_argument('--bloque', type=int, default=1, help='Tamaño de bloque de pre-asignación.')
+
+    def _trabajador(self, cantidad, maquina_id, reportante_id, folios, errores):
+        try:
+            for _ in range(cantidad):
+                folio = Ticket.generar_folio(prefijo=PREFIJO)
+                try:
+                    # bulk_create de una fila: un INSERT real contra el índice
+                    # único de folio, sin disparar post_save
+                    Ticket.objects.bulk_create([Ticket(
+                        folio=folio,
+                        maquina_id=maquina_id,
+                        reportante_id=reportante_id,
+                        categoria='otros',
+                        descripcion_problema='Prueba de concurrencia de folios',
+                        esta_activo=False,
+                        notas_internas=MARCA,
+                        creado_por='SYSTEM',
+                        modificado_por='SYSTEM',
+                    )])
+                    folios.append(folio)
+                except IntegrityError as e:
+                    errores.append(f'{folio}: {e}')
+        finally:
+            connections.close_all()
+
+    def _limpiar(self, anio):
+        # Borrado directo (sin signals): las filas de prueba nunca existieron para
+        # la auditoría ni para los rollups
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {Ticket._meta.db_table} WHERE notas_internas = %s AND folio LIKE %s',
+                [MARCA, f'{PREFIJO}-%'],
+            )
+            borrados = cursor.rowcount
+        Secuencia.objects.filter(prefijo=PREFIJO, anio=anio).delete()
+        descartar_bloques(PREFIJO)
+        return borrados
+
+    def handle(self, *args, **options):
+        hilos = max(options['hilos'], 1)
+        total = max(options['tickets'], 1)
+        maquina = Maquina.objects.order_by('id').first()
+        reportante = Usuarios.objects.order_by('id').first()
+        if maquina is None or reportante is None:
+            raise CommandError('Se necesita al menos una máquina y un usuario en la BD.')
+
+        anio = timezone.localdate().year
+        self._limpiar(anio)
+
+        config = dict(getattr(settings, 'SECUENCIAS', {}) or {})
+        config['BLOQUES'] = {**config.get('BLOQUES', {}), PREFIJO: max(options['bloque'], 1)}
+
+        folios, errores = [], []
+        reparto = [total // hilos + (1 if i < total % hilos else 0) for i in range(hilos)]
+        self.stdout.write(
+            f"\n📅 {total} tickets desde {hilos} hilos (bloque {options['bloque']}), "
+            f"secuencia en la conexión '{config.get('DB_ALIAS', 'secuencias')}'\n"
+        )
+
+        inicio = time.perf_counter()
+        try:
+            with override_settings(SECUENCIAS=config):
+                trabajadores = [
+                    threading.Thread(
+                        target=self._trabajador,
+                        args=(cantidad, maquina.id, reportante.id, folios, errores),
+                    )
+                    for cantidad in reparto
+                ]
+                for trabajador in trabajadores:
+                    trabajador.start()
+                for trabajador in trabajadores:
+                    trabajador.join()
+            duracion = time.perf_counter() - inicio
+            en_bd = Ticket.objects.filter(notas_internas=MARCA, folio__startswith=f'{PREFIJO}-').count()
+        finally:
+            borrados = self._limpiar(anio)
+
+        repetidos = len(folios) - len(set(folios))
+        self.stdout.write(f'  Tickets creados                → {len(folios):>7}')
+        self.stdout.write(f'  Filas en la BD                 → {en_bd:>7}')
+        self.stdout.write(f'  Folios repetidos               → {repetidos:>7}')
+        self.stdout.write(f'  Choques contra el índice único → {len(errores):>7}')
+        self.stdout.write(f'  Altas por segundo              → {len(folios) / duracion:>10.1f}')
+        self.stdout.write(f'  ─────────────────────────────────────────')
+        self.stdout.write(f'  Filas de prueba eliminadas     → {borrados:>7}\n')
+
+        for error in errores[:10]:
+            self.stdout.write(self.style.ERROR(f'  ❌ {error}'))
+        if errores or repetidos or len(folios) != total or en_bd != total:
+            raise CommandError('Se detectaron folios repetidos o altas fallidas.')
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} tickets concurrentes sin un solo folio repetido.'))
@@ -0,0 +1,81 @@
+"""
+Management Command: reconstruir_resumenes
+=========================================
+Recalcula desde las tablas de origen los rollups diarios del dashboard
+(ResumenDiario), reporta las desviaciones respecto a lo almacenado y
+reemplaza las filas del rango.
+
+Los rollups se mantienen de forma incremental por signals
+(Tickets/resumenes.py) y la carga inicial la hace la migración Tickets 0006
+con el mismo código; este comando sirve para cambios hechos fuera del ORM
+(update(), SQL directo, loaddata) y cuando una máquina se mueve de casino.
+
+Uso:
+    python manage.py reconstruir_resumenes                         ← Todo el histórico
+    python manage.py reconstruir_resumenes --dry-run               ← Solo reporta, no corrige
+    python manage.py reconstruir_resumenes --casino 3
+    python manage.py reconstruir_resumenes --desde 2026-01-01 --hasta 2026-02-01
+
+Programación recomendada: diaria en horario de baja carga.
+"""
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from Tickets.resumenes import reconstruir
+
+
+def _fecha(valor):
+    try:
+        return datetime.strptime(valor, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f'Fecha inválida "{valor}" (formato YYYY-MM-DD).')
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye los rollups diarios del dashboard de tickets y reporta desviaciones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--casino', type=int, help='ID del casino (por defecto todos).')
+        parser.add_argument('--desde', help='Fecha inicial inclusiva YYYY-MM-DD.')
+        parser.add_argument('--hasta', help='Fecha final exclusiva YYYY-MM-DD.')
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Solo reporta desviaciones sin reescribir los rollups.',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        desde   = _fecha(options['desde']) if options['desde'] else None
+        hasta   = _fecha(options['hasta']) if options['hasta'] else None
+        if desde and hasta and desde >= hasta:
+            raise CommandError('--desde debe ser anterior a --hasta.')
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING('⚠️  MODO DRY-RUN: no se corregirá nada.'))
+
+        ahora = timezone.now()
+        self.stdout.write(f'\n📅 Reconstrucción iniciada: {ahora.strftime("%Y-%m-%d %H:%M:%S")}\n')
+
+        filas, desviaciones = reconstruir(desde, hasta, options['casino'], escribir=not dry_run)
+
+        for (casino_id, fecha, metrica, dimension), almacenado, real in desviaciones[:50]:
+            anterior = 'sin fila' if almacenado is None else f'{almacenado[0]}/{almacenado[1]}'
+            actual   = 'sin fila' if real is None else f'{real[0]}/{real[1]}'
+            self.stdout.write(
+                f'  casino {casino_id:<4} {fecha} {metrica:<12} {dimension[:20]:<20} '
+                f'almacenado: {anterior:>14} → real: {actual:>14}'
+            )
+        if len(desviaciones) > 50:
+            self.stdout.write(f'  … {len(desviaciones) - 50} desviaciones más')
+
+        self.stdout.write(f'  ─────────────────────────────────────────')
+        self.stdout.write(f'  Filas de rollup calculadas     → {filas:>7}')
+        self.stdout.write(f'  Con desviación                 → {len(desviaciones):>7}\n')
+
+        if dry_run:
+            self.stdout.write(self.style.SUCCESS('✅ Dry-run completado. Sin cambios en la BD.'))
+            return
+        self.stdout.write(self.style.SUCCESS(f'✅ Rollups reconstruidos. Filas escritas: {filas}.'))
@@ -0,0 +1,31 @@
+# Generated by Django 6.0.2 on 2026-10-18 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Tickets', '0003_ticket_estado_maquina_reportado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('casino_id', models.IntegerField(help_text='Id del casino (sin FK: el rollup no debe bloquear borrados)', verbose_name='Casino')),
+                ('fecha', models.DateField(verbose_name='Día')),
+                ('metrica', models.CharField(choices=[('creados', 'Tickets creados por categoría'), ('cerrados', 'Tickets cerrados por categoría'), ('maquina', 'Tickets creados por máquina'), ('tecnico', 'Intervenciones por técnico'), ('preventivos', 'Mantenimientos preventivos'), ('incidencias', 'Incidencias de infraestructura')], max_length=20, verbose_name='Métrica')),
+                ('dimension', models.CharField(blank=True, default='', help_text='Categoría, id de máquina o id de técnico según la métrica', max_length=50, verbose_name='Dimensión')),
+                ('valor', models.IntegerField(default=0, verbose_name='Conteo')),
+                ('suma', models.BigIntegerField(default=0, help_text="Acumulado adicional (segundos de reparación para 'cerrados')", verbose_name='Suma')),
+            ],
+            options={
+                'verbose_name': 'Resumen Diario',
+                'verbose_name_plural': 'Resúmenes Diarios',
+                'db_table': 'tickets_resumen_diario',
+                'unique_together': {('casino_id', 'fecha', 'metrica', 'dimension')},
+            },
+        ),
+    ]
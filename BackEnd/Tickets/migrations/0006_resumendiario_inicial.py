@@ -0,0 +1,35 @@
+# Generated by Django 6.0.2 on 2026-10-18 19:25
+
+from django.db import migrations
+
+
+def poblar_resumenes(apps, schema_editor):
+    """
+    Carga inicial de ResumenDiario: sin ella el dashboard muestra ceros para
+    todo lo anterior al despliegue. Usa el mismo código que
+    `reconstruir_resumenes` (modelos actuales, no los históricos); sin filas
+    de origen no hay nada que resumir y se salta.
+    """
+    from IncidenciasInfraestructura.models import IncidenciaInfraestructura
+    from MantenimientosPreventivos.models import MantenimientoPreventivo
+    from Tickets.models import Ticket
+    from Tickets.resumenes import reconstruir
+
+    # Las bitácoras cuelgan de tickets: sin tickets no hay bitácoras
+    if any(modelo.objects.exists() for modelo in (Ticket, MantenimientoPreventivo, IncidenciaInfraestructura)):
+        reconstruir()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Tickets', '0005_ticket_indice_creado_en'),
+        ('BitacoraTecnica', '0002_bitacoratecnica_indice_creado_en'),
+        ('IncidenciasInfraestructura', '0001_initial'),
+        ('MantenimientosPreventivos', '0001_initial'),
+        ('Maquinas', '0004_versionmapa_cambiomapa'),
+    ]
+
+    operations = [
+        migrations.RunPython(poblar_resumenes, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
+from django.utils import timezone
 from ModelBase.models import ModeloBase 
-from datetime import date
+from ModelBase.secuencias import siguiente
 
 from Maquinas.models import Maquina
 from Usuarios.models import Usuarios
@@ -110,11 +111,104 @@ class Ticket(ModeloBase):
         verbose_name = "Ticket"
         verbose_name_plural = "Tickets"
         ordering = ['-creado_en']
+        indexes = [
+            models.Index(fields=['creado_en']),
+        ]
 
 
+    PREFIJO_FOLIO = 'TK'
+
+    @classmethod
+    def generar_folio(cls, prefijo=None, anio=None):
+        """
+        Folio `TK-{año}-{n:04d}` desde la secuencia (prefijo, año): sin COUNT de
+        la tabla, sin choques entre altas concurrentes y reiniciando cada año.
+        """
+        prefijo = prefijo or cls.PREFIJO_FOLIO
+        anio = anio or timezone.localdate().year
+        numero = siguiente(prefijo, anio, inicial=lambda: cls._ultimo_folio_existente(prefijo, anio))
+        return f"{prefijo}-{anio}-{numero:04d}"
+
+    @classmethod
+    def _ultimo_folio_existente(cls, prefijo, anio):
+        """Mayor número ya usado en el año: la secuencia continúa desde ahí."""
+        inicio = f"{prefijo}-{anio}-"
+        numeros = (
+            folio[len(inicio):]
+            for folio in cls.objects.filter(folio__startswith=inicio).values_list('folio', flat=True).iterator()
+        )
+        return max((int(numero) for numero in numeros if numero.isdigit()), default=0)
+
     def save(self, *args, **kwargs):
         # Generación automática de Folio si no existe
         if not self.folio:
-            count = Ticket.objects.count() + 1
-            self.folio = f"TK-{date.today().year}-{count:04d}"
-        super().save(*args, **kwargs)
\ No newline at end of file
+            self.folio = Ticket.generar_folio()
+        super().save(*args, **kwargs)
+
+
+class ResumenDiario(models.Model):
+    """
+    Rollup diario por casino para las gráficas del dashboard
+    (ver Tickets/resumenes.py). Cada fila acumula una métrica para un día,
+    un casino y una dimensión:
+
+      metrica       dimension          valor               suma
+      ───────────   ───────────────    ─────────────────   ──────────────────────
+      creados       categoría          tickets creados     —
+      cerrados      categoría          tickets cerrados    segundos de reparación
+      maquina       id de máquina      tickets creados     —
+      tecnico       id de usuario      intervenciones      —
+      preventivos   ''                 mantenimientos      —
+      incidencias   ''                 incidencias infra   —
+
+    Se mantiene de forma incremental desde signals y se reconstruye con
+    `python manage.py reconstruir_resumenes`.
+
+    No hereda de ModeloBase: se actualiza con UPDATE ... SET valor = valor + n.
+    """
+    METRICAS_CHOICES = [
+        ('creados', 'Tickets creados por categoría'),
+        ('cerrados', 'Tickets cerrados por categoría'),
+        ('maquina', 'Tickets creados por máquina'),
+        ('tecnico', 'Intervenciones por técnico'),
+        ('preventivos', 'Mantenimientos preventivos'),
+        ('incidencias', 'Incidencias de infraestructura'),
+    ]
+
+    casino_id = models.IntegerField(
+        verbose_name="Casino",
+        help_text="Id del casino (sin FK: el rollup no debe bloquear borrados)"
+    )
+    fecha = models.DateField(
+        verbose_name="Día"
+    )
+    metrica = models.CharField(
+        max_length=20,
+        choices=METRICAS_CHOICES,
+        verbose_name="Métrica"
+    )
+    dimension = models.CharField(
+        max_length=50,
+        blank=True,
+        default='',
+        verbose_name="Dimensión",
+        help_text="Categoría, id de máquina o id de técnico según la métrica"
+    )
+    valor = models.IntegerField(
+        default=0,
+        verbose_name="Conteo"
+    )
+    suma = models.BigIntegerField(
+        default=0,
+        verbose_name="Suma",
+        help_text="Acumulado adicional (segundos de reparación para 'cerrados')"
+    )
+
+    class Meta:
+        db_table = 'tickets_resumen_diario'
+        verbose_name = "Resumen Diario"
+        verbose_name_plural = "Resúmenes Diarios"
+        unique_together = [['casino_id', 'fecha', 'metrica', 'dimension']]
+
+    def __str__(self):
+        return f"{self.casino_id} {self.fecha} {self.metrica}:{self.dimension} = {self.valor}"
@@ -0,0 +1,291 @@
+"""
+Rollups diarios por casino para TicketViewSet.dashboard_charts.
+
+Antes cada carga del dashboard ejecutaba ~10 agregados sobre tickets,
+tickets_bitacora, maquinas, mantenimientos e incidencias, re-escaneando todo
+el rango del mes. Ahora las métricas por periodo se acumulan por día en
+ResumenDiario y el dashboard solo suma como máximo 31 días por métrica.
+
+Mantenimiento incremental (signals en Tickets/signals.py):
+  Cada registro "aporta" una lista de (casino, día, métrica, dimensión,
+  valor, suma). Al guardar se resta el aporte de su estado anterior (leído
+  con ModeloBase.previous(), sin consultar la fila) y se suma el del estado
+  nuevo; al borrar (pre_delete) se resta el aporte actual. Así cualquier
+  cambio de categoría, estado, fecha o baja lógica queda reflejado.
+
+Reglas (idénticas a las consultas originales del dashboard):
+  - creados / maquina: tickets activos por día de `creado_en`
+  - cerrados: tickets activos en estado 'cerrado' por día de `modificado_en`
+    (proxy de fecha de cierre); `suma` acumula segundos de reparación (MTTR)
+  - tecnico: bitácoras por día de `creado_en` y técnico
+  - preventivos: mantenimientos activos por `fecha_mantenimiento`
+  - incidencias: incidencias activas por día de `hora_inicio`
+
+El casino se toma de la máquina al momento del evento. Si una máquina cambia
+de casino, sus tickets históricos siguen en el casino anterior hasta
+ejecutar `python manage.py reconstruir_resumenes`.
+"""
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+
+def _dia(momento):
+    if momento is None:
+        return None
+    if timezone.is_aware(momento):
+        return timezone.localtime(momento).date()
+    return momento.date()
+
+
+def _casino_de_maquina(maquina_id):
+    from Maquinas.models import Maquina
+
+    if maquina_id is None:
+        return None
+    return Maquina.objects.filter(pk=maquina_id).values_list('casino_id', flat=True).first()
+
+
+def _casino_de_ticket(ticket_id):
+    from .models import Ticket
+
+    if ticket_id is None:
+        return None
+    return Ticket.objects.filter(pk=ticket_id).values_list('maquina__casino_id', flat=True).first()
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Aportes por modelo. `estado` es un dict attname → valor.
+# ──────────────────────────────────────────────────────────────────────────────
+def aporte_ticket(estado, casino_id):
+    if not estado or not estado.get('esta_activo') or casino_id is None:
+        return []
+    dia_creado = _dia(estado['creado_en'])
+    if dia_creado is None:
+        return []
+    aporte = [
+        (casino_id, dia_creado, 'creados', estado['categoria'], 1, 0),
+        (casino_id, dia_creado, 'maquina', str(estado['maquina_id']), 1, 0),
+    ]
+    if estado['estado_ciclo'] == 'cerrado' and estado['modificado_en'] is not None:
+        segundos = int((estado['modificado_en'] - estado['creado_en']).total_seconds())
+        aporte.append((casino_id, _dia(estado['modificado_en']), 'cerrados', estado['categoria'], 1, segundos))
+    return aporte
+
+
+def aporte_bitacora(estado, casino_id):
+    if not estado or casino_id is None or estado.get('creado_en') is None:
+        return []
+    return [(casino_id, _dia(estado['creado_en']), 'tecnico', str(estado['usuario_tecnico_id']), 1, 0)]
+
+
+def aporte_preventivo(estado, casino_id):
+    if not estado or not estado.get('esta_activo') or casino_id is None or estado.get('fecha_mantenimiento') is None:
+        return []
+    return [(casino_id, estado['fecha_mantenimiento'], 'preventivos', '', 1, 0)]
+
+
+def aporte_incidencia(estado, casino_id):
+    if not estado or not estado.get('esta_activo') or casino_id is None or estado.get('hora_inicio') is None:
+        return []
+    return [(casino_id, _dia(estado['hora_inicio']), 'incidencias', '', 1, 0)]
+
+
+# Por modelo: (función de aporte, campo del que depende el casino, resolución del casino)
+def _registro(instance):
+    from BitacoraTecnica.models import BitacoraTecnica
+    from IncidenciasInfraestructura.models import IncidenciaInfraestructura
+    from MantenimientosPreventivos.models import MantenimientoPreventivo
+    from .models import Ticket
+
+    if isinstance(instance, Ticket):
+        return aporte_ticket, 'maquina_id', _casino_de_maquina
+    if isinstance(instance, BitacoraTecnica):
+        return aporte_bitacora, 'ticket_id', _casino_de_ticket
+    if isinstance(instance, MantenimientoPreventivo):
+        return aporte_preventivo, 'maquina_id', _casino_de_maquina
+    if isinstance(instance, IncidenciaInfraestructura):
+        return aporte_incidencia, 'casino_id', lambda casino_id: casino_id
+    return None
+
+
+def _estado_actual(instance):
+    return {field.attname: getattr(instance, field.attname) for field in instance._meta.concrete_fields}
+
+
+def _casino_actual(instance, campo, resolver):
+    # Reutiliza la relación ya cargada en la instancia cuando existe
+    if campo == 'maquina_id' and 'maquina' in instance._state.fields_cache:
+        return instance.maquina.casino_id
+    return resolver(getattr(instance, campo))
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Aplicación de deltas
+# ──────────────────────────────────────────────────────────────────────────────
+def aplicar(deltas):
+    """
+    Suma `deltas` {(casino, fecha, metrica, dimension): [valor, suma]} a
+    ResumenDiario con UPDATE atómico; crea la fila si no existe.
+    """
+    from .models import ResumenDiario
+
+    for (casino_id, fecha, metrica, dimension), (valor, suma) in deltas.items():
+        if not valor and not suma:
+            continue
+        llave = {'casino_id': casino_id, 'fecha': fecha, 'metrica': metrica, 'dimension': dimension}
+        actualizadas = ResumenDiario.objects.filter(**llave).update(
+            valor=F('valor') + valor, suma=F('suma') + suma
+        )
+        if actualizadas:
+            continue
+        try:
+            with transaction.atomic():
+                ResumenDiario.objects.create(valor=valor, suma=suma, **llave)
+        except IntegrityError:
+            # Otro proceso creó la fila entre el UPDATE y el INSERT
+            ResumenDiario.objects.filter(**llave).update(
+                valor=F('valor') + valor, suma=F('suma') + suma
+            )
+
+
+def _acumular(deltas, aporte, signo):
+    for casino_id, fecha, metrica, dimension, valor, suma in aporte:
+        acumulado = deltas[(casino_id, fecha, metrica, dimension)]
+        acumulado[0] += signo * valor
+        acumulado[1] += signo * suma
+
+
+def registrar_guardado(instance, created):
+    """post_save: aplica (aporte nuevo − aporte anterior)."""
+    registro = _registro(instance)
+    if registro is None:
+        return
+    aporte, campo, resolver = registro
+
+    deltas = defaultdict(lambda: [0, 0])
+    casino_nuevo = _casino_actual(instance, campo, resolver)
+    _acumular(deltas, aporte(_estado_actual(instance), casino_nuevo), 1)
+
+    if not created:
+        anterior = instance.valores_previos()
+        if anterior is not None:
+            if anterior.get(campo) == getattr(instance, campo):
+                casino_anterior = casino_nuevo
+            else:
+                casino_anterior = resolver(anterior.get(campo))
+            _acumular(deltas, aporte(anterior, casino_anterior), -1)
+
+    aplicar(deltas)
+
+
+def registrar_borrado(instance):
+    """pre_delete: resta el aporte actual (las filas relacionadas aún existen)."""
+    registro = _registro(instance)
+    if registro is None:
+        return
+    aporte, campo, resolver = registro
+
+    deltas = defaultdict(lambda: [0, 0])
+    _acumular(deltas, aporte(_estado_actual(instance), _casino_actual(instance, campo, resolver)), -1)
+    aplicar(deltas)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Reconstrucción completa
+# ──────────────────────────────────────────────────────────────────────────────
+def calcular(desde=None, hasta=None, casino_id=None):
+    """
+    Recalcula los rollups desde las tablas de origen.
+    Retorna {(casino, fecha, metrica, dimension): [valor, suma]}.
+    `desde`/`hasta` son fechas (hasta exclusiva) sobre el día del rollup.
+    """
+    from BitacoraTecnica.models import BitacoraTecnica
+    from IncidenciasInfraestructura.models import IncidenciaInfraestructura
+    from MantenimientosPreventivos.models import MantenimientoPreventivo
+    from .models import Ticket
+
+    def en_rango(fecha):
+        return (desde is None or fecha >= desde) and (hasta is None or fecha < hasta)
+
+    deltas = defaultdict(lambda: [0, 0])
+    campos_ticket = ['maquina_id', 'categoria', 'estado_ciclo', 'creado_en', 'modificado_en', 'esta_activo']
+
+    tickets = Ticket.objects.filter(esta_activo=True)
+    bitacoras = BitacoraTecnica.objects.all()
+    preventivos = MantenimientoPreventivo.objects.filter(esta_activo=True)
+    incidencias = IncidenciaInfraestructura.objects.filter(esta_activo=True)
+    if casino_id is not None:
+        tickets = tickets.filter(maquina__casino_id=casino_id)
+        bitacoras = bitacoras.filter(ticket__maquina__casino_id=casino_id)
+        preventivos = preventivos.filter(maquina__casino_id=casino_id)
+        incidencias = incidencias.filter(casino_id=casino_id)
+
+    # El alias no puede llamarse `casino`: IncidenciaInfraestructura ya tiene ese campo
+    fuentes = [
+        (tickets.values(*campos_ticket, casino_resumen=F('maquina__casino_id')), aporte_ticket),
+        (bitacoras.values('usuario_tecnico_id', 'creado_en', casino_resumen=F('ticket__maquina__casino_id')),
+         aporte_bitacora),
+        (preventivos.values('fecha_mantenimiento', 'esta_activo', casino_resumen=F('maquina__casino_id')),
+         aporte_preventivo),
+        (incidencias.values('hora_inicio', 'esta_activo', casino_resumen=F('casino_id')), aporte_incidencia),
+    ]
+    for filas, aporte in fuentes:
+        for fila in filas.iterator(chunk_size=2000):
+            casino = fila.pop('casino_resumen')
+            for item in aporte(fila, casino):
+                if en_rango(item[1]):
+                    _acumular(deltas, [item], 1)
+    return deltas
+
+
+def reconstruir(desde=None, hasta=None, casino_id=None, escribir=True):
+    """
+    Reemplaza los rollups del rango por los recalculados (con escribir=False
+    solo compara).
+    Retorna (filas_escritas, desviaciones) donde desviaciones es una lista de
+    (llave, almacenado, real) para las filas que no coincidían.
+    """
+    from .models import ResumenDiario
+
+    reales = {
+        llave: tuple(valores) for llave, valores in calcular(desde, hasta, casino_id).items()
+        if valores[0] or valores[1]
+    }
+
+    existentes = ResumenDiario.objects.all()
+    if desde is not None:
+        existentes = existentes.filter(fecha__gte=desde)
+    if hasta is not None:
+        existentes = existentes.filter(fecha__lt=hasta)
+    if casino_id is not None:
+        existentes = existentes.filter(casino_id=casino_id)
+
+    almacenados = {
+        (fila['casino_id'], fila['fecha'], fila['metrica'], fila['dimension']): (fila['valor'], fila['suma'])
+        for fila in existentes.values('casino_id', 'fecha', 'metrica', 'dimension', 'valor', 'suma')
+        if fila['valor'] or fila['suma']
+    }
+    desviaciones = [
+        (llave, almacenados.get(llave), reales.get(llave))
+        for llave in sorted(set(almacenados) | set(reales), key=str)
+        if almacenados.get(llave) != reales.get(llave)
+    ]
+    if not escribir:
+        return len(reales), desviaciones
+
+    with transaction.atomic():
+        existentes.delete()
+        ResumenDiario.objects.bulk_create(
+            [
+                ResumenDiario(
+                    casino_id=casino, fecha=fecha, metrica=metrica, dimension=dimension,
+                    valor=valor, suma=suma,
+                )
+                for (casino, fecha, metrica, dimension), (valor, suma) in reales.items()
+            ],
+            batch_size=1000,
+        )
+    return len(reales), desviaciones
@@ -1,13 +1,35 @@
 from rest_framework import serializers
 from .models import Ticket
 from datetime import datetime
+from django.db.models import Count
 from django.utils import timezone
+from ModelBase.cargadores import Cargador, CampoPorLote, ListaConCargadores
+
+
+def _estados_de_maquinas(ids):
+    from Maquinas.models import Maquina
+    return dict(Maquina.objects.filter(pk__in=ids).values_list('id', 'estado_actual'))
+
+
+def _intervenciones_de_tickets(ids):
+    from BitacoraTecnica.models import BitacoraTecnica
+    return dict(
+        BitacoraTecnica.objects.filter(ticket_id__in=ids, esta_activo=True)
+        .values('ticket_id').annotate(total=Count('id')).values_list('ticket_id', 'total')
+    )
+
+
+# Búsquedas por lote (ver ModelBase/cargadores.py): una consulta por lista, no por ticket.
+# El estado se lee de la BD y no de `obj.maquina` para devolver siempre el estado fresco
+ESTADO_MAQUINA = Cargador('maquina.estado_actual', _estados_de_maquinas)
+INTERVENCIONES_TICKET = Cargador('ticket.total_intervenciones', _intervenciones_de_tickets)
+
 
 class TicketSerializer(serializers.ModelSerializer):
     # Datos informativos de relaciones para el frontend de Sakai
     maquina_uid = serializers.CharField(source='maquina.uid_sala', read_only=True)
-    # Usar SerializerMethodField para obtener siempre el estado fresco de la máquina
-    maquina_estado_actual = serializers.SerializerMethodField()
+    # Estado fresco de la máquina, resuelto por lote para toda la lista
+    maquina_estado_actual = CampoPorLote(ESTADO_MAQUINA, clave='maquina_id')
     casino_nombre = serializers.CharField(source='maquina.casino.nombre', read_only=True)
     reportante_nombre = serializers.CharField(source='reportante.nombres', read_only=True)
     reportante_apellidos = serializers.SerializerMethodField()
@@ -20,6 +42,7 @@ class TicketSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Ticket
+        list_serializer_class = ListaConCargadores
         fields = '__all__'
         read_only_fields = [
             'folio', 
@@ -30,17 +53,6 @@ class TicketSerializer(serializers.ModelSerializer):
             'contador_reaperturas'
         ]
     
-    def get_maquina_estado_actual(self, obj):
-        """Obtiene el estado actual de la máquina desde la base de datos."""
-        if obj.maquina_id:
-            from Maquinas.models import Maquina
-            try:
-                maquina = Maquina.objects.only('estado_actual').get(id=obj.maquina_id)
-                return maquina.estado_actual
-            except Maquina.DoesNotExist:
-                return None
-        return None
-
     def get_reportante_apellidos(self, obj):
         """Obtiene los apellidos del reportante."""
         if obj.reportante:
@@ -75,7 +87,7 @@ class TicketSerializer(serializers.ModelSerializer):
 class TicketCentroServiciosSerializer(serializers.ModelSerializer):
     """Serializer para Centro de Servicios con campos calculados."""
     maquina_uid = serializers.CharField(source='maquina.uid_sala', read_only=True)
-    maquina_estado_actual = serializers.SerializerMethodField()
+    maquina_estado_actual = CampoPorLote(ESTADO_MAQUINA, clave='maquina_id')
     casino_nombre = serializers.CharField(source='maquina.casino.nombre', read_only=True)
     reportante_nombre = serializers.CharField(source='reportante.nombres', read_only=True)
     reportante_apellidos = serializers.SerializerMethodField()
@@ -84,10 +96,11 @@ class TicketCentroServiciosSerializer(serializers.ModelSerializer):
     
     # Campos calculados para Centro de Servicios
     dias_abierto = serializers.SerializerMethodField()
-    total_intervenciones = serializers.SerializerMethodField()
+    total_intervenciones = CampoPorLote(INTERVENCIONES_TICKET, clave='pk', defecto=0)
 
     class Meta:
         model = Ticket
+        list_serializer_class = ListaConCargadores
         fields = [
             'id', 'folio', 'maquina', 'maquina_uid', 'maquina_estado_actual', 'casino_nombre',
             'categoria', 'subcategoria', 'prioridad', 'descripcion_problema',
@@ -98,17 +111,6 @@ class TicketCentroServiciosSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['folio', 'creado_en', 'modificado_en', 'contador_reaperturas']
 
-    def get_maquina_estado_actual(self, obj):
-        """Obtiene el estado actual de la máquina desde la base de datos."""
-        if obj.maquina_id:
-            from Maquinas.models import Maquina
-            try:
-                maquina = Maquina.objects.only('estado_actual').get(id=obj.maquina_id)
-                return maquina.estado_actual
-            except Maquina.DoesNotExist:
-                return None
-        return None
-
     def get_reportante_apellidos(self, obj):
         """Obtiene los apellidos del reportante."""
         if obj.reportante:
@@ -136,7 +138,4 @@ class TicketCentroServiciosSerializer(serializers.ModelSerializer):
             diferencia = ahora - obj.creado_en
             return diferencia.days
         return 0
-    
-    def get_total_intervenciones(self, obj):
-        """Cuenta el número total de bitacoras/intervenciones del ticket."""
-        return obj.bitacoras.filter(esta_activo=True).count()
\ No newline at end of file
+    
\ No newline at end of file
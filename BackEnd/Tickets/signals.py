@@ -6,47 +6,30 @@ Eventos cubiertos:
   2. Ticket cerrado    → Informativa personal al reportante.
   3. Ticket reabierto  → Alerta al técnico asignado (si existe).
   4. Técnico asignado  → Informativa personal al nuevo técnico.
+
+Además mantiene los rollups diarios del dashboard (Tickets/resumenes.py) al
+guardar o borrar tickets, bitácoras, mantenimientos preventivos e incidencias.
 """
-from django.db.models.signals import pre_save, post_save
+from django.db.models.signals import pre_save, post_save, pre_delete
 from django.dispatch import receiver
 from .models import Ticket
+from . import resumenes
+from BitacoraTecnica.models import BitacoraTecnica
+from IncidenciasInfraestructura.models import IncidenciaInfraestructura
+from MantenimientosPreventivos.models import MantenimientoPreventivo
 from Notificaciones.models import Notificacion
-from Roles.models import Rol
-
-
-def _notificar_por_rol_y_casino(titulo, contenido, nivel, tipo, casino, nombres_rol):
-    """
-    Crea una notificación separada por cada rol de la lista, 
-    segmentada al casino indicado.
-    """
-    roles = Rol.objects.filter(nombre__in=nombres_rol)
-    for rol in roles:
-        Notificacion.objects.create(
-            titulo=titulo,
-            contenido=contenido,
-            nivel=nivel,
-            tipo=tipo,
-            casino_destino=casino,
-            rol_destino=rol,
-        )
+# Despacho compartido: roles cacheados + un solo bulk_create en on_commit
+from Notificaciones.despacho import notificar_por_rol_y_casino
 
 
 # ─────────────────────────────────────────────────────────────
 # Captura el estado ANTES de guardar para detectar transiciones
 # ─────────────────────────────────────────────────────────────
+# Se lee de la foto de ModeloBase (previous), sin consultar la BD.
 @receiver(pre_save, sender=Ticket)
 def ticket_snapshot_pre_save(sender, instance, **kwargs):
-    if instance.pk:
-        try:
-            prev = Ticket.objects.get(pk=instance.pk)
-            instance._prev_estado     = prev.estado_ciclo
-            instance._prev_tecnico_id = prev.tecnico_asignado_id
-        except Ticket.DoesNotExist:
-            instance._prev_estado     = None
-            instance._prev_tecnico_id = None
-    else:
-        instance._prev_estado     = None
-        instance._prev_tecnico_id = None
+    instance._prev_estado     = instance.previous('estado_ciclo')
+    instance._prev_tecnico_id = instance.previous('tecnico_asignado')
 
 
 # ─────────────────────────────────────────────────────────────
@@ -61,7 +44,7 @@ def ticket_post_save(sender, instance, created, **kwargs):
 
     # ── 1. Ticket NUEVO ─────────────────────────────────────
     if created:
-        _notificar_por_rol_y_casino(
+        notificar_por_rol_y_casino(
             titulo   = f"🎰 Nuevo Ticket {folio}",
             contenido= (
                 f"Se ha abierto el ticket {folio} para la máquina {uid}. "
@@ -119,3 +102,24 @@ def ticket_post_save(sender, instance, created, **kwargs):
             tipo            = 'ticket',
             usuario_destino = instance.tecnico_asignado,
         )
+
+
+# ─────────────────────────────────────────────────────────────
+# Rollups diarios del dashboard (ResumenDiario)
+# ─────────────────────────────────────────────────────────────
+MODELOS_RESUMEN = (Ticket, BitacoraTecnica, MantenimientoPreventivo, IncidenciaInfraestructura)
+
+
+def resumen_post_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return  # loaddata: se recalcula con reconstruir_resumenes
+    resumenes.registrar_guardado(instance, created)
+
+
+def resumen_pre_delete(sender, instance, **kwargs):
+    resumenes.registrar_borrado(instance)
+
+
+for _modelo in MODELOS_RESUMEN:
+    post_save.connect(resumen_post_save, sender=_modelo, dispatch_uid=f'resumen_post_save_{_modelo.__name__}')
+    pre_delete.connect(resumen_pre_delete, sender=_modelo, dispatch_uid=f'resumen_pre_delete_{_modelo.__name__}')
@@ -1,3 +1,285 @@
-from django.test import TestCase
+from importlib import import_module
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from Maquinas.tests import crear_sala
+from ModelBase.pruebas import presupuesto_consultas
+from ModelBase.secuencias import descartar_bloques
+from ModelBase.tests import en_paralelo, lecturas_de_fila
+from Roles.models import Rol
+from Usuarios.models import Usuarios
+
+from .models import ResumenDiario, Ticket
+from .serializers import TicketCentroServiciosSerializer, TicketSerializer
+
+# Los folios se reservan en la conexión de la prueba: con el alias propio
+# (espejo de default) la reserva confirmaría fuera de la transacción del TestCase
+SECUENCIAS_EN_DEFAULT = override_settings(SECUENCIAS={'DB_ALIAS': 'default', 'BLOQUE': 1})
+
+
+def crear_usuario(casino, nombre_rol, username):
+    rol, _ = Rol.objects.get_or_create(nombre=nombre_rol)
+    return Usuarios.objects.create_user(
+        username=username, email=f'{username}@nexus.mx', password='clave-segura-123',
+        nombres=username.title(), apellido_paterno='Pruebas', casino=casino, rol=rol,
+    )
+
+
+def crear_tickets(cantidad, maquinas, reportante, tecnico=None):
+    return [
+        Ticket.objects.create(
+            maquina=maquinas[i % len(maquinas)], reportante=reportante, tecnico_asignado=tecnico,
+            categoria='hardware', descripcion_problema=f'Falla {i}',
+        )
+        for i in range(cantidad)
+    ]
+
+
+@SECUENCIAS_EN_DEFAULT
+class ConsultasListadosTicketsTests(TestCase):
+    """Los listados de tickets hacen las mismas consultas con N y 2N filas."""
+
+    FILAS = 6
+
+    @classmethod
+    def setUpTestData(cls):
+        casino, maquinas = crear_sala(4)
+        cls.reportante = crear_usuario(casino, 'SUP SISTEMAS', 'supervisor')
+        cls.tecnico = crear_usuario(casino, 'TECNICO', 'tecnico')
+        crear_tickets(cls.FILAS, maquinas, cls.reportante)
+        crear_tickets(cls.FILAS, maquinas, cls.reportante, cls.tecnico)
+
+    def _consultas(self, serializer_class, queryset, filas):
+        with presupuesto_consultas() as medicion:
+            datos = serializer_class(list(queryset[:filas]), many=True).data
+        self.assertEqual(len(datos), filas)
+        return medicion.total
+
+    def _queryset(self):
+        return Ticket.objects.filter(esta_activo=True).select_related(
+            'maquina', 'maquina__casino', 'reportante', 'reportante__rol', 'tecnico_asignado'
+        ).order_by('-creado_en', '-id')
+
+    def test_listado_tickets_constante(self):
+        self.assertEqual(
+            self._consultas(TicketSerializer, self._queryset(), self.FILAS),
+            self._consultas(TicketSerializer, self._queryset(), 2 * self.FILAS),
+        )
+
+    def test_centro_servicios_constante(self):
+        self.assertEqual(
+            self._consultas(TicketCentroServiciosSerializer, self._queryset(), self.FILAS),
+            self._consultas(TicketCentroServiciosSerializer, self._queryset(), 2 * self.FILAS),
+        )
+
+    def test_estado_maquina_fresco(self):
+        ticket = self._queryset().first()
+        ticket.maquina.__class__.objects.filter(pk=ticket.maquina_id).update(estado_actual='DAÑADA')
+        datos = TicketCentroServiciosSerializer([ticket], many=True).data
+        self.assertEqual(datos[0]['maquina_estado_actual'], 'DAÑADA')
+        self.assertEqual(datos[0]['total_intervenciones'], 0)
+
+
+@SECUENCIAS_EN_DEFAULT
+class GuardadoTicketTests(TestCase):
+    """Los receivers de pre_save/post_save de Ticket leen el estado previo de la foto, no de la BD."""
+
+    @classmethod
+    def setUpTestData(cls):
+        casino, maquinas = crear_sala(1)
+        cls.reportante = crear_usuario(casino, 'SUP SISTEMAS', 'supervisor')
+        cls.tecnico = crear_usuario(casino, 'TECNICO', 'tecnico')
+        cls.ticket, = crear_tickets(1, maquinas, cls.reportante)
+
+    def _guardar(self, ticket, **kwargs):
+        with CaptureQueriesContext(connection) as ctx, self.captureOnCommitCallbacks(execute=True):
+            ticket.save(**kwargs)
+        return lecturas_de_fila(ctx.captured_queries, Ticket._meta.db_table)
+
+    def test_asignar_tecnico_sin_releer(self):
+        ticket = Ticket.objects.get(pk=self.ticket.pk)
+        ticket.tecnico_asignado = self.tecnico
+        ticket.estado_ciclo = 'proceso'
+        self.assertEqual(self._guardar(ticket), [])
+        self.assertEqual(ticket._prev_estado, 'abierto')
+        self.assertIsNone(ticket._prev_tecnico_id)
+
+    def test_cerrar_con_update_fields_sin_releer(self):
+        ticket = Ticket.objects.get(pk=self.ticket.pk)
+        ticket.estado_ciclo = 'cerrado'
+        ticket.explicacion_cierre = 'Se reemplazó el billetero'
+        self.assertEqual(self._guardar(ticket, update_fields=['estado_ciclo', 'explicacion_cierre']), [])
+        self.assertEqual(ticket._prev_estado, 'abierto')
+        self.assertEqual(ticket.changed_fields(), [])
+
+
+@SECUENCIAS_EN_DEFAULT
+class FoliosTicketTests(TestCase):
+    """Folio TK-{año}-{n:04d} desde la secuencia, sin COUNT de la tabla."""
+
+    @classmethod
+    def setUpTestData(cls):
+        casino, cls.maquinas = crear_sala(1)
+        cls.reportante = crear_usuario(casino, 'SUP SISTEMAS', 'supervisor')
+
+    def setUp(self):
+        descartar_bloques()
+        self.addCleanup(descartar_bloques)
+        self.anio = timezone.localdate().year
+
+    def test_folios_consecutivos(self):
+        folios = [ticket.folio for ticket in crear_tickets(3, self.maquinas, self.reportante)]
+        self.assertEqual(folios, [f'TK-{self.anio}-{numero:04d}' for numero in (1, 2, 3)])
+
+    def test_continua_desde_el_mayor_folio_existente(self):
+        Ticket.objects.create(
+            maquina=self.maquinas[0], reportante=self.reportante, categoria='otros',
+            descripcion_problema='Migrado', folio=f'TK-{self.anio}-0041',
+        )
+        ticket, = crear_tickets(1, self.maquinas, self.reportante)
+        self.assertEqual(ticket.folio, f'TK-{self.anio}-0042')
+
+    def test_reinicia_por_anio(self):
+        crear_tickets(2, self.maquinas, self.reportante)
+        self.assertEqual(Ticket.generar_folio(anio=self.anio - 1), f'TK-{self.anio - 1}-0001')
+
+    def test_alta_sin_count_de_tickets(self):
+        crear_tickets(1, self.maquinas, self.reportante)
+        with CaptureQueriesContext(connection) as ctx:
+            crear_tickets(1, self.maquinas, self.reportante)
+        conteos = [
+            consulta['sql'] for consulta in ctx.captured_queries
+            if 'COUNT(' in consulta['sql'].upper() and Ticket._meta.db_table in consulta['sql']
+        ]
+        self.assertEqual(conteos, [])
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class FoliosConcurrentesTests(TransactionTestCase):
+    """Altas simultáneas desde varios hilos (cada uno con su conexión): sin folios repetidos."""
+
+    databases = {'default', 'secuencias'}
+
+    def setUp(self):
+        descartar_bloques()
+        self.addCleanup(descartar_bloques)
+        casino, self.maquinas = crear_sala(8)
+        self.reportante = crear_usuario(casino, 'SUP SISTEMAS', 'supervisor')
+
+    def test_hilos_sin_choques(self):
+        hilos, por_hilo = 8, 50
+        resultados = en_paralelo(hilos, lambda indice: [
+            ticket.folio for ticket in crear_tickets(por_hilo, self.maquinas[indice:indice + 1], self.reportante)
+        ])
+        folios = [folio for lote in resultados for folio in lote]
+        anio = timezone.localdate().year
+        self.assertEqual(sorted(folios), [f'TK-{anio}-{numero:04d}' for numero in range(1, hilos * por_hilo + 1)])
+        self.assertEqual(Ticket.objects.count(), hilos * por_hilo)
+
+
+@SECUENCIAS_EN_DEFAULT
+class PaginacionTicketsTests(APITestCase):
+    """Paginación por cursor (creado_en, id) de /api/tickets/ con filtros y fechas repetidas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        casino, maquinas = crear_sala(2)
+        cls.usuario = crear_usuario(casino, 'SUP SISTEMAS', 'supervisor')
+        tickets = crear_tickets(11, maquinas, cls.usuario)
+        # Fechas repetidas en bloques de tres: el id debe desempatar
+        inicio = timezone.now()
+        for indice, ticket in enumerate(tickets):
+            Ticket.objects.filter(pk=ticket.pk).update(
+                creado_en=inicio - timezone.timedelta(minutes=indice // 3),
+                estado_ciclo='cerrado' if indice % 2 else 'abierto',
+            )
+        cls.orden = list(Ticket.objects.order_by('-creado_en', '-pk').values_list('pk', flat=True))
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.usuario)
+        self.url = reverse('tickets-list')
+
+    def _recorrer(self, url, **params):
+        paginas, respuesta = [], self.client.get(url, params)
+        while True:
+            self.assertEqual(respuesta.status_code, 200)
+            paginas.append(respuesta.json())
+            if not paginas[-1]['next']:
+                return paginas
+            respuesta = self.client.get(paginas[-1]['next'])
+
+    def test_sin_parametros_devuelve_la_lista_completa(self):
+        respuesta = self.client.get(self.url)
+        self.assertEqual([ticket['id'] for ticket in respuesta.json()], self.orden)
+
+    def test_recorre_todas_las_filas_sin_repetir(self):
+        paginas = self._recorrer(self.url, page_size=4)
+        self.assertEqual([len(pagina['results']) for pagina in paginas], [4, 4, 3])
+        self.assertEqual([ticket['id'] for pagina in paginas for ticket in pagina['results']], self.orden)
+        self.assertIsNone(paginas[0]['previous'])
+        self.assertIsNone(paginas[0]['count'])
+
+    def test_previous_regresa_a_la_pagina_anterior(self):
+        paginas = self._recorrer(self.url, page_size=4)
+        anterior = self.client.get(paginas[2]['previous']).json()
+        self.assertEqual(anterior['results'], paginas[1]['results'])
+        self.assertTrue(anterior['next'])
+        primera = self.client.get(anterior['previous']).json()
+        self.assertEqual(primera['results'], paginas[0]['results'])
+        self.assertIsNone(primera['previous'])
+
+    def test_respeta_los_filtros(self):
+        paginas = self._recorrer(self.url, page_size=2, estado_ciclo='cerrado')
+        cerrados = list(
+            Ticket.objects.filter(estado_ciclo='cerrado').order_by('-creado_en', '-pk').values_list('pk', flat=True)
+        )
+        self.assertEqual([ticket['id'] for pagina in paginas for ticket in pagina['results']], cerrados)
+
+    def test_total_exacto(self):
+        respuesta = self.client.get(self.url, {'page_size': 4, 'total': 'exacto', 'estado_ciclo': 'abierto'})
+        self.assertEqual(respuesta.json()['count'], 6)
+        self.assertFalse(respuesta.json()['count_aproximado'])
+
+    def test_ultima_pagina_cuesta_lo_mismo_que_la_primera(self):
+        primera = self.client.get(self.url, {'page_size': 4})
+        ultima_url = self._recorrer(self.url, page_size=4)[-2]['next']
+        with CaptureQueriesContext(connection) as consultas_primera:
+            self.client.get(self.url, {'page_size': 4})
+        with CaptureQueriesContext(connection) as consultas_ultima:
+            self.client.get(ultima_url)
+        self.assertEqual(primera.status_code, 200)
+        self.assertEqual(len(consultas_primera), len(consultas_ultima))
+        self.assertNotIn('OFFSET', consultas_ultima.captured_queries[-1]['sql'].upper())
+
+    def test_ordering_con_cursor_responde_400(self):
+        respuesta = self.client.get(self.url, {'page_size': 4, 'ordering': 'prioridad'})
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertIn('paginación por cursor', respuesta.json()['error'])
+        # Sin paginar, ?ordering= sigue aplicando a la lista completa
+        self.assertEqual(self.client.get(self.url, {'ordering': 'prioridad'}).status_code, 200)
+
+    def test_cursor_invalido_responde_404(self):
+        self.assertEqual(self.client.get(self.url, {'cursor': 'no-es-un-cursor'}).status_code, 404)
+
+
+@SECUENCIAS_EN_DEFAULT
+class ResumenDiarioInicialTests(TestCase):
+    """La migración 0006 carga los rollups del dashboard desde los tickets existentes."""
+
+    def test_migracion_resume_lo_existente(self):
+        casino, maquinas = crear_sala(2)
+        crear_tickets(3, maquinas, crear_usuario(casino, 'SUP SISTEMAS', 'supervisor'))
+        ResumenDiario.objects.all().delete()
+
+        import_module('Tickets.migrations.0006_resumendiario_inicial').poblar_resumenes(None, None)
+        creados = ResumenDiario.objects.get(casino_id=casino.pk, metrica='creados', dimension='hardware')
+        self.assertEqual((creados.fecha, creados.valor), (timezone.localdate(), 3))
+        self.assertEqual(
+            sorted(ResumenDiario.objects.filter(metrica='maquina').values_list('dimension', 'valor')),
+            sorted([(str(maquinas[0].pk), 2), (str(maquinas[1].pk), 1)]),
+        )
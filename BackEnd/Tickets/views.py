@@ -3,8 +3,13 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.filters import SearchFilter, OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db.models import Prefetch
 from .models import Ticket
+from BitacoraTecnica.models import BitacoraTecnica
 from .serializers import TicketSerializer, TicketCentroServiciosSerializer
+from ModelBase.cache_respuestas import cachear_respuesta, casino_de_url
+from ModelBase.exportacion import respuesta_exportacion
+from ModelBase.paginacion import PaginacionKeysetOpcional
 from Gamificacion.signals_gamificacion import get_puntos_context, limpiar_puntos_context
 
 import logging
@@ -17,6 +22,10 @@ class TicketViewSet(viewsets.ModelViewSet):
     serializer_class = TicketSerializer
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['maquina', 'esta_activo', 'estado_ciclo', 'prioridad', 'categoria', 'maquina__casino']
+    # Paginación por cursor (creado_en, id) solo con ?cursor= o ?page_size=;
+    # sin ellos se conserva la lista completa que espera el frontend.
+    # ?ordering= solo aplica a la lista completa: con cursor responde 400
+    pagination_class = PaginacionKeysetOpcional
 
     def get_queryset(self):
         """Optimización de consultas para las 17 salas."""
@@ -29,6 +38,7 @@ class TicketViewSet(viewsets.ModelViewSet):
         ).order_by('-creado_en')
 
     @action(detail=False, methods=['get'], url_path='lista-por-casino/(?P<casino_id>[^/.]+)')
+    @cachear_respuesta('tickets.lista_por_casino', casino=casino_de_url)
     def lista_por_casino(self, request, casino_id=None):
         """
         Devuelve todos los tickets abiertos de un casino específico.
@@ -53,8 +63,6 @@ class TicketViewSet(viewsets.ModelViewSet):
                 'reportante',
                 'reportante__rol',
                 'tecnico_asignado'
-            ).prefetch_related(
-                'bitacoras'
             ).order_by('-creado_en')
 
             serializer = TicketCentroServiciosSerializer(queryset, many=True)
@@ -192,8 +200,12 @@ class TicketViewSet(viewsets.ModelViewSet):
                 'reportante',
                 'tecnico_asignado'
             ).prefetch_related(
-                'bitacoras',
-                'bitacoras__usuario_tecnico'
+                # El orden va en el Prefetch: un .order_by() sobre
+                # ticket.bitacoras.all() ignora el prefetch y consulta por ticket
+                Prefetch(
+                    'bitacoras',
+                    queryset=BitacoraTecnica.objects.select_related('usuario_tecnico').order_by('-creado_en')
+                )
             ).order_by('-creado_en')[:3]
             
             # Serializar los datos
@@ -201,8 +213,8 @@ class TicketViewSet(viewsets.ModelViewSet):
             
             historial = []
             for ticket in tickets:
-                # Obtener bitácoras del ticket
-                bitacoras = ticket.bitacoras.all().order_by('-creado_en')
+                # Bitácoras del ticket (ya ordenadas por el prefetch)
+                bitacoras = ticket.bitacoras.all()
                 
                 historial.append({
                     'id': ticket.id,
@@ -246,11 +258,10 @@ class TicketViewSet(viewsets.ModelViewSet):
         """
         from datetime import timedelta, date, datetime
         from django.utils import timezone
-        from django.db.models import Count, Q, Avg, F, ExpressionWrapper, DurationField
+        from django.db.models import Count, Sum
         from Maquinas.models import Maquina
-        from BitacoraTecnica.models import BitacoraTecnica
-        from IncidenciasInfraestructura.models import IncidenciaInfraestructura
-        from MantenimientosPreventivos.models import MantenimientoPreventivo
+        from Usuarios.models import Usuarios
+        from .models import ResumenDiario
         from calendar import monthrange
         
         if not casino_id:
@@ -308,109 +319,80 @@ class TicketViewSet(viewsets.ModelViewSet):
         except ValueError as e:
             return Response({'error': f'Parámetros de fecha inválidos: {str(e)}'}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Convertimos a datetimes con timezone para filtros precisos django __gte __lt
-        tz = timezone.get_current_timezone()
-        dt_inicio = timezone.make_aware(datetime.combine(fecha_inicio, datetime.min.time()), tz)
-        dt_fin = timezone.make_aware(datetime.combine(fecha_fin, datetime.min.time()), tz)
-            
+        # Métricas del periodo desde los rollups diarios (Tickets/resumenes.py):
+        # una sola consulta de como máximo 31 días × métricas, en lugar de
+        # re-escanear tickets, bitácoras, mantenimientos e incidencias.
+        resumen = {}
+        for fila in ResumenDiario.objects.filter(
+            casino_id=casino_id,
+            fecha__gte=fecha_inicio,
+            fecha__lt=fecha_fin,
+        ).values('metrica', 'dimension').annotate(valor=Sum('valor'), suma=Sum('suma')):
+            resumen.setdefault(fila['metrica'], {})[fila['dimension']] = (fila['valor'], fila['suma'])
+
+        def _total(metrica):
+            return sum(valor for valor, _ in resumen.get(metrica, {}).values())
+
+        def _top(metrica, limite=5):
+            filas = [(dimension, valor) for dimension, (valor, _) in resumen.get(metrica, {}).items() if valor > 0]
+            return sorted(filas, key=lambda fila: -fila[1])[:limite]
+
         # 1. Fallas por Categoría (Tickets creados en el periodo)
-        tickets_periodo_creados = Ticket.objects.filter(
-            maquina__casino_id=casino_id,
-            creado_en__gte=dt_inicio,
-            creado_en__lt=dt_fin,
-            esta_activo=True
-        )
-        
         categorias_dict = dict(Ticket.CATEGORIAS_CHOICES)
-        fallas_raw = list(tickets_periodo_creados.values('categoria').annotate(total=Count('id')).order_by('-total'))
         fallas_categoria = [
-            {'categoria': c['categoria'], 'label': categorias_dict.get(c['categoria'], c['categoria']), 'total': c['total']}
-            for c in fallas_raw
+            {'categoria': categoria, 'label': categorias_dict.get(categoria, categoria), 'total': total}
+            for categoria, total in _top('creados', limite=None)
         ]
-        
-        # 1b. Top 5 Máquinas Problemáticas (NUEVO)
-        maquinas_problematicas_raw = list(tickets_periodo_creados.values(
-            'maquina__uid_sala', 
-            'maquina__modelo__nombre_modelo'
-        ).annotate(
-            total=Count('id')
-        ).order_by('-total')[:5])
-        
+
+        # 1b. Top 5 Máquinas Problemáticas
+        maquinas_top = _top('maquina')
+        maquinas_info = {
+            str(m['id']): m for m in Maquina.objects.filter(
+                id__in=[int(maquina_id) for maquina_id, _ in maquinas_top]
+            ).values('id', 'uid_sala', 'modelo__nombre_modelo')
+        }
         top_maquinas = [
             {
-                'uid_sala': m['maquina__uid_sala'], 
-                'modelo': m['maquina__modelo__nombre_modelo'], 
-                'total': m['total']
-            } for m in maquinas_problematicas_raw
+                'uid_sala': maquinas_info.get(maquina_id, {}).get('uid_sala'),
+                'modelo': maquinas_info.get(maquina_id, {}).get('modelo__nombre_modelo'),
+                'total': total
+            } for maquina_id, total in maquinas_top
         ]
-        
-        # 2. Resolución y MTTR (Cerrados en el periodo)
-        tickets_creados_count = tickets_periodo_creados.count()
-        
-        tickets_cerrados_query = Ticket.objects.filter(
-            maquina__casino_id=casino_id,
-            estado_ciclo='cerrado',
-            modificado_en__gte=dt_inicio, # Usamos modificacion como fecha de cierre proxy (y suelto para MTTR real)
-            modificado_en__lt=dt_fin,
-            esta_activo=True
-        )
-        tickets_cerrados_count = tickets_cerrados_query.count()
-        
-        # Cálculo de MTTR (Mean Time To Repair) - NUEVO
+
+        # 2. Resolución y MTTR (Cerrados en el periodo, modificado_en como fecha de cierre proxy)
+        tickets_creados_count = _total('creados')
+        tickets_cerrados_count = _total('cerrados')
+
+        # MTTR (Mean Time To Repair): `suma` acumula los segundos de reparación
         mttr_horas = 0
         if tickets_cerrados_count > 0:
-            # Anotar el tiempo empleado en cada ticket
-            tickets_con_tiempo = tickets_cerrados_query.annotate(
-                tiempo_reparacion=ExpressionWrapper(
-                    F('modificado_en') - F('creado_en'),
-                    output_field=DurationField()
-                )
-            )
-            promedio_str = tickets_con_tiempo.aggregate(promedio=Avg('tiempo_reparacion'))['promedio']
-            if promedio_str:
-                mttr_horas = round(promedio_str.total_seconds() / 3600.0, 1)
+            segundos = sum(suma for _, suma in resumen.get('cerrados', {}).values())
+            mttr_horas = round(segundos / tickets_cerrados_count / 3600.0, 1)
+
+        # 3. Preventivos vs Correctivos
+        preventivos_count = _total('preventivos')
 
-        # 3. Preventivos vs Correctivos - NUEVO
-        preventivos_count = MantenimientoPreventivo.objects.filter(
-            maquina__casino__id=casino_id,
-            fecha_mantenimiento__gte=fecha_inicio,
-            fecha_mantenimiento__lt=fecha_fin,
-            esta_activo=True
-        ).count()
-        
         # 4. Técnico más activo
-        tecnicos_activos = list(BitacoraTecnica.objects.filter(
-            ticket__maquina__casino_id=casino_id,
-            creado_en__gte=dt_inicio,
-            creado_en__lt=dt_fin
-        ).values(
-            'usuario_tecnico__nombres', 
-            'usuario_tecnico__apellido_paterno'
-        ).annotate(
-            total_intervenciones=Count('id')
-        ).order_by('-total_intervenciones')[:5])
-        
-        tecnicos = []
-        for t in tecnicos_activos:
-            nombre = f"{t['usuario_tecnico__nombres']} {t['usuario_tecnico__apellido_paterno'] or ''}".strip()
-            tecnicos.append({
-                'nombre': nombre,
-                'total': t['total_intervenciones']
-            })
-            
+        tecnicos_top = _top('tecnico')
+        nombres_tecnicos = {
+            str(u['id']): f"{u['nombres']} {u['apellido_paterno'] or ''}".strip()
+            for u in Usuarios.objects.filter(
+                id__in=[int(usuario_id) for usuario_id, _ in tecnicos_top if usuario_id.isdigit()]
+            ).values('id', 'nombres', 'apellido_paterno')
+        }
+        tecnicos = [
+            {'nombre': nombres_tecnicos.get(usuario_id, ''), 'total': total}
+            for usuario_id, total in tecnicos_top
+        ]
+
         # 5. Estado de la Sala (Instantánea actual, no depende del rango de fechas)
         maquinas_estado = list(Maquina.objects.filter(
             casino_id=casino_id,
             esta_activo=True
         ).values('estado_actual').annotate(total=Count('id')))
         
-        # 6. Incidencias de Infraestructura (Inciadas en el periodo)
-        incidencias = IncidenciaInfraestructura.objects.filter(
-            casino_id=casino_id,
-            hora_inicio__gte=dt_inicio,
-            hora_inicio__lt=dt_fin,
-            esta_activo=True
-        ).count()
+        # 6. Incidencias de Infraestructura (Iniciadas en el periodo)
+        incidencias = _total('incidencias')
         
         return Response({
             'periodo': {
@@ -433,6 +415,32 @@ class TicketViewSet(viewsets.ModelViewSet):
             'incidencias_infra': incidencias
         })
 
+    @action(detail=False, methods=['get'], url_path='exportar')
+    def exportar(self, request):
+        """
+        Exporta tickets en streaming (NDJSON o CSV) por rango de creación y casino.
+        Respeta los mismos filtros del listado (estado_ciclo, prioridad, etc.).
+        Ej: /api/tickets/exportar/?formato=csv&desde=2026-01-01&hasta=2026-01-31&casino=3&gzip=1
+        """
+        return respuesta_exportacion(
+            request,
+            self.filter_queryset(self.get_queryset()),
+            columnas=[
+                'id', 'folio', 'creado_en',
+                ('casino_nombre', 'maquina__casino__nombre'),
+                ('maquina_uid_sala', 'maquina__uid_sala'),
+                'categoria', 'subcategoria', 'prioridad', 'estado_ciclo',
+                'estado_maquina_reportado',
+                ('reportante_username', 'reportante__username'),
+                ('tecnico_asignado_username', 'tecnico_asignado__username'),
+                'descripcion_problema', 'explicacion_cierre',
+                'contador_reaperturas', 'esta_activo', 'modificado_en',
+            ],
+            campo_fecha='creado_en',
+            campo_casino='maquina__casino',
+            nombre='tickets',
+        )
+
     @action(detail=False, methods=['options'], url_path='esquema')
     def esquema(self, request):
         """
@@ -5,7 +5,7 @@ que usa session_token desde localStorage en lugar de JWT o sesiones.
 
 from rest_framework import authentication
 from rest_framework import exceptions
-from Usuarios.models import Usuarios
+from Usuarios.token_cache import resolver_request
 
 
 class SessionTokenAuthentication(authentication.BaseAuthentication):
@@ -15,35 +15,26 @@ class SessionTokenAuthentication(authentication.BaseAuthentication):
     
     Esta clase permite que DRF reconozca la autenticación y desactive
     automáticamente la verificación CSRF para endpoints autenticados.
+
+    Reutiliza la resolución que SessionTokenMiddleware ya dejó en el
+    HttpRequest, por lo que en el camino normal no ejecuta consultas.
     """
     
     def authenticate(self, request):
-        # Obtener el header Authorization
-        auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-        
-        if not auth_header:
-            return None  # No hay autenticación
-        
-        # Formato esperado: "Bearer {token}"
-        parts = auth_header.split()
-        
-        if len(parts) != 2 or parts[0].lower() != 'bearer':
+        # request._request es el HttpRequest original de Django
+        usuario, token, formato_valido = resolver_request(request._request)
+
+        if not formato_valido:
             raise exceptions.AuthenticationFailed('Formato de token inválido')
-        
-        token = parts[1]
-        
-        try:
-            # Buscar usuario por session_token
-            user = Usuarios.objects.select_related('casino', 'rol').get(
-                session_token=token,
-                esta_activo=True
-            )
-            
-            # Retornar tupla (user, auth) donde auth puede ser None o el token
-            return (user, token)
-            
-        except Usuarios.DoesNotExist:
+
+        if token is None:
+            return None  # No hay autenticación
+
+        if usuario is None:
             raise exceptions.AuthenticationFailed('Token inválido o usuario no activo')
+
+        # Retornar tupla (user, auth) donde auth puede ser None o el token
+        return (usuario, token)
     
     def authenticate_header(self, request):
         """
@@ -0,0 +1,436 @@
+"""
+Modo --scale de seed_nexus_perfecto: volumen de producción para benchmarks.
+
+El seed normal crea un casino con `objects.create()`/`save()` fila por fila;
+cada alta dispara auditoría, notificaciones, gamificación, feed del mapa e
+índice de búsqueda, así que no llega a millones de filas. Aquí:
+
+  1. Todas las tablas grandes se llenan con bulk_create por lotes y con los
+     signals silenciados (pre/post save/delete y m2m_changed), de modo que
+     no se encola ningún efecto secundario.
+  2. Las fechas se escriben tal cual: auto_now/auto_now_add se desactivan
+     durante la carga para repartir los datos en los últimos DIAS días.
+  3. Cada casino usa su propio random.Random(f'{semilla}-{n}'): misma
+     semilla y misma fecha base → mismos datos, sin importar el orden.
+  4. Al terminar se reconstruye lo que normalmente mantienen los signals:
+     resúmenes del dashboard, contadores de no leídas, bandeja e índice de
+     búsqueda (con los comandos reconstruir_* / reconciliar_*).
+
+Todo lo sembrado queda marcado con creado_por='semilla_escala' y casinos
+'escala-NNN', que es lo que borra --flush junto con --scale.
+"""
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime, time as hora, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.db import transaction
+from django.db.models import Max
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.utils import timezone
+
+from .seed_nexus_perfecto import (
+    AP_MAT, AP_PAT, BITACORA_TRABAJOS, DESCRIPCIONES_TICKET, EXPLICACIONES_CIERRE,
+    JUEGOS_SLOTS, NOMBRES_H, NOMBRES_M, TICKET_SUBCATS,
+)
+
+MARCA = 'semilla_escala'
+PREFIJO_CASINO = 'escala-'
+DIAS = 90
+
+MAQUINAS_POR_CASINO = 500
+PROVEEDORES_POR_CASINO = 4
+MODELOS_POR_PROVEEDOR = 3
+# (rol, cantidad por casino, puntos máximos de gamificación)
+PLANTILLA = [
+    ('TECNICO', 30, 4500),
+    ('SUP SISTEMAS', 6, 4500),
+    ('ADMINISTRADOR', 2, 600),
+    ('GERENCIA', 2, 300),
+    ('OBSERVADOR', 2, 100),
+]
+
+ESTADOS_MAQUINA = ['OPERATIVA'] * 7 + ['DAÑADA_OPERATIVA', 'DAÑADA', 'MANTENIMIENTO', 'OBSERVACION', 'PRUEBAS']
+ESTADOS_TICKET = ['cerrado'] * 6 + ['abierto', 'proceso', 'espera', 'reabierto']
+PRIORIDADES = ['baja', 'media', 'media', 'alta', 'critica', 'emergencia']
+TIPOS_INTERVENCION = ['correctiva', 'ajuste', 'instalacion', 'actualización', 'diagnostico']
+RESULTADOS = ['exitosa', 'parcial', 'fallida', 'espera_refaccion']
+ESTADOS_RESULTANTES = ['operativa', 'dañada_operativa', 'dañada', 'mantenimiento']
+NIVELES_NOTIFICACION = ['informativa', 'informativa', 'alerta', 'urgente']
+TIPOS_NOTIFICACION = ['ticket', 'ticket', 'sistema', 'infraestructura', 'wiki']
+
+
+@contextmanager
+def signals_silenciados():
+    """Desconecta temporalmente todos los receivers de save/delete/m2m."""
+    senales = (pre_save, post_save, pre_delete, post_delete, m2m_changed)
+    guardados = [(senal, senal.receivers) for senal in senales]
+    try:
+        for senal in senales:
+            senal.receivers = []
+            senal.sender_receivers_cache.clear()
+        yield
+    finally:
+        for senal, receivers in guardados:
+            senal.receivers = receivers
+            senal.sender_receivers_cache.clear()
+
+
+@contextmanager
+def fechas_manuales(*modelos):
+    """Desactiva auto_now/auto_now_add de `modelos` para escribir fechas históricas."""
+    campos = [
+        (campo, campo.auto_now, campo.auto_now_add)
+        for modelo in modelos for campo in modelo._meta.concrete_fields
+        if getattr(campo, 'auto_now', False) or getattr(campo, 'auto_now_add', False)
+    ]
+    try:
+        for campo, _, _ in campos:
+            campo.auto_now = campo.auto_now_add = False
+        yield
+    finally:
+        for campo, auto_now, auto_now_add in campos:
+            campo.auto_now, campo.auto_now_add = auto_now, auto_now_add
+
+
+def insertar(modelo, objetos, lote, con_ids=False):
+    """
+    bulk_create por lotes. Con `con_ids` asigna el pk a cada objeto: MySQL no
+    devuelve ids en un INSERT múltiple, así que se leen los mayores al tope
+    previo con la marca del seed (bulk_create inserta en el orden de la lista).
+    """
+    if not objetos:
+        return objetos
+    tope = (modelo.objects.aggregate(tope=Max('pk'))['tope'] or 0) if con_ids else 0
+    modelo.objects.bulk_create(objetos, batch_size=lote)
+    if con_ids and objetos[0].pk is None:
+        ids = list(
+            modelo.objects.filter(pk__gt=tope, creado_por=MARCA).order_by('pk').values_list('pk', flat=True)
+        )
+        if len(ids) != len(objetos):
+            raise RuntimeError(f'{modelo.__name__}: se esperaban {len(objetos)} ids nuevos y hay {len(ids)}')
+        for objeto, pk in zip(objetos, ids):
+            objeto.pk = pk
+    return objetos
+
+
+class SemillaEscala:
+    """Genera `casinos` casinos completos con `tickets_por_casino` tickets cada uno."""
+
+    def __init__(self, casinos, tickets_por_casino, semilla=42, lote=5000, fecha_base=None, escribir=print):
+        self.casinos = casinos
+        self.tickets_por_casino = tickets_por_casino
+        self.semilla = semilla
+        self.lote = lote
+        fin = timezone.make_aware(datetime.combine(fecha_base, hora(23, 59))) if fecha_base else timezone.now()
+        self.fin = fin.replace(microsecond=0)
+        self.inicio = self.fin - timedelta(days=DIAS)
+        self.escribir = escribir
+        self.totales = {}
+
+    def _fecha(self, rng, desde=None, hasta=None):
+        desde = desde or self.inicio
+        hasta = min(hasta or self.fin, self.fin)
+        segundos = max(int((hasta - desde).total_seconds()), 1)
+        return desde + timedelta(seconds=rng.randint(0, segundos))
+
+    def _contar(self, nombre, cantidad):
+        self.totales[nombre] = self.totales.get(nombre, 0) + cantidad
+
+    # ──────────────────────────────────────────────────────────────────────
+    # Carga
+    # ──────────────────────────────────────────────────────────────────────
+    def ejecutar(self, reconstruir=True):
+        from BitacoraTecnica.models import BitacoraTecnica
+        from Casinos.models import Casino
+        from Denominaciones.models import Denominacion
+        from Maquinas.models import Maquina
+        from ModelosMaquinas.models import ModeloMaquina
+        from Notificaciones.models import Notificacion, NotificacionUsuario
+        from Proveedores.models import Proveedor
+        from Roles.models import Rol
+        from Tickets.models import Ticket
+        from Usuarios.models import Usuarios
+
+        roles = {rol.nombre.upper(): rol for rol in Rol.objects.all()}
+        if 'TECNICO' not in roles:
+            raise RuntimeError("Se necesita al menos el rol 'TECNICO' para sembrar.")
+        existentes = set(Casino.objects.filter(nombre__startswith=PREFIJO_CASINO).values_list('nombre', flat=True))
+        self.denominaciones = list(Denominacion.objects.order_by('id').values_list('id', flat=True))
+        self.password = make_password('123')
+
+        modelos = (
+            Casino, Proveedor, ModeloMaquina, Maquina, Usuarios, Ticket,
+            BitacoraTecnica, Notificacion, NotificacionUsuario,
+        )
+        inicio = time.perf_counter()
+        with signals_silenciados(), fechas_manuales(*modelos):
+            for indice in range(1, self.casinos + 1):
+                nombre = f'{PREFIJO_CASINO}{indice:03d}'
+                if nombre in existentes:
+                    self.escribir(f'  → {nombre} ya existe, se omite')
+                    continue
+                parcial = time.perf_counter()
+                with transaction.atomic():
+                    self._casino(indice, nombre, roles)
+                self.escribir(f'  ✓ {nombre} sembrado en {time.perf_counter() - parcial:.1f} s')
+
+        self.totales['segundos_carga'] = round(time.perf_counter() - inicio, 1)
+        if reconstruir:
+            self._reconstruir()
+        return self.totales
+
+    def _casino(self, indice, nombre, roles):
+        from Casinos.models import Casino
+
+        rng = random.Random(f'{self.semilla}-{indice}')
+        creado = self.inicio - timedelta(days=30)
+        casino = Casino(
+            nombre=nombre, identificador=f'ESC-{indice:03d}',
+            direccion=f'Entorno de carga #{indice}', ciudad='Benchmark, México',
+            telefono='000-000-0000', encargado='Semilla de escala',
+            horario_apertura='00:00', horario_cierre='23:59',
+            grid_width=50, grid_height=50,
+            creado_en=creado, modificado_en=creado, creado_por=MARCA,
+        )
+        insertar(Casino, [casino], self.lote, con_ids=True)
+        self._contar('casinos', 1)
+
+        maquinas = self._maquinas(rng, casino, creado)
+        usuarios = self._usuarios(rng, casino, roles, creado)
+        self._tickets(rng, indice, casino, maquinas, usuarios)
+        self._notificaciones(rng, casino, usuarios, roles)
+
+    def _maquinas(self, rng, casino, creado):
+        from Maquinas.models import Maquina
+        from ModelosMaquinas.models import ModeloMaquina
+        from Proveedores.models import Proveedor
+
+        proveedores = insertar(Proveedor, [
+            Proveedor(
+                casino=casino, nombre=f'Proveedor {numero} {casino.identificador}',
+                rfc=f'ESC{casino.pk % 1000:03d}{numero:02d}0000'[:13],
+                email_corporativo=f'proveedor{numero}@escala.local', telefono_soporte='000-000-0000',
+                username=f'prov{numero}', password='123',
+                creado_en=creado, modificado_en=creado, creado_por=MARCA,
+            )
+            for numero in range(1, PROVEEDORES_POR_CASINO + 1)
+        ], self.lote, con_ids=True)
+        modelos = insertar(ModeloMaquina, [
+            ModeloMaquina(
+                proveedor=proveedor, nombre_modelo=f'Modelo {numero}',
+                nombre_producto=rng.choice(JUEGOS_SLOTS)[:100],
+                creado_en=creado, modificado_en=creado, creado_por=MARCA,
+            )
+            for proveedor in proveedores for numero in range(1, MODELOS_POR_PROVEEDOR + 1)
+        ], self.lote, con_ids=True)
+
+        # Cuatro salas de 50x50 llenadas por filas
+        salas = [(piso, sala) for piso, _ in Maquina.PISO_CHOICES[:2] for sala, _ in Maquina.SALA_CHOICES[:2]]
+        maquinas = []
+        for numero in range(MAQUINAS_POR_CASINO):
+            piso, sala = salas[numero % len(salas)]
+            celda = numero // len(salas)
+            maquinas.append(Maquina(
+                casino=casino, modelo=rng.choice(modelos),
+                uid_sala=f'M{numero + 1:05d}', numero_serie=f'SN-{casino.pk}-{numero + 1:06d}',
+                ip_maquina=f'10.{casino.pk % 250}.{numero // 250}.{numero % 250 + 1}',
+                juego=rng.choice(JUEGOS_SLOTS), ubicacion_piso=piso, ubicacion_sala=sala,
+                coordenada_x=celda % 50 + 1, coordenada_y=celda // 50 + 1,
+                estado_actual=rng.choice(ESTADOS_MAQUINA), contador_fallas=rng.randint(0, 12),
+                creado_en=creado, modificado_en=creado, creado_por=MARCA,
+            ))
+        insertar(Maquina, maquinas, self.lote, con_ids=True)
+        if self.denominaciones:
+            Intermedia = Maquina.denominaciones.through
+            insertar(Intermedia, [
+                Intermedia(maquina_id=maquina.pk, denominacion_id=denominacion)
+                for maquina in maquinas
+                for denominacion in rng.sample(self.denominaciones, min(2, len(self.denominaciones)))
+            ], self.lote)
+        self._contar('maquinas', len(maquinas))
+        return maquinas
+
+    def _usuarios(self, rng, casino, roles, creado):
+        from Usuarios.models import Usuarios
+
+        usuarios = {}
+        for clave, cantidad, puntos_max in PLANTILLA:
+            rol = roles.get(clave)
+            if rol is None:
+                continue
+            for numero in range(1, cantidad + 1):
+                username = f'esc{casino.identificador[-3:]}_{clave.split()[0].lower()}_{numero:02d}'
+                puntos = rng.randint(0, puntos_max)
+                usuarios.setdefault(clave, []).append(Usuarios(
+                    username=username, email=f'{username}@escala.local', password=self.password,
+                    nombres=rng.choice(NOMBRES_H + NOMBRES_M), apellido_paterno=rng.choice(AP_PAT),
+                    apellido_materno=rng.choice(AP_MAT), casino=casino, rol=rol,
+                    puntos_gamificacion=puntos, puntos_gamificacion_historico=puntos, EULAAceptada=True,
+                    creado_en=creado, modificado_en=creado, creado_por=MARCA,
+                ))
+        insertar(Usuarios, [usuario for lista in usuarios.values() for usuario in lista], self.lote, con_ids=True)
+        self._contar('usuarios', sum(len(lista) for lista in usuarios.values()))
+        return usuarios
+
+    def _tickets(self, rng, indice, casino, maquinas, usuarios):
+        from AuditoriaGlobal.models import LogAuditoria
+        from BitacoraTecnica.models import BitacoraTecnica
+        from Tickets.models import Ticket
+
+        tecnicos = usuarios['TECNICO']
+        reportantes = tecnicos + usuarios.get('SUP SISTEMAS', [])
+        categorias = list(TICKET_SUBCATS)
+
+        for desde in range(0, self.tickets_por_casino, self.lote):
+            tickets = []
+            for numero in range(desde, min(desde + self.lote, self.tickets_por_casino)):
+                maquina = rng.choice(maquinas)
+                categoria = rng.choice(categorias)
+                estado = rng.choice(ESTADOS_TICKET)
+                fecha = self._fecha(rng)
+                tickets.append(Ticket(
+                    maquina=maquina, reportante=rng.choice(reportantes), tecnico_asignado=rng.choice(tecnicos),
+                    folio=f'ES{indice:03d}-{numero + 1:07d}', categoria=categoria,
+                    subcategoria=rng.choice(TICKET_SUBCATS[categoria])[:50], prioridad=rng.choice(PRIORIDADES),
+                    descripcion_problema=rng.choice(DESCRIPCIONES_TICKET.get(categoria, ['Problema reportado en máquina.'])),
+                    estado_maquina_reportado=maquina.estado_actual, estado_ciclo=estado,
+                    explicacion_cierre=rng.choice(EXPLICACIONES_CIERRE) if estado == 'cerrado' else None,
+                    contador_reaperturas=rng.randint(1, 2) if estado == 'reabierto' else 0,
+                    creado_en=fecha, modificado_en=fecha, creado_por=MARCA,
+                ))
+            insertar(Ticket, tickets, self.lote, con_ids=True)
+
+            bitacoras, auditoria = [], []
+            for ticket in tickets:
+                cantidad = rng.randint(1, 4)
+                fecha = ticket.creado_en
+                for numero in range(cantidad):
+                    fecha = self._fecha(rng, fecha, fecha + timedelta(hours=24))
+                    bitacoras.append(BitacoraTecnica(
+                        ticket_id=ticket.pk, usuario_tecnico=rng.choice(reportantes),
+                        tipo_intervencion=rng.choice(TIPOS_INTERVENCION),
+                        descripcion_trabajo=rng.choice(BITACORA_TRABAJOS),
+                        resultado_intervencion=rng.choice(RESULTADOS),
+                        estado_maquina_resultante=rng.choice(ESTADOS_RESULTANTES),
+                        finaliza_ticket=numero == cantidad - 1 and ticket.estado_ciclo == 'cerrado',
+                        creado_en=fecha, modificado_en=fecha, creado_por=MARCA,
+                    ))
+                auditoria.append(LogAuditoria(
+                    tabla='tickets', registro_id=str(ticket.pk), accion='CREATE', es_checkpoint=True,
+                    datos_nuevos={'folio': ticket.folio, 'estado_ciclo': 'abierto', 'prioridad': ticket.prioridad},
+                    fecha=ticket.creado_en, usuario_id=ticket.reportante_id, casino=casino,
+                ))
+                if ticket.estado_ciclo != 'abierto':
+                    auditoria.append(LogAuditoria(
+                        tabla='tickets', registro_id=str(ticket.pk), accion='UPDATE',
+                        cambios={'estado_ciclo': ['abierto', ticket.estado_ciclo]},
+                        fecha=fecha, usuario_id=ticket.tecnico_asignado_id, casino=casino,
+                    ))
+            insertar(BitacoraTecnica, bitacoras, self.lote)
+            insertar(LogAuditoria, auditoria, self.lote)
+            self._contar('tickets', len(tickets))
+            self._contar('bitacoras', len(bitacoras))
+            self._contar('auditoria', len(auditoria))
+
+    def _notificaciones(self, rng, casino, usuarios, roles):
+        from Notificaciones.models import Notificacion, NotificacionUsuario
+
+        todos = [usuario for lista in usuarios.values() for usuario in lista]
+        total = max(self.tickets_por_casino // 2, 1)
+        for desde in range(0, total, self.lote):
+            notificaciones = []
+            for numero in range(desde, min(desde + self.lote, total)):
+                fecha = self._fecha(rng)
+                destino = {'casino_destino': casino}
+                audiencia = rng.random()
+                if audiencia < 0.5:
+                    destino['usuario_destino'] = rng.choice(todos)
+                elif audiencia < 0.8:
+                    destino['rol_destino'] = roles['TECNICO']
+                notificaciones.append(Notificacion(
+                    titulo=f'Aviso {numero + 1} de {casino.nombre}',
+                    contenido='Notificación generada por la semilla de escala.',
+                    nivel=rng.choice(NIVELES_NOTIFICACION), tipo=rng.choice(TIPOS_NOTIFICACION),
+                    creado_en=fecha, modificado_en=fecha, creado_por=MARCA, **destino,
+                ))
+            insertar(Notificacion, notificaciones, self.lote, con_ids=True)
+
+            lecturas = []
+            for notificacion in notificaciones:
+                if notificacion.usuario_destino_id:
+                    lectores = [notificacion.usuario_destino] if rng.random() < 0.6 else []
+                else:
+                    lectores = rng.sample(todos, rng.randint(0, min(5, len(todos))))
+                for lector in lectores:
+                    fecha = self._fecha(rng, notificacion.creado_en, notificacion.creado_en + timedelta(days=2))
+                    lecturas.append(NotificacionUsuario(
+                        notificacion_id=notificacion.pk, usuario=lector, fecha_visto=fecha,
+                        creado_en=fecha, modificado_en=fecha, creado_por=MARCA,
+                    ))
+            insertar(NotificacionUsuario, lecturas, self.lote)
+            self._contar('notificaciones', len(notificaciones))
+            self._contar('lecturas', len(lecturas))
+
+    # ──────────────────────────────────────────────────────────────────────
+    # Derivados
+    # ──────────────────────────────────────────────────────────────────────
+    def _reconstruir(self):
+        """Lo que los signals habrían mantenido: rollups, contadores, bandeja e índice."""
+        from Notificaciones.bandeja import bandeja_habilitada
+
+        comandos = ['reconstruir_resumenes', 'reconciliar_no_leidas', 'reconstruir_indice_busqueda']
+        if bandeja_habilitada():
+            comandos.append('reconstruir_bandeja')
+        inicio = time.perf_counter()
+        for comando in comandos:
+            self.escribir(f'  → {comando}')
+            call_command(comando, verbosity=0)
+        self.totales['segundos_derivados'] = round(time.perf_counter() - inicio, 1)
+
+
+def limpiar_escala(lote=5000, escribir=print):
+    """Borra por lotes todo lo sembrado en modo escala (casinos 'escala-NNN')."""
+    from AuditoriaGlobal.models import LogAuditoria
+    from BitacoraTecnica.models import BitacoraTecnica
+    from Casinos.models import Casino
+    from Maquinas.models import Maquina
+    from ModelosMaquinas.models import ModeloMaquina
+    from Notificaciones.models import Notificacion, NotificacionUsuario
+    from Proveedores.models import Proveedor
+    from Tickets.models import ResumenDiario, Ticket
+    from Usuarios.models import Usuarios
+
+    casinos = list(Casino.objects.filter(nombre__startswith=PREFIJO_CASINO).values_list('pk', flat=True))
+    if not casinos:
+        escribir('  → No hay casinos de escala que limpiar')
+        return
+    # De las hojas hacia arriba, para que cada delete() no tenga que recolectar en cascada
+    orden = [
+        (LogAuditoria, {'casino_id__in': casinos}),
+        (ResumenDiario, {'casino_id__in': casinos}),
+        (NotificacionUsuario, {'notificacion__casino_destino_id__in': casinos}),
+        (Notificacion, {'casino_destino_id__in': casinos}),
+        (BitacoraTecnica, {'ticket__maquina__casino_id__in': casinos}),
+        (Ticket, {'maquina__casino_id__in': casinos}),
+        (Maquina.denominaciones.through, {'maquina__casino_id__in': casinos}),
+        (Maquina, {'casino_id__in': casinos}),
+        (ModeloMaquina, {'proveedor__casino_id__in': casinos}),
+        (Proveedor, {'casino_id__in': casinos}),
+        (Usuarios, {'casino_id__in': casinos, 'creado_por': MARCA}),
+        (Casino, {'pk__in': casinos}),
+    ]
+    with signals_silenciados():
+        for modelo, filtro in orden:
+            borrados = 0
+            while True:
+                pks = list(modelo.objects.filter(**filtro).values_list('pk', flat=True)[:lote])
+                if not pks:
+                    break
+                modelo.objects.filter(pk__in=pks).delete()
+                borrados += len(pks)
+            escribir(f'  ✓ {modelo._meta.db_table}: {borrados} filas eliminadas')
+    # El índice de búsqueda quita las entradas de objetos que ya no existen
+    call_command('reconstruir_indice_busqueda', verbosity=0)
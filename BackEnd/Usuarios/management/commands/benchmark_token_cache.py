@@ -0,0 +1,75 @@
+"""
+Management Command: benchmark_token_cache
+=========================================
+Mide cuántas consultas SQL cuesta autenticar un request con
+`Authorization: Bearer {token}` pasando por SessionTokenMiddleware y
+SessionTokenAuthentication (el mismo camino que recorre cualquier endpoint).
+
+Escenarios:
+  - Caché frío: el token no está en el LRU → 1 consulta (antes: 2).
+  - Caché caliente: el token ya fue resuelto → 0 consultas.
+
+Uso:
+    python manage.py benchmark_token_cache --usuario <username>
+    python manage.py benchmark_token_cache --usuario <username> --iteraciones 500
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+
+from Usuarios.authentication import SessionTokenAuthentication
+from Usuarios.middleware import SessionTokenMiddleware
+from Usuarios.models import Usuarios
+from Usuarios.token_cache import limpiar_cache
+
+
+class Command(BaseCommand):
+    help = 'Compara consultas SQL por request de la autenticación Bearer con caché frío vs caliente'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuario', required=True, help='Username activo con session_token vigente.')
+        parser.add_argument('--iteraciones', type=int, default=200, help='Requests simulados en caché caliente.')
+
+    def _autenticar(self, factory, middleware, token):
+        http_request = factory.get('/api/usuarios/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        middleware.process_request(http_request)
+        drf_request = Request(http_request, authenticators=[SessionTokenAuthentication()])
+        return drf_request.user
+
+    def handle(self, *args, **options):
+        try:
+            usuario = Usuarios.objects.get(username=options['usuario'], esta_activo=True)
+        except Usuarios.DoesNotExist:
+            raise CommandError('El usuario no existe o está inactivo.')
+        if not usuario.session_token:
+            raise CommandError('El usuario no tiene session_token; inicia sesión primero.')
+
+        factory = RequestFactory()
+        middleware = SessionTokenMiddleware(lambda request: None)
+        token = usuario.session_token
+        iteraciones = options['iteraciones']
+
+        # ── Caché frío ─────────────────────────────────────────────────────
+        limpiar_cache()
+        with CaptureQueriesContext(connection) as ctx:
+            user = self._autenticar(factory, middleware, token)
+        if user.pk != usuario.pk:
+            raise CommandError('La autenticación no resolvió al usuario esperado.')
+        consultas_frio = len(ctx.captured_queries)
+
+        # ── Caché caliente ─────────────────────────────────────────────────
+        inicio = time.perf_counter()
+        with CaptureQueriesContext(connection) as ctx:
+            for _ in range(iteraciones):
+                self._autenticar(factory, middleware, token)
+        duracion = time.perf_counter() - inicio
+        consultas_caliente = len(ctx.captured_queries) / iteraciones
+
+        self.stdout.write(f'  Consultas por request (caché frío)     → {consultas_frio}')
+        self.stdout.write(f'  Consultas por request (caché caliente) → {consultas_caliente:.2f}')
+        self.stdout.write(f'  Tiempo medio de autenticación          → {duracion / iteraciones * 1000:.3f} ms')
+        self.stdout.write(self.style.SUCCESS('✅ Benchmark completado. Referencia previa: 2 consultas por request.'))
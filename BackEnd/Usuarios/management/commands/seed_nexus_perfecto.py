@@ -9,6 +9,11 @@ lógica de negocio del sistema (últimos 90 días).
 Uso:
     python manage.py seed_nexus_perfecto
     python manage.py seed_nexus_perfecto --flush   (limpia datos del seed prev.)
+
+Modo escala (volumen de producción para benchmarks, ver _semilla_escala.py):
+    python manage.py seed_nexus_perfecto --scale 50                        (50 casinos x 20,000 tickets)
+    python manage.py seed_nexus_perfecto --scale 10 --tickets-por-casino 100000 --semilla 7
+    python manage.py seed_nexus_perfecto --scale 50 --flush                (borra y resiembra los casinos escala-NNN)
 =============================================================================
 """
 
@@ -412,8 +417,23 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument('--flush', action='store_true',
                             help='Elimina datos del seed anterior antes de sembrar.')
+        parser.add_argument('--scale', type=int, default=0,
+                            help='Modo escala: número de casinos a generar con bulk_create y signals silenciados.')
+        parser.add_argument('--tickets-por-casino', type=int, default=20000,
+                            help='Modo escala: tickets por casino (bitácoras, auditoría y notificaciones escalan con él).')
+        parser.add_argument('--semilla', type=int, default=42,
+                            help='Modo escala: semilla del generador; misma semilla y fecha base, mismos datos.')
+        parser.add_argument('--fecha-base', type=date.fromisoformat, default=None,
+                            help='Modo escala: último día del rango de 90 días (YYYY-MM-DD, por defecto hoy).')
+        parser.add_argument('--lote', type=int, default=5000,
+                            help='Modo escala: filas por bulk_create.')
+        parser.add_argument('--sin-derivados', action='store_true',
+                            help='Modo escala: no reconstruye resúmenes, contadores, bandeja ni índice de búsqueda.')
 
     def handle(self, *args, **options):
+        if options['scale']:
+            return self._escala(options)
+
         banner("NEXUS — SEEDING PERFECTO v2.0  [casino: pruebas]")
         info(f"Fecha base: {TODAY}  |  Rango: últimos 90 días")
         info("Modo seguro: NO se modifican datos existentes — todo va al casino 'pruebas'")
@@ -456,6 +476,32 @@ class Command(BaseCommand):
 
         self._resumen(usuarios)
 
+    # ─────────────────────────────────────────────────────────────────────────
+    # MODO ESCALA
+    # ─────────────────────────────────────────────────────────────────────────
+
+    def _escala(self, options):
+        from ._semilla_escala import SemillaEscala, limpiar_escala
+
+        casinos, por_casino = options['scale'], max(options['tickets_por_casino'], 1)
+        banner(f"NEXUS — SEEDING A ESCALA  [{casinos} casinos x {por_casino:,} tickets]")
+        info(f"Semilla: {options['semilla']}  |  Fecha base: {options['fecha_base'] or TODAY}  |  Lote: {options['lote']}")
+
+        if options.get('flush'):
+            banner("LIMPIEZA DE CASINOS DE ESCALA")
+            limpiar_escala(lote=options['lote'], escribir=self.stdout.write)
+
+        banner("CARGA MASIVA (signals silenciados)")
+        semilla = SemillaEscala(
+            casinos, por_casino, semilla=options['semilla'], lote=max(options['lote'], 1),
+            fecha_base=options['fecha_base'], escribir=self.stdout.write,
+        )
+        totales = semilla.ejecutar(reconstruir=not options['sin_derivados'])
+
+        banner("RESUMEN")
+        for nombre, valor in totales.items():
+            ok(f"{nombre:<20} {valor:>14,}")
+
     # ─────────────────────────────────────────────────────────────────────────
     # FLUSH
     # ─────────────────────────────────────────────────────────────────────────
@@ -2,11 +2,15 @@
 Middleware personalizado para autenticación basada en session_token
 sin usar sesiones de Django. Lee el token del header Authorization
 y asigna el usuario correspondiente a request.user.
+
+La resolución se delega a Usuarios.token_cache, que la cachea y la deja
+guardada en el request para que SessionTokenAuthentication (DRF) no
+vuelva a consultar la base de datos.
 """
 
 from django.utils.deprecation import MiddlewareMixin
 from django.contrib.auth.models import AnonymousUser
-from Usuarios.models import Usuarios
+from Usuarios.token_cache import resolver_request
 
 
 class SessionTokenMiddleware(MiddlewareMixin):
@@ -16,30 +20,6 @@ class SessionTokenMiddleware(MiddlewareMixin):
     """
     
     def process_request(self, request):
-        # Obtener el token del header Authorization
-        auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-        
-        if not auth_header:
-            request.user = AnonymousUser()
-            return None
-        
-        # Formato esperado: "Bearer {token}"
-        parts = auth_header.split()
-        
-        if len(parts) != 2 or parts[0].lower() != 'bearer':
-            request.user = AnonymousUser()
-            return None
-        
-        token = parts[1]
-        
-        try:
-            # Buscar usuario por session_token
-            user = Usuarios.objects.select_related('casino', 'rol').get(
-                session_token=token,
-                esta_activo=True
-            )
-            request.user = user
-        except Usuarios.DoesNotExist:
-            request.user = AnonymousUser()
-        
+        usuario, token, formato_valido = resolver_request(request)
+        request.user = usuario if usuario is not None else AnonymousUser()
         return None
@@ -0,0 +1,20 @@
+# Generated by Django 6.0.2 on 2026-10-18 18:40
+
+import ModelBase.almacen_contenido
+import Usuarios.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Usuarios', '0007_add_puntos_gamificacion_historico'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='usuarios',
+            name='avatar',
+            field=models.FileField(blank=True, help_text='Imagen de perfil del usuario', null=True, storage=ModelBase.almacen_contenido.almacen_contenido, upload_to=Usuarios.models.custom_upload_to),
+        ),
+    ]
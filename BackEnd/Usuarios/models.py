@@ -1,4 +1,5 @@
 from django.db import models
+from ModelBase.almacen_contenido import almacen_contenido
 from ModelBase.models import ModeloBase
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager
 from Casinos.models import Casino
@@ -121,6 +122,7 @@ class Usuarios(AbstractBaseUser, ModeloBase):
 
     avatar = models.FileField(
         upload_to=custom_upload_to,
+        storage=almacen_contenido,
         null=True,
         blank=True,
         help_text="Imagen de perfil del usuario"
@@ -195,16 +197,21 @@ class Usuarios(AbstractBaseUser, ModeloBase):
           - Compatible con llamadas que usen `update_fields`: si puntos_gamificacion
             está en update_fields, se agrega puntos_gamificacion_historico
             automáticamente para que el histórico siempre sea consistente.
+          - Si los puntos vienen diferidos (usuario del caché de autenticación)
+            no se tocan: Django solo guarda los campos cargados.
         """
         update_fields = kwargs.get('update_fields')
 
         if self.pk:
-            try:
-                previo = Usuarios.objects.get(pk=self.pk)
-                if self.puntos_gamificacion > previo.puntos_gamificacion:
-                    diferencia = self.puntos_gamificacion - previo.puntos_gamificacion
+            # Usuario del caché de autenticación: los puntos vienen diferidos y
+            # el save no los escribe, no hay histórico que sincronizar
+            previos = None if 'puntos_gamificacion' in self.get_deferred_fields() else self.valores_previos()
+            if previos is not None:
+                puntos_previos = previos['puntos_gamificacion']
+                if self.puntos_gamificacion > puntos_previos:
+                    diferencia = self.puntos_gamificacion - puntos_previos
                     self.puntos_gamificacion_historico = (
-                        previo.puntos_gamificacion_historico + diferencia
+                        previos['puntos_gamificacion_historico'] + diferencia
                     )
                     # Si se usa update_fields, aseguramos que historico también se persista
                     if update_fields is not None:
@@ -212,8 +219,6 @@ class Usuarios(AbstractBaseUser, ModeloBase):
                         if 'puntos_gamificacion_historico' not in campos:
                             campos.append('puntos_gamificacion_historico')
                         kwargs['update_fields'] = campos
-            except Usuarios.DoesNotExist:
-                pass
         else:
             # Usuario nuevo: si se crea con puntos, el histórico arranca igual
             self.puntos_gamificacion_historico = self.puntos_gamificacion
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from ModelBase.derivados import DerivadoImagen
 from .models import Usuarios
 
 class UsuariosSerializer(serializers.ModelSerializer):
@@ -10,6 +11,7 @@ class UsuariosSerializer(serializers.ModelSerializer):
     nivel_jerarquia = serializers.IntegerField(source='rol.nivel_jerarquia', read_only=True)
     casino_nombre = serializers.CharField(source='casino.nombre', read_only=True)
     avatar = serializers.SerializerMethodField()
+    avatar_mini = DerivadoImagen('mini', source='avatar')
     # ── Gamificación ──────────────────────────────────────────────────────────
     rango_gamificacion = serializers.SerializerMethodField()
 
@@ -22,7 +24,7 @@ class UsuariosSerializer(serializers.ModelSerializer):
             'creado_en', 'modificado_en', 'creado_por', 'modificado_por',
             'ultima_ip', 'user_agent', 'requiere_cambio_password',
             'password', 'session_token', 'refresh_token', 'intentos_fallidos', 'EULAAceptada',
-            'avatar',
+            'avatar', 'avatar_mini',
             # Gamificación
             'puntos_gamificacion',
             'puntos_gamificacion_historico',
@@ -55,9 +57,8 @@ class UsuariosSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if request:
             return request.build_absolute_uri(obj.avatar.url)
-        # Fallback sin request (ej. login que no pasa context)
-        from django.conf import settings
-        return f"{settings.MEDIA_URL}{obj.avatar.name}"
+        # Fallback sin request (ej. login que no pasa context): ruta relativa firmada
+        return obj.avatar.url
 
     def get_rango_gamificacion(self, obj):
         """Expone el rango RPG calculado dinámicamente desde el modelo."""
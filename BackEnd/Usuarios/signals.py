@@ -8,10 +8,18 @@ Razón: Los supervisores de sistemas deben saber cuándo un nuevo integrante
 entra al sistema para poder asistirlo o verificar sus permisos.
 
 Anti-spam: NO se notifica al editar, activar o desactivar usuarios.
+
+Además, cualquier alta, edición o borrado revoca las entradas del usuario
+en el caché de autenticación (Usuarios/token_cache.py) al confirmarse la
+transacción, en todos los workers.
 """
-from django.db.models.signals import post_save
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from .models import Usuarios
+from .token_cache import CAMPOS_FRESCOS, invalidar_usuario
 from Notificaciones.models import Notificacion
 from Roles.models import Rol
 
@@ -38,3 +46,12 @@ def usuario_post_save(sender, instance, created, **kwargs):
             casino_destino= casino,
             rol_destino   = rol,
         )
+
+
+@receiver(post_save, sender=Usuarios, dispatch_uid='usuarios_revocar_cache_token_save')
+@receiver(post_delete, sender=Usuarios, dispatch_uid='usuarios_revocar_cache_token_delete')
+def revocar_cache_token(sender, instance, update_fields=None, **kwargs):
+    # Los puntos no se cachean (CAMPOS_FRESCOS): guardarlos no revoca nada
+    if update_fields is not None and set(update_fields) <= set(CAMPOS_FRESCOS):
+        return
+    transaction.on_commit(partial(invalidar_usuario, instance.pk))
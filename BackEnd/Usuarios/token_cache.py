@@ -0,0 +1,285 @@
+"""
+Resolución cacheada de session_token → Usuario.
+
+Tanto SessionTokenMiddleware como SessionTokenAuthentication necesitan saber
+qué usuario corresponde al header `Authorization: Bearer {token}`. Antes cada
+uno hacía su propio SELECT (2 round trips a MySQL por request). Este módulo
+centraliza la resolución:
+
+  1. Se resuelve UNA sola vez por request y se guarda en el HttpRequest
+     (atributo `_session_token_resuelto`), de modo que DRF reutiliza lo que
+     ya resolvió el middleware.
+  2. Entre requests, el usuario se guarda en un LRU en memoria del proceso
+     y, opcionalmente, en un backend de caché compartido de Django
+     (Redis/Memcached) para que todos los workers se beneficien.
+
+Qué se cachea: la identidad y los datos de autorización (casino, rol,
+esta_activo). Los campos que cambian fuera del perfil del usuario
+(CAMPOS_FRESCOS: los puntos de gamificación) se cargan diferidos: se leen
+de la BD al usarlos y un save() de la instancia cacheada no los pisa.
+
+Invalidación:
+  - Las vistas que rotan o desactivan tokens (login, refresh, switch-estado,
+    destroy) llaman a `invalidar_token()` con el token anterior.
+  - Cualquier save/delete de un Usuarios marca al usuario como revocado
+    (`invalidar_usuario()`, desde un signal al confirmarse la transacción).
+    La marca es la hora de la revocación y se guarda en el caché compartido;
+    cada lectura la compara con la hora en que se leyó la entrada, así que
+    ningún worker sirve una entrada anterior a la revocación.
+  - Sin caché compartido la marca solo existe en el proceso que escribió:
+    el LRU de los demás workers usa un TTL de TTL_SIN_COMPARTIDO segundos.
+  - Cada entrada expira por TTL como red de seguridad.
+
+Configuración (settings.SESSION_TOKEN_CACHE, todas opcionales):
+    'LRU_MAXSIZE'         → entradas máximas en memoria por proceso (default 1024)
+    'TTL'                 → segundos de vida de cada entrada (default 300)
+    'TTL_SIN_COMPARTIDO'  → TTL del LRU cuando no hay CACHE_ALIAS (default 5)
+    'CACHE_ALIAS'         → alias de settings.CACHES para caché compartido (default None)
+    'KEY_PREFIX'          → prefijo de llaves en el caché compartido
+"""
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+_SIN_RESOLVER = object()
+ATRIBUTO_REQUEST = '_session_token_resuelto'
+
+# Campos que otros procesos modifican con UPDATE ... F(): nunca se cachean
+CAMPOS_FRESCOS = ('puntos_gamificacion', 'puntos_gamificacion_historico')
+
+
+def _config():
+    config = getattr(settings, 'SESSION_TOKEN_CACHE', {}) or {}
+    return {
+        'LRU_MAXSIZE': int(config.get('LRU_MAXSIZE', 1024)),
+        'TTL': float(config.get('TTL', 300)),
+        'TTL_SIN_COMPARTIDO': float(config.get('TTL_SIN_COMPARTIDO', 5)),
+        'CACHE_ALIAS': config.get('CACHE_ALIAS'),
+        'KEY_PREFIX': config.get('KEY_PREFIX', 'nexus:session_token:'),
+    }
+
+
+class LRUTokenCache:
+    """
+    LRU thread-safe con expiración por TTL.
+    Guarda tuplas (expira_en, entrada) indexadas por el hash del token.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, llave):
+        with self._lock:
+            entrada = self._datos.get(llave)
+            if entrada is None:
+                self.misses += 1
+                return None
+            expira_en, usuario = entrada
+            if expira_en < time.monotonic():
+                del self._datos[llave]
+                self.misses += 1
+                return None
+            self._datos.move_to_end(llave)
+            self.hits += 1
+            return usuario
+
+    def set(self, llave, usuario):
+        with self._lock:
+            self._datos[llave] = (time.monotonic() + self.ttl, usuario)
+            self._datos.move_to_end(llave)
+            while len(self._datos) > self.maxsize:
+                self._datos.popitem(last=False)
+
+    def delete(self, llave):
+        with self._lock:
+            self._datos.pop(llave, None)
+
+    def clear(self):
+        with self._lock:
+            self._datos.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._datos)
+
+
+_lru = None
+_lru_lock = threading.Lock()
+
+
+def get_lru():
+    """Devuelve el LRU del proceso (se crea perezosamente con la config actual)."""
+    global _lru
+    if _lru is None:
+        with _lru_lock:
+            if _lru is None:
+                config = _config()
+                ttl = config['TTL'] if config['CACHE_ALIAS'] else min(config['TTL'], config['TTL_SIN_COMPARTIDO'])
+                _lru = LRUTokenCache(config['LRU_MAXSIZE'], ttl)
+    return _lru
+
+
+def _cache_compartido():
+    alias = _config()['CACHE_ALIAS']
+    if not alias:
+        return None
+    from django.core.cache import caches
+    return caches[alias]
+
+
+def _llave(token):
+    # Nunca guardamos el token en claro como llave de caché
+    digest = hashlib.sha256(token.encode('utf-8')).hexdigest()
+    return f"{_config()['KEY_PREFIX']}{digest}"
+
+
+def _llave_revocacion(usuario_id):
+    return f"{_config()['KEY_PREFIX']}revocado:{usuario_id}"
+
+
+# usuario_id → hora de la última revocación hecha en este proceso
+_revocaciones_locales = {}
+
+
+def _revocado_en(usuario_id):
+    """Hora de la última revocación conocida del usuario (0 si nunca)."""
+    revocado = _revocaciones_locales.get(usuario_id, 0)
+    compartido = _cache_compartido()
+    if compartido is not None:
+        revocado = max(revocado, compartido.get(_llave_revocacion(usuario_id)) or 0)
+    return revocado
+
+
+def _vigente(entrada):
+    """True si la entrada (usuario, leido_en) se leyó después de la última revocación."""
+    if not isinstance(entrada, tuple):
+        return False
+    usuario, leido_en = entrada
+    return leido_en > _revocado_en(usuario.pk)
+
+
+def extraer_token(request):
+    """
+    Extrae el token del header Authorization.
+    Retorna (token, formato_valido):
+      - (None, True)  → no hay header
+      - (None, False) → header con formato inválido
+      - (token, True) → token listo para resolver
+    """
+    auth_header = request.META.get('HTTP_AUTHORIZATION', '')
+    if not auth_header:
+        return None, True
+
+    # Formato esperado: "Bearer {token}"
+    parts = auth_header.split()
+    if len(parts) != 2 or parts[0].lower() != 'bearer':
+        return None, False
+
+    return parts[1], True
+
+
+def _consultar_usuario(token):
+    from Usuarios.models import Usuarios
+    try:
+        return Usuarios.objects.select_related('casino', 'rol').defer(*CAMPOS_FRESCOS).get(
+            session_token=token,
+            esta_activo=True
+        )
+    except Usuarios.DoesNotExist:
+        return None
+
+
+def obtener_usuario_por_token(token):
+    """
+    Resuelve un token a un usuario activo: LRU local → caché compartido → MySQL.
+    Las entradas anteriores a una revocación del usuario se descartan.
+    Retorna una copia de la instancia para que ningún request mute la
+    instancia compartida del LRU. Retorna None si el token no es válido.
+    """
+    llave = _llave(token)
+    lru = get_lru()
+    compartido = _cache_compartido()
+
+    entrada = lru.get(llave)
+    if entrada is None and compartido is not None:
+        entrada = compartido.get(llave)
+        if entrada is not None:
+            lru.set(llave, entrada)
+
+    if entrada is not None and not _vigente(entrada):
+        lru.delete(llave)
+        entrada = None
+
+    if entrada is None:
+        # La hora se toma ANTES de consultar: una revocación confirmada
+        # mientras se lee la fila deja esta entrada como no vigente
+        leido_en = time.time()
+        usuario = _consultar_usuario(token)
+        if usuario is None:
+            # Los tokens inválidos no se cachean: se re-validan siempre
+            return None
+        entrada = (usuario, leido_en)
+        lru.set(llave, entrada)
+        if compartido is not None:
+            compartido.set(llave, entrada, timeout=lru.ttl)
+
+    return copy.copy(entrada[0])
+
+
+def resolver_request(request):
+    """
+    Resuelve el usuario del request UNA sola vez y lo guarda en el propio
+    HttpRequest. Llamadas posteriores (middleware → DRF) no tocan caché ni BD.
+    Retorna (usuario | None, token | None, formato_valido).
+    """
+    resuelto = getattr(request, ATRIBUTO_REQUEST, _SIN_RESOLVER)
+    if resuelto is not _SIN_RESOLVER:
+        return resuelto
+
+    token, formato_valido = extraer_token(request)
+    usuario = obtener_usuario_por_token(token) if token else None
+
+    resuelto = (usuario, token, formato_valido)
+    setattr(request, ATRIBUTO_REQUEST, resuelto)
+    return resuelto
+
+
+def invalidar_token(token):
+    """Elimina un token del LRU local y del caché compartido (si está configurado)."""
+    if not token:
+        return
+    llave = _llave(token)
+    get_lru().delete(llave)
+    compartido = _cache_compartido()
+    if compartido is not None:
+        compartido.delete(llave)
+
+
+def invalidar_usuario(usuario_id):
+    """
+    Revoca todas las entradas cacheadas del usuario (cualquier token, en
+    todos los workers si hay caché compartido).
+    """
+    if usuario_id is None:
+        return
+    ahora = time.time()
+    _revocaciones_locales[usuario_id] = ahora
+    compartido = _cache_compartido()
+    if compartido is not None:
+        # Basta con que la marca sobreviva a las entradas que revoca
+        compartido.set(_llave_revocacion(usuario_id), ahora, timeout=get_lru().ttl + 60)
+
+
+def limpiar_cache():
+    """Vacía el LRU local. Útil para benchmarks y mantenimiento."""
+    get_lru().clear()
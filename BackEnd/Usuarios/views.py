@@ -8,6 +8,8 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.generics import GenericAPIView
 from .models import Usuarios
 from .serializers import UsuariosSerializer, UsuarioLoginSerializer, UsuarioRefreshSerializer
+from .token_cache import invalidar_token
+from ModelBase.cache_respuestas import cachear_respuesta, casino_de_parametro
 
 class UsuariosViewSet(viewsets.ModelViewSet):
     """
@@ -117,6 +119,8 @@ class UsuariosViewSet(viewsets.ModelViewSet):
             user.last_login = timezone.now()
             token = str(uuid.uuid4())
             refresh = str(uuid.uuid4())
+            # El token anterior deja de ser válido: se saca del caché de autenticación
+            invalidar_token(user.session_token)
             user.session_token = token
             user.refresh_token = refresh
             user.save()
@@ -128,6 +132,7 @@ class UsuariosViewSet(viewsets.ModelViewSet):
             if user_obj.intentos_fallidos >= 3:
                 user_obj.esta_activo = False
                 user_obj.intentos_fallidos = 0
+                invalidar_token(user_obj.session_token)
                 user_obj.save()
                 return Response({"error": "Cuenta bloqueada por seguridad."}, status=status.HTTP_403_FORBIDDEN)
             
@@ -154,6 +159,7 @@ class UsuariosViewSet(viewsets.ModelViewSet):
         new_token = str(uuid.uuid4())
         new_refresh = str(uuid.uuid4())
         
+        invalidar_token(user.session_token)
         user.session_token = new_token
         user.refresh_token = new_refresh
         user.save()
@@ -178,6 +184,8 @@ class UsuariosViewSet(viewsets.ModelViewSet):
         usuario.esta_activo = not usuario.esta_activo
         usuario.modificado_por = request.user.username if request.user.is_authenticated else 'Anónimo'
         usuario.save()
+        # Desactivar (o reactivar) debe reflejarse de inmediato en la autenticación
+        invalidar_token(usuario.session_token)
         
         serializer = self.get_serializer(usuario)
         return Response(serializer.data)
@@ -203,7 +211,9 @@ class UsuariosViewSet(viewsets.ModelViewSet):
 
     def perform_update(self, serializer):
         modificado_por = self.request.user.username if self.request.user.is_authenticated else 'system'
-        serializer.save(modificado_por=modificado_por)
+        usuario = serializer.save(modificado_por=modificado_por)
+        # Cambios de rol/casino deben verse en el siguiente request del usuario
+        invalidar_token(usuario.session_token)
 
     @action(detail=False, methods=['get'], url_path='dashboard-stats')
     def dashboard_stats(self, request):
@@ -275,6 +285,7 @@ class UsuariosViewSet(viewsets.ModelViewSet):
         })
 
     @action(detail=False, methods=['get'], url_path='reporte-diario')
+    @cachear_respuesta('usuarios.reporte_diario', casino=casino_de_parametro('casino'))
     def reporte_diario(self, request):
         """
         Genera el Reporte Diario de Operaciones para el Dashboard.
@@ -419,208 +430,33 @@ class UsuariosViewSet(viewsets.ModelViewSet):
     def global_search(self, request):
         """
         Búsqueda global (Spotlight) para el sistema.
-        Busca en múltiples modelos basado en el término 'q'.
-        
-        NUEVO: Recibe parámetro 'types' (separado por comas) para filtrar qué buscar.
+        Busca el término 'q' en el índice de búsqueda (ModelBase/busqueda.py):
+        una sola consulta indexada por prefijo y trigramas, ordenada por relevancia.
+
+        Recibe parámetro 'types' (separado por comas) para filtrar qué buscar y
+        'casino' (opcional) para limitar los resultados a ese casino.
         La seguridad y permisos (RBAC) se delegan al Frontend, el Backend busca lo que se le pide.
         """
-        from django.db.models import Q
-        
-        # Importación de Modelos
-        from Maquinas.models import Maquina
-        from Tickets.models import Ticket
-        from Proveedores.models import Proveedor
-        from ModelosMaquinas.models import ModeloMaquina
-        from InventarioSala.models import InventarioSala
-        from EvolucionNexus.models import EvolucionNexus
-        from Casinos.models import Casino
-        from AuditoriasExternas.models import AuditoriaServicioExterno
-        from IncidenciasInfraestructura.models import IncidenciaInfraestructura
-        from TareasEspeciales.models import TareaEspecial
-        from Wiki.models import WikiTecnica
+        from ModelBase.busqueda import buscar
 
         query = request.query_params.get('q', '').strip()
         requested_types = request.query_params.get('types', '').split(',')
         requested_types = [t.strip() for t in requested_types if t.strip()]
+        casino_id = request.query_params.get('casino')
 
         # Validación mínima
         if not query or len(query) < 2:
             return Response([])
+        if casino_id and not casino_id.isdigit():
+            return Response({'error': 'El parámetro casino debe ser numérico'}, status=status.HTTP_400_BAD_REQUEST)
 
-        results = []
-
-        # ==============================================================================
-        # CONFIGURACIÓN DE BÚSQUEDA
-        # ==============================================================================
-        SEARCH_CONFIG = [
-            {
-                'type': 'user',
-                'model': Usuarios,
-                'fields': ['username', 'nombres', 'apellido_paterno', 'apellido_materno'],
-                'icon': 'pi pi-user',
-                'label_fn': lambda x: f"{x.nombres} {x.apellido_paterno} {x.apellido_materno or ''}",
-                'sublabel_fn': lambda x: f"Usuario: {x.username} - {x.rol.nombre}",
-                'route_fn': lambda x: f"/admin/usuarios?search={x.username}"
-            },
-            {
-                'type': 'machine',
-                'model': Maquina,
-                'fields': ['uid_sala', 'numero_serie'],
-                'icon': 'pi pi-cog',
-                'label_fn': lambda x: f"{x.uid_sala} - {x.modelo.nombre_modelo}",
-                'sublabel_fn': lambda x: f"Serie: {x.numero_serie} - {x.casino.nombre}",
-                'route_fn': lambda x: f"/centro-servicios/maquinas"
-            },
-            {
-                'type': 'ticket',
-                'model': Ticket,
-                'fields': ['folio', 'id'],
-                'icon': 'pi pi-ticket',
-                'label_fn': lambda x: f"{x.folio}",
-                'sublabel_fn': lambda x: f"{x.get_categoria_display()} - {x.maquina.uid_sala if x.maquina else 'Sin Máquina'}",
-                'route_fn': lambda x: f"/centro-servicios/tickets"
-            },
-            {
-                'type': 'supplier',
-                'model': Proveedor,
-                'fields': ['nombre', 'rfc', 'nombre_contacto_tecnico'],
-                'icon': 'pi pi-truck',
-                'label_fn': lambda x: f"{x.nombre}",
-                'sublabel_fn': lambda x: f"RFC: {x.rfc} - Contacto: {x.nombre_contacto_tecnico or 'N/A'}",
-                'route_fn': lambda x: f"/centro-servicios/proveedores"
-            },
-            {
-                'type': 'model',
-                'model': ModeloMaquina,
-                'fields': ['nombre_modelo', 'nombre_producto'],
-                'icon': 'pi pi-list',
-                'label_fn': lambda x: f"{x.nombre_modelo}",
-                'sublabel_fn': lambda x: f"Producto: {x.nombre_producto} - Prov: {x.proveedor.nombre}",
-                'route_fn': lambda x: f"/centro-servicios/modelos"
-            },
-            {
-                'type': 'inventory',
-                'model': InventarioSala,
-                'fields': ['nombre'],
-                'icon': 'pi pi-box',
-                'label_fn': lambda x: f"{x.nombre}",
-                'sublabel_fn': lambda x: f"Tipo: {x.get_tipo_display()} - Cantidad: {x.cantidad}",
-                'route_fn': lambda x: f"/centro-servicios/inventario"
-            },
-            {
-                'type': 'evolution',
-                'model': EvolucionNexus,
-                'fields': ['titulo', 'descripcion'],
-                'icon': 'pi pi-bolt',
-                'label_fn': lambda x: f"{x.titulo}",
-                'sublabel_fn': lambda x: f"Evolución: {x.get_categoria_display()} - {x.get_estado_display()}",
-                'route_fn': lambda x: f"/evolucion-nexus"
-            },
-            {
-                'type': 'casino',
-                'model': Casino,
-                'fields': ['nombre', 'identificador', 'ciudad'],
-                'icon': 'pi pi-building',
-                'label_fn': lambda x: f"{x.nombre}",
-                'sublabel_fn': lambda x: f"{x.ciudad} - ID: {x.identificador or 'N/A'}",
-                'route_fn': lambda x: f"/admin/casinos"
-            },
-            # --- NUEVOS MODELOS AGREAGADOS ---
-            {
-                'type': 'audit',
-                'model': AuditoriaServicioExterno,
-                'fields': ['empresa_proveedora__nombre', 'nombre_tecnico_externo', 'descripcion_actividad'],
-                'icon': 'pi pi-file-check',
-                'label_fn': lambda x: f"Auditoria: {x.empresa_proveedora.nombre}",
-                'sublabel_fn': lambda x: f"Técnico: {x.nombre_tecnico_externo} - {x.get_area_acceso_display()}",
-                'route_fn': lambda x: f"/operatividad/auditorias-externas"
-            },
-            {
-                'type': 'infra',
-                'model': IncidenciaInfraestructura,
-                'fields': ['titulo', 'descripcion', 'categoria'],
-                'icon': 'pi pi-exclamation-triangle',
-                'label_fn': lambda x: f"Infra: {x.titulo}",
-                'sublabel_fn': lambda x: f"{x.get_categoria_display()} - {x.casino.nombre}",
-                'route_fn': lambda x: f"/operatividad/incidencias-infraestructura"
-            },
-            {
-                'type': 'task',
-                'model': TareaEspecial,
-                'fields': ['titulo', 'descripcion'],
-                'icon': 'pi pi-check-square',
-                'label_fn': lambda x: f"Tarea: {x.titulo}",
-                'sublabel_fn': lambda x: f"{x.get_prioridad_display()} - {x.get_estatus_display()}",
-                'route_fn': lambda x: f"/operatividad/tareas-especiales"
-            },
-            {
-                'type': 'wiki',
-                'model': WikiTecnica,
-                'fields': ['titulo_guia', 'categoria'],
-                'icon': 'pi pi-book',
-                'label_fn': lambda x: f"Wiki: {x.titulo_guia}",
-                'sublabel_fn': lambda x: f"Categoría: {x.get_categoria_display()}",
-                'route_fn': lambda x: f"/centro-servicios/wiki"
-            }
-        ]
-
-        # ==============================================================================
-        # MOTOR DE BÚSQUEDA
-        # ==============================================================================
-        
-        for config in SEARCH_CONFIG:
-            # 1. Filtrado frontend: Si se especificaron 'types' y este no está, saltar.
-            # Si 'types' viene vacío, buscamos en TODO (comportamiento default permisivo o restrictivo según se desee, aqui permisivo).
-            if requested_types and config['type'] not in requested_types:
-                continue
-
-            # 2. Construir Query
-            q_objects = Q()
-            for field in config['fields']:
-                q_objects |= Q(**{f"{field}__icontains": query})
-
-            # 3. Ejecutar Consulta
-            try:
-                queryset = config['model'].objects.filter(q_objects)
-                
-                # Optimizaciones select_related
-                if config['type'] == 'user':
-                    queryset = queryset.select_related('rol')
-                elif config['type'] == 'machine':
-                    queryset = queryset.select_related('modelo', 'casino')
-                elif config['type'] == 'ticket':
-                    queryset = queryset.select_related('maquina')
-                elif config['type'] == 'supplier':
-                    queryset = queryset.select_related('casino')
-                elif config['type'] == 'model':
-                    queryset = queryset.select_related('proveedor')
-                elif config['type'] == 'audit':
-                    queryset = queryset.select_related('empresa_proveedora')
-                elif config['type'] == 'infra':
-                    queryset = queryset.select_related('casino')
-                elif config['type'] == 'wiki':
-                    pass # Wiki no tiene relaciones complejas urgentes para listado
-                
-                queryset = queryset[:5] # Limite para no saturar
-
-                for item in queryset:
-                    results.append({
-                        'type': config['type'],
-                        'label': config['label_fn'](item),
-                        'sublabel': config['sublabel_fn'](item),
-                        'icon': config['icon'],
-                        'route': config['route_fn'](item)
-                    })
-            except Exception as e:
-                print(f"Error buscando en {config['type']}: {str(e)}")
-                continue
-
-        return Response(results)
+        return Response(buscar(query, tipos=requested_types, casino_id=int(casino_id) if casino_id else None))
 
     def destroy(self, request, *args, **kwargs):
         """Implementa borrado lógico e invalida tokens de sesión."""
         instance = self.get_object()
         instance.esta_activo = False
+        invalidar_token(instance.session_token)
         instance.session_token = None
         instance.refresh_token = None
         instance.modificado_por = self.request.user.username if self.request.user.is_authenticated else 'system'
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.2 on 2026-10-18 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('VaciosTickets', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ticketvacio',
+            index=models.Index(fields=['fecha_creacion'], name='VaciosTicke_fecha_c_0f2236_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 6.0.2 on 2026-10-18 18:40
+
+import ModelBase.almacen_contenido
+import VaciosTickets.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('VaciosTickets', '0002_ticketvacio_indice_fecha_creacion'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ticketvacio',
+            name='foto_ultimas_operaciones',
+            field=models.ImageField(help_text='Captura de las últimas transacciones registradas en la máquina', storage=ModelBase.almacen_contenido.almacen_contenido, upload_to=VaciosTickets.models.vacio_foto_upload, verbose_name='Foto: Últimas Operaciones'),
+        ),
+        migrations.AlterField(
+            model_name='ticketvacio',
+            name='foto_carga_sistema',
+            field=models.ImageField(help_text='Captura de la pantalla del sistema en el momento de la carga', storage=ModelBase.almacen_contenido.almacen_contenido, upload_to=VaciosTickets.models.vacio_foto_upload, verbose_name='Foto: Carga en Sistema'),
+        ),
+        migrations.AlterField(
+            model_name='ticketvacio',
+            name='foto_seguimiento_slot',
+            field=models.ImageField(help_text='Captura del seguimiento de slot / historial de la máquina', storage=ModelBase.almacen_contenido.almacen_contenido, upload_to=VaciosTickets.models.vacio_foto_upload, verbose_name='Foto: Seguimiento Slot'),
+        ),
+        migrations.AlterField(
+            model_name='ticketvacio',
+            name='foto_recarga_error',
+            field=models.ImageField(help_text='Captura del error mostrado durante el intento de recarga', storage=ModelBase.almacen_contenido.almacen_contenido, upload_to=VaciosTickets.models.vacio_foto_upload, verbose_name='Foto: Error de Recarga'),
+        ),
+    ]
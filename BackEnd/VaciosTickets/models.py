@@ -1,4 +1,5 @@
 from django.db import models
+from ModelBase.almacen_contenido import almacen_contenido
 from ModelBase.models import ModeloBase
 from Casinos.models import Casino
 from Maquinas.models import Maquina
@@ -8,7 +9,11 @@ from datetime import datetime
 
 
 def vacio_foto_upload(instance, filename):
-    """Genera ruta dinámica para subir imágenes de evidencia de vacíos."""
+    """
+    Genera ruta dinámica para subir imágenes de evidencia de vacíos. Con el
+    almacén por contenido solo se conserva la extensión: el nombre final es
+    el SHA-256 de la imagen (ver ModelBase/almacen_contenido.py).
+    """
     base, ext = os.path.splitext(filename)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     ticket_id = instance.pk if instance.pk else 'new'
@@ -157,21 +162,25 @@ class TicketVacio(ModeloBase):
 
     foto_ultimas_operaciones = models.ImageField(
         upload_to=vacio_foto_upload,
+        storage=almacen_contenido,
         verbose_name='Foto: Últimas Operaciones',
         help_text='Captura de las últimas transacciones registradas en la máquina'
     )
     foto_carga_sistema = models.ImageField(
         upload_to=vacio_foto_upload,
+        storage=almacen_contenido,
         verbose_name='Foto: Carga en Sistema',
         help_text='Captura de la pantalla del sistema en el momento de la carga'
     )
     foto_seguimiento_slot = models.ImageField(
         upload_to=vacio_foto_upload,
+        storage=almacen_contenido,
         verbose_name='Foto: Seguimiento Slot',
         help_text='Captura del seguimiento de slot / historial de la máquina'
     )
     foto_recarga_error = models.ImageField(
         upload_to=vacio_foto_upload,
+        storage=almacen_contenido,
         verbose_name='Foto: Error de Recarga',
         help_text='Captura del error mostrado durante el intento de recarga'
     )
@@ -238,6 +247,9 @@ class TicketVacio(ModeloBase):
         verbose_name = 'Ticket de Vacío'
         verbose_name_plural = 'Tickets de Vacíos'
         ordering = ['-fecha_creacion']
+        indexes = [
+            models.Index(fields=['fecha_creacion']),
+        ]
 
     def __str__(self):
         return f'Vacío #{self.pk} | {self.casino.nombre} | ${self.monto_extraviado} | {self.get_estado_operativo_display()}'
@@ -1,7 +1,15 @@
 from rest_framework import serializers
 from django.utils import timezone
+from ModelBase.derivados import DerivadosImagen
 from .models import ConfiguracionCasino, TicketVacio
 
+FOTOS_EVIDENCIA = [
+    'foto_ultimas_operaciones',
+    'foto_carga_sistema',
+    'foto_seguimiento_slot',
+    'foto_recarga_error',
+]
+
 
 class ConfiguracionCasinoSerializer(serializers.ModelSerializer):
     casino_nombre = serializers.CharField(source='casino.nombre', read_only=True)
@@ -31,6 +39,9 @@ class TicketVacioSerializer(serializers.ModelSerializer):
         source='get_motivo_falla_display', read_only=True
     )
 
+    # URLs de las fotos por tamaño: {campo: {mini, medio, original}}
+    fotos = DerivadosImagen(FOTOS_EVIDENCIA, tamanos=('mini', 'medio', 'original'))
+
     class Meta:
         model = TicketVacio
         fields = '__all__'
@@ -70,13 +81,7 @@ class TicketVacioSerializer(serializers.ModelSerializer):
         """Valida que las 4 fotos estén presentes en la creación."""
         request = self.context.get('request')
         if request and request.method == 'POST':
-            fotos_requeridas = [
-                'foto_ultimas_operaciones',
-                'foto_carga_sistema',
-                'foto_seguimiento_slot',
-                'foto_recarga_error',
-            ]
-            faltantes = [f for f in fotos_requeridas if not data.get(f)]
+            faltantes = [f for f in FOTOS_EVIDENCIA if not data.get(f)]
             if faltantes:
                 raise serializers.ValidationError(
                     {f: 'Este campo de imagen es obligatorio.' for f in faltantes}
@@ -84,6 +89,18 @@ class TicketVacioSerializer(serializers.ModelSerializer):
         return data
 
 
+class TicketVacioListaSerializer(TicketVacioSerializer):
+    """
+    Filas de los listados: sin las URLs de los originales ni del tamaño
+    medio, solo las miniaturas. El detalle se pide a /api/vacios/tickets/{id}/.
+    """
+    fotos = DerivadosImagen(FOTOS_EVIDENCIA, tamanos=('mini',))
+
+    class Meta(TicketVacioSerializer.Meta):
+        fields = None
+        exclude = FOTOS_EVIDENCIA
+
+
 class AuditoriaVacioSerializer(serializers.Serializer):
     """
     Serializador mínimo para la acción de auditoría.
@@ -11,8 +11,12 @@ from .models import ConfiguracionCasino, TicketVacio
 from .serializers import (
     ConfiguracionCasinoSerializer,
     TicketVacioSerializer,
+    TicketVacioListaSerializer,
     AuditoriaVacioSerializer,
 )
+from ModelBase.cache_respuestas import cachear_respuesta, casino_de_url
+from ModelBase.exportacion import respuesta_exportacion
+from ModelBase.paginacion import PaginacionKeysetOpcional
 
 logger = logging.getLogger(__name__)
 
@@ -73,6 +77,9 @@ class TicketVacioViewSet(viewsets.ModelViewSet):
     ]
     search_fields = ['cliente_nombre', 'explicacion_detallada', 'maquina__uid_sala']
     ordering_fields = ['fecha_creacion', 'monto_extraviado']
+    # Paginación por cursor (fecha_creacion, id) solo con ?cursor= o ?page_size=
+    pagination_class = PaginacionKeysetOpcional
+    cursor_campo = 'fecha_creacion'
 
     def get_queryset(self):
         return TicketVacio.objects.select_related(
@@ -82,6 +89,12 @@ class TicketVacioViewSet(viewsets.ModelViewSet):
             'gerente_auditor',
         ).all().order_by('-fecha_creacion')
 
+    def get_serializer_class(self):
+        # Los listados solo llevan miniaturas de las fotos de evidencia
+        if self.action == 'list':
+            return TicketVacioListaSerializer
+        return TicketVacioSerializer
+
     # ── Creación ──────────────────────────────────────────────────────────
 
     def perform_create(self, serializer):
@@ -91,6 +104,32 @@ class TicketVacioViewSet(viewsets.ModelViewSet):
         """
         serializer.save(tecnico_creador=self.request.user)
 
+    # ── Exportación ───────────────────────────────────────────────────────
+
+    @action(detail=False, methods=['get'], url_path='exportar')
+    def exportar(self, request):
+        """
+        Exporta tickets de vacíos en streaming (NDJSON o CSV) por rango y casino.
+        Endpoint: /api/vacios/tickets/exportar/?formato=csv&desde=2026-01-01&casino=3
+        """
+        return respuesta_exportacion(
+            request,
+            self.filter_queryset(self.get_queryset()),
+            columnas=[
+                'id', 'fecha_creacion',
+                ('casino_nombre', 'casino__nombre'),
+                ('maquina_uid_sala', 'maquina__uid_sala'),
+                'cliente_nombre', 'monto_extraviado', 'motivo_falla', 'explicacion_detallada',
+                'estado_operativo', 'estado_auditoria',
+                ('tecnico_creador_username', 'tecnico_creador__username'),
+                ('gerente_auditor_username', 'gerente_auditor__username'),
+                'fecha_auditoria',
+            ],
+            campo_fecha='fecha_creacion',
+            campo_casino='casino',
+            nombre='vacios',
+        )
+
     # ── Acción de Auditoría Gerencial ─────────────────────────────────────
 
     @action(detail=True, methods=['post'], url_path='emitir_veredicto')
@@ -172,6 +211,7 @@ class TicketVacioViewSet(viewsets.ModelViewSet):
     # ── Historial por casino ──────────────────────────────────────────────
 
     @action(detail=False, methods=['get'], url_path='por_casino/(?P<casino_id>[^/.]+)')
+    @cachear_respuesta('vacios.por_casino', casino=casino_de_url)
     def por_casino(self, request, casino_id=None):
         """
         Devuelve el historial de tickets de vacíos de un casino específico.
@@ -187,7 +227,7 @@ class TicketVacioViewSet(viewsets.ModelViewSet):
         if estado_aud:
             qs = qs.filter(estado_auditoria=estado_aud)
 
-        serializer = TicketVacioSerializer(qs, many=True, context={'request': request})
+        serializer = TicketVacioListaSerializer(qs, many=True, context={'request': request})
 
         stats = {
             'total': qs.count(),
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.2 on 2026-10-18 18:40
+
+import ModelBase.almacen_contenido
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Wiki', '0002_gamificacion_wiki_flujo_aprobacion'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='wikitecnica',
+            name='archivo_pdf',
+            field=models.FileField(help_text='Documento oficial con la resolución o manual técnico', storage=ModelBase.almacen_contenido.almacen_contenido, upload_to='wiki_tecnica/pdfs/', verbose_name='Archivo PDF'),
+        ),
+    ]
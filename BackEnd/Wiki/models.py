@@ -1,4 +1,5 @@
 from django.db import models
+from ModelBase.almacen_contenido import almacen_contenido
 from ModelBase.models import ModeloBase
 from Usuarios.models import Usuarios # Importación directa solicitada
 from Casinos.models import Casino
@@ -62,6 +63,7 @@ class WikiTecnica(ModeloBase):
 
     archivo_pdf = models.FileField(
         upload_to='wiki_tecnica/pdfs/',
+        storage=almacen_contenido,
         verbose_name="Archivo PDF",
         help_text="Documento oficial con la resolución o manual técnico"
     )
@@ -14,7 +14,7 @@ from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
 from .models import WikiTecnica
 from Notificaciones.models import Notificacion
-from Roles.models import Rol
+from Notificaciones.despacho import notificar_por_rol_y_casino
 
 
 # ── 1. Al recibir una nueva propuesta → notificar al Administrador ─────────
@@ -49,14 +49,8 @@ def wiki_detectar_publicacion(sender, instance, **kwargs):
     Detecta si el estado está cambiando a 'publicada' y guarda el estado anterior
     en el atributo transitorio `_estado_anterior` para que post_save lo use.
     """
-    if instance.pk:
-        try:
-            anterior = WikiTecnica.objects.get(pk=instance.pk)
-            instance._estado_anterior = anterior.estado
-        except WikiTecnica.DoesNotExist:
-            instance._estado_anterior = None
-    else:
-        instance._estado_anterior = None
+    # Se lee de la foto de ModeloBase (previous), sin consultar la BD.
+    instance._estado_anterior = instance.previous('estado')
 
 
 @receiver(post_save, sender=WikiTecnica)
@@ -78,8 +72,6 @@ def wiki_post_publicacion(sender, instance, created, **kwargs):
     casino = instance.casino_origen
     puntos = instance.puntos_reconocimiento
 
-    roles_tecnicos = Rol.objects.filter(nombre__in=['TECNICO', 'SUP SISTEMAS'])
-
     contenido_red = (
         f"{autor.nombres} {autor.apellido_paterno} publicó una nueva guía técnica: "
         f'"{instance.titulo_guia}" para el modelo {modelo.nombre_modelo}. '
@@ -87,15 +79,14 @@ def wiki_post_publicacion(sender, instance, created, **kwargs):
     )
 
     if casino:
-        for rol in roles_tecnicos:
-            Notificacion.objects.create(
-                titulo='📚 Nueva Guía Técnica Disponible',
-                contenido=contenido_red,
-                nivel='informativa',
-                tipo='wiki',
-                casino_destino=casino,
-                rol_destino=rol,
-            )
+        notificar_por_rol_y_casino(
+            titulo='📚 Nueva Guía Técnica Disponible',
+            contenido=contenido_red,
+            nivel='informativa',
+            tipo='wiki',
+            casino=casino,
+            nombres_rol=['TECNICO', 'SUP SISTEMAS'],
+        )
     else:
         Notificacion.objects.create(
             titulo='📚 Nueva Guía Técnica Global Disponible',
@@ -4,23 +4,84 @@ import api from './api';
  * Servicio para el Mapa Interactivo de Sala (Digital Twin)
  */
 
+/**
+ * Reconstruye la lista de máquinas (mismos campos que MaquinaMapaSerializer)
+ * a partir de la respuesta `formato=columnar`: arreglos paralelos por campo
+ * más tablas de búsqueda para estados, pisos, salas, modelos, proveedores y
+ * denominaciones (ver BackEnd/Maquinas/mapa_columnar.py).
+ * @param {Object} data - Respuesta de mapa-completo con formato columnar
+ * @returns {Object} La misma respuesta con `maquinas` como arreglo de objetos
+ */
+export function desempaquetarMapaColumnar(data) {
+    const { maquinas: m, tablas: t } = data;
+    const etiquetaPiso = Object.fromEntries((data.piso_choices || []).map((c) => [c.value, c.label]));
+    const etiquetaSala = Object.fromEntries((data.sala_choices || []).map((c) => [c.value, c.label]));
+
+    const maquinas = m.id.map((id, i) => {
+        const modelo = m.modelo[i];
+        const proveedor = modelo !== null ? t.modelos.proveedor[modelo] : null;
+        const piso = t.pisos[m.piso[i]];
+        const sala = t.salas[m.sala[i]];
+        return {
+            id,
+            uid: m.uid[i],
+            uid_sala: m.uid[i],
+            juego: m.juego[i],
+            coordenada_x: m.x[i],
+            coordenada_y: m.y[i],
+            ubicacion_piso: piso,
+            ubicacion_piso_label: etiquetaPiso[piso] ?? piso,
+            ubicacion_sala: sala,
+            ubicacion_sala_label: etiquetaSala[sala] ?? sala,
+            estado_actual: t.estados[m.estado[i]],
+            contador_fallas: m.fallas[i],
+            casino: data.casino.id,
+            casino_nombre: data.casino.nombre,
+            modelo_nombre: modelo !== null ? t.modelos.nombre[modelo] : null,
+            modelo_producto: modelo !== null ? t.modelos.producto[modelo] : null,
+            proveedor_id: proveedor !== null ? t.proveedores.id[proveedor] : null,
+            proveedor_nombre: proveedor !== null ? t.proveedores.nombre[proveedor] : null,
+            proveedor_rfc: proveedor !== null ? t.proveedores.rfc[proveedor] : null,
+            proveedor_email: proveedor !== null ? t.proveedores.email[proveedor] : null,
+            proveedor_telefono: proveedor !== null ? t.proveedores.telefono[proveedor] : null,
+            ip_maquina: m.ip[i],
+            numero_serie: m.serie[i],
+            ultimo_mantenimiento: m.ultimo_mantenimiento[i],
+            fecha_vencimiento_licencia: m.vencimiento_licencia[i],
+            dias_licencia: m.dias_licencia[i],
+            fecha_instalacion: m.instalacion[i],
+            denominaciones_info: m.denominaciones[i].map((d) => ({
+                id: t.denominaciones.id[d],
+                etiqueta: t.denominaciones.etiqueta[d],
+                valor: t.denominaciones.valor[d]
+            }))
+        };
+    });
+
+    const { tablas, formato, ...resto } = data;
+    return { ...resto, maquinas };
+}
+
 /**
  * Obtiene la configuración del grid y las máquinas de un casino.
+ * Se pide en formato columnar (más ligero) y se desempaqueta aquí, de modo
+ * que el resto de la vista recibe la misma estructura de siempre.
  * @param {number|string} casinoId  - ID del casino
  * @param {string} [piso]           - Clave de piso para filtrar (opcional)
  * @param {string} [area]           - Clave de área/sala para filtrar (opcional)
- * @returns {Promise<Object>} { casino, pisos_disponibles, areas_disponibles, piso_choices, sala_choices, maquinas, total }
+ * @returns {Promise<Object>} { version, casino, pisos_disponibles, areas_disponibles, piso_choices, sala_choices, maquinas, total }
  */
 export async function obtenerMapaCasino(casinoId, piso = null, area = null) {
     try {
-        const params = { casino_id: casinoId };
+        const params = { casino_id: casinoId, formato: 'columnar' };
         if (piso) params.piso = piso;
         if (area) params.area = area;
 
         const response = await api.get('maquinas/mapa-completo/', { params });
+        const data = response.data.formato === 'columnar' ? desempaquetarMapaColumnar(response.data) : response.data;
         return {
             exito: true,
-            data: response.data
+            data
         };
     } catch (error) {
         console.error('Error al obtener el mapa del casino:', error);
@@ -31,6 +92,35 @@ export async function obtenerMapaCasino(casinoId, piso = null, area = null) {
     }
 }
 
+/**
+ * Cambios del mapa posteriores a la versión `since` (la `version` de la
+ * última respuesta de obtenerMapaCasino o de esta misma función).
+ * @param {number|string} casinoId  - ID del casino
+ * @param {number} since            - Versión de la última carga aplicada
+ * @param {string} [piso]           - Mismo filtro de piso de la carga
+ * @param {string} [area]           - Mismo filtro de área/sala de la carga
+ * @returns {Promise<Object>} { exito, data: { version, snapshot, maquinas, eliminadas } }
+ */
+export async function obtenerCambiosMapa(casinoId, since, piso = null, area = null) {
+    try {
+        const params = { casino_id: casinoId, since };
+        if (piso) params.piso = piso;
+        if (area) params.area = area;
+
+        const response = await api.get('maquinas/mapa-cambios/', { params });
+        return {
+            exito: true,
+            data: response.data
+        };
+    } catch (error) {
+        console.error('Error al obtener cambios del mapa:', error);
+        return {
+            exito: false,
+            error: error.response?.data?.error || 'No se pudieron obtener los cambios del mapa'
+        };
+    }
+}
+
 /**
  * Actualiza las coordenadas X e Y de una máquina en el mapa.
  * @param {number} maquinaId  - PK de la máquina
@@ -65,7 +155,71 @@ export async function actualizarCoordenadas(maquinaId, x, y) {
     }
 }
 
+/**
+ * Mueve o intercambia varias máquinas de una sala en una sola transacción.
+ * El backend valida el resultado final, así que un intercambio son dos
+ * movimientos cruzados.
+ * @param {number|string} casinoId  - ID del casino
+ * @param {string} piso             - Clave de piso de la sala
+ * @param {string} area             - Clave de área/sala
+ * @param {Array<Object>} movimientos - [{ id, coordenada_x, coordenada_y }, ...]
+ * @returns {Promise<Object>} { exito, data: { movidas, maquinas }, error }
+ */
+export async function reacomodarMaquinas(casinoId, piso, area, movimientos) {
+    try {
+        const response = await api.post('maquinas/reacomodar/', { piso, area, movimientos }, {
+            params: { casino_id: casinoId }
+        });
+        return {
+            exito: true,
+            data: response.data
+        };
+    } catch (error) {
+        console.error('Error al reacomodar máquinas:', error);
+        const status = error.response?.status;
+        return {
+            exito: false,
+            error: status === 409
+                ? error.response?.data?.error || 'Alguna posición ya está ocupada'
+                : error.response?.data?.error || 'No se pudieron reacomodar las máquinas'
+        };
+    }
+}
+
+/**
+ * Celda libre más cercana a (x, y) en una sala (para máquinas nuevas).
+ * @param {number|string} casinoId  - ID del casino
+ * @param {string} piso             - Clave de piso
+ * @param {string} area             - Clave de área/sala
+ * @param {number} [x]              - Columna de referencia (por defecto 1)
+ * @param {number} [y]              - Fila de referencia (por defecto 1)
+ * @returns {Promise<Object>} { exito, data: { coordenada_x, coordenada_y }, error }
+ */
+export async function buscarCeldaLibre(casinoId, piso, area, x = null, y = null) {
+    try {
+        const params = { casino_id: casinoId, piso, area };
+        if (x !== null) params.x = x;
+        if (y !== null) params.y = y;
+
+        const response = await api.get('maquinas/celda-libre/', { params });
+        return {
+            exito: true,
+            data: response.data
+        };
+    } catch (error) {
+        console.error('Error al buscar celda libre:', error);
+        return {
+            exito: false,
+            error: error.response?.data?.error || 'No se pudo buscar una celda libre'
+        };
+    }
+}
+
 export default {
     obtenerMapaCasino,
-    actualizarCoordenadas
+    desempaquetarMapaColumnar,
+    obtenerCambiosMapa,
+    actualizarCoordenadas,
+    reacomodarMaquinas,
+    buscarCeldaLibre
 };
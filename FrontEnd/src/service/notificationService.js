@@ -29,10 +29,11 @@
  * 
  * La tabla tiene unique_together=['notificacion', 'usuario'] para evitar duplicados.
  * 
- * POLLING:
- * --------
- * Se recomienda polling cada 45 segundos usando fetchNotificacionesNoLeidas()
- * para obtener el count de notificaciones no leídas sin sobrecargar el servidor.
+ * ENTREGA EN VIVO:
+ * ----------------
+ * suscribirStreamNotificaciones() mantiene abierto un stream SSE y avisa de
+ * cada notificación nueva. El polling cada 45 segundos queda solo como
+ * respaldo si el stream no está disponible.
  * 
  * ============================================================================
  */
@@ -593,6 +594,93 @@ export const getColorNivel = (nivel) => {
   return colores[nivel] || '#3b82f6';
 };
 
+// ============================================================================
+// ENTREGA EN VIVO (SSE)
+// ============================================================================
+
+/**
+ * Suscribirse al stream de notificaciones en vivo
+ *
+ * FUNCIONAMIENTO:
+ * ---------------
+ * - Abre GET notificaciones/stream/ (Server-Sent Events) con fetch para poder
+ *   enviar el header Authorization (EventSource no lo permite)
+ * - El backend envía cada notificación nueva de la audiencia del usuario en
+ *   cuanto se crea; mientras no hay novedades solo envía pings (sin costo en BD)
+ * - El servidor cierra la conexión cada pocos minutos: se reconecta sola
+ *   enviando Last-Event-ID para no perder eventos
+ *
+ * @param {Object} handlers
+ * @param {Function} handlers.onNotificacion - Recibe el objeto notificación
+ * @param {Function} handlers.onResync - El cliente debe recargar la lista por REST
+ * @param {Function} handlers.onError - Error no recuperable (ej. 401); se detiene
+ * @returns {Function} Función para cerrar la suscripción
+ */
+export const suscribirStreamNotificaciones = ({ onNotificacion, onResync, onError } = {}) => {
+  const controller = new AbortController();
+  let ultimoId = null;
+  let reintentoMs = 5000;
+  let cerrado = false;
+
+  const procesarBloque = (bloque) => {
+    let evento = 'message';
+    let datos = '';
+    for (const linea of bloque.split('\n')) {
+      if (linea.startsWith('id: ')) ultimoId = linea.slice(4);
+      else if (linea.startsWith('event: ')) evento = linea.slice(7);
+      else if (linea.startsWith('data: ')) datos += linea.slice(6);
+      else if (linea.startsWith('retry: ')) reintentoMs = parseInt(linea.slice(7), 10) || reintentoMs;
+    }
+    if (evento === 'notificacion' && onNotificacion) onNotificacion(JSON.parse(datos));
+    else if (evento === 'resync' && onResync) onResync();
+  };
+
+  const conectar = async () => {
+    while (!cerrado) {
+      try {
+        const headers = { Accept: 'text/event-stream' };
+        const token = localStorage.getItem('token');
+        if (token) headers.Authorization = `Bearer ${token}`;
+        if (ultimoId) headers['Last-Event-ID'] = ultimoId;
+
+        const response = await fetch(`${notificationApi.defaults.baseURL}notificaciones/stream/`, {
+          headers,
+          signal: controller.signal
+        });
+        if (response.status === 401 || response.status === 403) {
+          if (onError) onError(new Error('No autorizado'));
+          return;
+        }
+        if (!response.ok || !response.body) throw new Error(`HTTP ${response.status}`);
+
+        const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+        let buffer = '';
+        while (true) {
+          const { value, done } = await reader.read();
+          if (done) break;
+          buffer += value;
+          let corte;
+          while ((corte = buffer.indexOf('\n\n')) !== -1) {
+            procesarBloque(buffer.slice(0, corte));
+            buffer = buffer.slice(corte + 2);
+          }
+        }
+      } catch (error) {
+        if (cerrado || error.name === 'AbortError') return;
+      }
+      // Cierre normal del servidor o error de red: reconectar tras `retry`
+      await new Promise((resolve) => setTimeout(resolve, reintentoMs));
+    }
+  };
+
+  conectar();
+
+  return () => {
+    cerrado = true;
+    controller.abort();
+  };
+};
+
 // ============================================================================
 // EXPORTACIÓN DEFAULT (Para importar todo el servicio)
 // ============================================================================
@@ -609,5 +697,6 @@ export default {
   marcarTodasLeidas,
   getNivelPrioridad,
   getIconoNivel,
-  getColorNivel
+  getColorNivel,
+  suscribirStreamNotificaciones
 };